@@ -22,8 +22,15 @@ Author: Walker M. White (wmw2)
 Date:   November 1, 2020
 """
 from consts import *
-from app import *
 
 # Application code
 if __name__ == '__main__':
-    Froggit(width=GAME_WIDTH,height=GAME_HEIGHT).run()
+    if REPLAY_HEADLESS:
+        # Never import the application (and Kivy) for a headless replay
+        from replay import replayHeadless
+        replayHeadless(REPLAY_FILE)
+    else:
+        from app import *
+        Froggit(width=GAME_WIDTH,height=GAME_HEIGHT,
+                timestep=GAME_TIMESTEP,maxsteps=GAME_MAXSTEPS,
+                profile=not PROFILE_FILE is None).run()
@@ -12,6 +12,7 @@ John Fernandez jmf433
 from consts import *
 from game2d import *
 from level import *
+from replay import *
 import introcs
 
 from kivy.logger import Logger
@@ -60,12 +61,21 @@ class Froggit(GameApp):
     # Attribute _level: The subcontroller for a level, managing the frog and obstacles
     # Invariant: _level is a Level object or None if no level is currently active
     #
+    # Attribute _data: The parsed level file, loaded once for the whole session
+    # Invariant: _data is a dictionary or None if no level has been loaded yet
+    #
+    # Attribute _hitboxes: The parsed object data file, loaded once for the whole session
+    # Invariant: _hitboxes is a dictionary or None if no level has been loaded yet
+    #
     # Attribute _title: The title of the game
     # Invariant: _title is a GLabel, or None if there is no title to display
     #
     # Attribute _text: A message to display to the player
     # Invariant: _text is a GLabel, or None if there is no message to display
     #
+    # Attribute _text2: A second message to display to the player
+    # Invariant: _text2 is a GLabel, or None if there is no message to display
+    #
     # Attribute _lastS: Whether 's' key was pressed in the last frame or not
     # Invariant: _lastS is a bool
     #
@@ -77,6 +87,18 @@ class Froggit(GameApp):
     #
     # Attribute _currentC: If 'c' key is currently being pressed
     # Invariant: _currentC is a bool
+    #
+    # Attribute _levelName: The level file that is played
+    # Invariant: _levelName is a str
+    #
+    # Attribute _mask: The keys held down this frame (see replay.py)
+    # Invariant: _mask is an int in 0..255
+    #
+    # Attribute _replay: The frames left to replay
+    # Invariant: _replay is a generator of (mask,dt) tuples, or None if not replaying
+    #
+    # Attribute _recorder: The recorder for this play session
+    # Invariant: _recorder is a Recorder object, or None if not recording
 
     def start(self):
         """
@@ -91,9 +113,78 @@ class Froggit(GameApp):
         given invariants. When done, it sets the _state to STATE_INACTIVE and
         creates both the title (in attribute _title) and a message (in attribute
         _text) saying that the user should press a key to play a game.
+
+        If a recording was given on the command line, the input is taken from that
+        recording until it runs out. If a record file was given, every frame of input
+        is recorded to that file.
+
+        The images of the obstacles and frogs are packed into a texture atlas (built
+        the first time, and whenever an image changes).
+        """
+        self._mask = 0
+        self._replay = None
+        self._recorder = None
+        self._levelName = DEFAULT_LEVEL
+        if not REPLAY_FILE is None:
+            recording = Recording.load(REPLAY_FILE)
+            if recording.speed != FROG_SPEED:
+                Logger.warning('Froggit: %s was recorded with frog speed %s, not %s' %
+                               (REPLAY_FILE,recording.speed,FROG_SPEED))
+            self._levelName = recording.level
+            self._replay = recording.frames()
+        if not RECORD_FILE is None:
+            self._recorder = Recorder(RECORD_FILE,self._levelName)
+        if not ATLAS_NAME is None:
+            images = self._atlasImages(self.load_json(OBJECT_DATA))
+            self.load_atlas(ATLAS_NAME,images,ATLAS_SIZE)
+        self._newGame()
+
+    def on_stop(self):
+        """
+        Finishes the recording and the profile (if any) when the game window closes.
+        """
+        if not self._recorder is None:
+            self._recorder.close()
+        if not self.profiler is None and not PROFILE_FILE is None:
+            self.profiler.write_trace(PROFILE_FILE)
+            summary = self.profiler.summary()
+            Logger.info('Froggit: %d frames, %d late, %d over budget, %d updates dropped' %
+                        (summary['frames'],summary['late'],summary['over_budget'],
+                         summary['dropped']))
+            for name in sorted(summary['phases']):
+                phase = summary['phases'][name]
+                Logger.info('Froggit: %-12s mean %.3fms p50 %.3fms p99 %.3fms' %
+                            (name,phase['mean'],phase['p50'],phase['p99']))
+
+    def _atlasImages(self,data):
+        """
+        Returns the sorted list of image files to pack into the texture atlas
+
+        These are the images of every object and sprite sheet in the object data file,
+        plus the safe frog and the life meter. Files that are not in the Images folder
+        are left out. The lane backgrounds are never packed, as a tile must be its own
+        texture to repeat across a lane in a single quad (see GTile).
+
+        Parameter data: The parsed object data file
+        Precondition: data is a dictionary with the keys 'images' and 'sprites'
+        """
+        names = set([FROG_SAFE,FROG_HEAD])
+        for kind in data['images']:
+            names.add(kind+'.png')
+            names.add(data['images'][kind]['file'])
+        for kind in data['sprites']:
+            names.add(data['sprites'][kind]['file'])
+        return sorted(name for name in names if self.is_image(name))
+
+    def _newGame(self):
+        """
+        Resets the game to STATE_INACTIVE, with the title and start message.
         """
         self._state = STATE_INACTIVE
         self._level = None
+        self._data = None
+        self._hitboxes = None
+        self._text2 = None
 
         if self._state == STATE_INACTIVE:
             self._title = GLabel(text='FROGGIT', font_name='Spongeboy.ttf')
@@ -134,7 +225,8 @@ class Froggit(GameApp):
         This state only lasts one animation frame (the amount of time to load
         the data from the file) before switching to STATE_ACTIVE. One of the
         key things about this state is that it resizes the window to match the
-        level file.
+        level file. A level larger than VIEW_MAXWIDTH x VIEW_MAXHEIGHT does not
+        fit, and the window scrolls to follow the frog instead.
 
         STATE_ACTIVE: This is a session of normal gameplay. The player can
         move the frog towards the exit, and the game will move all obstacles
@@ -159,6 +251,7 @@ class Froggit(GameApp):
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
+        dt = self._readInput(dt)
         if self._state == STATE_INACTIVE:
             self._stateInactive()
         elif self._state == STATE_LOADING:
@@ -184,17 +277,85 @@ class Froggit(GameApp):
         getters for these attributes or you need to add a draw method to
         those two classes.  We suggest the latter.  See the example subcontroller.py
         from the lesson videos.
+
+        The game runs with a fixed timestep, so update may run several times (or not
+        at all) between two calls to draw. Therefore, the state helpers never draw
+        anything. While the game is active, the level is drawn in between its last two
+        frames, according to the interpolation factor alpha. The level is attached to the
+        view when it is loaded, so drawing it only moves the objects already on screen.
         """
         if self._state == STATE_INACTIVE:
             self._title.draw(self.view)
             self._text.draw(self.view)
+        elif not self._level is None:
+            self.view.camera.look_at(self._level.getFrogX(),self._level.getFrogY())
+            if self._state == STATE_ACTIVE:
+                self._level.draw(self.view,self.alpha)
+            else:
+                self._level.draw(self.view)
+            if not self._text is None:
+                self._text.draw(self.view)
+            if not self._text2 is None:
+                self._text2.draw(self.view)
+
+    def _readInput(self,dt):
+        """
+        Reads the keys held down this frame into _mask, and returns the frame time
+
+        While replaying, both the keys and the frame time come from the recording.
+        Otherwise they come from the player, and are recorded if there is a recorder.
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        if not self._replay is None:
+            frame = next(self._replay,None)
+            if frame is None:
+                Logger.info('Froggit: replay of %s finished' % REPLAY_FILE)
+                self._replay = None
+            else:
+                (self._mask,dt) = frame
+
+        if self._replay is None:
+            self._mask = 0
+            for key in KEY_NAMES:
+                if self.input.is_key_down(key):
+                    self._mask |= KEY_BITS[key]
+
+        if not self._recorder is None:
+            self._recorder.record(self._mask,dt)
+        return dt
+
+    def _isKeyDown(self,key):
+        """
+        Returns True if the key is held down this frame
+
+        Parameter key: The key to check
+        Precondition: key is one of KEY_NAMES (see replay.py)
+        """
+        return isKeyDown(self._mask,key)
+
+    def _message(self,text):
+        """
+        Returns a new message label, in the style of the pause and end screens
+
+        The states only make a message when it first appears, and move it with the
+        camera after that, so the text is not rendered again every frame.
+
+        Parameter text: The message text
+        Precondition: text is a string
+        """
+        label = GLabel(text=text,font_name='Spongeboy.ttf')
+        label.font_size = ALLOY_SMALL
+        label.fillcolor = 'white'
+        return label
 
     def _stateInactive(self):
         """
         Helper method for STATE_INACTIVE
         """
         self._lastS = False
-        self._currentS = self.input.is_key_down('s')
+        self._currentS = self._isKeyDown('s')
 
         if self._currentS == True and self._lastS == False:
             self._state = STATE_LOADING
@@ -204,12 +365,16 @@ class Froggit(GameApp):
         """
         Helper method for STATE_LOADING
         """
-        level = self.load_json(DEFAULT_LEVEL)
-        hitboxes = self.load_json(OBJECT_DATA)
-        self.width = level['size'][0] * GRID_SIZE
-        self.height = (level['size'][1] + 1) * GRID_SIZE
-        self._level = Level(level,hitboxes)
-        self._level.draw(self.view)
+        self._data = self.load_json(self._levelName)
+        self._hitboxes = self.load_json(OBJECT_DATA)
+        self._level = Level(self._data,self._hitboxes,BATCH_SPRITES)
+        self.width = min(self._level.getWidth(),VIEW_MAXWIDTH)
+        self.height = min(self._level.getHeight(),VIEW_MAXHEIGHT)
+        # The camera shows the whole level if it fits, and follows the frog otherwise
+        bounds = (0,0,self._level.getWidth(),self._level.getHeight())
+        self.view.camera = GCamera(width=self.width,height=self.height,bounds=bounds)
+        # Attached after the resize, as this bakes the background of the level
+        self._level.attach(self.view)
         self._state = STATE_ACTIVE
 
     def _stateActive(self,dt):
@@ -219,20 +384,17 @@ class Froggit(GameApp):
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
-        level = self.load_json(DEFAULT_LEVEL)
-        hitboxes = self.load_json(OBJECT_DATA)
-        self._level.draw(self.view)
         self._text = None
-        self._level.update(level,'none',dt,hitboxes)
-        if self.input.is_key_down('up'):
-            self._level.update(level,'up',dt,hitboxes)
-        elif self.input.is_key_down('down'):
-            self._level.update(level,'down',dt,hitboxes)
-        elif self.input.is_key_down('right'):
-            self._level.update(level,'right',dt,hitboxes)
-        elif self.input.is_key_down('left'):
-            self._level.update(level,'left',dt,hitboxes)
-        self._level.draw(self.view)
+        if self._isKeyDown('up'):
+            self._level.step('up',dt)
+        elif self._isKeyDown('down'):
+            self._level.step('down',dt)
+        elif self._isKeyDown('right'):
+            self._level.step('right',dt)
+        elif self._isKeyDown('left'):
+            self._level.step('left',dt)
+        else:
+            self._level.step('none',dt)
 
         if self._level.getPauseGame():
             if self._level.getLCounter() == []:
@@ -251,16 +413,12 @@ class Froggit(GameApp):
         Helper method for STATE_PAUSED
         """
         self._lastC = False
-        self._currentC = self.input.is_key_down('c')
+        self._currentC = self._isKeyDown('c')
 
-        level = self.load_json(DEFAULT_LEVEL)
-        self._level.draw(self.view)
-        self._text = GLabel(text="PRESS 'C' TO CONTINUE",font_name='Spongeboy.ttf')
-        self._text.font_size = ALLOY_SMALL
-        self._text.x = self.width/2
-        self._text.y = ((level['size'][1]/2)+(1/2))*GRID_SIZE
-        self._text.fillcolor = 'white'
-        self._text.draw(self.view)
+        if self._text is None:
+            self._text = self._message("PRESS 'C' TO CONTINUE")
+        self._text.x = self.view.camera.x
+        self._text.y = self.view.camera.y
 
         if self._currentC == True and self._lastC == False:
             self._text = None
@@ -270,14 +428,9 @@ class Froggit(GameApp):
         """
         Helper method for STATE_CONTINUE
         """
-        level = self.load_json(DEFAULT_LEVEL)
         self._level.setFrogCollision(False)
         self._level.setReachedExit(False)
-        self._level.setFrogX(level['start'][0] * GRID_SIZE + (GRID_SIZE / 2))
-        self._level.setFrogY(level['start'][1] * GRID_SIZE + (GRID_SIZE / 2))
-        self._level.setFrogAngle(FROG_NORTH)
-        self._level.continueGame(level)
-        self._level.draw(self.view)
+        self._level.continueGame()
         self._state = STATE_ACTIVE
         self._level.setAnimator(None)
 
@@ -285,46 +438,32 @@ class Froggit(GameApp):
         """
         Helper method for STATE_COMPLETE
         """
-        if self._level.getGameWin():
-            level = self.load_json(DEFAULT_LEVEL)
-            self._level.draw(self.view)
-            self._text = GLabel(text="YOU WIN!",font_name='Spongeboy.ttf')
-            self._text.font_size = ALLOY_SMALL
-            self._text.x = self.width/2
-            self._text.y = ((level['size'][1]/2)+(1/2))*GRID_SIZE
-            self._text.fillcolor = 'white'
-            self._text.draw(self.view)
-            self._stateComplete2()
-        else:
-            level = self.load_json(DEFAULT_LEVEL)
-            self._level.draw(self.view)
-            self._text = GLabel(text="GAME OVER",font_name='Spongeboy.ttf')
-            self._text.font_size = ALLOY_SMALL
-            self._text.x = self.width/2
-            self._text.y = ((level['size'][1]/2)+(1/2))*GRID_SIZE
-            self._text.fillcolor = 'white'
-            self._text.draw(self.view)
-            self._stateComplete2()
+        if self._text is None:
+            if self._level.getGameWin():
+                self._text = self._message("YOU WIN!")
+            else:
+                self._text = self._message("GAME OVER")
+        self._text.x = self.view.camera.x
+        self._text.y = self.view.camera.y
+        self._stateComplete2()
 
     def _stateComplete2(self):
         """
         Helper method for _stateComplete
         """
         self._lastR = False
-        self._currentR = self.input.is_key_down('r')
-        level = self.load_json(DEFAULT_LEVEL)
+        self._currentR = self._isKeyDown('r')
 
-        self._text2= GLabel(text="RESTART? PRESS 'R'",
-        font_name='Spongeboy.ttf')
-        self._text2.font_size = ALLOY_SMALL
-        self._text2.x = self.width/2
-        self._text2.y = ((level['size'][1]/4)+(1/4))*GRID_SIZE
-        self._text2.fillcolor = 'white'
-        self._text2.draw(self.view)
+        if self._text2 is None:
+            self._text2 = self._message("RESTART? PRESS 'R'")
+        self._text2.x = self.view.camera.x
+        self._text2.y = self.view.camera.bottom + self.view.camera.height/4
 
         if self._currentR == True and self._lastR == False:
             self._text = None
             self._text2 = None
+            self._level.detach()
+            self.view.camera = None
             self.width = GAME_WIDTH
             self.height = GAME_HEIGHT
-            self.start()
+            self._newGame()
@@ -0,0 +1,467 @@
+"""
+Benchmark module for Froggit
+
+This module measures how long the game takes to create, update and draw a level. Run
+it from the command line (from the folder containing froggit) with
+
+    python froggit/bench.py
+
+Each level is timed in several phases:
+
+    init        Level.__init__ (compiling the level file and creating every GObject)
+    idle        Level.step with no key pressed
+    scripted    Level.step with a fixed, pseudo-random sequence of moves
+    lanes       Lane.update for every lane, after moving the obstacles
+    collisions  Simulation.collidesRoad, with the frog placed on random lanes
+    draw        Level.draw (building the Kivy graphics commands, but not the OpenGL
+                calls, which happen in the Kivy event loop after the frame)
+    attached    Level.draw after Level.attach (moving the retained objects)
+    batched     Level.draw after Level.attach, with the lanes drawn by a sprite batch
+    scrolled    the batched phase, with a camera the size of the largest window that
+                follows the frog (so only the lanes on screen are drawn)
+
+The benchmark times the shipped levels, plus synthetic levels that are much larger
+than any real level (hundreds of lanes and thousands of objects). It prints the mean,
+median (p50) and 99th percentile (p99) of each phase, in microseconds, as JSON. Use the
+option --output to save that JSON to a file, and --baseline to compare the results to an
+earlier file. Any phase that got slower by more than the threshold (10% by default) is
+reported as a regression, and the script then exits with status 1.
+
+The scripted moves come from a seeded random generator, so every run plays exactly the
+same game. Use --help for the other options.
+"""
+import sys
+import os
+import os.path
+import time
+import json
+import random
+import platform
+import argparse
+
+# consts.py reads the level file and frog speed from sys.argv, so the options of this
+# script are removed before it is imported. Kivy must not read them either.
+if __name__ == '__main__':
+    _OPTIONS = sys.argv[1:]
+    del sys.argv[1:]
+    os.environ.setdefault('KIVY_NO_ARGS','1')
+
+from consts import *
+from game2d import *
+from lanes  import *
+from level  import *
+
+# The folder with this module (and the resource folders)
+FOLDER = os.path.dirname(os.path.abspath(__file__))
+
+# The shipped levels
+LEVELS = ('easy1.json','easy2.json','bigones.json','multihedge.json','roadsonly.json',
+          'complete.json')
+
+# The synthetic levels, as (lanes,columns) pairs
+SYNTHETIC = ((200,40),(500,60))
+
+# The phases timed for each level, in order
+PHASES = ('init','idle','scripted','lanes','collisions','draw','attached','batched',
+          'scrolled')
+
+# The statistics reported for each phase
+METRICS = ('mean','p50','p99')
+
+# The moves of the scripted phase, weighted towards moving up
+MOVES = ('none','none','none','up','up','up','left','right','down')
+
+
+def setPaths():
+    """
+    Points GameApp and Kivy at the resource folders, as GameApp does when it runs
+    """
+    GameApp.json   = os.path.join(FOLDER,'JSON')
+    GameApp.fonts  = os.path.join(FOLDER,'Fonts')
+    GameApp.sounds = os.path.join(FOLDER,'Sounds')
+    GameApp.images = os.path.join(FOLDER,'Images')
+
+    import kivy.resources
+    kivy.resources.resource_add_path(GameApp.fonts)
+    kivy.resources.resource_add_path(GameApp.sounds)
+    kivy.resources.resource_add_path(GameApp.images)
+
+
+def syntheticLevel(rows,columns):
+    """
+    Returns a level file (as parsed JSON) with the given size
+
+    The bottom lane is grass and the top lane is a hedge of exits. In between, the lanes
+    repeat grass, road, road, water, water. Road lanes have a car every 3 grid squares
+    and water lanes a log every 4 grid squares, with speeds that vary from lane to lane.
+
+    Parameter rows: The number of lanes
+    Precondition: rows is an int >= 2
+
+    Parameter columns: The number of grid squares across the level
+    Precondition: columns is an int >= 4
+    """
+    cars = ('car1','car2','car3','car4','car5','truck1')
+    logs = ('log1','log2','log3')
+    lanes = [{'type':'grass'}]
+    for row in range(1,rows-1):
+        speed = (40+(row*37) % 120)*(1 if row % 2 == 0 else -1)
+        kind = row % 5
+        if kind == 0:
+            lanes.append({'type':'grass'})
+        elif kind <= 2:
+            objects = [{'type':cars[(row+x) % len(cars)],'position':x}
+                       for x in range(0,columns,3)]
+            lanes.append({'type':'road','speed':speed,'objects':objects})
+        else:
+            objects = [{'type':logs[(row+x) % len(logs)],'position':x}
+                       for x in range(0,columns,4)]
+            lanes.append({'type':'water','speed':speed,'objects':objects})
+    exits = [{'type':'exit','position':x} for x in range(1,columns,4)]
+    lanes.append({'type':'hedge','objects':exits})
+    return {'version':1.0,'size':[columns,rows],'start':[columns//2,0],'offscreen':2,
+            'lanes':lanes}
+
+
+def summarize(samples):
+    """
+    Returns a dictionary with the statistics of the given samples, in microseconds
+
+    The percentiles use the nearest-rank method.
+
+    Parameter samples: The measured times in nanoseconds
+    Precondition: samples is a nonempty list of ints
+    """
+    ordered = sorted(samples)
+    size = len(ordered)
+    def rank(p):
+        return ordered[min(size-1,max(0,-(-p*size//100)-1))]/1000
+    return {'n':size,'mean':sum(ordered)/size/1000,'p50':rank(50),'p99':rank(99),
+            'min':ordered[0]/1000,'max':ordered[-1]/1000}
+
+
+def benchLevel(data,hitboxes,frames,repeat,seed):
+    """
+    Returns the statistics of every phase for the given level
+
+    The result is a dictionary keyed by phase name (see PHASES).
+
+    Parameter data: The level file
+    Precondition: data is a parsed level file
+
+    Parameter hitboxes: The object data file
+    Precondition: hitboxes is a parsed object data file
+
+    Parameter frames: The number of frames timed in each per-frame phase
+    Precondition: frames is an int > 0
+
+    Parameter repeat: The number of times a level is created in the init phase
+    Precondition: repeat is an int > 0
+
+    Parameter seed: The seed of the scripted moves
+    Precondition: seed is an int
+    """
+    clock = time.perf_counter_ns
+    dt = GAME_TIMESTEP
+    results = {}
+
+    samples = []
+    for x in range(repeat):
+        start = clock()
+        level = Level(data,hitboxes)
+        samples.append(clock()-start)
+    results['init'] = summarize(samples)
+
+    level = Level(data,hitboxes)
+    samples = []
+    for x in range(frames):
+        start = clock()
+        level.step('none',dt)
+        samples.append(clock()-start)
+        _recover(level)
+    results['idle'] = summarize(samples)
+
+    level = Level(data,hitboxes)
+    script = random.Random(seed)
+    samples = []
+    key = 'none'
+    for x in range(frames):
+        if x % 8 == 0:
+            key = script.choice(MOVES)
+        start = clock()
+        level.step(key,dt)
+        samples.append(clock()-start)
+        _recover(level)
+    results['scripted'] = summarize(samples)
+
+    spec = LevelSpec(data,hitboxes)
+    sim = Simulation(spec)
+    lanes = [_createLane(lane) for lane in spec.lanes]
+    samples = []
+    for x in range(frames):
+        sim.step('none',dt)
+        start = clock()
+        for pos in range(len(lanes)):
+            lanes[pos].update(sim.getVisible(pos))
+        samples.append(clock()-start)
+    results['lanes'] = summarize(samples)
+
+    sim = Simulation(spec)
+    frog = sim.getFrog()
+    place = random.Random(seed)
+    samples = []
+    for x in range(frames):
+        sim.step('none',dt)
+        sim.continueGame()
+        frog.x = place.uniform(0,spec.width)
+        frog.y = place.randrange(spec.rows)*GRID_SIZE+GRID_SIZE/2
+        start = clock()
+        sim.collidesRoad()
+        samples.append(clock()-start)
+    results['collisions'] = summarize(samples)
+
+    level = Level(data,hitboxes)
+    view = GView()
+    samples = []
+    for x in range(frames):
+        level.step('none',dt)
+        _recover(level)
+        start = clock()
+        view.clear()
+        level.draw(view,0.5)
+        samples.append(clock()-start)
+    results['draw'] = summarize(samples)
+
+    level = Level(data,hitboxes)
+    view = GView()
+    level.attach(view)
+    samples = []
+    for x in range(frames):
+        level.step('none',dt)
+        _recover(level)
+        start = clock()
+        view.clear()
+        level.draw(view,0.5)
+        samples.append(clock()-start)
+    results['attached'] = summarize(samples)
+
+    level = Level(data,hitboxes,True)
+    view = GView()
+    level.attach(view)
+    samples = []
+    for x in range(frames):
+        level.step('none',dt)
+        _recover(level)
+        start = clock()
+        view.clear()
+        level.draw(view,0.5)
+        samples.append(clock()-start)
+    results['batched'] = summarize(samples)
+
+    level = Level(data,hitboxes,True)
+    view = GView()
+    view.camera = GCamera(width=min(level.getWidth(),VIEW_MAXWIDTH),
+                          height=min(level.getHeight(),VIEW_MAXHEIGHT),
+                          bounds=(0,0,level.getWidth(),level.getHeight()))
+    level.attach(view)
+    script = random.Random(seed)
+    samples = []
+    key = 'none'
+    for x in range(frames):
+        if x % 8 == 0:
+            key = script.choice(MOVES)
+        level.step(key,dt)
+        _recover(level)
+        start = clock()
+        view.clear()
+        view.camera.look_at(level.getFrogX(),level.getFrogY())
+        level.draw(view,0.5)
+        samples.append(clock()-start)
+    results['scrolled'] = summarize(samples)
+    return results
+
+
+def compare(results,baseline,metric='p50',threshold=0.1):
+    """
+    Returns the comparison of the results with an earlier baseline
+
+    The result is a list with one dictionary for each (level,phase) timed in both. Each
+    dictionary has the keys 'level', 'phase', 'baseline', 'current', 'ratio' (current
+    over baseline) and 'regression' (True if the ratio is more than 1+threshold).
+
+    Parameter results: The current results, keyed by level and then by phase
+    Precondition: results is a dictionary as in the key 'levels' of run
+
+    Parameter baseline: The earlier results, in the same format
+    Precondition: baseline is a dictionary as in the key 'levels' of run
+
+    Parameter metric: The statistic compared
+    Precondition: metric is one of METRICS
+
+    Parameter threshold: The slowdown allowed before reporting a regression
+    Precondition: threshold is a float >= 0
+    """
+    report = []
+    for name in results:
+        if not name in baseline:
+            continue
+        for phase in PHASES:
+            if phase in results[name] and phase in baseline[name]:
+                old = baseline[name][phase][metric]
+                new = results[name][phase][metric]
+                ratio = new/old if old > 0 else float('inf') if new > 0 else 1.0
+                report.append({'level':name,'phase':phase,'baseline':old,'current':new,
+                               'ratio':ratio,'regression':ratio > 1+threshold})
+    return report
+
+
+def run(levels,synthetic,frames,repeat,seed):
+    """
+    Returns the benchmark results for the given levels
+
+    The result is a dictionary with the keys 'meta' (the settings and the platform)
+    and 'levels' (the statistics of each level, keyed by level name and then by phase).
+    Each level also has the key 'size', with the number of lanes and objects.
+
+    Parameter levels: The names of the level files to time
+    Precondition: levels is a list of str
+
+    Parameter synthetic: The sizes of the synthetic levels to time
+    Precondition: synthetic is a list of (lanes,columns) pairs
+
+    Parameter frames: The number of frames timed in each per-frame phase
+    Precondition: frames is an int > 0
+
+    Parameter repeat: The number of times a level is created in the init phase
+    Precondition: repeat is an int > 0
+
+    Parameter seed: The seed of the scripted moves
+    Precondition: seed is an int
+    """
+    setPaths()
+    hitboxes = GameApp.load_json(OBJECT_DATA)
+    todo = [(name,GameApp.load_json(name)) for name in levels]
+    for (rows,columns) in synthetic:
+        todo.append(('synthetic-%dx%d' % (rows,columns),syntheticLevel(rows,columns)))
+
+    try:
+        import numpy
+        numpy = numpy.__version__
+    except ImportError:
+        numpy = None
+    meta = {'python':platform.python_version(),'platform':platform.platform(),
+            'numpy':numpy,'frames':frames,'repeat':repeat,'seed':seed,
+            'timestep':GAME_TIMESTEP,'unit':'us'}
+
+    # One untimed pass loads the images and fonts, so that the first level is not slower
+    if todo:
+        benchLevel(todo[0][1],hitboxes,min(frames,60),1,seed)
+
+    results = {}
+    for (name,data) in todo:
+        results[name] = benchLevel(data,hitboxes,frames,repeat,seed)
+        results[name]['size'] = {'lanes':len(data['lanes']),
+            'objects':sum(len(lane.get('objects',[])) for lane in data['lanes'])}
+    return {'meta':meta,'levels':results}
+
+
+def main(options):
+    """
+    Runs the benchmark with the given command line options, and returns the exit status
+
+    Parameter options: The command line options
+    Precondition: options is a list of str
+    """
+    parser = argparse.ArgumentParser(prog='bench.py',
+                                     description='Times the Froggit tick and draw paths.')
+    parser.add_argument('levels',nargs='*',default=list(LEVELS),
+                        help='level files to time (default: all shipped levels)')
+    parser.add_argument('--frames',type=int,default=600,
+                        help='frames timed in each per-frame phase (default: 600)')
+    parser.add_argument('--repeat',type=int,default=5,
+                        help='levels created in the init phase (default: 5)')
+    parser.add_argument('--seed',type=int,default=0,
+                        help='seed of the scripted moves (default: 0)')
+    parser.add_argument('--synthetic',type=str,default=None,
+                        help='synthetic level sizes as LANESxCOLUMNS,... '
+                             '(default: 200x40,500x60)')
+    parser.add_argument('--no-synthetic',action='store_true',
+                        help='do not time any synthetic levels')
+    parser.add_argument('--output',type=str,default=None,
+                        help='file to save the JSON results to (default: print them)')
+    parser.add_argument('--baseline',type=str,default=None,
+                        help='JSON results to compare against')
+    parser.add_argument('--metric',choices=METRICS,default='p50',
+                        help='statistic compared with the baseline (default: p50)')
+    parser.add_argument('--threshold',type=float,default=0.1,
+                        help='slowdown reported as a regression (default: 0.1)')
+    args = parser.parse_args(options)
+
+    synthetic = list(SYNTHETIC)
+    if args.no_synthetic:
+        synthetic = []
+    elif not args.synthetic is None:
+        synthetic = [tuple(int(x) for x in size.split('x'))
+                     for size in args.synthetic.split(',') if size]
+    levels = [name if name.lower().endswith('.json') else name+'.json'
+              for name in args.levels]
+
+    output = run(levels,synthetic,args.frames,args.repeat,args.seed)
+    status = 0
+    if not args.baseline is None:
+        with open(args.baseline) as file:
+            baseline = json.load(file)['levels']
+        report = compare(output['levels'],baseline,args.metric,args.threshold)
+        output['comparison'] = {'baseline':args.baseline,'metric':args.metric,
+                                'threshold':args.threshold,'results':report}
+        for item in report:
+            if item['regression']:
+                status = 1
+                sys.stderr.write('REGRESSION %s %s: %s %.1fus -> %.1fus (x%.2f)\n' %
+                                 (item['level'],item['phase'],args.metric,
+                                  item['baseline'],item['current'],item['ratio']))
+        if status == 0:
+            sys.stderr.write('No regressions against %s\n' % args.baseline)
+
+    text = json.dumps(output,indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output,'w') as file:
+            file.write(text+'\n')
+    return status
+
+
+# HELPER FUNCTIONS
+def _createLane(lane):
+    """
+    Returns the lane object for the given lane specification, as Level creates it
+
+    Parameter lane: The compiled specification for the lane
+    Precondition: lane is a LaneSpec object
+    """
+    if lane.kind == LANE_GRASS:
+        return Grass(lane)
+    elif lane.kind == LANE_ROAD:
+        return Road(lane)
+    elif lane.kind == LANE_WATER:
+        return Water(lane)
+    return Hedge(lane)
+
+
+def _recover(level):
+    """
+    Restores the frog after it died or reached an exit, as Froggit does on 'C'
+
+    Parameter level: The level being timed
+    Precondition: level is a Level object
+    """
+    if level.getPauseGame() or level.getReachedExit():
+        level.setFrogCollision(False)
+        level.setReachedExit(False)
+        level.continueGame()
+        level.setAnimator(None)
+
+
+if __name__ == '__main__':
+    sys.exit(main(_OPTIONS))
@@ -18,8 +18,16 @@ import sys
 GAME_WIDTH  = 1024
 # The initial height of the game display
 GAME_HEIGHT = 896
+# The largest width of the game display (wider levels scroll)
+VIEW_MAXWIDTH  = 1024
+# The largest height of the game display (taller levels scroll)
+VIEW_MAXHEIGHT = 896
 # The size in pixels of a single grid square
 GRID_SIZE    = 64
+# The fixed time in seconds of a single simulation step
+GAME_TIMESTEP = 1/60
+# The most simulation steps to run in a single animation frame (when catching up)
+GAME_MAXSTEPS = 5
 
 
 ### FROG CONSTANTS ###
@@ -46,8 +54,13 @@ FROG_SOUTH  =   0
 FROG_SPRITE  = 'frog2'
 # The sprite sheet for the dying frog
 DEATH_SPRITE = 'skulls'
+# The sprite sheets of the frog and the dying frog in the object data file
+FROG_KEY     = 'frog'
+DEATH_KEY    = 'skulls'
 # The number of seconds for a death animation
 DEATH_SPEED  = 0.5
+# The number of frames in the death animation
+DEATH_FRAMES = 8
 
 
 ### GAME CONSTANTS ###
@@ -66,6 +79,34 @@ STATE_CONTINUE = 4
 STATE_COMPLETE = 5
 
 
+### LANE CONSTANTS ###
+
+# A safe grass lane
+LANE_GRASS = 0
+# A road lane with cars that kill the frog
+LANE_ROAD  = 1
+# A water lane with logs that carry the frog
+LANE_WATER = 2
+# A hedge lane with the exits
+LANE_HEDGE = 3
+
+# The lane types as they appear in the level files
+LANE_TYPES = {'grass' : LANE_GRASS, 'road' : LANE_ROAD, 'water' : LANE_WATER,
+              'hedge' : LANE_HEDGE}
+
+
+### LAYER CONSTANTS (for objects attached to the view, from the bottom up) ###
+
+# The lane backgrounds
+LAYER_TILES   = 0
+# The obstacles, exits and safe frogs
+LAYER_OBJECTS = 1
+# The frog and the death animation
+LAYER_FROG    = 2
+# The lives meter
+LAYER_HUD     = 3
+
+
 ### FONT CONSTANTS ###
 
 # The font choice for labels and messages
@@ -87,6 +128,11 @@ SPLAT_SOUND = 'splat.wav'
 # The succes sound
 TRILL_SOUND = 'trill.wav'
 
+# The sound events reported by a simulation (see sim.py)
+EVENT_CROAK = 'croak'
+EVENT_SPLAT = 'splat'
+EVENT_TRILL = 'trill'
+
 
 ### JSON FILES ###
 
@@ -96,6 +142,76 @@ DEFAULT_LEVEL  = 'easy2.json'
 OBJECT_DATA    = 'objects.json'
 
 
+### COLLISION MASK CONSTANTS ###
+
+# Whether obstacles collide pixel by pixel inside their hitboxes (needs NumPy)
+PIXEL_COLLISIONS = False
+# The smallest alpha value of a pixel that can collide
+MASK_ALPHA     = 128
+
+
+### TEXTURE ATLAS CONSTANTS ###
+
+# The texture atlas for the images in the object data file (None to not use an atlas)
+ATLAS_NAME     = 'objects'
+# The width and height of an atlas page in pixels
+ATLAS_SIZE     = 2048
+# Whether to draw the objects in the lanes with a sprite batch (one mesh per texture)
+BATCH_SPRITES  = True
+
+
+### USE COMMAND LINE FLAGS TO RECORD, REPLAY OR PROFILE A PLAY SESSION
+"""
+The flags below may appear anywhere on the command line. So if you start the game typing
+
+    python froggit easy2.json --record bug.frog
+
+the whole play session is recorded to the file bug.frog. Typing
+
+    python froggit --replay bug.frog
+
+replays that session in the game window (the level is taken from the recording), and
+
+    python froggit --replay bug.frog --headless
+
+replays it without a game window, as fast as possible. Finally,
+
+    python froggit --profile trace.json
+
+times every frame, and writes the timings of the last frames to trace.json (in the Chrome
+trace-event format) when the window closes. The flags are removed from sys.argv before
+anything else reads it, so they never confuse Kivy or the arguments below.
+"""
+def _popFlag(flag,value=True):
+    """
+    Removes a flag from sys.argv and returns its value (None if it is missing)
+
+    Parameter flag: The flag to remove
+    Precondition: flag is a str
+
+    Parameter value: Whether the flag is followed by a value
+    Precondition: value is a bool
+    """
+    if not flag in sys.argv:
+        return None
+    pos = sys.argv.index(flag)
+    if not value:
+        del sys.argv[pos]
+        return True
+    result = sys.argv[pos+1] if pos+1 < len(sys.argv) else None
+    del sys.argv[pos:pos+2]
+    return result
+
+# The file to record the play session to (None to not record)
+RECORD_FILE = _popFlag('--record')
+# The file to replay a play session from (None to play normally)
+REPLAY_FILE = _popFlag('--replay')
+# Whether to replay the session without a game window
+REPLAY_HEADLESS = _popFlag('--headless',False) == True and not REPLAY_FILE is None
+# The file to write a Chrome trace of the last frames to (None to not profile)
+PROFILE_FILE = _popFlag('--profile')
+
+
 ### USE COMMAND LINE ARGUMENTS TO CHANGE DEFAULT LEVEL FILE AND FROG SPEED
 """
 sys.argv is a list of the command line arguments when you run python. These arguments are
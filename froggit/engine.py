@@ -0,0 +1,555 @@
+"""
+Obstacle engine module for Froggit
+
+This module contains the engines that move the obstacles (cars, trucks and logs) of a
+level. An engine knows the x coordinate of every obstacle in the level at any time.
+
+Obstacle motion is periodic. Every obstacle in a lane moves at the same constant speed,
+and wraps around once it passes the offscreen buffer of its lane. So the engines do not
+integrate the motion frame after frame. Instead, the position of an obstacle is its
+initial position plus speed times time, modulo the period (the distance between the
+wrap bounds) of its lane. The position at any time t costs O(1) to compute, which means
+we can seek or rewind instantly, look ahead without stepping the world, and play for
+hours without accumulating any floating point drift.
+
+The closed form does not reproduce the old frame by frame stepping to the last bit, as
+stepping rounds every frame. The difference is far below a pixel, but a car that exactly
+touches the frog can be on either side of the touch. So a collision at an exact touch can
+happen one frame earlier or later than it did when obstacles were stepped.
+
+There are two engines. ObstacleEngine is written in plain Python and computes one
+obstacle at a time. ObstacleArrays keeps the phases, speeds and periods of the whole
+level in contiguous NumPy arrays, so that every obstacle is placed in a single vectorized
+step. That is much faster for large levels, but it requires NumPy. Both engines produce
+exactly the same positions.
+
+Engines also know which obstacles are on screen, so that the renderer only has to move
+(and draw) the sprites that can actually be seen. Finally, engines know the obstacles
+of each lane sorted by x, so that a collision query only has to look at the obstacles
+near the frog. All obstacles in a lane move together, so the sorted order at any time
+is just a rotation of the order of their phases.
+"""
+from consts import *
+from specs  import *
+import bisect
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# PRIMARY RULE: Engines are not allowed to access anything in any module other than
+# consts.py and specs.py. In particular, they must never import game2d (or kivy).
+
+
+def createEngine(spec,vectorized=None):
+    """
+    Returns a new obstacle engine for the given level
+
+    By default, the vectorized engine is used whenever NumPy is installed.
+
+    Parameter spec: The compiled level file
+    Precondition: spec is a LevelSpec object
+
+    Parameter vectorized: Whether to use the NumPy engine (None for the default)
+    Precondition: vectorized is a bool or None; it is only True if NumPy is installed
+    """
+    if vectorized is None:
+        vectorized = not numpy is None
+    assert not vectorized or not numpy is None, 'The vectorized engine requires NumPy'
+    if vectorized:
+        return ObstacleArrays(spec)
+    return ObstacleEngine(spec)
+
+
+class _SortedView(object):
+    """
+    A read-only sequence of the x coordinates of a lane, in sorted order
+
+    This allows bisect to search the positions of a lane without sorting or copying
+    them. The sorted order is a rotation (and, for lanes moving left, a reversal) of the
+    order of the phases of the objects.
+    """
+
+    def __init__(self,positions,order,shift,reverse):
+        """
+        Initializes the view of the given positions
+
+        Parameter positions: The x coordinates of the objects in a lane
+        Precondition: positions is a list of numbers
+
+        Parameter order: The positions in list of the objects, sorted by phase
+        Precondition: order is a permutation of range(len(positions))
+
+        Parameter shift: The place in order of the first object in the rotation
+        Precondition: shift is an int in 0..len(order)
+
+        Parameter reverse: Whether the rotation is in descending order of x
+        Precondition: reverse is a bool
+        """
+        self._positions = positions
+        self._order = order
+        self._shift = shift
+        self._reverse = reverse
+
+    def __len__(self):
+        """
+        Returns the number of objects in the lane
+        """
+        return len(self._order)
+
+    def __getitem__(self,index):
+        """
+        Returns the x coordinate of the object at the given place in sorted order
+
+        Parameter index: The place in sorted order
+        Precondition: index is an int in 0..len(self)-1
+        """
+        return self._positions[self.index(index)]
+
+    def index(self,index):
+        """
+        Returns the position in list of the object at the given place in sorted order
+
+        Parameter index: The place in sorted order
+        Precondition: index is an int in 0..len(self)-1
+        """
+        size = len(self._order)
+        if self._reverse:
+            index = size-1-index
+        return self._order[(index+self._shift) % size]
+
+
+class ObstacleEngine(object):
+    """
+    A class that places the obstacles of a level, one obstacle at a time
+
+    The obstacles of each lane are stored in the same order as the objects in the lane
+    specification, so an obstacle is identified by its lane and its position in that
+    lane. Obstacles in lanes that do not move keep their initial positions.
+
+    The phase of an obstacle is its distance from the wrap bound that it moves away
+    from (the left bound for lanes moving right, and the right bound for lanes moving
+    left) at time 0, modulo the period of the lane. Objects moving right never reach
+    their right bound, and objects moving left never reach their left bound.
+    """
+    # Attribute _spec: The compiled level file
+    # Invariant: _spec is a LevelSpec object
+
+    # Attribute _time: The current time of the engine in seconds
+    # Invariant: _time is a float
+
+    # Attribute _direction: The direction of each lane
+    # Invariant: _direction is a list of 1 (right), -1 (left) or 0, one for each lane
+
+    # Attribute _base: The wrap bound that the objects in each lane move away from
+    # Invariant: _base is a list of numbers, one for each lane (0 if it does not move)
+
+    # Attribute _period: The distance between the wrap bounds of each lane
+    # Invariant: _period is a list of numbers > 0, one for each lane
+
+    # Attribute _phases: The phases of the objects in each lane
+    # Invariant: _phases is a list of lists of numbers, one list for each lane. For lanes
+    # that do not move, the phases are the positions.
+
+    # Attribute _order: The positions in list of the objects in each lane, sorted by phase
+    # Invariant: _order is a list of lists of ints, one list for each lane
+
+    # Attribute _sorted: The phases of the objects in each lane, sorted
+    # Invariant: _sorted is a list of sorted lists of numbers, one list for each lane
+
+    # Attribute _positions: The x coordinates of each lane at the current time, if known
+    # Invariant: _positions is a list of (lists of numbers or None), one for each lane
+
+    def getTime(self):
+        """
+        Returns the current time of the engine in seconds
+        """
+        return self._time
+
+    def setTime(self,time):
+        """
+        Moves every obstacle to its position at the given time
+
+        Time can move backwards as well as forwards.
+
+        Parameter time: The time in seconds
+        Precondition: time is an int or float
+        """
+        self._time = float(time)
+        self._positions = [None]*len(self._positions)
+
+    def getPositions(self,lane):
+        """
+        Returns the x coordinates of the objects in the given lane
+
+        The list is in the same order as the objects in the lane specification. It
+        should not be modified.
+
+        Parameter lane: The lane position from the bottom
+        Precondition: lane is a valid lane index
+        """
+        positions = self._positions[lane]
+        if positions is None:
+            phases = self._phases[lane]
+            direction = self._direction[lane]
+            if direction == 0:
+                positions = list(phases)
+            else:
+                shift = self._shift(lane,self._time)
+                base = self._base[lane]
+                period = self._period[lane]
+                positions = []
+                for phase in phases:
+                    a = phase + shift
+                    if a >= period:
+                        a -= period
+                    positions.append(base + a if direction > 0 else base - a)
+            self._positions[lane] = positions
+        return positions
+
+    def __init__(self,spec):
+        """
+        Initializes the engine with the obstacles at their starting positions
+
+        Parameter spec: The compiled level file
+        Precondition: spec is a LevelSpec object
+        """
+        self._spec = spec
+        self._time = 0.0
+        self._direction = []
+        self._base = []
+        self._period = []
+        self._phases = []
+        self._order = []
+        self._sorted = []
+        for lane in spec.lanes:
+            period = lane.wrapRight - lane.wrapLeft
+            if not lane.moving or lane.speed == 0:
+                self._direction.append(0)
+                self._base.append(0)
+                phases = [obj.x for obj in lane.objects]
+            elif lane.speed > 0:
+                self._direction.append(1)
+                self._base.append(lane.wrapLeft)
+                phases = [(obj.x - lane.wrapLeft) % period for obj in lane.objects]
+            else:
+                self._direction.append(-1)
+                self._base.append(lane.wrapRight)
+                phases = [(lane.wrapRight - obj.x) % period for obj in lane.objects]
+            order = sorted(range(len(phases)),key=phases.__getitem__)
+            self._period.append(period)
+            self._phases.append(phases)
+            self._order.append(order)
+            self._sorted.append([phases[y] for y in order])
+        self._positions = [None]*len(spec.lanes)
+
+    def update(self,dt):
+        """
+        Moves the obstacles forward in time
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        self.setTime(self._time + dt)
+
+    def positionAt(self,lane,index,time=None):
+        """
+        Returns the x coordinate of a single object at the given time
+
+        This does not change the time of the engine, and it costs O(1) no matter how
+        far away the time is.
+
+        Parameter lane: The lane position from the bottom
+        Precondition: lane is a valid lane index
+
+        Parameter index: The position of the object in the lane specification
+        Precondition: index is a valid object position for that lane
+
+        Parameter time: The time in seconds (None for the current time)
+        Precondition: time is an int, float or None
+        """
+        if time is None:
+            time = self._time
+        phase = self._phases[lane][index]
+        direction = self._direction[lane]
+        if direction == 0:
+            return phase
+        period = self._period[lane]
+        a = phase + self._shift(lane,time)
+        if a >= period:
+            a -= period
+        return self._base[lane] + a if direction > 0 else self._base[lane] - a
+
+    def getVisible(self,lane,time=None,span=None):
+        """
+        Returns the objects in the given lane that are (at least partly) on screen
+
+        The value returned is a pair of lists. The first list has the positions of the
+        visible objects in the lane specification, and the second has their x
+        coordinates. Asking for another time (e.g. to draw between two updates) does not
+        change the time of the engine.
+
+        Parameter lane: The lane position from the bottom
+        Precondition: lane is a valid lane index
+
+        Parameter time: The time in seconds (None for the current time)
+        Precondition: time is an int, float or None
+
+        Parameter span: The left and right edges of the screen (None for the whole level)
+        Precondition: span is None or a pair of numbers
+        """
+        (left,right) = (0,self._spec.width) if span is None else span
+        objs = self._spec.lanes[lane].objects
+        if time is None or time == self._time:
+            positions = self.getPositions(lane)
+        else:
+            positions = [self.positionAt(lane,y,time) for y in range(len(objs))]
+        index = []
+        xs = []
+        for y in range(len(objs)):
+            x = positions[y]
+            half = objs[y].width/2
+            if x + half >= left and x - half <= right:
+                index.append(y)
+                xs.append(x)
+        return (index,xs)
+
+    def getCandidates(self,lane,low,high):
+        """
+        Returns the objects in the given lane whose x coordinate is in [low,high]
+
+        The value returned is a list of positions in the lane specification, sorted by
+        x coordinate. It is found with a binary search, so it only costs time for the
+        objects that are actually returned.
+
+        Parameter lane: The lane position from the bottom
+        Precondition: lane is a valid lane index
+
+        Parameter low: The smallest x coordinate to return
+        Precondition: low is an int or float
+
+        Parameter high: The largest x coordinate to return
+        Precondition: high is an int or float
+        """
+        view = self._view(lane)
+        start = bisect.bisect_left(view,low)
+        end = bisect.bisect_right(view,high,start)
+        return [view.index(y) for y in range(start,end)]
+
+    # HELPER METHODS
+    def _shift(self,lane,time):
+        """
+        Returns the distance travelled by the objects in a lane, modulo the period
+
+        Parameter lane: The lane position from the bottom
+        Precondition: lane is the index of a lane that moves
+
+        Parameter time: The time in seconds
+        Precondition: time is an int or float
+        """
+        return (abs(self._spec.lanes[lane].speed)*time) % self._period[lane]
+
+    def _view(self,lane):
+        """
+        Returns a view of the positions of a lane in sorted order
+
+        The objects that have wrapped around (their phase plus the shift reaches the
+        period) are a suffix of the phase order, and they come first in x order.
+
+        Parameter lane: The lane position from the bottom
+        Precondition: lane is a valid lane index
+        """
+        positions = self.getPositions(lane)
+        order = self._order[lane]
+        direction = self._direction[lane]
+        if direction == 0:
+            return _SortedView(positions,order,0,False)
+
+        phases = self._sorted[lane]
+        period = self._period[lane]
+        shift = self._shift(lane,self._time)
+        wrap = bisect.bisect_left(phases,period-shift)
+        # Correct for rounding, so that the split agrees with getPositions
+        while wrap > 0 and phases[wrap-1] + shift >= period:
+            wrap -= 1
+        while wrap < len(phases) and phases[wrap] + shift < period:
+            wrap += 1
+        return _SortedView(positions,order,wrap,direction < 0)
+
+
+class ObstacleArrays(ObstacleEngine):
+    """
+    A class that places the obstacles of a level with NumPy
+
+    The obstacles of the whole level are stored as a structure of arrays: one array for
+    the phases, one for the speeds, and one each for the periods, wrap bounds and
+    directions. The obstacles of a lane are a contiguous slice of these arrays. Placing
+    every obstacle is a handful of vectorized operations, no matter how many obstacles
+    there are. The positions are only computed when they are needed after the time
+    changes.
+
+    The x coordinates of a lane are converted to a list the first time that they are
+    requested after the time changes. The renderer does not need these lists, as
+    getVisible only converts the obstacles that are on screen.
+    """
+    # Attribute _bounds: The start of the slice of each lane in the arrays
+    # Invariant: _bounds is a list of ints of length rows+1
+
+    # Attribute _phase: The phase of every object in the level
+    # Invariant: _phase is a 1-dimensional float array (0 for objects that do not move)
+
+    # Attribute _speed: The absolute speed of each object (0 if it does not move)
+    # Invariant: _speed is a float array with the same shape as _phase
+
+    # Attribute _cycle: The period of the lane of each object
+    # Invariant: _cycle is a float array with the same shape as _phase, all > 0
+
+    # Attribute _start: The wrap bound each object moves away from (its position if
+    # it does not move)
+    # Invariant: _start is a float array with the same shape as _phase
+
+    # Attribute _sign: The direction of each object
+    # Invariant: _sign is a float array of 1, -1 or 0 with the same shape as _phase
+
+    # Attribute _half: Half the width of each object
+    # Invariant: _half is a float array with the same shape as _phase
+
+    # Attribute _x: The x coordinates of all objects at the current time, if known
+    # Invariant: _x is a float array with the same shape as _phase, or None
+
+    # Attribute _visible: Whether each object is on screen (None if not yet known)
+    # Invariant: _visible is a bool array with the same shape as _phase, or None
+
+    def setTime(self,time):
+        """
+        Moves every obstacle to its position at the given time
+
+        Time can move backwards as well as forwards.
+
+        Parameter time: The time in seconds
+        Precondition: time is an int or float
+        """
+        super().setTime(time)
+        self._x = None
+        self._visible = None
+
+    def getPositions(self,lane):
+        """
+        Returns the x coordinates of the objects in the given lane
+
+        The list is in the same order as the objects in the lane specification. It
+        should not be modified.
+
+        Parameter lane: The lane position from the bottom
+        Precondition: lane is a valid lane index
+        """
+        positions = self._positions[lane]
+        if positions is None:
+            positions = self._place()[self._bounds[lane]:self._bounds[lane+1]].tolist()
+            self._positions[lane] = positions
+        return positions
+
+    def __init__(self,spec):
+        """
+        Initializes the engine with the obstacles at their starting positions
+
+        Parameter spec: The compiled level file
+        Precondition: spec is a LevelSpec object
+        """
+        super().__init__(spec)
+        self._bounds = [0]
+        phase = []
+        speed = []
+        cycle = []
+        start = []
+        sign = []
+        half = []
+        for lane in spec.lanes:
+            direction = self._direction[lane.index]
+            for y in range(len(lane.objects)):
+                if direction == 0:
+                    phase.append(0)
+                    speed.append(0)
+                    start.append(self._phases[lane.index][y])
+                else:
+                    phase.append(self._phases[lane.index][y])
+                    speed.append(abs(lane.speed))
+                    start.append(self._base[lane.index])
+                cycle.append(self._period[lane.index])
+                sign.append(direction)
+                half.append(lane.objects[y].width/2)
+            self._bounds.append(len(phase))
+
+        self._phase = numpy.array(phase,dtype=float)
+        self._speed = numpy.array(speed,dtype=float)
+        self._cycle = numpy.array(cycle,dtype=float)
+        self._start = numpy.array(start,dtype=float)
+        self._sign  = numpy.array(sign,dtype=float)
+        self._half  = numpy.array(half,dtype=float)
+        self._x = None
+        self._visible = None
+
+    def getVisible(self,lane,time=None,span=None):
+        """
+        Returns the objects in the given lane that are (at least partly) on screen
+
+        The value returned is a pair of lists. The first list has the positions of the
+        visible objects in the lane specification, and the second has their x
+        coordinates. Asking for another time (e.g. to draw between two updates) does not
+        change the time of the engine.
+
+        Parameter lane: The lane position from the bottom
+        Precondition: lane is a valid lane index
+
+        Parameter time: The time in seconds (None for the current time)
+        Precondition: time is an int, float or None
+
+        Parameter span: The left and right edges of the screen (None for the whole level)
+        Precondition: span is None or a pair of numbers
+        """
+        start = self._bounds[lane]
+        end = self._bounds[lane+1]
+        current = time is None or time == self._time
+        x = self._place()[start:end] if current else self._compute(time,start,end)
+        if current and span is None:
+            if self._visible is None:
+                whole = self._place()
+                self._visible = (whole+self._half >= 0) & (whole-self._half <= self._spec.width)
+            visible = self._visible[start:end]
+        else:
+            (left,right) = (0,self._spec.width) if span is None else span
+            half = self._half[start:end]
+            visible = (x + half >= left) & (x - half <= right)
+        index = numpy.flatnonzero(visible)
+        return (index.tolist(),x[index].tolist())
+
+    # HELPER METHODS
+    def _place(self):
+        """
+        Returns the x coordinates of every object at the current time
+
+        The positions are computed the first time that they are needed after the
+        time changes.
+        """
+        if self._x is None:
+            self._x = self._compute(self._time,0,len(self._phase))
+        return self._x
+
+    def _compute(self,time,start,end):
+        """
+        Returns the x coordinates of a slice of the objects at the given time
+
+        Parameter time: The time in seconds
+        Precondition: time is an int or float
+
+        Parameter start: The first object in the slice
+        Precondition: start is an int in 0..len(self._phase)
+
+        Parameter end: The end of the slice (exclusive)
+        Precondition: end is an int in start..len(self._phase)
+        """
+        cycle = self._cycle[start:end]
+        a = self._phase[start:end] + (self._speed[start:end]*time) % cycle
+        a -= cycle*(a >= cycle)
+        return self._start[start:end] + self._sign[start:end]*a
@@ -9,9 +9,14 @@ Date:   August 1, 2017 (Python 3 version)
 """
 from .gobject import GObject, GScene
 from .grectangle import GRectangle, GEllipse, GImage, GLabel
-from .gsprite import GSprite
+from .gsprite import GSprite, GSpriteSheet
 from .gtile import GTile
+from .gstatic import GStatic
+from .gbatch import GSpriteBatch
+from .gcamera import GCamera
+from .collision import CollisionWorld, sweep
 from .gpath import GPath, GTriangle, GPolygon
 from .gview import GInput, GView
 from .sound import Sound, SoundLibrary
+from .profiler import Profiler, span
 from .app import GameApp
\ No newline at end of file
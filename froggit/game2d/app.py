@@ -17,7 +17,9 @@ from kivy.clock  import Clock
 from kivy.core.window import Window
 from kivy.logger import Logger
 
+from collections import OrderedDict
 import traceback
+import weakref
 import os.path
 import json
 import sys
@@ -46,7 +48,46 @@ class GameApp(kivy.app.App):
     thing you should have in this method are calls to ``self.view.draw()``.
     """
     # Class attribute for tracking textures (to reduce memory footprint)
-    TEXTURE_CACHE = {}
+    # Textures are ordered least recently used first, so that the oldest are evicted
+    TEXTURE_CACHE = OrderedDict()
+    
+    # The bytes of texture memory to keep (textures in use are never evicted)
+    TEXTURE_BUDGET = 128*1024*1024
+    
+    # Class attribute for the size in bytes of each texture in TEXTURE_CACHE
+    # Atlas regions have no size of their own (their page has)
+    TEXTURE_SIZES = {}
+    
+    # The total size in bytes of the cached textures (the sum of TEXTURE_SIZES)
+    TEXTURE_RESIDENT = 0
+    
+    # Class attribute for counting the objects using each texture (see hold_texture)
+    TEXTURE_REFS = {}
+    
+    # Class attribute for counting TEXTURE_CACHE hits, misses and evictions
+    TEXTURE_STATS = {'hits':0, 'misses':0, 'evictions':0}
+    
+    # Class attribute for sharing the frames of filmstrips (see GSprite)
+    # Each entry maps a (file name, format) pair to a tuple of texture regions
+    FRAME_CACHE = {}
+    
+    # Class attribute for sharing rendered text (see GLabel), least recently used first
+    # Each entry maps (text, font name, size, bold, color, halign, valign) to a texture
+    TEXT_CACHE = OrderedDict()
+    
+    # The most textures kept in TEXT_CACHE
+    TEXT_CACHE_SIZE = 128
+    
+    # Class attribute for counting TEXT_CACHE hits, misses and evictions
+    TEXT_STATS = {'hits':0, 'misses':0, 'evictions':0}
+    
+    # Class attribute for tracking parsed JSON files (to avoid reparsing them)
+    # Each entry maps a file name to a (modification time, file size, data) triple
+    JSON_CACHE = {}
+    
+    # Class attribute for finding images packed into a texture atlas
+    # Each entry maps an image file to an (atlas, page, x, y, width, height) tuple
+    ATLAS_INDEX = {}
     
     
     # MUTABLE ATTRIBUTES
@@ -71,6 +112,54 @@ class GameApp(kivy.app.App):
         self._fps = value
         Clock.schedule_interval(self._refresh,1.0/self._fps)
     
+    @property
+    def timestep(self):
+        """
+        The fixed simulation timestep in seconds, or None for a variable timestep
+        
+        By default this value is None, and ``update`` is called exactly once per animation 
+        frame with the time since the last frame. If this value is a number, the game runs 
+        in fixed-timestep mode instead. The elapsed time is accumulated, and ``update`` is 
+        called with exactly this ``dt`` as many times as the accumulated time allows (up 
+        to ``maxsteps`` times per frame). That means a slow frame never produces a large 
+        ``dt``, so fast objects cannot tunnel through one another.
+        
+        In fixed-timestep mode, ``update`` may run zero, one or several times before each 
+        call to ``draw``, so all drawing should happen in ``draw``. Use ``alpha`` to 
+        interpolate between the last two updates.
+        
+        **Invariant**: Must be None or an int or float > 0.
+        """
+        return self._timestep
+    
+    @timestep.setter
+    def timestep(self,value):
+        assert value is None or type(value) in [int,float], 'value %s is not a number' % repr(value)
+        assert value is None or value > 0, 'value %s is not positive' % repr(value)
+        self._timestep = value
+        self._accumulator = 0
+        self._alpha = 1.0
+    
+    @property
+    def maxsteps(self):
+        """
+        The maximum number of fixed updates in a single animation frame
+        
+        If the game falls too far behind (for example, when the window is dragged), it 
+        will not try to catch up all at once. Any time beyond this many steps is dropped, 
+        and the game simply runs slower for that frame. This value is ignored if 
+        ``timestep`` is None.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._maxsteps
+    
+    @maxsteps.setter
+    def maxsteps(self,value):
+        assert type(value) == int, 'value %s is not an int' % repr(value)
+        assert value > 0, 'value %s is not positive' % repr(value)
+        self._maxsteps = value
+    
     @property
     def width(self):
         """
@@ -129,6 +218,34 @@ class GameApp(kivy.app.App):
         """
         return self._input
     
+    @property
+    def alpha(self):
+        """
+        The interpolation factor for the current call to ``draw``
+        
+        In fixed-timestep mode, the display is usually somewhere between two updates. 
+        This value is the fraction of a timestep that has elapsed since the last update,
+        so ``draw`` can show each object at ``previous + alpha*(current-previous)``. It 
+        is always 1 if ``timestep`` is None.
+        
+        **Invariant**: Must be a float in 0..1.
+        """
+        return self._alpha
+    
+    @property
+    def profiler(self):
+        """
+        The frame profiler, or None if profiling is disabled
+        
+        Profiling is enabled with the keyword ``profile`` in the constructor.  The 
+        profiler times the phases of every animation frame, as well as any spans opened
+        with the function :func:`span`. See the class :class:`Profiler` for more 
+        information.
+        
+        **Invariant**: Must be None or an instance of :class:`Profiler`.
+        """
+        return self._profiler
+    
     # CLASS METHODS
     @classmethod
     def is_image(cls,name):
@@ -213,6 +330,15 @@ class GameApp(kivy.app.App):
         has already been loaded, it will return the cached texture.  Otherwise, it will
         load the texture and cache it before returning it.
         
+        If the file was packed into an atlas with :meth:`load_atlas`, the texture is a
+        region of the atlas page instead.  A region behaves just like a texture of the
+        original image, so the caller never needs to know the difference.
+        
+        Once the cached textures take more than :attr:`TEXTURE_BUDGET` bytes, the least
+        recently used textures are evicted, unless an object still holds them (see 
+        :meth:`hold_texture`).  An evicted texture is simply loaded again the next time 
+        it is needed.
+        
         :param name: The file name
         :type name:  ``str``
         """
@@ -220,12 +346,21 @@ class GameApp(kivy.app.App):
             Logger.info('GameApp: No image file named %s.' % repr(name))
             return None
         elif name in cls.TEXTURE_CACHE:
+            cls.TEXTURE_CACHE.move_to_end(name)
+            cls.TEXTURE_STATS['hits'] += 1
             return cls.TEXTURE_CACHE[name]
+        elif name in cls.ATLAS_INDEX:
+            entry = cls.ATLAS_INDEX[name]
+            page = cls.load_texture(entry[1])
+            if not page is None:
+                texture = page.get_region(*entry[2:])
+                cls._cache_texture(name,texture,0)
+                return texture
         
         try:
             from kivy.core.image import Image
             texture = Image(name).texture
-            cls.TEXTURE_CACHE[name] = texture
+            cls._cache_texture(name,texture,texture.width*texture.height*4)
         except:
             Logger.info('GameApp: Image %s is not properly formatted.' % repr(name))
             exc_type, exc_value, exc_tb = sys.exc_info()
@@ -235,6 +370,47 @@ class GameApp(kivy.app.App):
         
         return texture
     
+    @classmethod
+    def load_repeating_texture(cls,name):
+        """
+        Returns: A texture for the given file name that repeats, or None if it cannot be loaded
+        
+        The textures from :meth:`load_texture` are shared by every object with the same
+        ``source``, and so their ``wrap`` must stay 'clamp_to_edge'.  Otherwise, the 
+        edges of those objects bleed into the opposite edge when they are scaled.  So 
+        this method loads a separate copy of the image, whose ``wrap`` is 'repeat'.  
+        
+        The copy is cached under the key ``name+'#repeat'``.  It counts against the
+        :attr:`TEXTURE_BUDGET` and is evicted like any other texture.  An object that
+        uses the copy keeps it alive, even if it is evicted.  The file should not be
+        packed into an atlas, as a region of an atlas page cannot repeat.
+        
+        :param name: The file name
+        :type name:  ``str``
+        """
+        key = name+'#repeat'
+        if not cls.is_image(name):
+            Logger.info('GameApp: No image file named %s.' % repr(name))
+            return None
+        elif key in cls.TEXTURE_CACHE:
+            cls.TEXTURE_CACHE.move_to_end(key)
+            cls.TEXTURE_STATS['hits'] += 1
+            return cls.TEXTURE_CACHE[key]
+        
+        try:
+            from kivy.core.image import Image
+            # Bypass the Kivy cache, which would return the shared texture
+            texture = Image(name,nocache=True).texture
+            texture.wrap = 'repeat'
+            cls._cache_texture(key,texture,texture.width*texture.height*4)
+        except:
+            Logger.info('GameApp: Image %s is not properly formatted.' % repr(name))
+            exc_type, exc_value, exc_tb = sys.exc_info()
+            items = traceback.format_exception(exc_type, exc_value, exc_tb)
+            Logger.info(items[-1].strip())
+            texture = None
+        return texture
+    
     @classmethod
     def unload_texture(cls,name):
         """
@@ -248,12 +424,235 @@ class GameApp(kivy.app.App):
         :type name:  ``str``
         """
         assert type(name) == str, '%s is not a valid texture name' % repr(name)
-        if name in cls.TEXTURE_CACHE:
-            texture = cls.TEXTURE_CACHE[name]
-            del cls.TEXTURE_CACHE[name]
-            return texture
+        cls._forget_frames([name])
+        return cls._drop_texture(name)
+    
+    @classmethod
+    def hold_texture(cls,owner,name):
+        """
+        Returns: A function that releases the hold on the texture
         
-        return None
+        While a texture is held, it is never evicted from the texture cache (see 
+        :meth:`load_texture`).  The texture does not have to be loaded yet.  Images,
+        sprites and tiles hold the texture of their ``source``.
+        
+        The hold is released by calling the function that is returned, or else when 
+        ``owner`` is garbage collected, whichever happens first.  Calling the function
+        more than once has no effect.
+        
+        :param owner: The object using the texture
+        :type owner:  any object that can be weakly referenced
+        
+        :param name: The file name
+        :type name:  ``str``
+        """
+        cls.TEXTURE_REFS[name] = cls.TEXTURE_REFS.get(name,0)+1
+        release = weakref.finalize(owner,cls._release_texture,name)
+        release.atexit = False
+        return release
+    
+    @classmethod
+    def texture_stats(cls):
+        """
+        Returns: A dictionary of statistics about the texture cache
+        
+        The keys are 'hits', 'misses' and 'evictions' (counted since the program 
+        started), 'resident' and 'budget' (in bytes), 'count' (the number of cached 
+        textures) and 'held' (the number of textures held by objects).
+        
+        Only the cached textures are 'resident'.  A texture removed from the cache (by
+        :meth:`unload_texture` or :meth:`load_atlas`) may still be alive, if an object 
+        is drawing it, but it is no longer counted.  Held textures are never evicted, 
+        so they are always counted.
+        """
+        result = dict(cls.TEXTURE_STATS)
+        result['resident'] = cls.TEXTURE_RESIDENT
+        result['budget'] = cls.TEXTURE_BUDGET
+        result['count'] = len(cls.TEXTURE_CACHE)
+        result['held'] = len(cls.TEXTURE_REFS)
+        return result
+    
+    @classmethod
+    def load_frames(cls,name,format):
+        """
+        Returns: The frames of the given filmstrip, or None if it cannot be loaded
+        
+        The image is divided into a grid of equal rectangles, with ``format`` giving the
+        number of (rows, columns).  The frames are these rectangles as texture regions,
+        left-to-right and top-to-bottom.  They are cut out of the texture the first time
+        they are needed, and then cached, so that every sprite with the same image and
+        format shares the same frames.
+        
+        :param name: The file name
+        :type name:  ``str``
+        
+        :param format: The grid size as (rows, columns)
+        :type format:  2-element tuple of ints > 0
+        """
+        key = (name,tuple(format))
+        if key in cls.FRAME_CACHE:
+            return cls.FRAME_CACHE[key]
+        
+        texture = cls.load_texture(name)
+        if texture is None:
+            return None
+        
+        (rows,columns) = key[1]
+        width  = texture.width/columns
+        height = texture.height/rows
+        frames = []
+        for row in range(rows):
+            for col in range(columns):
+                frames.append(texture.get_region(int(col*width),
+                                                 texture.height-int(row*height)-int(height),
+                                                 int(width),int(height)))
+        frames = tuple(frames)
+        cls.FRAME_CACHE[key] = frames
+        return frames
+    
+    @classmethod
+    def load_text(cls,text,font_name,font_size,bold,color,halign,valign):
+        """
+        Returns: The texture of the given text, rendered with the given options
+        
+        Rendering text is expensive, so the texture is cached.  Labels with the same text
+        and options (like the messages of a game, redrawn every frame) share a single
+        texture.  The cache keeps only the :attr:`TEXT_CACHE_SIZE` most recently used
+        textures.  An evicted texture stays alive as long as a label still draws it, so
+        this only bounds the textures that nothing is using.
+        
+        :param text: The text to render
+        :type text:  ``str``
+        
+        :param font_name: The font name (a file in the **Fonts** folder, or a Kivy font)
+        :type font_name:  ``str``
+        
+        :param font_size: The font size in pixels
+        :type font_size:  ``int`` or ``float``
+        
+        :param bold: Whether the text is bold
+        :type bold:  ``bool``
+        
+        :param color: The text color
+        :type color:  4-element tuple of floats
+        
+        :param halign: The alignment of the lines of text
+        :type halign:  ``str``
+        
+        :param valign: The vertical alignment of the text
+        :type valign:  ``str``
+        """
+        key = (text,font_name,font_size,bold,tuple(color),halign,valign)
+        if key in cls.TEXT_CACHE:
+            cls.TEXT_CACHE.move_to_end(key)
+            cls.TEXT_STATS['hits'] += 1
+            return cls.TEXT_CACHE[key]
+        
+        from kivy.core.text import Label
+        label = Label(text=text,font_name=font_name,font_size=font_size,bold=bold,
+                      color=key[4],halign=halign,valign=valign)
+        label.refresh()
+        texture = label.texture
+        cls.TEXT_STATS['misses'] += 1
+        cls.TEXT_CACHE[key] = texture
+        while len(cls.TEXT_CACHE) > max(0,cls.TEXT_CACHE_SIZE):
+            cls.TEXT_CACHE.popitem(last=False)
+            cls.TEXT_STATS['evictions'] += 1
+        return texture
+    
+    @classmethod
+    def text_cache_stats(cls):
+        """
+        Returns: A dictionary of statistics about the text cache
+        
+        The keys are 'hits', 'misses' and 'evictions' (counted since the last call to
+        :meth:`clear_text_cache`), as well as 'size' and 'capacity'.
+        """
+        result = dict(cls.TEXT_STATS)
+        result['size'] = len(cls.TEXT_CACHE)
+        result['capacity'] = cls.TEXT_CACHE_SIZE
+        return result
+    
+    @classmethod
+    def clear_text_cache(cls):
+        """
+        Empties the text cache and resets its statistics
+        """
+        cls.TEXT_CACHE.clear()
+        for key in cls.TEXT_STATS:
+            cls.TEXT_STATS[key] = 0
+    
+    @classmethod
+    def load_atlas(cls,name,sources=None,size=1024,padding=2):
+        """
+        Returns: The image files in the given atlas, or None if it cannot be loaded
+        
+        An atlas packs many images into a few large textures (pages), so that objects 
+        with different images can still share a texture.  Atlases are stored in the 
+        **atlas** subfolder of the **Images** folder.  Once an atlas is loaded, 
+        :meth:`load_texture` returns regions of its pages for every image in it.  Images 
+        that were already loaded are evicted from the texture cache, so that they are
+        taken from the atlas the next time they are loaded.
+        
+        If ``sources`` is not None, the atlas is built from those image files first. The 
+        atlas is cached on disk, and it is only rebuilt if an image file has changed 
+        since the last build.  Files that are not in the **Images** folder are skipped.
+        See the module :mod:`atlas` for the meaning of ``size`` and ``padding``.
+        
+        :param name: The atlas name (without the '.atlas' suffix)
+        :type name:  ``str``
+        
+        :param sources: The image files to build the atlas from (or None)
+        :type sources:  ``list`` of ``str`` or ``None``
+        
+        :param size: The width and height of an atlas page
+        :type size:  ``int`` > 0
+        
+        :param padding: The gap in pixels around each image in a page
+        :type padding:  ``int`` >= 0
+        """
+        assert type(name) == str, '%s is not a valid atlas name' % repr(name)
+        from . import atlas
+        path = os.path.join(cls.images,'atlas',name+'.atlas')
+        try:
+            if not sources is None:
+                sources = [file for file in sources if cls.is_image(file)]
+                if atlas.build_atlas(path,sources,cls.images,size,padding):
+                    Logger.info('GameApp: Built atlas %s.' % repr(name))
+            index = atlas.read_atlas(path)
+        except:
+            Logger.info('GameApp: Atlas %s could not be loaded.' % repr(name))
+            exc_type, exc_value, exc_tb = sys.exc_info()
+            items = traceback.format_exception(exc_type, exc_value, exc_tb)
+            Logger.info(items[-1].strip())
+            return None
+        
+        for file in index:
+            entry = index[file]
+            cls.ATLAS_INDEX[file] = (name,'atlas/'+entry[0])+entry[1:]
+            cls._drop_texture(file)
+        cls._forget_frames(index)
+        return sorted(index)
+    
+    @classmethod
+    def unload_atlas(cls,name):
+        """
+        Returns: The image files that were in the given atlas
+        
+        The images and pages of the atlas are removed from the texture cache, and
+        :meth:`load_texture` loads each image from its own file again.
+        
+        :param name: The atlas name (without the '.atlas' suffix)
+        :type name:  ``str``
+        """
+        assert type(name) == str, '%s is not a valid atlas name' % repr(name)
+        files = [file for file in cls.ATLAS_INDEX if cls.ATLAS_INDEX[file][0] == name]
+        for file in files:
+            cls._drop_texture(cls.ATLAS_INDEX[file][1])
+            cls._drop_texture(file)
+            del cls.ATLAS_INDEX[file]
+        cls._forget_frames(files)
+        return sorted(files)
     
     @classmethod
     def load_json(cls,name):
@@ -263,6 +662,12 @@ class GameApp(kivy.app.App):
         The ``name`` must refer to the file in the **JSON** folder.  If the file is
         not there, it will return None.
         
+        Parsed files are cached.  If the file has already been loaded, and neither its 
+        modification time nor its size have changed since then, this method will return 
+        the cached data without touching the file contents.  Otherwise, it will reload 
+        the file and cache it before returning it.  Because the data is shared, you 
+        should never modify the value returned by this method.
+        
         :param name: The file name
         :type name:  ``str``
         """
@@ -270,8 +675,20 @@ class GameApp(kivy.app.App):
             Logger.info('GameApp: No json file named %s.' % repr(name))
             return None
         
+        path = os.path.join(cls.json,name)
+        try:
+            stats = os.stat(path)
+            stamp = (stats.st_mtime_ns, stats.st_size)
+        except OSError:
+            stamp = None
+        
+        if not stamp is None and name in cls.JSON_CACHE:
+            entry = cls.JSON_CACHE[name]
+            if entry[:2] == stamp:
+                return entry[2]
+        
         data = None
-        with open(os.path.join(cls.json,name)) as f: 
+        with open(path) as f: 
             data = f.read()
         
         if not data is None:
@@ -283,8 +700,38 @@ class GameApp(kivy.app.App):
                 items = traceback.format_exception(exc_type, exc_value, exc_tb)
                 Logger.info(items[-1].strip())
                 data = None
+        
+        if data is None or stamp is None:
+            cls.JSON_CACHE.pop(name,None)
+        else:
+            cls.JSON_CACHE[name] = stamp+(data,)
         return data
     
+    @classmethod
+    def unload_json(cls,name=None):
+        """
+        Returns: The cached JSON for the given file name, or None if it does not exist
+        
+        The ``name`` should refer to the file in the JSON cache.  If the file is in 
+        the cache, it will return the cached data before removing it. Otherwise, it will 
+        return None.  The next call to :meth:`load_json` will reload the file.
+        
+        If ``name`` is None, this method evicts every file from the JSON cache and 
+        returns None.
+        
+        :param name: The file name
+        :type name:  ``str`` or ``None``
+        """
+        assert name is None or type(name) == str, '%s is not a valid file name' % repr(name)
+        if name is None:
+            cls.JSON_CACHE.clear()
+        elif name in cls.JSON_CACHE:
+            data = cls.JSON_CACHE[name][2]
+            del cls.JSON_CACHE[name]
+            return data
+        
+        return None
+    
     # BUILT-IN METHODS
     def __init__(self,**keywords):
         """
@@ -303,23 +750,45 @@ class GameApp(kivy.app.App):
         **You will never call the constructor or run yourself**.  That is handled for 
         you in the provided code.
         
+        The keyword ``profile`` enables the frame profiler (see ``profiler``). It may be
+        True, or the number of events that the profiler keeps.
+        
         :param keywords: dictionary of keyword arguments 
         :type keywords:  keys are attribute names
         """
         w = keywords.pop('width', 0.0)
         h = keywords.pop('height', 0.0)
         f = keywords.pop('fps', 60.0)
+        t = keywords.pop('timestep', None)
+        m = keywords.pop('maxsteps', 5)
+        p = keywords.pop('profile', False)
         
         assert type(w) in [int,float], 'width %s is not a number' % repr(w)
         assert type(h) in [int,float], 'height %s is not a number' % repr(h)
         assert type(f) in [int,float], 'fps %s is not a number' % repr(value)
         assert f > 0, 'fps %s is not positive' % repr(value)
+        assert t is None or type(t) in [int,float], 'timestep %s is not a number' % repr(t)
+        assert t is None or t > 0, 'timestep %s is not positive' % repr(t)
+        assert type(m) == int, 'maxsteps %s is not an int' % repr(m)
+        assert m > 0, 'maxsteps %s is not positive' % repr(m)
+        assert type(p) in [bool,int] and p >= 0, 'profile %s is not valid' % repr(p)
         
         self._gwidth = w
         self._gheight = h
         Window.size = (self.width,self.height)
         
         self._fps = f
+        self._timestep = t
+        self._maxsteps = m
+        self._accumulator = 0
+        self._alpha = 1.0
+        
+        from .profiler import Profiler, _NULL_PROFILER
+        self._profiler = None
+        self._frametimer = _NULL_PROFILER
+        if p:
+            self._profiler = Profiler(budget=1.0/f) if p is True else Profiler(p,1.0/f)
+            self._frametimer = self._profiler
         
         x = keywords.pop('left', None)
         y = keywords.pop('top', None)
@@ -423,6 +892,100 @@ class GameApp(kivy.app.App):
     
     
     # HIDDEN METHODS
+    @classmethod
+    def _cache_texture(cls,name,texture,size):
+        """
+        Adds a newly loaded texture to the texture cache, evicting old ones if necessary
+        
+        :param name: The file name
+        :type name:  ``str``
+        
+        :param texture: The texture
+        :type texture:  ``Texture``
+        
+        :param size: The size of the texture in bytes
+        :type size:  ``int``
+        """
+        cls.TEXTURE_STATS['misses'] += 1
+        cls._drop_texture(name)
+        cls.TEXTURE_CACHE[name] = texture
+        cls.TEXTURE_SIZES[name] = size
+        cls.TEXTURE_RESIDENT += size
+        cls._trim_textures(name)
+    
+    @classmethod
+    def _drop_texture(cls,name):
+        """
+        Returns: The texture removed from the texture cache, or None if it was not cached
+        
+        :param name: The file name
+        :type name:  ``str``
+        """
+        cls.TEXTURE_RESIDENT -= cls.TEXTURE_SIZES.pop(name,0)
+        return cls.TEXTURE_CACHE.pop(name,None)
+    
+    @classmethod
+    def _release_texture(cls,name):
+        """
+        Releases one hold on a texture (see :meth:`hold_texture`)
+        
+        :param name: The file name
+        :type name:  ``str``
+        """
+        count = cls.TEXTURE_REFS.get(name,0)-1
+        if count > 0:
+            cls.TEXTURE_REFS[name] = count
+        else:
+            cls.TEXTURE_REFS.pop(name,None)
+            cls._trim_textures()
+    
+    @classmethod
+    def _trim_textures(cls,keep=None):
+        """
+        Evicts the least recently used textures until the cache fits in its budget
+        
+        Held textures are never evicted.  Neither is an atlas page if any of its images
+        is held, as the regions of a page share its memory.  Evicting a page evicts its 
+        regions too.
+        
+        :param keep: A texture to keep anyway (the one just loaded)
+        :type keep:  ``str`` or ``None``
+        """
+        if cls.TEXTURE_RESIDENT <= cls.TEXTURE_BUDGET:
+            return
+        
+        held = set(cls.TEXTURE_REFS)
+        held.add(keep)
+        for name in cls.TEXTURE_REFS:
+            if name in cls.ATLAS_INDEX:
+                held.add(cls.ATLAS_INDEX[name][1])
+        
+        for name in list(cls.TEXTURE_CACHE):
+            if cls.TEXTURE_RESIDENT <= cls.TEXTURE_BUDGET:
+                break
+            elif name in held or not cls.TEXTURE_SIZES.get(name,0):
+                # Regions are evicted with their page
+                continue
+            evicted = [name]+[file for file in cls.ATLAS_INDEX 
+                              if cls.ATLAS_INDEX[file][1] == name]
+            for file in evicted:
+                if file in cls.TEXTURE_CACHE:
+                    cls._drop_texture(file)
+                    cls.TEXTURE_STATS['evictions'] += 1
+            cls._forget_frames(evicted)
+    
+    @classmethod
+    def _forget_frames(cls,names):
+        """
+        Removes the frames of the given image files from the frame cache
+        
+        :param names: The file names
+        :type names:  iterable of ``str``
+        """
+        names = set(names)
+        for key in [key for key in cls.FRAME_CACHE if key[0] in names]:
+            del cls.FRAME_CACHE[key]
+    
     def _bootstrap(self,dt):
         """
         Bootstraps the clock scheduler for the game..
@@ -434,6 +997,8 @@ class GameApp(kivy.app.App):
             Clock.schedule_interval(self._refresh,1.0/self.fps)
         else:
             Clock.schedule_interval(self._refresh,0)
+        if not self._profiler is None:
+            self._profiler.activate()
         self.start()
     
     def _refresh(self,dt):
@@ -443,13 +1008,49 @@ class GameApp(kivy.app.App):
         This method a callback-proxy for the methods `update` and `draw`.  It handles
         important issues behind the scenes, particularly with clearing the window.
         
+        In fixed-timestep mode, this method runs as many fixed updates as the elapsed 
+        time allows (see ``timestep``) and sets ``alpha`` before drawing.
+        
+        Every phase of the frame is timed by the profiler.  When profiling is disabled,
+        the timer is a null profiler whose spans do nothing.
+        
         :param dt: time in seconds since last update
         :type dt:  ``int`` or ``float``
         """
-        self.view.clear()
-        self.update(dt)
-        self.draw()
-        self.input.refresh()
+        timer = self._frametimer
+        timer.begin_frame()
+        with timer.span('clear'):
+            self.view.clear()
+        
+        steps = 0
+        dropped = 0
+        if self._timestep is None:
+            with timer.span('update'):
+                self.update(dt)
+            steps = 1
+        else:
+            self._accumulator += dt
+            while self._accumulator >= self._timestep and steps < self._maxsteps:
+                with timer.span('update'):
+                    self.update(self._timestep)
+                with timer.span('input'):
+                    self.input.refresh()
+                self._accumulator -= self._timestep
+                steps += 1
+            if self._accumulator >= self._timestep:
+                # Too far behind; drop the time we cannot catch up on
+                dropped = int(self._accumulator // self._timestep)
+                self._accumulator %= self._timestep
+            self._alpha = self._accumulator/self._timestep
+        
+        with timer.span('draw'):
+            self.draw()
+            self.view._flush()
+        
+        if self._timestep is None:
+            with timer.span('input'):
+                self.input.refresh()
+        timer.end_frame(steps,dropped)
     
     def _setpaths(self):
         """
@@ -0,0 +1,316 @@
+"""
+Texture atlases for 2D game support.
+
+Every image file is normally its own texture, so drawing a scene full of different
+images binds a new texture for almost every object.  An atlas packs many small images
+into a few large pages, and each image becomes a region (a rectangle of UV coordinates)
+of one page.  Objects drawn from the same page share a texture.
+
+Atlases are built offline, and cached on disk.  An atlas is written in the Kivy atlas
+format (a JSON file mapping each page to the rectangles in it, next to the page images),
+together with a manifest of the image files that it was built from.  The atlas is only
+rebuilt when one of those files changes.  You will rarely use this module directly; use
+:meth:`GameApp.load_atlas` instead, and :meth:`GameApp.load_texture` will return the
+atlas regions transparently.
+
+To build an atlas from the command line, type::
+
+    python atlas.py OUTPUT.atlas IMAGE1.png IMAGE2.png ...
+"""
+import os.path
+import hashlib
+import struct
+import json
+import zlib
+import numpy
+
+
+# The version of the manifest format (a different version forces a rebuild)
+MANIFEST_VERSION = 1
+
+
+# PUBLIC FUNCTIONS
+def build_atlas(path,sources,folder=None,size=1024,padding=2):
+    """
+    Returns: True if the atlas was (re)built, False if the cached atlas is up to date
+
+    The images are packed into pages of at most ``size`` x ``size`` pixels.  The pages are
+    written next to the atlas file, named after it (so ``objects.atlas`` has the pages
+    ``objects-0.png``, ``objects-1.png`` and so on).  Each image is surrounded by
+    ``padding`` pixels, and the edges of each image are copied into that padding, so
+    that filtering never bleeds in color from a neighbor.
+
+    Images larger than a page get a page of their own.
+
+    :param path: The file name of the atlas
+    :type path:  ``str`` ending in '.atlas'
+
+    :param sources: The image files to pack (relative to ``folder``)
+    :type sources:  ``list`` of ``str``
+
+    :param folder: The folder with the image files (None for the current folder)
+    :type folder:  ``str`` or ``None``
+
+    :param size: The width and height of a page in pixels
+    :type size:  ``int`` > 0
+
+    :param padding: The gap in pixels around each image
+    :type padding:  ``int`` >= 0
+    """
+    assert type(path) == str and path[-6:] == '.atlas', '%s is not an atlas file' % repr(path)
+    assert type(size) == int and size > 0, 'size %s is not a positive int' % repr(size)
+    assert type(padding) == int and padding >= 0, 'padding %s is not valid' % repr(padding)
+    folder = '' if folder is None else folder
+    sources = sorted(set(sources))
+
+    manifest = {'version':MANIFEST_VERSION,'size':size,'padding':padding,
+                'sources':{name : _digest(os.path.join(folder,name)) for name in sources}}
+    if read_manifest(path) == manifest and os.path.exists(path):
+        return False
+
+    images = {name : read_image(os.path.join(folder,name)) for name in sources}
+    layout = pack_rects({name : images[name].shape[1::-1] for name in sources},size,padding)
+
+    base = os.path.splitext(os.path.basename(path))[0]
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    atlas = {}
+    for (page,(width,height,rects)) in enumerate(layout):
+        pixels = numpy.zeros((height,width,4),dtype=numpy.uint8)
+        entries = {}
+        for (name,x,y) in rects:
+            image = images[name]
+            h, w = image.shape[:2]
+            if padding:
+                edge = padding//2
+                pixels[y-edge:y+h+edge,x-edge:x+w+edge] = numpy.pad(image,
+                        ((edge,edge),(edge,edge),(0,0)),mode='edge')
+            else:
+                pixels[y:y+h,x:x+w] = image
+            # Kivy measures regions from the bottom of the page
+            entries[name] = [x,height-y-h,w,h]
+        file = '%s-%d.png' % (base,page)
+        write_png(os.path.join(directory,file),pixels)
+        atlas[file] = entries
+
+    with open(path,'w') as f:
+        json.dump(atlas,f,indent=1,sort_keys=True)
+    with open(_manifest_path(path),'w') as f:
+        json.dump(manifest,f,indent=1,sort_keys=True)
+    return True
+
+
+def is_fresh(path,sources,folder=None):
+    """
+    Returns: True if the atlas exists and was built from the current image files
+
+    :param path: The file name of the atlas
+    :type path:  ``str``
+
+    :param sources: The image files that should be in the atlas (relative to ``folder``)
+    :type sources:  ``list`` of ``str``
+
+    :param folder: The folder with the image files (None for the current folder)
+    :type folder:  ``str`` or ``None``
+    """
+    manifest = read_manifest(path)
+    if manifest is None or manifest.get('version') != MANIFEST_VERSION:
+        return False
+    if not os.path.exists(path):
+        return False
+    folder = '' if folder is None else folder
+    stamps = manifest['sources']
+    if sorted(stamps) != sorted(set(sources)):
+        return False
+    for name in stamps:
+        if _digest(os.path.join(folder,name)) != stamps[name]:
+            return False
+    return True
+
+
+def read_manifest(path):
+    """
+    Returns: The manifest of the given atlas, or None if it does not exist
+
+    :param path: The file name of the atlas
+    :type path:  ``str``
+    """
+    try:
+        with open(_manifest_path(path)) as f:
+            return json.load(f)
+    except (OSError,ValueError):
+        return None
+
+
+def read_atlas(path):
+    """
+    Returns: A dictionary mapping each image in the atlas to its page and rectangle
+
+    Each value is a tuple (page,x,y,width,height), where page is the file name of the
+    page (relative to the atlas) and the rectangle is measured from the bottom left
+    corner of the page, like :meth:`kivy.graphics.texture.Texture.get_region`.
+
+    :param path: The file name of the atlas
+    :type path:  ``str``
+    """
+    with open(path) as f:
+        data = json.load(f)
+    result = {}
+    for page in data:
+        for name in data[page]:
+            result[name] = (page,)+tuple(data[page][name])
+    return result
+
+
+def pack_rects(sizes,size=1024,padding=2):
+    """
+    Returns: The pages of a layout for rectangles of the given sizes
+
+    The rectangles are packed onto shelves, tallest first.  Each page is a tuple
+    (width,height,rects) where rects is a list of tuples (name,x,y), measured from the
+    top left corner of the page.  The width and height of each page are powers of two,
+    trimmed to the rectangles on it.
+
+    :param sizes: The (width,height) of each rectangle, by name
+    :type sizes:  ``dict``
+
+    :param size: The width and height of a page in pixels
+    :type size:  ``int`` > 0
+
+    :param padding: The gap in pixels around each rectangle
+    :type padding:  ``int`` >= 0
+    """
+    order = sorted(sizes,key=lambda name: (-sizes[name][1],-sizes[name][0],name))
+    pages = []
+    cursor = None
+    for name in order:
+        w = sizes[name][0]+padding
+        h = sizes[name][1]+padding
+        if w > size or h > size:
+            # Too big to share a page
+            pages.append([[(name,padding//2,padding//2)],w,h])
+            continue
+
+        if not cursor is None:
+            (page,x,y,shelf) = cursor
+            if x+w > size:
+                (x,y,shelf) = (0,y+shelf,0)
+            cursor = None if y+h > size else (page,x,y,shelf)
+        if cursor is None:
+            pages.append([[],0,0])
+            cursor = (len(pages)-1,0,0,0)
+
+        (page,x,y,shelf) = cursor
+        entry = pages[page]
+        entry[0].append((name,x+padding//2,y+padding//2))
+        entry[1] = max(entry[1],x+w)
+        entry[2] = max(entry[2],y+h)
+        cursor = (page,x+w,y,max(shelf,h))
+
+    result = []
+    for (rects,width,height) in pages:
+        result.append((_power_of_two(width),_power_of_two(height),rects))
+    return result
+
+
+def read_image(path):
+    """
+    Returns: The pixels of the given image file as an RGBA array
+
+    The array has shape (height,width,4) and type uint8, with the top row first.
+
+    :param path: The file name of the image
+    :type path:  ``str``
+    """
+    assert os.path.isfile(path), '%s is not an image file' % repr(path)
+    from kivy.core.image import ImageLoader
+    data = ImageLoader.load(path,keep_data=True)._data[0]
+    channels = len(data.fmt)
+    assert data.fmt in ('rgb','rgba'), '%s has unsupported format %s' % (repr(path),data.fmt)
+    rows = numpy.frombuffer(data.data,dtype=numpy.uint8)
+    rows = rows.reshape(data.height,-1)[:,:data.width*channels]
+    pixels = rows.reshape(data.height,data.width,channels)
+    if channels == 3:
+        alpha = numpy.full((data.height,data.width,1),255,dtype=numpy.uint8)
+        pixels = numpy.concatenate((pixels,alpha),axis=2)
+    return pixels
+
+
+def write_png(path,pixels):
+    """
+    Writes an RGBA array to a PNG file
+
+    :param path: The file name of the image
+    :type path:  ``str``
+
+    :param pixels: The pixels, with shape (height,width,4) and the top row first
+    :type pixels:  ``numpy.ndarray`` of uint8
+    """
+    height, width = pixels.shape[:2]
+    # Every row starts with filter type 0 (None)
+    rows = numpy.zeros((height,width*4+1),dtype=numpy.uint8)
+    rows[:,1:] = pixels.reshape(height,width*4)
+
+    def chunk(kind,data):
+        body = kind+data
+        return struct.pack('>I',len(data))+body+struct.pack('>I',zlib.crc32(body))
+
+    header = struct.pack('>IIBBBBB',width,height,8,6,0,0,0)
+    with open(path,'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR',header))
+        f.write(chunk(b'IDAT',zlib.compress(rows.tobytes(),9)))
+        f.write(chunk(b'IEND',b''))
+
+
+# HIDDEN FUNCTIONS
+def _manifest_path(path):
+    """
+    Returns: The file name of the manifest for the given atlas
+
+    :param path: The file name of the atlas
+    :type path:  ``str``
+    """
+    return os.path.splitext(path)[0]+'.manifest'
+
+
+def _digest(path):
+    """
+    Returns: The SHA-1 digest of the given file, or None if it cannot be read
+
+    :param path: The file name
+    :type path:  ``str``
+    """
+    try:
+        with open(path,'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _power_of_two(value):
+    """
+    Returns: The smallest power of two that is at least value
+
+    :param value: The value to round up
+    :type value:  ``int`` > 0
+    """
+    result = 1
+    while result < value:
+        result *= 2
+    return result
+
+
+if __name__ == '__main__':
+    import sys
+    if len(sys.argv) < 3:
+        print('Usage: python atlas.py OUTPUT.atlas IMAGE1.png IMAGE2.png ...')
+        sys.exit(1)
+    names = [os.path.basename(name) for name in sys.argv[2:]]
+    folder = os.path.dirname(sys.argv[2])
+    if build_atlas(sys.argv[1],names,folder):
+        print('Built %s' % sys.argv[1])
+    else:
+        print('%s is up to date' % sys.argv[1])
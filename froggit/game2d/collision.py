@@ -0,0 +1,483 @@
+"""
+A module to support collision detection between many objects.
+
+The method :meth:`GObject.collides` tests a single pair of objects.  Finding every
+collision among N objects that way takes N*N tests, which is far too slow once there are
+hundreds of objects.  A :class:`CollisionWorld` instead sorts the objects into a uniform
+grid of square cells, by their bounding boxes.  Two objects can only collide if they
+share a cell, so each query only tests the few objects near it.
+
+The grid is updated incrementally.  An object is only moved in the grid when its
+bounding box has changed, and only if it has moved into different cells.
+
+Testing positions once a frame misses fast objects, which can jump clean past each other
+between two frames.  The function :func:`sweep` instead finds the time of impact of two
+boxes moving over an interval, so that nothing is missed at any frame rate.
+"""
+import math
+from .gobject import GObject
+
+
+# The mask that matches every layer
+ALL_LAYERS = 0xFFFFFFFF
+
+
+class _Entry(object):
+    """
+    The record of one object in a collision world.
+    """
+    __slots__ = ('obj','layer','mask','order','version','box','cells')
+
+    def __init__(self,obj,layer,mask,order):
+        """
+        Creates a new record for the given object
+
+        :param obj: The object
+        :type obj:  :class:`GObject`
+
+        :param layer: The layer bits of the object
+        :type layer:  ``int``
+
+        :param mask: The layer bits that the object collides with
+        :type mask:  ``int``
+
+        :param order: The position of the object in the order of registration
+        :type order:  ``int``
+        """
+        self.obj = obj
+        self.layer = layer
+        self.mask = mask
+        self.order = order
+        # The object version and box when the entry was last placed in the grid
+        self.version = None
+        self.box = None
+        # The range of cells (left,bottom,right,top) that the entry is in
+        self.cells = None
+
+
+class CollisionWorld(object):
+    """
+    A class representing a set of objects that can collide with each other.
+
+    Objects are added with :meth:`add`.  Each object is on one or more layers, and has
+    a mask of the layers that it collides with.  Both are bit sets, so there can be up
+    to 32 layers.  For example, in a game where bullets hit aliens, but neither hits its
+    own kind::
+
+        world = CollisionWorld()
+        for alien in aliens:
+            world.add(alien,layer=1,mask=2)
+        for bullet in bullets:
+            world.add(bullet,layer=2,mask=1)
+
+    Once the objects have moved (normally once per animation frame), call :meth:`update`
+    to update the grid.  The methods :meth:`query`, :meth:`query_point`,
+    :meth:`query_rect` and :meth:`pairs` then find the collisions.  The results are
+    always in the order that the objects were added.
+
+    The objects are found by their bounding boxes (including hitboxes).  The methods
+    :meth:`query` and :meth:`pairs` then test each candidate with :meth:`GObject.collides`,
+    and :meth:`query_point` with :meth:`GObject.contains`.  For objects turned by a 
+    multiple of 90 degrees, the results are the same as testing every object by hand.
+    For other angles, :meth:`GObject.collides` is conservative, and may accept objects
+    whose bounding boxes do not even touch.  These are never reported.
+
+    The grid works best when the cells are a bit larger than a typical object.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def cell_size(self):
+        """
+        The width (and height) of a grid cell.
+
+        **Immutable**: This value cannot be changed after the world is created.
+
+        **invariant**: Value is an ``int`` or ``float`` > 0
+        """
+        return self._size
+
+    # BUILT-IN METHODS
+    def __init__(self,cell_size=64):
+        """
+        Creates a new, empty collision world.
+
+        :param cell_size: the width (and height) of a grid cell
+        :type cell_size:  ``int`` or ``float`` > 0
+        """
+        assert type(cell_size) in [int,float], '%s is not a number' % repr(cell_size)
+        assert cell_size > 0, '%s is not positive' % repr(cell_size)
+        self._size = cell_size
+        # The entries by object id, and the entries in each cell (i,j) by object id
+        self._entries = {}
+        self._grid = {}
+        self._count = 0
+
+    def __len__(self):
+        """
+        :return: The number of objects in this world
+        :rtype:  ``int``
+        """
+        return len(self._entries)
+
+    def __contains__(self,obj):
+        """
+        :return: True if the object is in this world
+        :rtype:  ``bool``
+        """
+        return id(obj) in self._entries
+
+    def __str__(self):
+        """
+        :return: A readable string representation of this world.
+        :rtype:  ``str``
+        """
+        return '[%s,objects=%s,cells=%s]' % (self.__class__.__name__,
+                                             len(self._entries),len(self._grid))
+
+    # PUBLIC METHODS
+    def add(self,obj,layer=1,mask=ALL_LAYERS):
+        """
+        Adds an object to this world.
+
+        If the object is already in this world, this only changes its layer and mask.
+
+        :param obj: the object to add
+        :type obj:  :class:`GObject`
+
+        :param layer: the layers of the object, as bits
+        :type layer:  ``int`` >= 0
+
+        :param mask: the layers that the object collides with, as bits
+        :type mask:  ``int`` >= 0
+        """
+        assert isinstance(obj,GObject), '%s is not an instance of GObject' % repr(obj)
+        assert type(layer) == int and layer >= 0, '%s is not a valid layer' % repr(layer)
+        assert type(mask) == int and mask >= 0, '%s is not a valid mask' % repr(mask)
+        key = id(obj)
+        if key in self._entries:
+            entry = self._entries[key]
+            entry.layer = layer
+            entry.mask = mask
+            return
+        entry = _Entry(obj,layer,mask,self._count)
+        self._count += 1
+        self._entries[key] = entry
+        self._place(entry)
+
+    def remove(self,obj):
+        """
+        Removes an object from this world.
+
+        :param obj: the object to remove
+        :type obj:  :class:`GObject`
+        """
+        key = id(obj)
+        assert key in self._entries, '%s is not in this world' % repr(obj)
+        entry = self._entries.pop(key)
+        self._unplace(entry,key)
+
+    def clear(self):
+        """
+        Removes every object from this world.
+        """
+        self._entries.clear()
+        self._grid.clear()
+
+    def update(self,obj=None):
+        """
+        Updates the grid after objects have moved.
+
+        If ``obj`` is None, every object is checked.  An object that has not changed
+        since the last update costs a single comparison.
+
+        :param obj: the object that moved (None for every object)
+        :type obj:  :class:`GObject` or ``None``
+        """
+        if obj is None:
+            for entry in self._entries.values():
+                if entry.version != entry.obj._version or entry.obj._stale:
+                    self._place(entry)
+        else:
+            key = id(obj)
+            assert key in self._entries, '%s is not in this world' % repr(obj)
+            self._place(self._entries[key])
+
+    def query(self,obj,mask=None):
+        """
+        Returns: The objects that collide with ``obj``, in the order they were added
+
+        Only the objects on a layer in the mask are returned.  By default, this is the
+        mask that ``obj`` was added with (or every layer if it is not in this world).
+        The object ``obj`` itself is never returned.
+
+        :param obj: the object to test
+        :type obj:  :class:`GObject`
+
+        :param mask: the layers to search, as bits (None for the mask of ``obj``)
+        :type mask:  ``int`` or ``None``
+        """
+        assert isinstance(obj,GObject), '%s is not an instance of GObject' % repr(obj)
+        key = id(obj)
+        if mask is None:
+            mask = self._entries[key].mask if key in self._entries else ALL_LAYERS
+        found = self._search(_normalize(obj._bbox()),mask)
+        found.pop(key,None)
+        return self._sorted(entry for entry in found.values() if obj.collides(entry.obj))
+
+    def query_point(self,x,y,mask=ALL_LAYERS):
+        """
+        Returns: The objects that contain the point (x,y), in the order they were added
+
+        :param x: the horizontal coordinate of the point
+        :type x:  ``int`` or ``float``
+
+        :param y: the vertical coordinate of the point
+        :type y:  ``int`` or ``float``
+
+        :param mask: the layers to search, as bits
+        :type mask:  ``int``
+        """
+        assert type(x) in [int,float], '%s is not a number' % repr(x)
+        assert type(y) in [int,float], '%s is not a number' % repr(y)
+        found = self._search((x,y,x,y),mask)
+        return self._sorted(entry for entry in found.values() if entry.obj.contains((x,y)))
+
+    def query_rect(self,left,bottom,right,top,mask=ALL_LAYERS):
+        """
+        Returns: The objects whose bounding boxes overlap the rectangle, in the order they were added
+
+        :param left: the left edge of the rectangle
+        :type left:  ``int`` or ``float``
+
+        :param bottom: the bottom edge of the rectangle
+        :type bottom:  ``int`` or ``float``
+
+        :param right: the right edge of the rectangle
+        :type right:  ``int`` or ``float``
+
+        :param top: the top edge of the rectangle
+        :type top:  ``int`` or ``float``
+
+        :param mask: the layers to search, as bits
+        :type mask:  ``int``
+        """
+        assert left <= right, '%s is to the right of %s' % (repr(left),repr(right))
+        assert bottom <= top, '%s is above %s' % (repr(bottom),repr(top))
+        return self._sorted(self._search((left,bottom,right,top),mask).values())
+
+    def pairs(self):
+        """
+        Returns: The list of all pairs of colliding objects
+
+        Two objects are a pair if each is on a layer in the mask of the other, and they
+        collide.  Each pair is a tuple (a,b) where ``a`` was added before ``b``, and the
+        pairs are sorted in that order.
+        """
+        size = self._size
+        result = []
+        for ((i,j),cell) in self._grid.items():
+            if len(cell) < 2:
+                continue
+            entries = list(cell.values())
+            for pos in range(len(entries)):
+                first = entries[pos]
+                for second in entries[pos+1:]:
+                    if not (first.layer & second.mask and second.layer & first.mask):
+                        continue
+                    (a,b) = (first,second) if first.order < second.order else (second,first)
+                    if not _overlaps(a.box,b.box):
+                        continue
+                    # Two boxes share many cells, but only one has the corner of their 
+                    # overlap.  The pair is only tested in that cell.
+                    if (math.floor(max(a.box[0],b.box[0])/size) != i or 
+                        math.floor(max(a.box[1],b.box[1])/size) != j):
+                        continue
+                    if a.obj.collides(b.obj):
+                        result.append((a,b))
+        result.sort(key=lambda pair: (pair[0].order,pair[1].order))
+        return [(a.obj,b.obj) for (a,b) in result]
+
+    # HIDDEN METHODS
+    def _cells(self,box):
+        """
+        Returns: The range of cells (left,bottom,right,top) that overlap a box
+
+        :param box: The box (left,bottom,right,top)
+        :type box:  4-element tuple of numbers
+        """
+        size = self._size
+        return (math.floor(box[0]/size),math.floor(box[1]/size),
+                math.floor(box[2]/size),math.floor(box[3]/size))
+
+    def _place(self,entry):
+        """
+        Moves an entry to the cells of its current bounding box
+
+        Nothing changes in the grid if the entry is still in the same cells.
+
+        :param entry: The entry to place
+        :type entry:  :class:`_Entry`
+        """
+        box = _normalize(entry.obj._bbox())
+        entry.version = entry.obj._version
+        entry.box = box
+        cells = self._cells(box)
+        if cells == entry.cells:
+            return
+        key = id(entry.obj)
+        self._unplace(entry,key)
+        entry.cells = cells
+        for i in range(cells[0],cells[2]+1):
+            for j in range(cells[1],cells[3]+1):
+                cell = self._grid.get((i,j))
+                if cell is None:
+                    cell = {}
+                    self._grid[(i,j)] = cell
+                cell[key] = entry
+
+    def _unplace(self,entry,key):
+        """
+        Removes an entry from all of its cells
+
+        :param entry: The entry to remove
+        :type entry:  :class:`_Entry`
+
+        :param key: The id of the entry object
+        :type key:  ``int``
+        """
+        cells = entry.cells
+        if cells is None:
+            return
+        for i in range(cells[0],cells[2]+1):
+            for j in range(cells[1],cells[3]+1):
+                cell = self._grid[(i,j)]
+                del cell[key]
+                if not cell:
+                    del self._grid[(i,j)]
+        entry.cells = None
+
+    def _search(self,box,mask):
+        """
+        Returns: The entries on a layer in the mask whose boxes overlap the given box
+
+        The result is a dictionary of entries by object id.
+
+        :param box: The box (left,bottom,right,top)
+        :type box:  4-element tuple of numbers
+
+        :param mask: The layers to search, as bits
+        :type mask:  ``int``
+        """
+        (i0,j0,i1,j1) = self._cells(box)
+        found = {}
+        grid = self._grid
+        if (i1-i0+1)*(j1-j0+1) > len(grid):
+            # A huge box: it is faster to go through the occupied cells
+            cells = [grid[pos] for pos in grid if i0 <= pos[0] <= i1 and j0 <= pos[1] <= j1]
+        else:
+            cells = [grid[(i,j)] for i in range(i0,i1+1) for j in range(j0,j1+1) if (i,j) in grid]
+        for cell in cells:
+            for key in cell:
+                if not key in found:
+                    entry = cell[key]
+                    if entry.layer & mask and _overlaps(entry.box,box):
+                        found[key] = entry
+        return found
+
+    def _sorted(self,entries):
+        """
+        Returns: The objects of the given entries, in the order they were added
+
+        :param entries: The entries to sort
+        :type entries:  iterable of :class:`_Entry`
+        """
+        return [entry.obj for entry in sorted(entries,key=lambda entry: entry.order)]
+
+
+def sweep(box0,move0,box1,move1):
+    """
+    Returns: The time of impact of two moving boxes, or None if they never touch
+
+    The boxes move in a straight line over an interval of time, which is scaled to be
+    [0,1].  The result is the first time in [0,1] at which the boxes intersect, so it is
+    0 if they intersect at the start.  Boxes that only touch along an edge intersect,
+    just as in :meth:`CollisionWorld.query`.
+
+    Each box may be a :class:`GObject` (in which case its current bounding box is the
+    box at the start) or a tuple (left,bottom,right,top).  For example, to test whether
+    a car moving at ``speed`` hits a frog hopping at ``(vx,vy)`` during ``dt``, call::
+
+        sweep(car,(speed*dt,0),frog,(vx*dt,vy*dt))
+
+    :param box0: The first box at the start of the interval
+    :type box0:  :class:`GObject` or 4-element tuple of numbers
+
+    :param move0: The displacement (dx,dy) of the first box over the interval
+    :type move0:  2-element tuple of numbers
+
+    :param box1: The second box at the start of the interval
+    :type box1:  :class:`GObject` or 4-element tuple of numbers
+
+    :param move1: The displacement (dx,dy) of the second box over the interval
+    :type move1:  2-element tuple of numbers
+    """
+    if isinstance(box0,GObject):
+        box0 = _normalize(box0._bbox())
+    if isinstance(box1,GObject):
+        box1 = _normalize(box1._bbox())
+    assert len(box0) == 4, '%s is not a valid box' % repr(box0)
+    assert len(box1) == 4, '%s is not a valid box' % repr(box1)
+    assert len(move0) == 2, '%s is not a valid displacement' % repr(move0)
+    assert len(move1) == 2, '%s is not a valid displacement' % repr(move1)
+
+    # Move the second box relative to the first, and clip that motion to each axis
+    first = 0.0
+    last  = 1.0
+    for axis in (0,1):
+        low0 = box0[axis]
+        high0 = box0[axis+2]
+        low1 = box1[axis]
+        high1 = box1[axis+2]
+        speed = move1[axis]-move0[axis]
+        if speed == 0:
+            if high1 < low0 or high0 < low1:
+                return None
+        else:
+            enter = (low0-high1)/speed
+            leave = (high0-low1)/speed
+            if speed < 0:
+                (enter,leave) = (leave,enter)
+            first = max(first,enter)
+            last  = min(last,leave)
+            if first > last:
+                return None
+    return first
+
+
+def _normalize(box):
+    """
+    Returns: The box (left,bottom,right,top) of a bounding box (l,t,r,b) from GObject
+
+    The edges are sorted, as the box of an object turned by 90 degrees may have its
+    top below its bottom.
+
+    :param box: The bounding box (l,t,r,b)
+    :type box:  4-element tuple of numbers
+    """
+    (l,t,r,b) = box
+    return (min(l,r),min(t,b),max(l,r),max(t,b))
+
+
+def _overlaps(box0,box1):
+    """
+    Returns: True if two boxes (left,bottom,right,top) intersect
+
+    :param box0: The first box
+    :type box0:  4-element tuple of numbers
+
+    :param box1: The second box
+    :type box1:  4-element tuple of numbers
+    """
+    return (box0[0] <= box1[2] and box1[0] <= box0[2] and
+            box0[1] <= box1[3] and box1[1] <= box0[3])
@@ -0,0 +1,344 @@
+"""
+A module to support sprite batching.
+
+Drawing a :class:`GImage` pushes a matrix, translates, rotates, scales, draws a rectangle
+and pops the matrix again.  That is fine for a few images, but it adds up when a scene
+has thousands of them.  A sprite batch instead gathers many images into a single mesh for
+each texture.  Each image is a quad in a flat vertex buffer, with its position, rotation,
+flip and texture coordinates baked into the vertices.  The buffer is refilled every frame
+(with NumPy, so the cost per image is tiny), and drawing the batch costs one mesh update
+per texture, no matter how many images are in it.
+
+Images packed into the same atlas (see :meth:`GameApp.load_atlas`) share a texture, so
+a batch of atlas images is a single mesh.
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from .gobject import GObject
+import numpy
+import math
+
+
+# The most quads in one mesh (Kivy meshes have 16-bit indices)
+MAX_QUADS = 16383
+
+# The corners of each texture coordinate order, for (flip x, flip y)
+_FLIPS = {(False,False):(0,1,2,3), (True,False):(1,0,3,2),
+          (False,True):(3,2,1,0), (True,True):(2,3,0,1)}
+
+# The triangle indices of MAX_QUADS quads (shared by every mesh)
+_INDICES = (numpy.arange(MAX_QUADS,dtype=numpy.uint16)[:,None]*4+
+            numpy.array([0,1,2,2,3,0],dtype=numpy.uint16)).ravel()
+
+
+class GSpriteBatch(GObject):
+    """
+    A class representing many images, drawn as one mesh per texture.
+
+    A batch is filled between a call to :meth:`begin` and a call to :meth:`end`.  Each
+    call to :meth:`add` (or :meth:`add_image`) in between adds an image to the batch.
+    For example, to draw the obstacles of a lane, call::
+
+        batch.begin()
+        for car in cars:
+            batch.add_image(car)
+        batch.end()
+        batch.draw(view)
+
+    Adding images one at a time is convenient, but every call costs a little Python.
+    To add many images at once, first get a quad for each kind of image with :meth:`quad`
+    (or :meth:`image_quad`).  A quad is an int that stands for a texture together with
+    a size, angle and flip.  Quads never change, so they can be computed once, when the
+    images are created.  The method :meth:`add_quads` then adds any number of quads,
+    given their positions, in a single call.  The vertices of all of the images are
+    computed together, with a few NumPy operations, when the batch is finished.
+
+    The images in a batch are positioned in the coordinates of the batch.  By default, a
+    batch is at the origin, so that these are just the coordinates of the view.  Moving,
+    rotating or scaling the batch moves, rotates or scales all of its images at once.
+
+    Images are drawn in the order that they were added, except that all of the images
+    with the same texture are drawn together.  A batch cannot tint its images, so the
+    ``fillcolor`` of an image is ignored.
+
+    A batch may also be attached to a view (see :meth:`GView.add`).  It then stays on
+    screen, and every call to :meth:`end` updates what is shown.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def count(self):
+        """
+        The number of images drawn by this batch (as of the last call to :meth:`end`).
+
+        **Immutable**: This value cannot be changed.  Use the methods :meth:`begin`,
+        :meth:`add` and :meth:`end` instead.
+
+        **invariant**: Value is an ``int`` >= 0
+        """
+        return self._count
+
+    @property
+    def meshes(self):
+        """
+        The number of meshes used to draw this batch.
+
+        This is normally the number of different textures in the batch.
+
+        **Immutable**: This value cannot be changed.
+
+        **invariant**: Value is an ``int`` >= 0
+        """
+        return sum(len(meshes) for meshes in self._meshes)
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new, empty sprite batch.
+
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes.  This class supports the
+        same keywords as :class:`GObject`, but none of them are required.  For example,
+        a batch in the coordinates of the view is simply::
+
+            GSpriteBatch()
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._defined = False
+        # The textures (one per mesh list), and the position of each by texture id
+        self._textures = []
+        self._pages = {}
+        self._meshes = []
+        # The quad table: the corners of each quad and the position of its texture
+        self._quads = {}
+        self._corners = numpy.zeros((16,16),dtype=numpy.float32)
+        self._owners = numpy.zeros(16,dtype=numpy.intp)
+        # The quads and positions of the images added since the last call to begin
+        self._added = ([],[],[])
+        self._count = 0
+        if not 'x' in keywords:
+            keywords['x'] = 0
+        if not 'y' in keywords:
+            keywords['y'] = 0
+        GObject.__init__(self,**keywords)
+        self._reset()
+        self._defined = True
+
+
+    # PUBLIC METHODS
+    def quad(self,texture,width=None,height=None,angle=0,flip=(False,False)):
+        """
+        Returns: The quad for the given texture, size, angle and flip
+
+        The quad is computed the first time it is needed, and remembered by this batch
+        from then on.  The texture may be a whole texture, or a region of one (like the
+        textures of an atlas or the frames of a sprite sheet).  By default, the quad has
+        the size of the texture.
+
+        :param texture: the texture of the image
+        :type texture:  ``Texture``
+
+        :param width: the image width (None for the texture width)
+        :type width:  ``int`` or ``float`` or ``None``
+
+        :param height: the image height (None for the texture height)
+        :type height:  ``int`` or ``float`` or ``None``
+
+        :param angle: the angle of rotation about the center, in degrees
+        :type angle:  ``int`` or ``float``
+
+        :param flip: whether to flip the image horizontally and vertically
+        :type flip:  pair of ``bool``
+        """
+        if width is None:
+            width = texture.width
+        if height is None:
+            height = texture.height
+        flip = (bool(flip[0]),bool(flip[1]))
+        coords = texture.tex_coords
+
+        key = (texture.id,coords,width,height,angle,flip)
+        if key in self._quads:
+            return self._quads[key]
+
+        if not texture.id in self._pages:
+            self._pages[texture.id] = len(self._textures)
+            self._textures.append(texture)
+            self._meshes.append([])
+
+        radians = math.radians(angle)
+        cos = math.cos(radians)
+        sin = math.sin(radians)
+        w = width/2.0
+        h = height/2.0
+        order = _FLIPS[flip]
+        corners = []
+        for (corner,(cx,cy)) in enumerate(((-w,-h),(w,-h),(w,h),(-w,h))):
+            pos = order[corner]
+            corners.extend((cx*cos-cy*sin,cx*sin+cy*cos,coords[2*pos],coords[2*pos+1]))
+
+        result = len(self._quads)
+        if result == len(self._owners):
+            self._corners = numpy.concatenate((self._corners,numpy.zeros_like(self._corners)))
+            self._owners  = numpy.concatenate((self._owners,numpy.zeros_like(self._owners)))
+        self._corners[result] = corners
+        self._owners[result] = self._pages[texture.id]
+        self._quads[key] = result
+        return result
+
+    def image_quad(self,image):
+        """
+        Returns: The quad for a :class:`GImage` or :class:`GSprite`, or None if it has no texture
+
+        The quad has the texture (or current frame), size and angle of the image.  A
+        negative scale flips the quad.
+
+        :param image: the image to copy
+        :type image:  :class:`GImage` or :class:`GSprite`
+        """
+        image._validate()
+        if image._texture is None:
+            return None
+        sx = image._scale.x
+        sy = image._scale.y
+        return self.quad(image._texture,image.width*abs(sx),image.height*abs(sy),
+                         image.angle,(sx < 0,sy < 0))
+
+    def begin(self):
+        """
+        Empties this batch, so that it can be filled again.
+        """
+        for added in self._added:
+            added.clear()
+
+    def add(self,texture,x,y,width=None,height=None,angle=0,flip=(False,False)):
+        """
+        Adds an image to this batch.
+
+        See :meth:`quad` for the meaning of the arguments.
+
+        :param texture: the texture of the image
+        :type texture:  ``Texture``
+
+        :param x: the horizontal coordinate of the image center
+        :type x:  ``int`` or ``float``
+
+        :param y: the vertical coordinate of the image center
+        :type y:  ``int`` or ``float``
+        """
+        self._added[0].append(self.quad(texture,width,height,angle,flip))
+        self._added[1].append(x)
+        self._added[2].append(y)
+
+    def add_image(self,image,x=None,y=None):
+        """
+        Adds a copy of a :class:`GImage` or :class:`GSprite` to this batch.
+
+        By default, the copy is where the image is, but this can be changed with ``x``
+        and ``y``.  Nothing is added if the image has no texture.
+
+        :param image: the image to copy
+        :type image:  :class:`GImage` or :class:`GSprite`
+
+        :param x: the horizontal coordinate of the copy (None for the image position)
+        :type x:  ``int`` or ``float`` or ``None``
+
+        :param y: the vertical coordinate of the copy (None for the image position)
+        :type y:  ``int`` or ``float`` or ``None``
+        """
+        quad = self.image_quad(image)
+        if not quad is None:
+            self._added[0].append(quad)
+            self._added[1].append(image.x if x is None else x)
+            self._added[2].append(image.y if y is None else y)
+
+    def add_quads(self,quads,xs,ys):
+        """
+        Adds many images to this batch at once.
+
+        The three arguments must have the same length.  Each image is given by its quad
+        (see :meth:`quad`) and the coordinates of its center.
+
+        :param quads: the quads of the images
+        :type quads:  sequence of ``int``
+
+        :param xs: the horizontal coordinates of the images
+        :type xs:  sequence of ``int`` or ``float``
+
+        :param ys: the vertical coordinates of the images
+        :type ys:  sequence of ``int`` or ``float``
+        """
+        self._added[0].extend(quads)
+        self._added[1].extend(xs)
+        self._added[2].extend(ys)
+
+    def end(self):
+        """
+        Finishes filling this batch, and copies the images to the meshes.
+        """
+        quads = numpy.array(self._added[0],dtype=numpy.intp)
+        xs = numpy.array(self._added[1],dtype=numpy.float32)
+        ys = numpy.array(self._added[2],dtype=numpy.float32)
+        self._count = len(quads)
+
+        pages = self._owners[quads]
+        if len(self._textures) > 1:
+            order = numpy.argsort(pages,kind='stable')
+            quads = quads[order]
+            xs = xs[order]
+            ys = ys[order]
+        vertices = self._corners[quads]
+        vertices[:,0::4] += xs[:,None]
+        vertices[:,1::4] += ys[:,None]
+        counts = numpy.bincount(pages,minlength=len(self._textures))
+
+        changed = False
+        start = 0
+        for page in range(len(self._textures)):
+            count = int(counts[page])
+            needed = max(1,-(-count//MAX_QUADS))
+            meshes = self._meshes[page]
+            if len(meshes) != needed:
+                texture = self._textures[page]
+                meshes[:] = [Mesh(mode='triangles',texture=texture) for x in range(needed)]
+                changed = True
+            for pos in range(needed):
+                mesh = meshes[pos]
+                size = min(MAX_QUADS,count-pos*MAX_QUADS)
+                if size == 0:
+                    # Kivy cannot take an empty buffer
+                    mesh.vertices = []
+                    mesh.indices = []
+                else:
+                    mesh.vertices = vertices[start:start+size].ravel()
+                    mesh.indices = _INDICES[:6*size]
+                start += size
+
+        if changed:
+            self._reset()
+
+    def draw(self, view):
+        """
+        Draws this batch in the provided view.
+
+        The batch is drawn as it was at the last call to :meth:`end`.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        GObject.draw(self,view)
+
+
+    # HIDDEN METHODS
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        GObject._reset(self)
+        self._cache.add(Color(1,1,1))
+        for meshes in self._meshes:
+            for mesh in meshes:
+                self._cache.add(mesh)
+        self._cache.add(PopMatrix())
@@ -0,0 +1,373 @@
+"""
+A module to support scrolling.
+
+A camera decides which part of a (possibly very large) world is shown in the view.  The
+objects are positioned in world coordinates, and the camera scrolls the view so that the
+rectangle it is looking at fills the window.  The camera can also tell which objects are
+in that rectangle, so that a game only draws what is actually on screen.
+"""
+from kivy.graphics import *
+from introcs.geom import Point2
+from .gobject import is_num_tuple
+
+
+class GCamera(object):
+    """
+    A class representing a camera that scrolls the view.
+
+    The camera looks at a rectangle of the world, the size of the view.  The attributes
+    ``x`` and ``y`` are the center of that rectangle, in world coordinates.  If the
+    camera has ``bounds``, it never shows anything outside of them.  To scroll the view,
+    assign the camera to the ``camera`` attribute of :class:`GView`.
+
+    The camera can follow an object.  Set the attribute ``target``, and call the method
+    :meth:`update` every animation frame to center the camera on that object.  The
+    camera only moves once the target is more than ``margin`` away from the center,
+    horizontally or vertically.
+
+    The methods :meth:`visible_rect`, :meth:`overlaps` and :meth:`is_visible` tell what
+    is on screen, so that a game can skip everything else (this is called culling).
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def x(self):
+        """
+        The horizontal coordinate of the center of the camera, in world coordinates.
+
+        Setting this value moves the camera, but never past its bounds.
+
+        **invariant**: Value must be an ``int`` or ``float``
+        """
+        return self._x
+
+    @x.setter
+    def x(self,value):
+        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        self._x = self._clamp(float(value),self._width,0)
+        self._move()
+
+    @property
+    def y(self):
+        """
+        The vertical coordinate of the center of the camera, in world coordinates.
+
+        Setting this value moves the camera, but never past its bounds.
+
+        **invariant**: Value must be an ``int`` or ``float``
+        """
+        return self._y
+
+    @y.setter
+    def y(self,value):
+        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        self._y = self._clamp(float(value),self._height,1)
+        self._move()
+
+    @property
+    def width(self):
+        """
+        The width of the rectangle shown by the camera (normally the view width).
+
+        **invariant**: Value must be an ``int`` or ``float`` > 0
+        """
+        return self._width
+
+    @width.setter
+    def width(self,value):
+        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        assert value > 0, '%s is not positive' % repr(value)
+        self._width = float(value)
+        self._x = self._clamp(self._x,self._width,0)
+        self._move()
+
+    @property
+    def height(self):
+        """
+        The height of the rectangle shown by the camera (normally the view height).
+
+        **invariant**: Value must be an ``int`` or ``float`` > 0
+        """
+        return self._height
+
+    @height.setter
+    def height(self,value):
+        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        assert value > 0, '%s is not positive' % repr(value)
+        self._height = float(value)
+        self._y = self._clamp(self._y,self._height,1)
+        self._move()
+
+    @property
+    def bounds(self):
+        """
+        The rectangle of the world that the camera may show, or None if unbounded.
+
+        The bounds are a tuple (left,bottom,right,top).  If the bounds are smaller than
+        the camera in either direction, the camera is centered on them in that direction.
+
+        **invariant**: Value must be None or a tuple of four numbers
+        """
+        return self._bounds
+
+    @bounds.setter
+    def bounds(self,value):
+        assert value is None or is_num_tuple(value,4), '%s is not a valid rectangle' % repr(value)
+        self._bounds = None if value is None else tuple(map(float,value))
+        self._x = self._clamp(self._x,self._width,0)
+        self._y = self._clamp(self._y,self._height,1)
+        self._move()
+
+    @property
+    def target(self):
+        """
+        The object that the camera follows, or None if it does not follow anything.
+
+        The target can be any object with attributes ``x`` and ``y``, like a
+        :class:`GObject`.  The camera only follows it when :meth:`update` is called.
+
+        **invariant**: Value must be None or an object with attributes ``x`` and ``y``
+        """
+        return self._target
+
+    @target.setter
+    def target(self,value):
+        assert value is None or (hasattr(value,'x') and hasattr(value,'y')), \
+                '%s cannot be followed' % repr(value)
+        self._target = value
+
+    @property
+    def margin(self):
+        """
+        How far the target may get from the center before the camera follows it.
+
+        **invariant**: Value must be an ``int`` or ``float`` >= 0
+        """
+        return self._margin
+
+    @margin.setter
+    def margin(self,value):
+        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        assert value >= 0, '%s is negative' % repr(value)
+        self._margin = value
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def left(self):
+        """
+        The left edge of the rectangle shown by the camera.
+
+        **Immutable**: This value cannot be changed.  Move the camera instead.
+
+        **invariant**: Value is a ``float``
+        """
+        return self._x-self._width/2.0
+
+    @property
+    def right(self):
+        """
+        The right edge of the rectangle shown by the camera.
+
+        **Immutable**: This value cannot be changed.  Move the camera instead.
+
+        **invariant**: Value is a ``float``
+        """
+        return self._x+self._width/2.0
+
+    @property
+    def bottom(self):
+        """
+        The bottom edge of the rectangle shown by the camera.
+
+        **Immutable**: This value cannot be changed.  Move the camera instead.
+
+        **invariant**: Value is a ``float``
+        """
+        return self._y-self._height/2.0
+
+    @property
+    def top(self):
+        """
+        The top edge of the rectangle shown by the camera.
+
+        **Immutable**: This value cannot be changed.  Move the camera instead.
+
+        **invariant**: Value is a ``float``
+        """
+        return self._y+self._height/2.0
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new camera.
+
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes.  For example, to create a
+        camera for an 800x600 window that scrolls over a world 800 wide and 5000 tall::
+
+            GCamera(width=800,height=600,bounds=(0,0,800,5000))
+
+        The width and height must be specified.  The camera starts at the bottom left
+        corner of the world (so that, without bounds, the world is not scrolled at all),
+        unless ``x`` and ``y`` are given.  The other keywords are ``bounds``, ``target``
+        and ``margin``.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        if not 'width' in keywords:
+            raise ValueError("The 'width' argument must be specified.")
+        if not 'height' in keywords:
+            raise ValueError("The 'height' argument must be specified.")
+        self._translate = Translate(0,0,0)
+        self._bounds = None
+        self._width = 1.0
+        self._height = 1.0
+        self._x = 0.0
+        self._y = 0.0
+        self.width  = keywords['width']
+        self.height = keywords['height']
+        self.bounds = keywords['bounds'] if 'bounds' in keywords else None
+        self.x = keywords['x'] if 'x' in keywords else self._width/2.0
+        self.y = keywords['y'] if 'y' in keywords else self._height/2.0
+        self.target = keywords['target'] if 'target' in keywords else None
+        self.margin = keywords['margin'] if 'margin' in keywords else 0
+
+    def __str__(self):
+        """
+        :return: A readable string representation of this camera.
+        :rtype:  ``str``
+        """
+        return '[%s,x=%s,y=%s,width=%s,height=%s]' % (self.__class__.__name__,
+                repr(self._x),repr(self._y),repr(self._width),repr(self._height))
+
+    # PUBLIC METHODS
+    def look_at(self,x,y):
+        """
+        Centers the camera on the given point (as far as the bounds allow).
+
+        :param x: the horizontal coordinate, in world coordinates
+        :type x:  ``int`` or ``float``
+
+        :param y: the vertical coordinate, in world coordinates
+        :type y:  ``int`` or ``float``
+        """
+        assert type(x) in [int,float], '%s is not a number' % repr(x)
+        assert type(y) in [int,float], '%s is not a number' % repr(y)
+        self._x = self._clamp(float(x),self._width,0)
+        self._y = self._clamp(float(y),self._height,1)
+        self._move()
+
+    def update(self):
+        """
+        Moves the camera to follow its target.
+
+        Nothing happens if there is no target, or if the target is within ``margin``
+        of the center.
+        """
+        if self._target is None:
+            return
+        x = self._x
+        y = self._y
+        dx = self._target.x-x
+        dy = self._target.y-y
+        if dx > self._margin:
+            x += dx-self._margin
+        elif dx < -self._margin:
+            x += dx+self._margin
+        if dy > self._margin:
+            y += dy-self._margin
+        elif dy < -self._margin:
+            y += dy+self._margin
+        if x != self._x or y != self._y:
+            self.look_at(x,y)
+
+    def visible_rect(self):
+        """
+        Returns: The rectangle shown by the camera as a tuple (left,bottom,right,top)
+        """
+        w = self._width/2.0
+        h = self._height/2.0
+        return (self._x-w,self._y-h,self._x+w,self._y+h)
+
+    def overlaps(self,left,bottom,right,top):
+        """
+        Returns: True if the given rectangle is (at least partly) on screen
+
+        :param left: the left edge of the rectangle
+        :type left:  ``int`` or ``float``
+
+        :param bottom: the bottom edge of the rectangle
+        :type bottom:  ``int`` or ``float``
+
+        :param right: the right edge of the rectangle
+        :type right:  ``int`` or ``float``
+
+        :param top: the top edge of the rectangle
+        :type top:  ``int`` or ``float``
+        """
+        w = self._width/2.0
+        h = self._height/2.0
+        return (right >= self._x-w and left <= self._x+w and
+                top >= self._y-h and bottom <= self._y+h)
+
+    def is_visible(self,obj):
+        """
+        Returns: True if the given object is (at least partly) on screen
+
+        The test uses the bounding box of the object (including any rotation).
+
+        :param obj: the object to test
+        :type obj:  :class:`GObject`
+        """
+        return self.overlaps(obj.left,obj.bottom,obj.right,obj.top)
+
+    def to_world(self,point):
+        """
+        Returns: The world coordinates of a point in the view (like a mouse click)
+
+        :param point: the point in view coordinates
+        :type point:  :class:`Point2` or a pair of numbers
+        """
+        assert isinstance(point,Point2) or is_num_tuple(point,2), '%s is not a valid point' % repr(point)
+        (x,y) = (point.x,point.y) if isinstance(point,Point2) else point
+        return Point2(x+self.left,y+self.bottom)
+
+    def to_view(self,point):
+        """
+        Returns: The view coordinates of a point in the world
+
+        :param point: the point in world coordinates
+        :type point:  :class:`Point2` or a pair of numbers
+        """
+        assert isinstance(point,Point2) or is_num_tuple(point,2), '%s is not a valid point' % repr(point)
+        (x,y) = (point.x,point.y) if isinstance(point,Point2) else point
+        return Point2(x-self.left,y-self.bottom)
+
+    # HIDDEN METHODS
+    def _clamp(self,value,size,axis):
+        """
+        Returns: The center value, moved so that the camera stays in bounds
+
+        :param value: the proposed center
+        :type value:  ``float``
+
+        :param size: the size of the camera along this axis
+        :type size:  ``float``
+
+        :param axis: 0 for horizontal, 1 for vertical
+        :type axis:  ``int``
+        """
+        if self._bounds is None:
+            return value
+        low = self._bounds[axis]
+        high = self._bounds[axis+2]
+        if high-low <= size:
+            return (low+high)/2.0
+        return min(max(value,low+size/2.0),high-size/2.0)
+
+    def _move(self):
+        """
+        Updates the translation that scrolls the view.
+        """
+        self._translate.xy = (self._width/2.0-self._x,self._height/2.0-self._y)
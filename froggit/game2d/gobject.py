@@ -10,7 +10,8 @@ Date:   November 1, 2020
 """
 from kivy.graphics import *
 from kivy.graphics.instructions import *
-from introcs.geom import Point2, Matrix
+from introcs.geom import Point2, Affine2
+from contextlib import contextmanager
 
 
 def is_color(c):
@@ -89,7 +90,34 @@ class GObject(object):
     You should never make a `GObject` directly.  Instead, you should use one of the
     subclasses: :class:`GRectangle`, :class:`GEllipse`, :class:`GImage`, :class:`GLabel`,
     :class:`GTriangle`, :class:`GPolygon`, or :class:`GPath`.
+    
+    Changing an attribute that affects the look of an object (such as its size, color or
+    text) does not rebuild the drawing cache right away.  The object is only marked as
+    stale, and the cache is rebuilt once, the next time it is needed (when the object is
+    drawn, or at the end of the animation frame if it is attached to a view).  So setting
+    several attributes in a row costs a single rebuild.  Attributes that depend on the 
+    cache, like the size of a label, are always up to date when read.  To rebuild the
+    cache right after a group of changes, use :meth:`batch_update`.
     """
+    # The views this object is attached to (see :meth:`GView.add`), mapped to the
+    # instruction group that holds the drawing cache in that view.  This is None (shared
+    # by every object) until the object is first attached.
+    _slots = None
+    
+    # Whether the drawing cache is out of date (see :meth:`_mark_stale`)
+    _stale = False
+    
+    # The number of nested calls to :meth:`batch_update` in progress
+    _batching = 0
+    
+    # The version of the position, angle, scale, size and hitbox.  Every change to them
+    # counts it up, so that the bounding box and the matrices are only computed again
+    # once they are out of date.
+    _version = 0
+    
+    # The versions of the cached bounding box and matrices (-1 if there are none yet)
+    _boxed = -1
+    _mversion = -1
 
     # MUTABLE PROPERTIES
     @property
@@ -105,7 +133,7 @@ class GObject(object):
     def x(self,value):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         self._trans.x = float(value)
-        self._mtrue = False
+        self._version += 1
 
     @property
     def y(self):
@@ -120,7 +148,7 @@ class GObject(object):
     def y(self,value):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         self._trans.y = float(value)
-        self._mtrue = False
+        self._version += 1
 
     @property
     def width(self):
@@ -131,6 +159,8 @@ class GObject(object):
 
         **invariant**: Value must be an ``int`` or ``float`` > 0
         """
+        if self._stale and self._defined:
+            self._validate()
         return self._width
 
     @width.setter
@@ -138,8 +168,9 @@ class GObject(object):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         assert value > 0, '%s is not positive' % repr(value)
         self._width = float(value)
+        self._version += 1
         if self._defined:
-            self._reset()
+            self._mark_stale()
 
     @property
     def height(self):
@@ -150,6 +181,8 @@ class GObject(object):
 
         **invariant**: Value must be an ``int`` or ``float`` > 0
         """
+        if self._stale and self._defined:
+            self._validate()
         return self._height
 
     @height.setter
@@ -157,8 +190,9 @@ class GObject(object):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         assert value > 0, '%s is not positive' % repr(value)
         self._height = float(value)
+        self._version += 1
         if self._defined:
-            self._reset()
+            self._mark_stale()
     
     @property
     def hitbox(self):
@@ -184,6 +218,7 @@ class GObject(object):
 
     @hitbox.setter
     def hitbox(self,value):
+        self._version += 1
         if value is None:
             self._hitbox = None
             return
@@ -224,7 +259,7 @@ class GObject(object):
         else:
             self._scale.x = float(value[0])
             self._scale.y = float(value[1])
-        self._mtrue = False
+        self._version += 1
 
     @property
     def angle(self):
@@ -244,7 +279,7 @@ class GObject(object):
         diff = np.allclose([self._rotate.angle],[value])
         self._rotate.angle = float(value)
         if not diff:
-            self._mtrue = False
+            self._version += 1
 
     @property
     def linecolor(self):
@@ -281,7 +316,7 @@ class GObject(object):
 
         self._linecolor = None if value is None else Color(value[0],value[1],value[2],value[3])
         if self._defined:
-            self._reset()
+            self._mark_stale()
 
     @property
     def fillcolor(self):
@@ -319,7 +354,7 @@ class GObject(object):
 
         self._fillcolor = None if value is None else Color(value[0],value[1],value[2],value[3])
         if self._defined:
-            self._reset()
+            self._mark_stale()
 
     @property
     def name(self):
@@ -499,9 +534,9 @@ class GObject(object):
         This value is constructed dynamically as needed.  It should only be used
         internally in this package
 
-        **invariant**: Either a :class:`Matrix` or ``None``
+        **invariant**: Either an :class:`Affine2` or ``None``
         """
-        if not self._mtrue or self._matrix is None:
+        if self._mversion != self._version:
             self._build_matrix()
         return self._matrix
 
@@ -513,9 +548,9 @@ class GObject(object):
         This value is constructed dynamically as needed.  It should only be used
         internally in this package
 
-        **invariant**: Either a :class:`Matrix` or ``None``
+        **invariant**: Either an :class:`Affine2` or ``None``
         """
-        if not self._mtrue or self._matrix is None:
+        if self._mversion != self._version:
             self._build_matrix()
         return self._invrse
 
@@ -545,7 +580,6 @@ class GObject(object):
         self._defined = False
 
         # Create the Kivy transforms for position and size
-        self._mtrue  = False
         self._trans  = Translate(0,0,0)
         self._rotate = Rotate(angle=0,axis=(0,0,1))
         self._scale  = Scale(1,1,1)
@@ -626,14 +660,14 @@ class GObject(object):
         h2 = (0,0,0,0) if obj._hitbox is None else obj._hitbox
 
         # Optimize for 90 degree turns
-        if (self.angle % 360) in [0,90,180,270] and (obj.angle % 360) in [0,90,180,270]:
+        if (self._rotate.angle % 360) in [0,90,180,270] and (obj._rotate.angle % 360) in [0,90,180,270]:
             (l0,t0,r0,b0) = obj._bbox()
             (l1,t1,r1,b1) = self._bbox()
             isx = l1 <= l0 <= r1 or l0 <= l1 <= r0
             isy = b1 <= b0 <= t1 or b0 <= b1 <= t0
             return isx and isy
         
-        comp = obj.matrix*self.matrix.inverse()
+        comp = obj.matrix*self.inverse
         w = obj.width/2.0
         h = obj.height/2.0
         p0 = tuple(comp._transform(-w+h2[0], h-h2[1]))
@@ -682,7 +716,7 @@ class GObject(object):
             return l <= point[0] <= r and b <= point[1] <= t
         
         # Transform this to the right space.
-        point = tuple(self.matrix.inverse()._transform(point[0],point[1]))
+        point = tuple(self.inverse._transform(point[0],point[1]))
         w = self.width/2.0 
         h = self.height/2.0
         isx = - w + self._hitbox[0] <= point[0] <= w - self._hitbox[2]
@@ -721,41 +755,149 @@ class GObject(object):
         :type view:  :class:`GView`
         """
         try:
+            if self._stale:
+                self._validate()
             view.draw(self._cache)
         except:
             raise IOError('Cannot draw %s since it was not initialized properly' % repr(self))
+    
+    @contextmanager
+    def batch_update(self):
+        """
+        Returns: A context manager that rebuilds this object once, after a group of changes
+        
+        Use it in a ``with`` statement to change several attributes at once::
+        
+            with label.batch_update():
+                label.text = 'GAME OVER'
+                label.font_size = 48
+                label.fillcolor = 'white'
+        
+        The drawing cache is rebuilt (at most) once, when the ``with`` statement ends, 
+        instead of waiting for the object to be drawn.  The statements may be nested.
+        """
+        self._batching += 1
+        try:
+            yield self
+        finally:
+            self._batching -= 1
+            if not self._batching and self._stale:
+                self._validate()
 
     # HIDDEN METHODS
+    def _mark_stale(self):
+        """
+        Marks the drawing cache as out of date.
+        
+        The cache is rebuilt by :meth:`_validate`, the next time that it is needed. If 
+        this object is attached to a view, the view rebuilds it at the end of the frame.
+        """
+        self._version += 1
+        if self._stale:
+            return
+        self._stale = True
+        if self._slots:
+            for view in self._slots:
+                view._pending.add(self)
+    
+    def _validate(self):
+        """
+        Rebuilds the drawing cache if it is out of date.
+        
+        The attributes changed by the rebuild itself (such as the size of an image, 
+        taken from its texture) do not mark the object as stale again.
+        """
+        if not self._stale:
+            return
+        defined = self._defined
+        self._defined = False
+        try:
+            self._reset()
+        finally:
+            self._defined = defined
+            self._version += 1
+    
     def _reset(self):
         """
         Resets the drawing cache.
+        
+        If this object is attached to a view, the new cache replaces the old one there.
         """
+        self._stale = False
         self._cache = InstructionGroup()
         self._cache.add(PushMatrix())
         self._cache.add(self._trans)
         self._cache.add(self._rotate)
         self._cache.add(self._scale)
+        if self._slots:
+            for slot in self._slots.values():
+                slot.clear()
+                slot.add(self._cache)
+
+    def _attach(self,view,slot):
+        """
+        Records that this object is attached to the given view.
+        
+        This method is called by :meth:`GView.add`, and should never be called directly.
+        
+        :param view: the view this object is attached to
+        :type view:  :class:`GView`
+        
+        :param slot: the instruction group holding the drawing cache in that view
+        :type slot:  ``InstructionGroup``
+        """
+        if self._slots is None:
+            self._slots = {}
+        self._slots[view] = slot
+
+    def _detach(self,view):
+        """
+        Records that this object is no longer attached to the given view.
+        
+        This method is called by :meth:`GView.remove`, and should never be called directly.
+        
+        :param view: the view this object was attached to
+        :type view:  :class:`GView`
+        """
+        if self._slots:
+            self._slots.pop(view,None)
 
     def _build_matrix(self):
         """
         Builds the transform matrices after a settings change.
         """
-        self._matrix = Matrix()
+        self._matrix = Affine2()
         self._matrix.scale(self._scale.x,self._scale.y)
         self._matrix.rotate(self._rotate.angle)
         self._matrix.translate(self._trans.x,self._trans.y)
-        self._invrse = Matrix()
+        self._invrse = Affine2()
         self._invrse.translate(-self._trans.x,-self._trans.y)
         self._invrse.rotate(-self._rotate.angle)
         self._invrse.scale(1.0/self._scale.x,1.0/self._scale.y)
-        self._mtrue = True
+        self._mversion = self._version
 
     def _bbox(self):
         """
-        Computes the bounding box of this rotated object
+        Returns the bounding box of this rotated object
         
         The bounding box is returned as a tuple (l,t,r,b). This function allows for 
-        fast(er) collisions when the object is rotated in 90 degree increments.
+        fast(er) collisions when the object is rotated in 90 degree increments.  The box
+        is cached, and only computed again once the object has changed (see 
+        :meth:`_compute_bbox`).
+        
+        :return: The bounding box for the shape
+        :rtype:  ``tuple`` of four ``float`` values
+        """
+        if self._stale and self._defined:
+            self._validate()
+        if self._boxed != self._version:
+            self._box = self._compute_bbox()
+            self._boxed = self._version
+        return self._box
+
+    def _compute_bbox(self):
+        """
+        Computes the bounding box of this rotated object
         
         :return: The bounding box for the shape
         :rtype:  ``tuple`` of four ``float`` values
@@ -838,7 +980,7 @@ class GScene(GObject):
         assert is_gobject_list(value), '%s is not a list of valid objects' % repr(value)
         self._children = list(value)
         if self._defined:
-            self._reset()
+            self._mark_stale()
 
 
     # IMMUTABLE PROPERTIES
@@ -897,8 +1039,8 @@ class GScene(GObject):
         self._defined = False
         self.children = keywords['children'] if 'children' in keywords else []
         GObject.__init__(self,**keywords)
-        self._reset()
         self._defined = True
+        self._mark_stale()
 
 
     # PUBLIC METHODS
@@ -938,5 +1080,18 @@ class GScene(GObject):
         """
         GObject._reset(self)
         for x in self.children:
+            x._validate()
             self._cache.add(x._cache)
         self._cache.add(PopMatrix())
+    
+    def _bbox(self):
+        """
+        Returns the bounding box of this scene
+        
+        The size of a scene depends on its children, which can change without this scene
+        knowing.  So the box is never cached.
+        
+        :return: The bounding box for the shape
+        :rtype:  ``tuple`` of four ``float`` values
+        """
+        return self._compute_bbox()
@@ -120,7 +120,7 @@ class GPath(GObject):
         assert is_point_tuple(value,2),'value %s is not a valid list of points' %  repr(value)
         self._points = tuple(value)
         if self._defined:
-            self._reset()
+            self._mark_stale()
     
     @property
     def linewidth(self):
@@ -139,7 +139,7 @@ class GPath(GObject):
         assert value >= 0, 'value %s is negative' % repr(value)
         self._linewidth = value
         if self._defined:
-            self._reset()
+            self._mark_stale()
     
     
     # IMMUTABLE PROPERTIES
@@ -194,8 +194,8 @@ class GPath(GObject):
         if not 'linecolor' in keywords:
             keywords['linecolor'] = (1,1,1,1)
         GObject.__init__(self,**keywords)
-        self._reset()
         self._defined = True
+        self._mark_stale()
     
     
     # PUBLIC METHODS
@@ -298,7 +298,7 @@ class GTriangle(GPath):
         assert len(value) == 6, 'value %s does not have the right length'  %  repr(value)
         self._points = tuple(value)
         if self._defined:
-            self._reset()
+            self._mark_stale()
     
     
     # BUILT-IN METHODS
@@ -322,8 +322,8 @@ class GTriangle(GPath):
         self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
         self.points = keywords['points'] if 'points' in keywords else (-100,-58,0,116,100,-58)
         GObject.__init__(self,**keywords)
-        self._reset()
         self._defined = True
+        self._mark_stale()
     
     
     # PUBLIC METHODS
@@ -414,7 +414,7 @@ class GPolygon(GPath):
         assert is_point_tuple(value,3),'value %s is not a valid list of points' %  repr(value)
         self._points = tuple(value)
         if self._defined:
-            self._reset()
+            self._mark_stale()
     
     @property
     def source(self):
@@ -431,7 +431,7 @@ class GPolygon(GPath):
         assert value is None or GameApp.is_image(value), 'value %s is not an image file' % repr(value)
         self._source = value
         if self._defined:
-            self._reset()
+            self._mark_stale()
     
     @property
     def source_width(self):
@@ -456,7 +456,7 @@ class GPolygon(GPath):
         assert value is None or type(value) in [int,float], 'value %s is not a valid width' % repr(value)
         self._source_width = None
         if self._defined:
-            self._reset()
+            self._mark_stale()
     
     @property
     def source_height(self):
@@ -481,7 +481,7 @@ class GPolygon(GPath):
         assert value is None or _is_num(value), 'value %s is not a valid width' % repr(value)
         self._source_height = None
         if self._defined:
-            self._reset()
+            self._mark_stale()
     
     
     # BUILT-IN METHODS
@@ -508,8 +508,8 @@ class GPolygon(GPath):
         self.source_width  = keywords['source_width']  if 'source_width'  in keywords else None
         self.source_height = keywords['source_height'] if 'source_height' in keywords else None
         GObject.__init__(self,**keywords)
-        self._reset()
         self._defined = True
+        self._mark_stale()
     
     
     # PUBLIC METHODS
@@ -10,7 +10,7 @@ Date:   August 1, 2017 (Python 3 version)
 """
 from kivy.graphics import *
 from kivy.graphics.instructions import *
-from kivy.uix.label import Label
+from kivy.metrics import sp
 from kivy.uix.image import Image
 from .gobject import GObject
 from .app import GameApp
@@ -47,7 +47,7 @@ class GRectangle(GObject):
         assert value >= 0, '%s is negative' % repr(value)
         self._linewidth = value
         if self._defined:
-            self._reset()
+            self._mark_stale()
     
     
     # BUILT-IN METHODS
@@ -71,8 +71,8 @@ class GRectangle(GObject):
         self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
         # Always delay the call to parent class, to avoid reset
         GObject.__init__(self,**keywords)
-        self._reset()
         self._defined = True
+        self._mark_stale()
     
     
     # HIDDEN METHODS
@@ -218,9 +218,13 @@ class GImage(GRectangle):
     @source.setter
     def source(self,value):
         assert value is None or GameApp.is_image(value), '%s is not an image file' % repr(value)
+        if value != self._source:
+            if not self._hold is None:
+                self._hold()
+            self._hold = None if value is None else GameApp.hold_texture(self,value)
         self._source = value
         if self._defined:
-            self._reset()
+            self._mark_stale()
     
     
     # BUILT-IN METHODS
@@ -242,6 +246,8 @@ class GImage(GRectangle):
         :type keywords:  keys are attribute names
         """
         self._defined = False
+        self._source = None
+        self._hold = None
         self.source = keywords['source'] if 'source' in keywords else None
         self._texture = None
         GRectangle.__init__(self,**keywords)
@@ -315,8 +321,7 @@ class GLabel(GRectangle):
     def font_size(self,value):
         assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         self._fsize = value
-        self._label.font_size = value
-        self._label.texture_update()
+        self._retexture()
     
     @property
     def font_name(self):
@@ -324,14 +329,14 @@ class GLabel(GRectangle):
         The file name for the .ttf file to use as a font
         
         **Invariant**: Must be a string referring to a .ttf file in folder Fonts"""
-        return self._label.font_name
+        return self._fname
     
     @font_name.setter
     def font_name(self,value):
         from .app import GameApp
         assert GameApp.is_font(value), 'value %s is not a font name' % repr(value)
-        self._label.font_name = value
-        self._label.texture_update()
+        self._fname = value
+        self._retexture()
     
     @property
     def bold(self):
@@ -343,13 +348,13 @@ class GLabel(GRectangle):
         `ComicSans.ttf` and `ComicSansBold.ttf` for an example.
         
         **Invariant**: Must be a boolean"""
-        return self._label.bold
+        return self._bold
 
     @bold.setter
     def bold(self,value):
         assert type(value) == bool, repr(value)+' is not a bool'
-        self._label.bold = value
-        self._label.texture_update()
+        self._bold = value
+        self._retexture()
 
     @property
     def text(self):
@@ -361,13 +366,13 @@ class GLabel(GRectangle):
         this label will grow to ensure that the text will fit in the rectangle.
         
         **Invariant**: Must be a string"""
-        return self._label.text
+        return self._text
     
     @text.setter
     def text(self,value):
         assert type(value) == str, 'value %s is not a string' % repr(value)
-        self._label.text = value
-        self._label.texture_update()
+        self._text = value
+        self._retexture()
     
     @property
     def halign(self):
@@ -389,9 +394,7 @@ class GLabel(GRectangle):
     def halign(self,value):
         assert value in ('left','right','center'), 'value %s is not a valid horizontal alignment' % repr(value)
         self._halign = value
-        self._label.halign = value
-        if self._defined:
-            self._reset()
+        self._retexture()
     
     @property
     def valign(self):
@@ -413,9 +416,7 @@ class GLabel(GRectangle):
     def valign(self,value):
         assert value in ('top','middle','bottom'), 'value %s is not a valid vertical alignment' % repr(value)
         self._valign = value
-        self._label.valign = value
-        if self._defined:
-            self._reset()
+        self._retexture()
     
     
     # REDEFINED PROPERTIES
@@ -431,7 +432,7 @@ class GLabel(GRectangle):
     def x(self,value):
         assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         self._trans.x = float(value)
-        self._mtrue = False
+        self._version += 1
         self._hanchor = 'center'
         self._ha = value
     
@@ -447,7 +448,7 @@ class GLabel(GRectangle):
     def y(self,value):
         assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         self._trans.y = float(value)
-        self._mtrue = False
+        self._version += 1
         self._vanchor = 'center'
         self._hv = value
     
@@ -597,15 +598,18 @@ class GLabel(GRectangle):
         self._defined = False
         self._hanchor = 'center'
         self._vanchor = 'center'
+        self._textured = False
+        self._texture = None
+        self._tcolor  = (0,0,0,1)
         
-        sanitized = {}
-        excludes  = ['linewidth','linecolor','fillcolor','halign','valign','left','bottom']
-        for key in keywords:
-            if not key in excludes:
-                sanitized[key] = keywords[key]
-        
-        self._label = Label(**sanitized)
-        self._label.size_hint = (None,None)
+        # The Kivy defaults
+        self._text  = ''
+        self._fname = 'Roboto'
+        self._fsize = sp(15)
+        self._bold  = False
+        for key in ['text','font_name','font_size','bold']:
+            if key in keywords:
+                setattr(self,key,keywords[key])
         
         self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
         self.halign = keywords['halign'] if 'halign' in keywords else 'center'
@@ -614,9 +618,8 @@ class GLabel(GRectangle):
         GObject.__init__(self,**keywords)
         if not self.linecolor:
             self.linecolor = (0,0,0,1)
-        self._reset()
         self._defined = True
-        self._label.bind(texture_size=self._callback)
+        self._mark_stale()
     
     def __str__(self):
         """
@@ -631,28 +634,37 @@ class GLabel(GRectangle):
                 % (s,repr(self.text),repr(self.x),repr(self.y),repr(self.angle))
     
     # HIDDEN METHODS
-    def _callback(self,instance=None,value=None):
+    def _retexture(self):
         """
-        A workaround to deal with parameter requirements for callbacks
+        Marks the text as changed, so that it is rendered again with the drawing cache.
+        
+        Rendering text is expensive, so it is not done by each setter.  It is done once,
+        when the drawing cache is rebuilt, and only if no other label has already rendered
+        the same text (see :meth:`GameApp.load_text`).
         """
+        self._textured = False
         if self._defined:
-            self._reset()
+            self._mark_stale()
     
     def _reset(self):
         """
         Resets the drawing cache.
         """
-        # Set up the label at the center.
-        self._label.size = self._label.texture_size
-        self._label.center = (0,0)
-        if self.linecolor:
-            self._label.color = self.linecolor
+        defined = self._defined
+        self._defined = False
+        if self.linecolor and tuple(self.linecolor) != self._tcolor:
+            self._tcolor = tuple(self.linecolor)
+            self._textured = False
+        if not self._textured:
+            self._textured = True
+            self._texture = GameApp.load_text(self._text,self._fname,self._fsize,self._bold,
+                                              self._tcolor,self._halign,self._valign)
+        (tw,th) = self._texture.size
         
         # Resize the outside if necessary
-        self._defined = False
-        self._width  = max(self.width, self._label.width)
-        self._height = max(self.height,self._label.height)
-        self._defined = True
+        self._width  = max(self.width, tw)
+        self._height = max(self.height,th)
+        self._defined = defined
         
         # Reset the absolute anchor
         if self._hanchor == 'left':
@@ -666,17 +678,19 @@ class GLabel(GRectangle):
         elif self._vanchor == 'bottom':
             self._trans.y = self._hv+self.height/2.0
         
-        # Reset the label anchor.
+        # Reset the text anchor.
+        tx = -tw/2.0
         if self.halign == 'left':
-            self._label.x = -self.width/2.0
+            tx = -self.width/2.0
         elif self.halign == 'right':
-            self._label.right = self.width/2.0
+            tx = self.width/2.0-tw
         
-        # Reset the label anchor.
+        # Reset the text anchor.
+        ty = -th/2.0
         if self.valign == 'top':
-            self._label.top = self.height/2.0
+            ty = self.height/2.0-th
         elif self.valign == 'bottom':
-            self._label.bottom = -self.height/2.0
+            ty = -self.height/2.0
         
         GObject._reset(self)
         x = -self.width/2.0
@@ -687,7 +701,8 @@ class GLabel(GRectangle):
             self._cache.add(self._fillcolor)
             self._cache.add(fill)
         
-        self._cache.add(self._label.canvas)
+        self._cache.add(Color(1,1,1,1))
+        self._cache.add(Rectangle(texture=self._texture,pos=(int(tx),int(ty)),size=(tw,th)))
         
         if self._linewidth > 0:
             line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
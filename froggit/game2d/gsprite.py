@@ -6,6 +6,10 @@ image divided into rectangles of equal size.  The number of rectangles is specif
 the rows and columns of the filmstrip.  Each rectangle is a frame.  You animate the image
 by changing the current frame.
 
+The frames of a filmstrip are cut out of the image once (see :meth:`GameApp.load_frames`)
+and shared by every sprite with the same image and format.  So creating a sprite, or 
+changing its frame, never cuts out the frames again.
+
 Author: Walker M. White (wmw2)
 Date:   November 1, 2020
 """
@@ -14,6 +18,131 @@ from kivy.graphics.instructions import *
 from .grectangle import GRectangle, GObject
 from .app import GameApp
 
+# #mark -
+class GSpriteSheet(object):
+    """
+    A class describing a filmstrip image.
+    
+    A sprite sheet is the image file, the grid format of its frames, and (optionally) 
+    a hitbox for each frame.  It is a convenient way to create many sprites from the same
+    image, as the keyword ``sheet`` of :class:`GSprite` sets all three attributes at once.
+    Sprite sheets can also be read from the ``sprites`` of a JSON file (see 
+    :meth:`from_json`).
+    
+    A sprite sheet is immutable, so it can be shared by any number of sprites.
+    """
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def source(self):
+        """
+        The source file for this sprite sheet.
+        
+        **Immutable**: This value cannot be changed.
+        
+        **invariant**. Value is a string refering to a valid file.
+        """
+        return self._source
+    
+    @property
+    def format(self):
+        """
+        The grid size of this sprite sheet, as (rows, columns).
+        
+        **Immutable**: This value cannot be changed.
+        
+        **invariant**. Value is a 2-element tuple of ints > 0
+        """
+        return self._format
+    
+    @property
+    def count(self):
+        """
+        The number of frames in this sprite sheet
+        
+        **Immutable**: This value cannot be changed.
+        
+        **invariant**. Value is an int > 0.
+        """
+        return self._format[0]*self._format[1]
+    
+    @property
+    def hitboxes(self):
+        """
+        The hitboxes of this sprite sheet, one for each frame.
+        
+        **Immutable**: This value cannot be changed.
+        
+        **invariant**. Value is either ``None`` or a tuple of ``count`` 4-element 
+        tuples of numbers.
+        """
+        return self._hitboxes
+    
+    @property
+    def frames(self):
+        """
+        The textures of the frames of this sprite sheet, or None if the image cannot be loaded.
+        
+        The frames are shared with every sprite (and sprite sheet) with the same source
+        and format.  See :meth:`GameApp.load_frames`.
+        
+        **Immutable**: This value cannot be changed.
+        
+        **invariant**. Value is either ``None`` or a tuple of ``count`` textures.
+        """
+        return GameApp.load_frames(self._source,self._format)
+    
+    # BUILT-IN METHODS
+    def __init__(self,source,format=(1,1),hitboxes=None):
+        """
+        Creates a new sprite sheet.
+        
+        :param source: the image file
+        :type source:  ``str``
+        
+        :param format: the grid size as (rows, columns)
+        :type format:  2-element tuple of ints > 0
+        
+        :param hitboxes: the hitbox of each frame (or None)
+        :type hitboxes:  ``None`` or a list of 4-element tuples of numbers
+        """
+        assert GameApp.is_image(source), '%s is not an image file' % repr(source)
+        assert type(format) in [tuple,list] and len(format) == 2, '%s does is not a tuple pair' % repr(format)
+        assert type(format[0]) == int and type(format[1]) == int, '%s does not have int values' % repr(format)
+        assert format[0] > 0 and format[1] > 0, '%s does not have valid values' % repr(format)
+        self._source = source
+        self._format = tuple(format)
+        if hitboxes is None:
+            self._hitboxes = None
+        else:
+            assert len(hitboxes) == self.count, '%s is not a tuple or list of size %s' % (repr(hitboxes),repr(self.count))
+            assert all(map(lambda x : type(x) in [tuple,list] and len(x) == 4, hitboxes)), '%s contains an invalid hitbox' % repr(hitboxes)
+            self._hitboxes = tuple(map(tuple,hitboxes))
+    
+    def __repr__(self):
+        """
+        :return: An unambiguous string representation of this sprite sheet.
+        :rtype:  ``str``
+        """
+        return '%s(%s,%s)' % (self.__class__.__name__,repr(self._source),repr(self._format))
+    
+    @classmethod
+    def from_json(cls,data):
+        """
+        Returns: The sprite sheet described by the given JSON dictionary
+        
+        The dictionary must have the keys ``file`` (the image file) and ``format`` (the
+        grid size as [rows, columns]).  The key ``hitboxes``, with one hitbox for each
+        frame, is optional.  Any other keys are ignored.
+        
+        :param data: the sprite sheet description
+        :type data:  ``dict``
+        """
+        assert type(data) == dict and 'file' in data and 'format' in data, '%s is not a sprite sheet' % repr(data)
+        hitboxes = data['hitboxes'] if 'hitboxes' in data else None
+        return cls(data['file'],tuple(data['format']),hitboxes)
+
+
 # #mark -
 class GSprite(GRectangle):
     """
@@ -33,6 +162,9 @@ class GSprite(GRectangle):
     
     If the image supports transparency, then this object can be used to represent irregular 
     shapes.  However, the :meth:`contains` method still treats this shape as a  rectangle.
+    
+    The frames are shared by all sprites with the same source and format, so changing 
+    the frame only swaps the texture of the rectangle.
     """
     
     # IMMUTABLE PROPERTIES
@@ -58,9 +190,13 @@ class GSprite(GRectangle):
     @source.setter
     def source(self,value):
         assert value is None or GameApp.is_image(value), '%s is not an image file' % repr(value)
+        if value != self._source:
+            if not self._hold is None:
+                self._hold()
+            self._hold = None if value is None else GameApp.hold_texture(self,value)
         self._source = value
         if self._defined:
-            self._reset()
+            self._mark_stale()
     
     @property
     def format(self):
@@ -89,6 +225,8 @@ class GSprite(GRectangle):
         
         if self.frame >= count:
             self.frame = 0
+        if self._defined:
+            self._mark_stale()
     
     @property
     def frame(self):
@@ -103,11 +241,15 @@ class GSprite(GRectangle):
     def frame(self,value):
         assert type(value) == int, '%s is not an int' % repr(value)
         assert value >= 0 and value < self.count, '%s is out of range' % repr(value)
+        if value == self._frame and self._bounds:
+            return
         self._frame = value
-        if not self.hitboxes is None:
-            self.hitbox = self.hitboxes[value]
-        if self._bounds:
-            self._texture = self._images[self._frame]
+        if not self._hitboxes is None:
+            # The hitboxes were checked when they were set
+            self._hitbox = self._hitboxes[value]
+            self._version += 1
+        if self._bounds and not self._stale:
+            self._texture = self._images[value]
             self._bounds.texture = self._texture
     
     @property
@@ -130,7 +272,7 @@ class GSprite(GRectangle):
     def hitboxes(self,value):
         if value is None:
             self._hitboxes = None
-            self._hitbox   = None
+            self.hitbox    = None
             return
         
         try:
@@ -143,6 +285,34 @@ class GSprite(GRectangle):
         self._hitboxes = tuple(map(tuple,value))
         self.hitbox = self._hitboxes[self.frame]
     
+    @property
+    def sheet(self):
+        """
+        The sprite sheet of this sprite, or None if it was not made from one.
+        
+        Setting the sprite sheet sets the attributes ``source``, ``format`` and 
+        ``hitboxes`` together (so the sprite is only reset once). Setting any of those
+        attributes directly does not change this one.
+        
+        **Invariant**: Value is either ``None`` or a :class:`GSpriteSheet`
+        """
+        return self._sheet
+    
+    @sheet.setter
+    def sheet(self,value):
+        assert value is None or isinstance(value,GSpriteSheet), '%s is not a sprite sheet' % repr(value)
+        self._sheet = value
+        if value is None:
+            return
+        defined = self._defined
+        self._defined = False
+        self.source = value.source
+        self.format = value.format
+        self.hitboxes = value.hitboxes
+        self._defined = defined
+        if defined:
+            self._mark_stale()
+    
     
     # BUILT-IN METHODS
     def __init__(self,**keywords):
@@ -160,19 +330,33 @@ class GSprite(GRectangle):
         frames in the image.  See the documentation of :class:`GImage` and 
         :class:`GObject` for the other supported keywords.
         
+        Alternatively, the keyword ``sheet`` gives the source, format and hitboxes at 
+        once, with a :class:`GSpriteSheet`::
+            
+            GSprite(x=0,y=0,sheet=GSpriteSheet('alien-strip1.png',(3,2)))
+        
         :param keywords: dictionary of keyword arguments 
         :type keywords:  keys are attribute names
         """
         self._defined = False
+        self._source = None
+        self._hold = None
         self._hitboxes = None
         self._frame  = 0
-        self.source = keywords['source'] if 'source' in keywords else None
-        self.format = keywords['format'] if 'format' in keywords else (1,1)
-        self._images = [None]*self.count
+        self._sheet = None
+        self._images = ()
         self._bounds = None
         self._texture = None
+        if 'sheet' in keywords:
+            self.sheet = keywords['sheet']
+        else:
+            self.source = keywords['source'] if 'source' in keywords else None
+            self.format = keywords['format'] if 'format' in keywords else (1,1)
         GRectangle.__init__(self,**keywords)
-        self.hitboxes = keywords['hitboxes'] if 'hitboxes' in keywords else None
+        if 'hitboxes' in keywords:
+            self.hitboxes = keywords['hitboxes']
+        else:
+            self.hitboxes = None if self._sheet is None else self._sheet.hitboxes
         self._defined = True
     
     # HIDDEN METHODS
@@ -182,23 +366,16 @@ class GSprite(GRectangle):
         """
         GObject._reset(self)
         
-        texture = GameApp.load_texture(self.source)
-        if texture:
-            width  = texture.width/self._format[1]
-            height = texture.height/self._format[0]
+        images = GameApp.load_frames(self.source,self._format)
+        if images:
             if (self.width == 0 or self.height == 0):
-                self.width  = width
-                self.height = height
-            
-            ty = 0
-            for row in range(self._format[0]):
-                tx = 0
-                for col in range(self._format[1]):
-                    self._images[row*self._format[1]+col] = texture.get_region(int(tx),texture.height-int(ty)-int(height),int(width),int(height))
-                    tx += width
-                ty += width
+                texture = GameApp.load_texture(self.source)
+                self.width  = texture.width/self._format[1]
+                self.height = texture.height/self._format[0]
+            self._images = images
         else:
             print('Failed to load',repr(self.source))
+            self._images = (None,)*self.count
         
         x = -self.width/2.0
         y = -self.height/2.0
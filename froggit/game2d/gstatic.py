@@ -0,0 +1,175 @@
+"""
+A module to support static layers.
+
+A static layer is a collection of objects that never change, like the background of a
+level.  The layer renders its objects once into an offscreen framebuffer (FBO), and then
+draws that framebuffer as a single textured rectangle.  No matter how many objects are
+in the layer, drawing it costs the same as drawing a single image.
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from .gobject import GObject, is_gobject_list
+import kivy.app
+
+
+class GStatic(GObject):
+    """
+    A class representing a static layer, baked into a framebuffer.
+
+    Unlike :class:`GScene`, the children of a static layer are positioned in the
+    coordinates of the view, not relative to the layer.  The layer covers the rectangle
+    given by its ``width`` and ``height`` (and its position), and anything outside of
+    that rectangle is cut off.
+
+    The layer is baked (rendered to the framebuffer) the first time it is drawn, or
+    whenever :meth:`bake` is called.  Changing a child has no effect on a baked layer
+    until the layer is invalidated with :meth:`invalidate`.
+
+    A framebuffer needs an OpenGL context, which only exists once the game is running.
+    Until then (or if there is no game window at all), the layer simply draws each of
+    its children.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def children(self):
+        """
+        The list of objects stored in this layer.
+
+        Changing this value invalidates the layer.
+
+        **invariant**: Value must be a list or tuple of :class:`GObject` (possibly empty)
+        """
+        return tuple(self._children)
+
+    @children.setter
+    def children(self,value):
+        assert is_gobject_list(value), '%s is not a list of valid objects' % repr(value)
+        self._children = list(value)
+        if self._defined:
+            self.invalidate()
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def baked(self):
+        """
+        Whether this layer is currently drawn from its framebuffer.
+
+        **Immutable**: This value cannot be changed.  Use the methods :meth:`bake` and
+        :meth:`invalidate` instead.
+
+        **invariant**: Value is a ``bool``
+        """
+        return not self._fbo is None and not self._dirty
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new static layer.
+
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes. For example, to create a
+        background layer for the bottom half of an 800x600 window, call the constructor::
+
+            GStatic(left=0,bottom=0,width=800,height=300,children=[road,grass])
+
+        This class supports the same keywords as :class:`GObject`. The width and height
+        must be specified.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        if not 'width' in keywords:
+            raise ValueError("The 'width' argument must be specified.")
+        if not 'height' in keywords:
+            raise ValueError("The 'height' argument must be specified.")
+        self._defined = False
+        self._fbo = None
+        self._dirty = True
+        self._cache = None
+        self.children = keywords['children'] if 'children' in keywords else []
+        GObject.__init__(self,**keywords)
+        self._reset()
+        self._defined = True
+
+
+    # PUBLIC METHODS
+    def bake(self):
+        """
+        Renders the children of this layer into its framebuffer.
+
+        Nothing happens if the layer is already baked.  If there is no OpenGL context
+        yet, the layer stays unbaked and this method returns False.
+
+        :return: True if the layer is baked
+        :rtype:  ``bool``
+        """
+        if self.baked:
+            return True
+        if kivy.app.App.get_running_app() is None:
+            return False
+
+        size = (max(1,int(round(self.width))),max(1,int(round(self.height))))
+        if self._fbo is None or tuple(self._fbo.size) != size:
+            self._fbo = Fbo(size=size)
+
+        if not self._cache is None:
+            # The children move from the drawing cache to the framebuffer
+            self._cache.clear()
+        self._fbo.clear()
+        self._fbo.add(ClearColor(0,0,0,0))
+        self._fbo.add(ClearBuffers())
+        self._fbo.add(PushMatrix())
+        self._fbo.add(Translate(self.width/2.0-self.x,self.height/2.0-self.y,0))
+        for child in self._children:
+            child._validate()
+            self._fbo.add(child._cache)
+        self._fbo.add(PopMatrix())
+        self._fbo.draw()
+
+        self._dirty = False
+        self._reset()
+        return True
+
+    def invalidate(self):
+        """
+        Marks this layer as out of date, and bakes it again (if possible).
+
+        Call this method when a child has changed, or when the game window was resized.
+        """
+        self._dirty = True
+        if not self.bake():
+            self._reset()
+
+    def draw(self, view):
+        """
+        Draws this layer in the provided view, baking it first if necessary.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        if self._dirty:
+            self.bake()
+        GObject.draw(self,view)
+
+
+    # HIDDEN METHODS
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        if not self._cache is None:
+            # Release the children, so that they are only in one group at a time
+            self._cache.clear()
+        GObject._reset(self)
+        if not self._fbo is None and not self._dirty:
+            self._cache.add(Color(1,1,1))
+            self._cache.add(Rectangle(pos=(-self.width/2.0,-self.height/2.0),
+                                      size=(self.width,self.height),
+                                      texture=self._fbo.texture))
+        else:
+            self._cache.add(Translate(-self.x,-self.y,0))
+            for child in self._children:
+                child._validate()
+                self._cache.add(child._cache)
+        self._cache.add(PopMatrix())
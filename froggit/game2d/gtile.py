@@ -10,6 +10,8 @@ Date:   November 1, 2020
 """
 from kivy.graphics import *
 from kivy.graphics.instructions import *
+from kivy.graphics.texture import TextureRegion
+from kivy.utils import platform
 from .grectangle import GRectangle, GObject
 from .app import GameApp
 
@@ -38,9 +40,13 @@ class GTile(GObject):
     @source.setter
     def source(self,value):
         assert value is None or GameApp.is_image(value), '%s is not an image file' % repr(value)
+        if value != self._source:
+            if not self._hold is None:
+                self._hold()
+            self._hold = None if value is None else GameApp.hold_texture(self,value)
         self._source = value
         if self._defined:
-            self._reset()
+            self._mark_stale()
     
     # IMMUTABLE PROPERTIES
     @property
@@ -50,6 +56,7 @@ class GTile(GObject):
         
         This value is a float, as sometimes only a portion of the image is drawn.
         """
+        self._validate()
         if self._texture is None:
             return 0
         return self.height/self._texture.height
@@ -61,6 +68,7 @@ class GTile(GObject):
         
         This value is a float, as sometimes only a portion of the image is drawn.
         """
+        self._validate()
         if self._texture is None:
             return 0
         return self.width/self._texture.width
@@ -84,6 +92,8 @@ class GTile(GObject):
         :type keywords:  keys are attribute names, including 'width' and 'height'
         """
         self._defined = False
+        self._source = None
+        self._hold = None
         self.source = keywords['source'] if 'source' in keywords else None
         if not 'width' in keywords:
             raise ValueError("The 'width' argument must be specified.")
@@ -97,6 +107,14 @@ class GTile(GObject):
     def _reset(self):
         """
         Resets the drawing cache.
+        
+        Whenever possible, the tile is a single rectangle whose texture repeats.  So it
+        costs the same to build and draw, no matter how many times the image repeats.
+        Otherwise (see :meth:`_can_wrap`), it is a mesh with one square per repetition.
+        
+        The texture of the rectangle is not the one in the texture cache, which other
+        objects with this image share, and whose wrap must not change.  It is a copy
+        that repeats, from :meth:`GameApp.load_repeating_texture`.
         """
         GObject._reset(self)
         x = -self.width/2.0
@@ -108,6 +126,75 @@ class GTile(GObject):
         if not self._texture is None and self.height == 0:
             self.height = self._texture.height
         
+        repeat = None
+        if self._can_wrap(self._texture):
+            repeat = GameApp.load_repeating_texture(self.source)
+        
+        if not repeat is None:
+            # One quad, with texture coordinates past 1 to repeat the image
+            self._texture = repeat
+            shape = Rectangle(pos=(x,y),size=(self.width,self.height),texture=self._texture,
+                              tex_coords=self._quad_coords())
+        else:
+            shape = self._build_mesh(x,y)
+        
+        if not self._fillcolor is None:
+            self._cache.add(self._fillcolor)
+        else:
+            self._cache.add(Color(1,1,1))
+        self._cache.add(shape)
+        
+        self._cache.add(PopMatrix())
+    
+    def _can_wrap(self,texture):
+        """
+        Returns: True if the texture can repeat itself across a single rectangle
+        
+        Only whole textures can repeat, not regions of a larger texture (such as the
+        images in a texture atlas).  In addition, OpenGL ES 2 (on Android and iOS) can
+        only repeat textures whose width and height are both powers of two.  Desktop
+        OpenGL repeats textures of any size.
+        
+        :param texture: The texture to check
+        :type texture:  ``Texture`` or ``None``
+        """
+        if texture is None or isinstance(texture,TextureRegion):
+            return False
+        if tuple(map(abs,texture.uvsize)) != (1,1):
+            return False
+        w = texture.width
+        h = texture.height
+        if w <= 0 or h <= 0:
+            return False
+        if platform in ('android','ios'):
+            return (w & (w-1)) == 0 and (h & (h-1)) == 0
+        return True
+    
+    def _quad_coords(self):
+        """
+        Returns: The texture coordinates of the single rectangle of a repeating texture
+        
+        The coordinates go past the texture by the number of times that the image 
+        repeats.  They are in the order of the corners of a ``Rectangle``.
+        """
+        (u0,v0) = self._texture.uvpos
+        u = u0+self._texture.uvsize[0]*self.width/self._texture.width
+        v = v0+self._texture.uvsize[1]*self.height/self._texture.height
+        return (u0,v0,u,v0,u,v,u0,v)
+    
+    def _build_mesh(self,x,y):
+        """
+        Returns: A mesh with one textured square for each repetition of the image
+        
+        The squares on the top and right edges only show part of the image. This is the
+        fallback for textures that cannot repeat themselves.
+        
+        :param x: The left edge of the tile, relative to its center
+        :type x:  ``float``
+        
+        :param y: The bottom edge of the tile, relative to its center
+        :type y:  ``float``
+        """
         grid_x = self._texture.width
         grid_y = self._texture.height
         size_x = int(self.width//grid_x)
@@ -118,6 +205,10 @@ class GTile(GObject):
         rng_x = size_x+1 if rem_x > 0 else size_x
         rng_y = size_y+1 if rem_y > 0 else size_y
         
+        # The texture coordinates of the image (which may be flipped, or a region)
+        (u0,v0) = self._texture.uvpos
+        (su,sv) = self._texture.uvsize
+        
         vert = []
         indx = []
         pos = 0
@@ -125,18 +216,11 @@ class GTile(GObject):
             for jj in range(rng_y):
                 ni = 1 if ii < size_x else rem_x/grid_x
                 nj = 1 if jj < size_y else rem_y/grid_y
-                vert.extend([x+ii*grid_x,      y+jj*grid_y,         0, 1])
-                vert.extend([x+(ii+ni)*grid_x, y+jj*grid_y,        ni, 1])
-                vert.extend([x+(ii+ni)*grid_x, y+(jj+nj)*grid_y,   ni, 1-nj])
-                vert.extend([x+ii*grid_x,      y+(jj+nj)*grid_y,    0, 1-nj])
+                vert.extend([x+ii*grid_x,      y+jj*grid_y,      u0,       v0])
+                vert.extend([x+(ii+ni)*grid_x, y+jj*grid_y,      u0+ni*su, v0])
+                vert.extend([x+(ii+ni)*grid_x, y+(jj+nj)*grid_y, u0+ni*su, v0+nj*sv])
+                vert.extend([x+ii*grid_x,      y+(jj+nj)*grid_y, u0,       v0+nj*sv])
                 indx.extend([pos,pos+1,pos+2,pos+2,pos+3,pos])
                 pos += 4
         
-        mesh = Mesh(vertices=vert, indices=indx,mode='triangles',texture=self._texture)
-        if not self._fillcolor is None:
-            self._cache.add(self._fillcolor)
-        else:
-            self._cache.add(Color(1,1,1))
-        self._cache.add(mesh)
-        
-        self._cache.add(PopMatrix())
\ No newline at end of file
+        return Mesh(vertices=vert, indices=indx,mode='triangles',texture=self._texture)
@@ -15,6 +15,7 @@ from kivy.uix.floatlayout import FloatLayout
 from kivy.metrics import dp
 
 from introcs.geom import Point2
+from .gcamera import GCamera
 
 
 class GInput(object):
@@ -411,12 +412,45 @@ class GView(FloatLayout):
     :class:`GObject` instances to the :meth:`draw` method.  You must do this every
     animation frame, as the game is constantly clearing the window.
 
+    Alternatively, objects can be retained.  An object attached with :meth:`add` stays 
+    on screen, in every frame, until it is detached with :meth:`remove`.  Changing the
+    attributes of a retained object (such as its position) changes it on screen, so 
+    nothing has to be drawn again.  This is much faster when there are many objects.
+    Retained objects are drawn in layers, from the lowest layer to the highest. Within a
+    layer, objects are drawn in the order they were added. Objects drawn with 
+    :meth:`draw` appear on top of all of the layers.  A retained object whose look 
+    changed (see :meth:`GObject.batch_update`) is rebuilt at the end of the frame.
+
     **You should never construct an object of this class**.  Creating a new instance
     of this class will not properly display it on the screen.  Instead, you should
     only use the one provided in the `view` attribute of :class:`GameApp`.
     See the documentation of that class for more information.
     """
 
+    # MUTABLE ATTRIBUTES
+    @property
+    def camera(self):
+        """
+        The camera that scrolls this view, or None if the view does not scroll.
+
+        With a camera, every object (drawn or retained) is positioned in world
+        coordinates, and the view shows the rectangle that the camera is looking at.
+        Without one, the world coordinates are just the coordinates of the view. See
+        :class:`GCamera` for more information.
+
+        **Invariant**: Must be a :class:`GCamera` or None
+        """
+        return self._camera
+
+    @camera.setter
+    def camera(self,value):
+        assert value is None or isinstance(value,GCamera), '%s is not a camera' % repr(value)
+        if value is self._camera:
+            return
+        self._camera = value
+        self._reset()
+
+
     # BUILT-IN METHODS
     def __init__(self):
         """
@@ -429,6 +463,11 @@ class GView(FloatLayout):
         """
         FloatLayout.__init__(self)
         self._frame = InstructionGroup()
+        self._retained = InstructionGroup()
+        self._layers = {}
+        self._slots = {}
+        self._pending = set()
+        self._camera = None
         self.bind(pos=self._reset)
         self.bind(size=self._reset)
         self._reset()
@@ -460,7 +499,90 @@ class GView(FloatLayout):
         self._frame.clear()
         self._contents.clear()
 
+    def add(self,obj,layer=0):
+        """
+        Attaches the given object to this view, in the given layer.
+
+        The object stays on screen until it is removed.  If the object is already 
+        attached, it is moved to the end of the given layer.
+
+        :param obj: the object to attach
+        :type obj:  :class:`GObject`
+
+        :param layer: the layer to draw the object in
+        :type layer:  ``int``
+        """
+        assert type(layer) == int, 'layer %s is not an int' % repr(layer)
+        if obj in self._slots:
+            self.remove(obj)
+
+        if not layer in self._layers:
+            self._layers[layer] = InstructionGroup()
+            self._retained.clear()
+            for key in sorted(self._layers):
+                self._retained.add(self._layers[key])
+
+        obj._validate()
+        slot = InstructionGroup()
+        slot.add(obj._cache)
+        self._layers[layer].add(slot)
+        self._slots[obj] = (layer,slot)
+        obj._attach(self,slot)
+
+    def remove(self,obj):
+        """
+        Detaches the given object from this view.
+
+        Nothing happens if the object is not attached.
+
+        :param obj: the object to detach
+        :type obj:  :class:`GObject`
+        """
+        if obj in self._slots:
+            (layer,slot) = self._slots.pop(obj)
+            self._layers[layer].remove(slot)
+            self._pending.discard(obj)
+            obj._detach(self)
+
+    def remove_all(self):
+        """
+        Detaches every retained object from this view.
+        """
+        for obj in self._slots:
+            obj._detach(self)
+        self._slots.clear()
+        self._pending.clear()
+        for layer in self._layers.values():
+            layer.clear()
+
+    def is_attached(self,obj):
+        """
+        Returns: True if the given object is attached to this view.
+
+        :param obj: the object to check
+        :type obj:  :class:`GObject`
+        """
+        return obj in self._slots
+
+    def layer_of(self,obj):
+        """
+        Returns: The layer of the given object, or None if it is not attached.
+
+        :param obj: the object to check
+        :type obj:  :class:`GObject`
+        """
+        return self._slots[obj][0] if obj in self._slots else None
+
     # HIDDEN METHODS
+    def _flush(self):
+        """
+        Rebuilds the drawing cache of every attached object that changed this frame.
+        
+        This method is called by :class:`GameApp` at the end of every animation frame.
+        """
+        while self._pending:
+            self._pending.pop()._validate()
+    
     def _reset(self,obj=None,value=None):
         """
         Resets the view canvas in response to a resizing event
@@ -470,4 +592,10 @@ class GView(FloatLayout):
         self.canvas.add(Rectangle(pos=self.pos,size=self.size))
         # Work-around for Retina Macs
         self.canvas.add(Scale(dp(1),dp(1),dp(1)))
+        if not self._camera is None:
+            self.canvas.add(PushMatrix())
+            self.canvas.add(self._camera._translate)
+        self.canvas.add(self._retained)
         self.canvas.add(self._frame)
+        if not self._camera is None:
+            self.canvas.add(PopMatrix())
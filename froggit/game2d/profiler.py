@@ -0,0 +1,436 @@
+"""
+Frame profiler for 2D game support.
+
+This module times each animation frame of a :class:`GameApp`.  The phases of every frame
+(clearing the view, updating, drawing and refreshing the input) are timed automatically
+once profiling is enabled.  In addition, any code can time its own work with a span::
+
+    with span('level.lanes'):
+        for lane in self._lanes:
+            lane.draw(view)
+
+Spans cost almost nothing when profiling is disabled, so they can stay in the code.
+
+All timings are stored in fixed-size ring buffers, so a profiler never grows, no matter
+how long the game runs.  Only the most recent frames are kept.  The timings can be
+summarized with :meth:`Profiler.summary` or exported with :meth:`Profiler.write_trace`
+to the Chrome trace-event format (open the file in chrome://tracing or Perfetto).
+"""
+import time
+import json
+
+
+# The profiler that spans are recorded to (None if profiling is disabled)
+_ACTIVE = None
+
+
+class _NullSpan(object):
+    """
+    A span that does nothing, used when profiling is disabled.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,exc_type,exc_value,tb):
+        return False
+
+
+# The only null span (it has no state, so it can be shared)
+_NULL_SPAN = _NullSpan()
+
+
+class _NullProfiler(object):
+    """
+    A profiler that does nothing, used by a :class:`GameApp` when profiling is disabled.
+
+    It has the frame methods of :class:`Profiler`, so the game loop is written once and
+    times its phases whether or not profiling is enabled.
+    """
+    __slots__ = ()
+
+    def begin_frame(self):
+        return 0
+
+    def end_frame(self,steps=1,dropped=0):
+        pass
+
+    def span(self,name):
+        return _NULL_SPAN
+
+
+# The only null profiler
+_NULL_PROFILER = _NullProfiler()
+
+
+class _Span(object):
+    """
+    A span that records its duration to a profiler when it is closed.
+    """
+    __slots__ = ('_profiler','_name','_start')
+
+    def __init__(self,profiler,name):
+        """
+        Creates a new span for the given profiler
+
+        :param profiler: The profiler to record to
+        :type profiler:  :class:`Profiler`
+
+        :param name: The span name
+        :type name:  ``str``
+        """
+        self._profiler = profiler
+        self._name = name
+        self._start = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self,exc_type,exc_value,tb):
+        start = self._start
+        self._profiler.record(self._name,start,time.perf_counter_ns()-start)
+        return False
+
+
+def span(name):
+    """
+    Returns: A context manager that times the enclosed code as the given span
+
+    The span is recorded to the active profiler (the profiler of the running
+    :class:`GameApp`).  If profiling is disabled, this returns a shared object that
+    does nothing.
+
+    :param name: The span name
+    :type name:  ``str``
+    """
+    if _ACTIVE is None:
+        return _NULL_SPAN
+    return _Span(_ACTIVE,name)
+
+
+def active_profiler():
+    """
+    Returns: The active profiler, or None if profiling is disabled
+    """
+    return _ACTIVE
+
+
+class Profiler(object):
+    """
+    A class that records the timings of animation frames.
+
+    A profiler has two ring buffers.  The event buffer holds every timed phase and span,
+    and the frame buffer holds one entry per animation frame.  When a buffer is full, the
+    oldest entries are overwritten.
+
+    The profiler also counts problem frames over the whole run (not just the frames in
+    the buffer).  A frame is *late* if it started more than 1.5 frame budgets after the
+    previous one, and *over budget* if its own work took longer than the budget.  In
+    fixed-timestep mode, any updates that the game skipped to catch up are *dropped*.
+
+    You should never need to create a profiler yourself.  Pass ``profile=True`` to the
+    :class:`GameApp` constructor and use its ``profiler`` attribute instead.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def budget(self):
+        """
+        The time budget of a single frame in seconds.
+
+        This is normally 1/fps of the game.
+
+        **Invariant**: Must be an int or float > 0.
+        """
+        return self._budget/1e9
+
+    @budget.setter
+    def budget(self,value):
+        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        assert value > 0, 'value %s is not positive' % repr(value)
+        self._budget = round(value*1e9)
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def capacity(self):
+        """
+        The number of events that the event buffer can hold.
+
+        The frame buffer holds capacity//8 frames (but at least 1).
+
+        **Immutable**: This value cannot be changed after the profiler is created.
+
+        **Invariant**: Must be an int > 0.
+        """
+        return self._capacity
+
+    @property
+    def frames(self):
+        """
+        The number of frames profiled since the last reset.
+
+        **Immutable**: This value cannot be changed.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._frame
+
+    @property
+    def late(self):
+        """
+        The number of late frames since the last reset.
+
+        **Immutable**: This value cannot be changed.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._late
+
+    @property
+    def over_budget(self):
+        """
+        The number of frames over budget since the last reset.
+
+        **Immutable**: This value cannot be changed.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._over
+
+    @property
+    def dropped(self):
+        """
+        The number of fixed updates dropped since the last reset.
+
+        **Immutable**: This value cannot be changed.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._dropped
+
+    # BUILT-IN METHODS
+    def __init__(self,capacity=16384,budget=1/60):
+        """
+        Creates a new, empty profiler.
+
+        :param capacity: The number of events in the event buffer
+        :type capacity:  ``int`` > 0
+
+        :param budget: The time budget of a single frame in seconds
+        :type budget:  ``int`` or ``float`` > 0
+        """
+        assert type(capacity) == int, 'capacity %s is not an int' % repr(capacity)
+        assert capacity > 0, 'capacity %s is not positive' % repr(capacity)
+        self._capacity = capacity
+        self.budget = budget
+        self.reset()
+
+    # PUBLIC METHODS
+    def reset(self):
+        """
+        Forgets all of the events, frames and counters.
+        """
+        size = self._capacity
+        self._names  = [None]*size
+        self._starts = [0]*size
+        self._durs   = [0]*size
+        self._owners = [0]*size
+        self._next   = 0
+        self._count  = 0
+
+        size = max(1,size//8)
+        self._fstarts = [0]*size
+        self._fdurs   = [0]*size
+        self._fsteps  = [0]*size
+        self._fnext   = 0
+        self._fcount  = 0
+
+        self._frame = 0
+        self._begin = None
+        self._last = None
+        self._late = 0
+        self._over = 0
+        self._dropped = 0
+
+    def record(self,name,start,duration):
+        """
+        Records a single event in the current frame.
+
+        :param name: The event name
+        :type name:  ``str``
+
+        :param start: The start of the event (from ``time.perf_counter_ns``)
+        :type start:  ``int``
+
+        :param duration: The duration of the event in nanoseconds
+        :type duration:  ``int`` >= 0
+        """
+        pos = self._next
+        self._names[pos]  = name
+        self._starts[pos] = start
+        self._durs[pos]   = duration
+        self._owners[pos] = self._frame
+        self._next = (pos+1) % self._capacity
+        if self._count < self._capacity:
+            self._count += 1
+
+    def begin_frame(self):
+        """
+        Starts a new frame, and returns its start time.
+
+        The start time comes from ``time.perf_counter_ns``.
+        """
+        now = time.perf_counter_ns()
+        if not self._last is None and now-self._last > self._budget*3//2:
+            self._late += 1
+        self._last = now
+        self._begin = now
+        self._frame += 1
+        return now
+
+    def end_frame(self,steps=1,dropped=0):
+        """
+        Finishes the current frame.
+
+        :param steps: The number of updates in this frame
+        :type steps:  ``int`` >= 0
+
+        :param dropped: The number of updates dropped in this frame
+        :type dropped:  ``int`` >= 0
+        """
+        if self._begin is None:
+            return
+        duration = time.perf_counter_ns()-self._begin
+        if duration > self._budget:
+            self._over += 1
+        self._dropped += dropped
+
+        pos = self._fnext
+        size = len(self._fstarts)
+        self._fstarts[pos] = self._begin
+        self._fdurs[pos]   = duration
+        self._fsteps[pos]  = steps
+        self._fnext = (pos+1) % size
+        if self._fcount < size:
+            self._fcount += 1
+        self._begin = None
+
+    def span(self,name):
+        """
+        Returns: A context manager that times the enclosed code as the given span
+
+        :param name: The span name
+        :type name:  ``str``
+        """
+        return _Span(self,name)
+
+    def activate(self):
+        """
+        Makes this profiler the one that the function :func:`span` records to.
+        """
+        global _ACTIVE
+        _ACTIVE = self
+
+    def deactivate(self):
+        """
+        Stops the function :func:`span` from recording to this profiler.
+
+        Nothing happens if this profiler is not active.
+        """
+        global _ACTIVE
+        if _ACTIVE is self:
+            _ACTIVE = None
+
+    def events(self):
+        """
+        Returns: The events in the buffer, oldest first
+
+        Each event is a tuple (name, start, duration, frame), with times in nanoseconds.
+        """
+        size = self._capacity
+        first = (self._next-self._count) % size
+        result = []
+        for x in range(self._count):
+            pos = (first+x) % size
+            result.append((self._names[pos],self._starts[pos],self._durs[pos],
+                           self._owners[pos]))
+        return result
+
+    def summary(self):
+        """
+        Returns: A dictionary summarizing the buffered events and the frame counters
+
+        The key 'phases' maps each event name to a dictionary with the keys 'count',
+        'mean', 'p50', 'p99' and 'max' (in milliseconds).  The key 'frame' has the same
+        statistics for whole frames.  The keys 'frames', 'late', 'over_budget' and
+        'dropped' are the counters, and 'budget' is the frame budget in milliseconds.
+        """
+        groups = {}
+        for (name,start,duration,frame) in self.events():
+            if not name in groups:
+                groups[name] = []
+            groups[name].append(duration)
+
+        size = len(self._fdurs)
+        first = (self._fnext-self._fcount) % size
+        frames = [self._fdurs[(first+x) % size] for x in range(self._fcount)]
+
+        return {'phases':{name : _statistics(groups[name]) for name in groups},
+                'frame':_statistics(frames),'frames':self._frame,'late':self._late,
+                'over_budget':self._over,'dropped':self._dropped,
+                'budget':self._budget/1e6}
+
+    def trace(self):
+        """
+        Returns: The buffered events as a Chrome trace-event dictionary
+
+        Every event is a complete ('X') event, so spans nest inside the phases that
+        contain them.  Each frame is also an event, named 'frame'.
+        """
+        events = []
+        size = len(self._fstarts)
+        first = (self._fnext-self._fcount) % size
+        for x in range(self._fcount):
+            pos = (first+x) % size
+            events.append({'name':'frame','cat':'frame','ph':'X','pid':1,'tid':1,
+                           'ts':self._fstarts[pos]/1000,'dur':self._fdurs[pos]/1000,
+                           'args':{'steps':self._fsteps[pos]}})
+        for (name,start,duration,frame) in self.events():
+            events.append({'name':name,'cat':'game','ph':'X','pid':1,'tid':1,
+                           'ts':start/1000,'dur':duration/1000,'args':{'frame':frame}})
+        events.sort(key=lambda item: (item['ts'],-item['dur']))
+        return {'traceEvents':events,'displayTimeUnit':'ms',
+                'otherData':{'frames':self._frame,'late':self._late,
+                             'over_budget':self._over,'dropped':self._dropped}}
+
+    def write_trace(self,path):
+        """
+        Writes the buffered events to a file in the Chrome trace-event format.
+
+        :param path: The file name
+        :type path:  ``str``
+        """
+        with open(path,'w') as file:
+            json.dump(self.trace(),file)
+
+
+# HIDDEN FUNCTIONS
+def _statistics(durations):
+    """
+    Returns: A dictionary of statistics (in milliseconds) for the given durations
+
+    The percentiles use the nearest-rank method.
+
+    :param durations: The durations in nanoseconds
+    :type durations:  ``list`` of ``int``
+    """
+    if not durations:
+        return {'count':0,'mean':0.0,'p50':0.0,'p99':0.0,'max':0.0}
+    ordered = sorted(durations)
+    size = len(ordered)
+    def rank(p):
+        return ordered[min(size-1,max(0,-(-p*size//100)-1))]/1e6
+    return {'count':size,'mean':sum(ordered)/size/1e6,'p50':rank(50),'p99':rank(99),
+            'max':ordered[-1]/1e6}
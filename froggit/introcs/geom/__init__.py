@@ -9,4 +9,5 @@ Date:   July 13, 2017 (Python 3 version)
 """
 from .point  import Point2, Point3, Point
 from .vector import Vector2, Vector3, Vector
-from .matrix import Matrix
\ No newline at end of file
+from .matrix import Matrix
+from .affine import Affine2
\ No newline at end of file
@@ -0,0 +1,411 @@
+"""
+Classes for representing 2D affine transforms.
+
+A :class:`Matrix` can represent any graphics transform, but it is a 4x4 NumPy array,
+and so even transforming a single point allocates arrays.  Most 2D games only need
+transforms of the plane: translations, rotations and scales.  These are 2x3 matrices,
+which are only six numbers.  The class :class:`Affine2` stores them as plain floats, so
+that transforming a point is a few multiplications.  It can also transform many points
+at once, in a single NumPy operation.
+"""
+import math
+
+
+class Affine2(object):
+    """
+    An instance is an affine transform of the plane.
+
+    The transform takes the point (x,y) to::
+
+        (m00*x + m01*y + m02, m10*x + m11*y + m12)
+
+    This class has the same methods as :class:`Matrix` (restricted to two dimensions),
+    and it can be converted to and from a :class:`Matrix`.  There are no publicly
+    accessible attributes, as it is not safe to access the internals.
+    """
+    __slots__ = ('_m00','_m01','_m02','_m10','_m11','_m12')
+
+    def __init__(self,m00=1,m01=0,m02=0,m10=0,m11=1,m12=0):
+        """
+        The constructor creates a new affine transform (the identity by default)
+
+        :param m00: the x-coefficient of x (default 1)
+        :type m00:  ``int`` or ``float``
+
+        :param m01: the y-coefficient of x (default 0)
+        :type m01:  ``int`` or ``float``
+
+        :param m02: the x-offset (default 0)
+        :type m02:  ``int`` or ``float``
+
+        :param m10: the x-coefficient of y (default 0)
+        :type m10:  ``int`` or ``float``
+
+        :param m11: the y-coefficient of y (default 1)
+        :type m11:  ``int`` or ``float``
+
+        :param m12: the y-offset (default 0)
+        :type m12:  ``int`` or ``float``
+        """
+        self._m00 = float(m00)
+        self._m01 = float(m01)
+        self._m02 = float(m02)
+        self._m10 = float(m10)
+        self._m11 = float(m11)
+        self._m12 = float(m12)
+
+    @classmethod
+    def CreateTranslation(cls,x=0,y=0):
+        """
+        Creates a translation transform for the given offset.
+
+        :param x: x-coordinate of translation (default 0)
+        :type x:  ``int`` or ``float``
+
+        :param y: y-coordinate of translation (default 0)
+        :type y:  ``int`` or ``float``
+        """
+        return cls(1,0,x,0,1,y)
+
+    @classmethod
+    def CreateRotation(cls,ang=0):
+        """
+        Creates a rotation about the origin.
+
+        The rotation angle is given in degrees, not radians. Rotation is counterclockwise.
+
+        :param ang: angle of rotation in degrees (default 0)
+        :type ang:  ``int`` or ``float``
+        """
+        result = cls()
+        result.rotate(ang)
+        return result
+
+    @classmethod
+    def CreateScale(cls,x=1,y=1):
+        """
+        Creates a scale transform for the given amount.
+
+        :param x: x-coordinate of the scale (default 1)
+        :type x:  ``int`` or ``float``
+
+        :param y: y-coordinate of the scale (default 1)
+        :type y:  ``int`` or ``float``
+        """
+        return cls(x,0,0,0,y,0)
+
+    @classmethod
+    def CreateFromMatrix(cls,matrix):
+        """
+        Creates the affine transform of the plane given by a :class:`Matrix`.
+
+        Anything that the matrix does to the z-coordinate is dropped.
+
+        :param matrix: the matrix to convert
+        :type matrix:  :class:`Matrix`
+        """
+        from .matrix import Matrix
+        assert isinstance(matrix,Matrix), "%s is not a matrix" % repr(matrix)
+        d = matrix._data
+        return cls(d[0,0],d[0,1],d[0,3],d[1,0],d[1,1],d[1,3])
+
+    def __str__(self):
+        """
+        :return: A readable string representation of this transform.
+        :rtype:  ``str``
+        """
+        return '[[%s, %s, %s],\n [%s, %s, %s]]' % (self._m00,self._m01,self._m02,
+                                                   self._m10,self._m11,self._m12)
+
+    def __repr__(self):
+        """
+        :return: An unambiguous string representation of this transform.
+        :rtype:  ``str``
+        """
+        return str(self.__class__)+str(self)
+
+    # COMPARISON
+    def __eq__(self, other):
+        """
+        Compares this object with ``other``
+
+        This method tests whether the coefficients are "close enough".  It does not
+        require exact equality for floats.  Equivalence also requires type equivalence.
+
+        :param other: The object to check
+
+        :return: True if ``self`` and ``other`` are equivalent
+        :rtype:  ``bool``
+        """
+        return (type(other) == type(self) and
+                all(math.isclose(a,b,rel_tol=1e-05,abs_tol=1e-08)
+                    for (a,b) in zip(self.list(),other.list())))
+
+    def __ne__(self, other):
+        """
+        Compares this object with ``other``
+
+        :param other: The object to check
+
+        :return: False if ``self`` and ``other`` are equivalent objects.
+        :rtype:  ``bool``
+        """
+        return not self == other
+
+    def __mul__(self,other):
+        """
+        Premultiplies this transform by ``other``.
+
+        As with :class:`Matrix`, this allows us to read graphics operations left to
+        right.  So if ``p`` is a rotation and ``q`` is a translation, then ``p * q`` is
+        a rotation followed by a translation.  This method does not modify this transform.
+
+        If ``other`` is a :class:`Matrix`, the result is a :class:`Matrix` too.
+
+        :param other: the transform to pre-multiply
+        :type other:  ``Affine2`` or ``Matrix``
+
+        :return: The result of premultiplying this transform by ``other``
+        :rtype:  ``Affine2`` or ``Matrix``
+        """
+        from .matrix import Matrix
+        if isinstance(other,Matrix):
+            return self.toMatrix()*other
+        assert isinstance(other,Affine2), "%s is not a transform" % repr(other)
+        result = self.copy()
+        result._premultiply(other._m00,other._m01,other._m02,other._m10,other._m11,other._m12)
+        return result
+
+    def __imul__(self,other):
+        """
+        Premultiplies this transform by ``other`` in place.
+
+        This method will modify the attributes of this oject. This method returns this
+        object for chaining.
+
+        :param other: the transform to pre-multiply
+        :type other:  ``Affine2``
+
+        :return: This object, newly modified
+        :rtype:  ``Affine2``
+        """
+        assert isinstance(other,Affine2), "%s is not a transform" % repr(other)
+        self._premultiply(other._m00,other._m01,other._m02,other._m10,other._m11,other._m12)
+        return self
+
+    def copy(self):
+        """
+        :return: a copy of this transform
+        :rtype:  ``Affine2``
+        """
+        return Affine2(self._m00,self._m01,self._m02,self._m10,self._m11,self._m12)
+
+    def list(self):
+        """
+        :return: the six coefficients (m00, m01, m02, m10, m11, m12) of this transform
+        :rtype:  ``list``
+        """
+        return [self._m00,self._m01,self._m02,self._m10,self._m11,self._m12]
+
+    def toMatrix(self):
+        """
+        :return: this transform as a :class:`Matrix`
+        :rtype:  ``Matrix``
+        """
+        from .matrix import Matrix
+        m = Matrix()
+        m._data[0,0] = self._m00
+        m._data[0,1] = self._m01
+        m._data[0,3] = self._m02
+        m._data[1,0] = self._m10
+        m._data[1,1] = self._m11
+        m._data[1,3] = self._m12
+        return m
+
+    def inverse(self):
+        """
+        :return: the inverse of this transform
+        :rtype:  ``Affine2``
+        """
+        return self.copy().invert()
+
+    def invert(self):
+        """
+        Inverts this transform in place.
+
+        This method returns this object for chaining.
+
+        :return: This object, newly modified
+        :rtype:  ``Affine2``
+        """
+        det = self._m00*self._m11-self._m01*self._m10
+        assert det != 0, "%s is not invertible" % repr(self)
+        m00 =  self._m11/det
+        m01 = -self._m01/det
+        m10 = -self._m10/det
+        m11 =  self._m00/det
+        m02 = -(m00*self._m02+m01*self._m12)
+        m12 = -(m10*self._m02+m11*self._m12)
+        self._m00 = m00
+        self._m01 = m01
+        self._m02 = m02
+        self._m10 = m10
+        self._m11 = m11
+        self._m12 = m12
+        return self
+
+    def translate(self,x=0,y=0):
+        """
+        Translates this transform (in-place) by the given amount.
+
+        This method returns this object for chaining.
+
+        :param x: x-coordinate of translation (default 0)
+        :type x:  ``int`` or ``float``
+
+        :param y: y-coordinate of translation (default 0)
+        :type y:  ``int`` or ``float``
+
+        :return: This object, newly modified
+        """
+        self._m02 += x
+        self._m12 += y
+        return self
+
+    def rotate(self,ang=0):
+        """
+        Rotates this transform (in place) about the origin
+
+        The rotation angle is given in degrees, not radians. Rotation is counterclockwise.
+
+        This method returns this object for chaining.
+
+        :param ang: angle of rotation in degrees (default 0)
+        :type ang:  ``int`` or ``float``
+
+        :return: This object, newly modified
+        """
+        # Exact values for right angles, so that they do not pick up rounding errors
+        quarter = ang % 360
+        if quarter in (0,90,180,270):
+            (c,s) = {0:(1,0),90:(0,1),180:(-1,0),270:(0,-1)}[quarter]
+        else:
+            c = math.cos(math.radians(ang))
+            s = math.sin(math.radians(ang))
+        self._premultiply(c,-s,0,s,c,0)
+        return self
+
+    def scale(self,x=1,y=1):
+        """
+        Scales this transform (in-place) by the given amount
+
+        This method returns this object for chaining.
+
+        :param x: x-coordinate of the scale (default 1)
+        :type x:  ``int`` or ``float``
+
+        :param y: y-coordinate of the scale (default 1)
+        :type y:  ``int`` or ``float``
+
+        :return: This object, newly modified
+        """
+        self._m00 *= x
+        self._m01 *= x
+        self._m02 *= x
+        self._m10 *= y
+        self._m11 *= y
+        self._m12 *= y
+        return self
+
+    def _transform(self,x=0,y=0,z=0):
+        """
+        Transforms the given point by this transform.
+
+        The value returned is a 2-element tuple of floats.  The z-coordinate is allowed
+        so that this method can replace :meth:`Matrix._transform`, but it is ignored.
+
+        :param x: x-coordinate to transform (default 0)
+        :type x:  ``int`` or ``float``
+
+        :param y: y-coordinate to transform (default 0)
+        :type y:  ``int`` or ``float``
+
+        :return: The point (x,y) transformed by this transform
+        :rtype:  ``tuple``
+        """
+        return (self._m00*x+self._m01*y+self._m02, self._m10*x+self._m11*y+self._m12)
+
+    def transform(self,value):
+        """
+        Transforms the given point or vector by this transform.
+
+        Value can be a :class:`Point2`, :class:`Point3`, :class:`Vector2`, or
+        :class:`Vector3`.  The value returned will have the same type as ``value``.  As
+        with :class:`Matrix`, vectors are moved by translations too.  The z-coordinate
+        of a 3D value is unchanged.
+
+        :param value: the object to transform
+        :type value:  point or vector
+
+        :return: The value transformed by this transform
+        :rtype:  ``type(value)``
+        """
+        from .tuple import Tuple2, Tuple3
+        if isinstance(value,Tuple2):
+            return type(value)(*self._transform(value.x,value.y))
+        elif isinstance(value,Tuple3):
+            return type(value)(*(self._transform(value.x,value.y)+(value.z,)))
+
+        assert False, '%s is not a point or vector' % repr(value)
+
+    def transform_points(self,points,out=None):
+        """
+        Transforms many points at once by this transform.
+
+        The points are a NumPy array (or anything that can be converted to one) whose
+        last dimension has size 2, such as an array of shape (n,2).  They are all
+        transformed with a single matrix product.  The result is a new array of the same
+        shape, unless ``out`` is given.  The array ``out`` may be ``points`` itself, to
+        transform the points in place.
+
+        :param points: the points to transform
+        :type points:  ``numpy.ndarray`` with shape (..., 2)
+
+        :param out: the array to store the result in (default None)
+        :type out:  ``numpy.ndarray`` or ``None``
+
+        :return: The points transformed by this transform
+        :rtype:  ``numpy.ndarray``
+        """
+        import numpy as np
+        points = np.asarray(points)
+        assert points.ndim > 0 and points.shape[-1] == 2, \
+                '%s is not an array of 2d points' % repr(points)
+        dtype = points.dtype if points.dtype.kind == 'f' else np.float64
+        linear = np.array([[self._m00,self._m10],[self._m01,self._m11]],dtype=dtype)
+        offset = np.array([self._m02,self._m12],dtype=dtype)
+        if out is None:
+            out = np.matmul(points,linear)
+        else:
+            np.matmul(points,linear,out=out)
+        out += offset
+        return out
+
+    def _premultiply(self,p00,p01,p02,p10,p11,p12):
+        """
+        Multiplies the given transform on the left of this one, in place.
+
+        The result first applies this transform, and then the given one.
+        """
+        m00 = p00*self._m00+p01*self._m10
+        m01 = p00*self._m01+p01*self._m11
+        m02 = p00*self._m02+p01*self._m12+p02
+        m10 = p10*self._m00+p11*self._m10
+        m11 = p10*self._m01+p11*self._m11
+        m12 = p10*self._m02+p11*self._m12+p12
+        self._m00 = m00
+        self._m01 = m01
+        self._m02 = m02
+        self._m10 = m10
+        self._m11 = m11
+        self._m12 = m12
@@ -146,12 +146,15 @@ class Matrix(object):
         produces a rotation followed by a translation. 
         
         :param other: the matrix to pre-multiply
-        :type other:  ``Matrix``
+        :type other:  ``Matrix`` or ``Affine2``
         
         :return: The result of premultiplying this matrix by ``other``
         :rtype:  ``Matrix``
         """
         import numpy as np
+        from .affine import Affine2
+        if isinstance(other,Affine2):
+            other = other.toMatrix()
         m = Matrix()
         np.dot(other._data,self._data,m._data)
         return m
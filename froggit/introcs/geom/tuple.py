@@ -334,10 +334,14 @@ class Tuple2(object):
         Transforms this object by a matrix in place
         
         :param matrix: matrix to transform with
-        :type matrix:  :class:`Matrix`
+        :type matrix:  :class:`Matrix` or :class:`Affine2`
         """
         from .matrix import Matrix
+        from .affine import Affine2
         import numpy as np
+        if isinstance(matrix,Affine2):
+            (self.x, self.y) = matrix._transform(self.x,self.y)
+            return
         assert isinstance(matrix,Matrix), "%s is not a matrix" % repr(matrix)
         b = np.array([self.x,self.y,0,1], dtype=np.float32)
         tmp = np.dot(matrix._data,b)
@@ -358,18 +362,19 @@ class Tuple2(object):
         of a subclass, it uses that object instead of the original class.
         
         :param value: value to multiply by
-        :type value:  ``int``, ``float``, :class:`Tuple2` or :class:`Matrix`
+        :type value:  ``int``, ``float``, :class:`Tuple2`, :class:`Matrix` or :class:`Affine2`
         
         :return: the altered object
         :rtype:  ``type(self)``
         """
         from .matrix import Matrix
+        from .affine import Affine2
         result = self.copy()
         if type(value) in [int,float]:
             result._imul_scalar_(value)
         elif isinstance(value,Tuple2):
             result._imul_tuple_(value)
-        elif isinstance(value,Matrix):
+        elif isinstance(value,(Matrix,Affine2)):
             result._imul_matrix_(value)
         else:
             assert False, "%s is not a valid value" % repr(value)
@@ -395,11 +400,12 @@ class Tuple2(object):
         :return: This object, newly modified
         """
         from .matrix import Matrix
+        from .affine import Affine2
         if type(value) in [int,float]:
             self._imul_scalar_(value)
         elif isinstance(value,Tuple2):
             self._imul_tuple_(value)
-        elif isinstance(value,Matrix):
+        elif isinstance(value,(Matrix,Affine2)):
             self._imul_matrix_(value)
         else:
             assert False, "%s is not a valid value" % repr(value)
@@ -973,10 +979,14 @@ class Tuple3(object):
         Transforms this object by a matrix in place
         
         :param matrix: matrix to transform with
-        :type matrix:  :class:`Matrix`
+        :type matrix:  :class:`Matrix` or :class:`Affine2`
         """
         from .matrix import Matrix
+        from .affine import Affine2
         import numpy as np
+        if isinstance(matrix,Affine2):
+            (self.x, self.y) = matrix._transform(self.x,self.y)
+            return
         assert isinstance(matrix,Matrix), "%s is not a matrix" % repr(matrix)
         b = np.array([self.x,self.y,self.z,1], dtype=np.float32)
         tmp = np.dot(matrix._data,b)
@@ -998,18 +1008,19 @@ class Tuple3(object):
         of a subclass, it uses that object instead of the original class.
         
         :param value: value to multiply by
-        :type value:  ``int``, ``float``, :class:`Tuple2` or :class:`Matrix`
+        :type value:  ``int``, ``float``, :class:`Tuple2`, :class:`Matrix` or :class:`Affine2`
         
         :return: the altered object
         :rtype:  ``type(self)``
         """
         from .matrix import Matrix
+        from .affine import Affine2
         result = self.copy()
         if type(value) in [int,float]:
             result._imul_scalar_(value)
         elif isinstance(value,Tuple3):
             result._imul_tuple_(value)
-        elif isinstance(value,Matrix):
+        elif isinstance(value,(Matrix,Affine2)):
             result._imul_matrix_(value)
         else:
             assert False, "%s is not a valid value" % repr(value)
@@ -1035,11 +1046,12 @@ class Tuple3(object):
         :return: This object, newly modified
         """
         from .matrix import Matrix
+        from .affine import Affine2
         if type(value) in [int,float]:
             self._imul_scalar_(value)
         elif isinstance(value,Tuple3):
             self._imul_tuple_(value)
-        elif isinstance(value,Matrix):
+        elif isinstance(value,(Matrix,Affine2)):
             self._imul_matrix_(value)
         else:
             assert False, "%s is not a valid value" % repr(value)
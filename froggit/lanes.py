@@ -57,92 +57,190 @@ class Lane(object):
     # Attribute _objs: The list containg the objects for each lane
     # Invariant: _objs is a list containing GImage objects
 
+    # Attribute _spec: The compiled specification for this lane
+    # Invariant: _spec is a LaneSpec object
+
+    # Attribute _shown: The objects that are currently on screen
+    # Invariant: _shown is a list containing GImage objects from _objs
+
+    # Attribute _view: The view this lane is attached to (see attach)
+    # Invariant: _view is a GView object, or None if the lane is drawn with draw
+
+    # Attribute _batch: The sprite batch that draws the objects (see useBatch)
+    # Invariant: _batch is a GSpriteBatch object, or None if each object draws itself
+
+    # Attribute _visible: The positions in list and x coordinates of the objects on
+    # screen, when the objects are drawn by a sprite batch
+    # Invariant: _visible is a pair of lists of the same length, or None if _batch is None
+
+    # Attribute _quads: The batch quad of each object (see GSpriteBatch)
+    # Invariant: _quads is a list of ints the same length as _objs, or None if _batch is None
+
+    # Attribute _ys: The y coordinate of each object
+    # Invariant: _ys is a list of numbers the same length as _objs, or None if _batch is None
+
     def getTile(self):
         return self._tile
 
     def getObjs(self):
         return self._objs
 
-    def __init__(self,level,x,hitboxes):
+    def getSpec(self):
         """
-        Initializer for lane object in froggit
-
-        Parameter level: The loaded json file that contains infromation for the level
-        Precondition: level is a preloaded json file
+        Getter for the compiled specification of this lane
+        """
+        return self._spec
 
-        Parameter x: The lane x from the bottom
-        Precondition: x is an int
+    def __init__(self,lane):
+        """
+        Initializer for lane object in froggit
 
-        Parameter hitboxes: The preloaded json file that contains the hitboxes
-        for the objects in the game
-        Precondition: hitboxes is a preloaded json file
+        Parameter lane: The compiled specification for this lane
+        Precondition: lane is a LaneSpec object
         """
+        self._spec = lane
+
         #Creats the lanes for the level
-        self._tile = GTile(width=(level['size'][0]*GRID_SIZE),height=GRID_SIZE,
-        source=(level['lanes'][x]['type']+'.png'))
+        self._tile = GTile(width=lane.width,height=GRID_SIZE,source=lane.source)
         self._tile.left = 0
-        self._tile.bottom = GRID_SIZE * x
+        self._tile.bottom = lane.bottom
 
-        #Creates the obstacles for each lane
+        #Creates the obstacles for each lane, with their hitboxes
         self._objs = []
-        if level['lanes'][x]['type'] != 'grass':
-            obj_dic = level['lanes'][x]['objects']
-
-            for item in range(len(obj_dic)):
-                xvalue = (obj_dic[item]['position'] * GRID_SIZE)  + (GRID_SIZE // 2)
-                yvalue = (x * GRID_SIZE) + (GRID_SIZE // 2)
-                new_obj = GImage(x=xvalue,y=yvalue, source=obj_dic[item]['type']+'.png')
-                if level['lanes'][x]['type'] != 'hedge':
-                    if level['lanes'][x]['speed'] < 0:
-                        new_obj.angle = 180
-                self._objs.append(new_obj)
-
-        # Sets hitboxes for objs
-        for obj in range(len(self._objs)):
-            if self._objs[obj] != []:
-                sourceKey = self._objs[obj].source[:-4]
-                objHitbox = tuple(hitboxes['images'][sourceKey]['hitbox'])
-                self._objs[obj].hitbox = objHitbox
-
-    def update(self,pos,dt,level):
-        """
-        Update method for lane that updates the movement of the obstacles
-
-        Parameter pos: The position of the lane in the json file
-        Precondition: object is a GImage object
-
-        Parameter dt: The time in seconds since last update
-        Precondition: dt is a number (int or float)
-
-        Parameter level: The loaded json file that contains infromation for the level
-        Precondition: level is a preloaded json file
-        """
-        # Updating obstacles
-        speed = level['lanes'][pos]['speed']
-        buffer = level['offscreen']
-        width = level['size'][0] * GRID_SIZE
-        dist = speed*dt
-        for y in range(len(self._objs)):
-            self._objs[y].x += dist
-            if self._objs[y].x >= (width + (buffer * GRID_SIZE)) and speed > 0:
-                extra_space = self._objs[y].x - (width + (buffer * GRID_SIZE))
-                self._objs[y].x = (-buffer * GRID_SIZE) + extra_space
-            elif self._objs[y].x <= (-4 * GRID_SIZE) and speed < 0:
-                extra_space = self._objs[y].x - (-4 * GRID_SIZE)
-                self._objs[y].x = (width + (buffer * GRID_SIZE)) + extra_space
-
-    def draw(self,view):
+        for item in lane.objects:
+            new_obj = GImage(x=item.x,y=item.y,source=item.source)
+            if item.angle != 0:
+                new_obj.angle = item.angle
+            new_obj.hitbox = item.hitbox
+            self._objs.append(new_obj)
+        self._shown = self._objs
+        self._view = None
+        self._batch = None
+        self._visible = None
+        self._quads = None
+        self._ys = None
+
+    def useBatch(self,batch):
+        """
+        Draws the objects of this lane with a sprite batch from now on
+
+        The lane no longer draws or attaches its objects. Instead, the method fill adds
+        them to the batch, and the owner of the batch draws it. The objects themselves
+        are not moved by update any more, which saves setting their positions.
+
+        Parameter batch: The batch to draw the objects with
+        Precondition: batch is a GSpriteBatch object
+        """
+        self._batch = batch
+        self._visible = (list(range(len(self._objs))),[obj.x for obj in self._objs])
+        self._quads = [batch.image_quad(obj) for obj in self._objs]
+        self._ys = [obj.y for obj in self._objs]
+
+    def update(self,visible):
+        """
+        Update method for lane that moves the obstacles to their simulated positions
+
+        Only the obstacles on screen are moved (and drawn). The others keep their old
+        positions until they come back on screen.
+
+        Parameter visible: The positions in list of the obstacles on screen, and their
+        x coordinates
+        Precondition: visible is a pair of lists of the same length, the first with
+        ints and the second with numbers
+        """
+        if not self._batch is None:
+            self._visible = visible
+            return
+
+        objs = self._objs
+        shown = []
+        for pos, x in zip(visible[0],visible[1]):
+            obj = objs[pos]
+            obj.x = x
+            shown.append(obj)
+        if not self._view is None and shown != self._shown:
+            self._swap(self._shown,shown)
+        self._shown = shown
+
+    def draw(self,view,tile=True):
         """
         Draws the current lane for Froggit
 
         Parameter view: The window to draw the lanes on
         Precondition: view is a valid window
+
+        Parameter tile: Whether to draw the tile (False if it is in a background layer)
+        Precondition: tile is a bool
         """
-        self._tile.draw(view)
-        if self._objs != []:
-            for obj in self._objs:
+        if tile:
+            self._tile.draw(view)
+        if self._batch is None:
+            for obj in self._shown:
                 obj.draw(view)
 
+    def fill(self):
+        """
+        Adds the objects on screen to the sprite batch of this lane (see useBatch)
+
+        The batch must be filled between calls to its methods begin and end.
+        """
+        quads = self._quads
+        ys = self._ys
+        shown = self._visible[0]
+        self._batch.add_quads([quads[pos] for pos in shown],self._visible[1],
+                              [ys[pos] for pos in shown])
+
+    def attach(self,view,tile=True):
+        """
+        Attaches the tile and the objects on screen to the view
+
+        Once attached, the lane stays on screen without calling draw. The method update
+        adds and removes the objects that come on or go off screen.
+
+        Parameter view: The window to attach the lane to
+        Precondition: view is a valid window
+
+        Parameter tile: Whether to attach the tile (False if it is in a background layer)
+        Precondition: tile is a bool
+        """
+        self._view = view
+        if tile:
+            view.add(self._tile,LAYER_TILES)
+        if self._batch is None:
+            for obj in self._shown:
+                view.add(obj,LAYER_OBJECTS)
+
+    def detach(self):
+        """
+        Removes the tile and objects from the view this lane is attached to
+        """
+        if self._view is None:
+            return
+        self._view.remove(self._tile)
+        for obj in self._objs:
+            self._view.remove(obj)
+        self._view = None
+
+    def _swap(self,old,new):
+        """
+        Helper method for update that attaches the objects that came on screen, and
+        removes the objects that went off screen
+
+        Parameter old: The objects on screen before the update
+        Precondition: old is a list of GImage objects from _objs
+
+        Parameter new: The objects on screen after the update
+        Precondition: new is a list of GImage objects from _objs
+        """
+        # A set of ids, so each old object is checked in constant time
+        kept = set(map(id,new))
+        for obj in old:
+            if not id(obj) in kept:
+                self._view.remove(obj)
+        for obj in new:
+            if not self._view.is_attached(obj):
+                self._view.add(obj,LAYER_OBJECTS)
+
 
 class Grass(Lane):
     """
@@ -228,49 +326,48 @@ class Hedge(Lane):
         """
         return self._safeFrogs
 
-    def __init__(self,level,x,hitboxes):
+    def __init__(self,lane):
         """
         Initializer for Hedge
 
-        Parameter level: The loaded json file that contains infromation for the level
-        Precondition: level is a preloaded json file
-
-        Parameter x: The lane x from the bottom
-        Precondition: x is an int
-
-        Parameter hitboxes: The preloaded json file that contains the hitboxes
-        for the objects in the game
-        Precondition: hitboxes is a preloaded json file
+        Parameter lane: The compiled specification for this lane
+        Precondition: lane is a LaneSpec object
         """
-        super().__init__(level,x,hitboxes)
+        super().__init__(lane)
         self._safeFrogs = []
 
-    def reachExit(self,x,level):
+    def reachExit(self,x):
         """
         Method that detects when the frog has reached an exit and blocks the exit
 
         Parameter x: The position in list of exit frog has reached
         Precondition: x is an int
-
-        Parameter level: The loaded json file that contains infromation for the level
-        Precondition: level is a preloaded json file
         """
         xvalue = self._objs[x].x
         yvalue = self._objs[x].y
         if self._objs[x].source == 'exit.png':
             newFrog = GImage(x=xvalue,y=yvalue,source='safe.png')
             self._safeFrogs.append(newFrog)
+            if not self._view is None and self._batch is None:
+                self._view.add(newFrog,LAYER_OBJECTS)
+
+    def updateSafeFrogs(self,exits):
+        """
+        Method that adds a safe frog for every newly reached exit
+
+        Parameter exits: The positions in list of the exits reached so far, in order
+        Precondition: exits is a list of ints
+        """
+        for x in range(len(self._safeFrogs),len(exits)):
+            self.reachExit(exits[x])
 
-    def opening(self,x,level):
+    def opening(self,x):
         """
         Method that detects if there is an opening in the hedge for the
         frog to pass through
 
         Parameter x: The position in list of exit frog has reached
         Precondition: x is an int
-
-        Parameter level: The loaded json file that contains infromation for the level
-        Precondition: level is a preloaded json file
         """
         if self._objs[x].source == 'open.png':
             return True
@@ -288,17 +385,55 @@ class Hedge(Lane):
                 self._totalExits.append(self._objs[x])
         return len(self._totalExits)
 
-    def draw(self,view):
+    def draw(self,view,tile=True):
         """
         Draw method for Hedge
 
         Parameter view: The window to draw the objects on
         Precondition: view is a valid window
+
+        Parameter tile: Whether to draw the tile (False if it is in a background layer)
+        Precondition: tile is a bool
         """
-        self._tile.draw(view)
+        if tile:
+            self._tile.draw(view)
+        if not self._batch is None:
+            return
         if self._objs != []:
             for obj in self._objs:
                 obj.draw(view)
         if self._safeFrogs != []:
             for obj in self._safeFrogs:
                 obj.draw(view)
+
+    def fill(self):
+        """
+        Adds the exits and the safe frogs to the sprite batch of this hedge
+        """
+        super().fill()
+        for obj in self._safeFrogs:
+            self._batch.add_image(obj)
+
+    def attach(self,view,tile=True):
+        """
+        Attaches the tile, the exits and the safe frogs to the view
+
+        Parameter view: The window to attach the hedge to
+        Precondition: view is a valid window
+
+        Parameter tile: Whether to attach the tile (False if it is in a background layer)
+        Precondition: tile is a bool
+        """
+        super().attach(view,tile)
+        if self._batch is None:
+            for obj in self._safeFrogs:
+                view.add(obj,LAYER_OBJECTS)
+
+    def detach(self):
+        """
+        Removes the tile, the exits and the safe frogs from the view
+        """
+        if not self._view is None:
+            for obj in self._safeFrogs:
+                self._view.remove(obj)
+        super().detach()
@@ -7,7 +7,8 @@ level, you are expected to make a new instance of this class.
 
 The subcontroller Level manages the frog and all of the obstacles. However, those are
 all defined in models.py.  The only thing in this class is the level class and all of
-the individual lanes.
+the individual lanes. The rules of the game are in sim.py; a Level steps its Simulation
+and then draws whatever state the simulation is in.
 
 This module should not contain any more classes than Levels. If you need a new class,
 it should either go in the lanes.py module or the models.py module.
@@ -19,6 +20,8 @@ from game2d import *
 from consts import *
 from lanes  import *
 from models import *
+from specs  import *
+from sim    import *
 
 # PRIMARY RULE: Level can only access attributes in models.py or lanes.py using getters
 # and setters. Level is NOT allowed to access anything in app.py (Subcontrollers are not
@@ -49,75 +52,88 @@ class Level(object):
     resize to match.  That resizing is done in the Froggit app, and so it needs to access
     these values in the level.  The height value should include one extra grid square
     to suppose the number of lives meter.
+
+    A level may be larger than the window.  In that case the view has a camera (see
+    GCamera), and the level only draws the lanes and obstacles the camera can see. The
+    lives meter always stays in the top right corner of the camera.
     """
+    # Attribute _sim: The simulation of this level
+    # Invariant: _sim is a Simulation object
+
+    # Attribute _spec: The compiled level file
+    # Invariant: _spec is a LevelSpec object
+
     # Attribute _lanes: A list containing what to draw for each lane
-    # Invariant: _lanes is a list of GTile objects
+    # Invariant: _lanes is a list of Lane objects
+
+    # Attribute _background: The static layer with the tiles of every lane
+    # Invariant: _background is a GStatic object
 
     # Attribute _frog: The frog object for Froggit
     # Invariant: _frog is a Frog object
 
+    # Attribute _death: The death object for Frog object
+    # Invariant: _death is a Death object
+
     # Attribute _liveCounter: A list containing the frog heads that display lives
     # Invariant: _liveCounter is a list of GImages objects
 
     # Attribute _liveText: The text for the live counter
     # Invariant: _liveText is a GLabel object
 
-    # Attribute _delay: The amount of time to delay before the frog can move again
-    # Invariant: _delay is an int or a bool
-
-    # Attribute _frogcollision: Bool that tells whether or not the frog was hit by car
-    # Invariant: _frogcollision is a bool
+    # Attribute _previous: The time and frog position before the last call to step
+    # Invariant: _previous is a 3-element tuple of floats, or None if unknown
 
-    # Attribute _hedgeLanes: A list that tells us which lanes are of the class: 'Hedge'
-    # Invariant: _hedgeLanes is a list of ints
+    # Attribute _view: The view this level is attached to (see attach)
+    # Invariant: _view is a GView object, or None if the level is drawn every frame
 
-    # Attribute _reachedExit: Bool that tells us if frog has reached an exit
-    # Invariant: _reachedExit is a bool
+    # Attribute _batch: The sprite batch that draws the objects in every lane
+    # Invariant: _batch is a GSpriteBatch object, or None if each object draws itself
 
-    # Attribute _gameWin: Bool that tells us if player has won game
-    # Invariant: _gameWin is a bool
+    # Attribute _onscreen: The lanes attached to the view (see attach)
+    # Invariant: _onscreen is a range of lane indices
 
-    # Attribute _totalExits: Int that tells us the total amount of exits in the level
-    # Invariant: _totalExits is an int
+    # Attribute _baked: Whether the lane tiles are attached as the background layer
+    # Invariant: _baked is a bool
 
-    # Attribute _totalSafeFrogs: Int that tells us how many safe frogs there are
-    # Invariant: _totalSafeFrogs is an int
+    # Attribute _corner: The top right corner of the screen the lives meter is placed in
+    # Invariant: _corner is a pair of numbers
 
-    # Attribute _animator: Bool or None that tells us if frog is currenly animating
-    # Invariant: _animator is a bool or None
-
-    # Attribute _blocked: Bool that tells us if the frog's path is currently blocked
-    # Invariant: _blocked is a bool
-
-    # Attribute _waterLanes: A list that tells us whihc lanes are of the class: "Water"
-    # Invariant: _waterLanes is a list of ints
+    def getWidth(self):
+        """
+        Getter for the width of the level in pixels
+        """
+        return self._spec.width
 
-    # Attribute _safe: A bool that tells us whether the frog is safe on a log
-    # Invariant: _safe is a bool
+    def getHeight(self):
+        """
+        Getter for the height of the level in pixels
 
-    # Attribute _opening: A bool that tells us whether there is an opening in a hedge
-    # Invariant: _opening is a bool
+        This height includes one extra grid square for the lives meter.
+        """
+        return self._spec.height + GRID_SIZE
 
-    # Attribute _death: The death object for Frog object
-    # Invariant: _death is a Death object
 
-    # Attribute _deathAnimation: A bool that tells us if the death animation is running
-    # Invariant: _deathAnimation is a bool
+    def getSimulation(self):
+        """
+        Getter for the simulation of this level
 
-    # Attribute _pauseGame: A bool that tells us whether or not to pause the game
-    # Invariant: _pauseGame is a bool
+        The simulation can be stepped on its own (e.g. for benchmarks or replays), but
+        the level will only show the changes after the next call to update.
+        """
+        return self._sim
 
     def getFrogX(self):
         """
         Getter for the x position of the frog
         """
-        return self._frog.getX()
+        return self._sim.getFrog().x
 
     def getFrogY(self):
         """
         Getter for the y position of the frog
         """
-        return self._frog.getY()
+        return self._sim.getFrog().y
 
     def setFrogX(self,value):
         """
@@ -126,6 +142,7 @@ class Level(object):
         Parameter value: The value to set x to
         Precondition: value is an int or float
         """
+        self._sim.getFrog().x = value
         self._frog.setX(value)
 
     def setFrogY(self,value):
@@ -135,6 +152,7 @@ class Level(object):
         Parameter value: The value to set y to
         Precondition: value is an int or float
         """
+        self._sim.getFrog().y = value
         self._frog.setY(value)
 
     def getFrogCollision(self):
@@ -142,7 +160,7 @@ class Level(object):
         Getter for for the bool that determines if the frog has collided
         with an object
         """
-        return self._frogcollision
+        return self._sim.getFrogCollision()
 
     def setFrogCollision(self,value):
         """
@@ -152,7 +170,7 @@ class Level(object):
         Parameter value: The bool value to change the attribute to
         Precondition: value is a bool
         """
-        self._frogcollision = value
+        self._sim.setFrogCollision(value)
 
     def setFrogAngle(self,value):
         """
@@ -161,6 +179,7 @@ class Level(object):
         Parameter value: The angle value to change the frog to
         Precondition: Value is int between 0 and 360 (inclusive)
         """
+        self._sim.getFrog().angle = value
         self._frog.angle = value
 
     def getLCounter(self):
@@ -174,7 +193,7 @@ class Level(object):
         Getter for for the bool that determines if the frog has reached an exit
         with an object
         """
-        return self._reachedExit
+        return self._sim.getReachedExit()
 
     def setReachedExit(self,value):
         """
@@ -183,13 +202,13 @@ class Level(object):
         Parameter value: The bool value to change the attribute to
         Precondition: value is a bool
         """
-        self._reachedExit = value
+        self._sim.setReachedExit(value)
 
     def getGameWin(self):
         """
         Getter for the bool that determines if game has been won
         """
-        return self._gameWin
+        return self._sim.getGameWin()
 
     def setAnimator(self,value):
         """
@@ -198,438 +217,374 @@ class Level(object):
         Parameter value: The bool to change the attribute to
         Precondition: value is a bool or None
         """
-        self._animator = value
+        self._sim.setAnimator(value)
 
     def getPauseGame(self):
         """
         Getter for the bool that determines if the game should pause
         """
-        return self._pauseGame
+        return self._sim.getPauseGame()
 
     # INITIALIZER (standard form) TO CREATE THE FROG AND LANES
-    def __init__(self,level,hitboxes):
+    def __init__(self,level,hitboxes,batched=False):
         """
         Initializes the level object for Froggit
 
+        If batched is True, the obstacles, exits and safe frogs of every lane are drawn
+        with a single sprite batch (one mesh for each texture) instead of one by one.
+
         Parameter level: The loaded json file that contains infromation for the level
         Precondition: level is a preloaded json file
 
         Parameter hitboxes: The preloaded json file that contains the hitboxes
         for the objects in the game
         Precondition: hitboxes is a preloaded json file
+
+        Parameter batched: Whether to draw the objects in the lanes with a sprite batch
+        Precondition: batched is a bool
         """
+        # Compiles the level file once, so that update never touches the json
+        self._spec = LevelSpec(level,hitboxes)
+        self._sim = Simulation(self._spec)
         # Creates the lanes for the level
         self._lanes = []
-        self._totalExits = 0
-        self._totalSafeFrogs = 0
-        self._delay = 0
-        self._opening = False
-        self._frogcollision = False
-        self._reachedExit = False
-        self._gameWin = False
-        self._animator = None
-        self._animator2 = None
-        self._blocked = False
-        self._deathAnimation = True
-        self._pauseGame = False
-        self._trill = False
-        for x in range(level['size'][1]):
-            if level['lanes'][x]['type'] == 'grass':
-                lane = Grass(level,x,hitboxes)
-            elif level['lanes'][x]['type'] == 'road':
-                lane = Road(level,x,hitboxes)
-            elif level['lanes'][x]['type'] == 'water':
-                lane = Water(level,x,hitboxes)
+        for lane in self._spec.lanes:
+            if lane.kind == LANE_GRASS:
+                self._lanes.append(Grass(lane))
+            elif lane.kind == LANE_ROAD:
+                self._lanes.append(Road(lane))
+            elif lane.kind == LANE_WATER:
+                self._lanes.append(Water(lane))
             else:
-                lane = Hedge(level,x,hitboxes)
-            self._lanes.append(lane)
-        #Creates the frog and death sprite for the level
-        self._frog = Frog(level['start'][0],level['start'][1],hitboxes)
-        self._death = Death(level['start'][0],level['start'][1])
+                self._lanes.append(Hedge(lane))
+        # The lane tiles never change, so they are drawn as a single static layer
+        self._background = GStatic(left=0,bottom=0,width=self._spec.width,
+                                   height=self._spec.height,
+                                   children=[lane.getTile() for lane in self._lanes])
+        self._batch = GSpriteBatch() if batched else None
+        if batched:
+            for lane in self._lanes:
+                lane.useBatch(self._batch)
+        #Creates the frog and death sprite for the level, from the sprite sheets
+        start = self._spec.start
+        sprites = hitboxes['sprites']
+        self._frog = Frog(start[0],start[1],GSpriteSheet.from_json(sprites[FROG_KEY]))
+        self._death = Death(start[0],start[1],GSpriteSheet.from_json(sprites[DEATH_KEY]))
         #Creates the live counter
-        self._createLcounter(level)
+        self._createLcounter()
+        self._previous = None
+        self._view = None
+        self._onscreen = range(0)
+        self._baked = False
+        self._sync()
 
-    def update(self,level,keyInput,dt,hitboxes):
+    def update(self,keyInput,dt):
         """
-        Updates Frog object and the objects in each lane
-
-        Parameter level: The loaded json file that contains infromation for the level
-        Precondition: level is a preloaded json file
+        Updates the simulation, and then the frog and the objects in each lane
 
         Parameter keyInput: The current key being pressed
         Precondition: keyInput is a str
 
         Parameter dt: The time in seconds since last update
         Precondition: dt is an int or a float
+        """
+        self._previous = None
+        self._sim.update(keyInput,dt)
+        self._sync()
 
-        Parameter hitboxes: The preloaded json file that contains the hitboxes
-        for the objects in the game
-        Precondition: hitboxes is a preloaded json file
+    def step(self,keyInput,dt):
         """
-        # Updating obstacles and frog collisions
-        if keyInput == 'none':
-            for x in range(len(self._lanes)):
-                if (level['lanes'][x]['type'] != 'grass' and
-                level['lanes'][x]['type'] != 'hedge'):
-                    self._lanes[x].update(x,dt,level)
-                if level['lanes'][x]['type'] == 'road':
-                    for y in range(len(level['lanes'][x]['objects'])):
-                        collide = self._lanes[x].getObjs()[y].collides(self._frog)
-                        if collide:
-                            self._animator = None
-                            self._frogcollision = True
-        # Frog riding on log
-        if self._frogcollision != True:
-            if self._animator == None and self._blocked == False:
-                waterLanes = self._findWater(level)
-                for x in range(len(waterLanes)):
-                    self._logRide(waterLanes[x],dt,level)
-        self._blocked = False
-        # Frog hitboxes
-        currentFrame = self._frog.frame
-        self.hitbox = hitboxes['sprites']['frog']['hitboxes'][currentFrame]
-        # Movement of the Frog
-        self._trill = False
-        self._frogMovement(level,keyInput,dt,hitboxes)
-        self._death.setX(self._frog.getX())
-        self._death.setY(self._frog.getY())
-        if self._frogcollision == True and self._pauseGame == False:
-            self._animateDeath(dt)
-
-    def draw(self,view):
+        Advances the level by one animation frame
+
+        The obstacles move first, and then the frog responds to the key. This also
+        remembers where everything was before the frame, so that draw can show the level
+        in between two frames.
+
+        Parameter keyInput: The current key being pressed
+        Precondition: keyInput is one of 'none', 'up', 'down', 'left' or 'right'
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is an int or a float
+        """
+        frog = self._sim.getFrog()
+        self._previous = (self._sim.getTime(),frog.x,frog.y)
+        with span('level.sim'):
+            self._sim.step(keyInput,dt)
+        with span('level.sync'):
+            self._sync()
+
+    def draw(self,view,alpha=1):
         """
         Draws the lanes and frog for Froggit
 
+        If alpha is less than 1, the frog and obstacles are drawn that fraction of the
+        way between their positions before and after the last call to step.
+
+        If the level is attached to the view (see attach), the objects are only moved.
+        If the view has a camera, only the lanes that the camera can see are drawn.
+
         Parameter view: The window to draw the lanes on
         Precondition: view is a valid window
-        """
-        for lane in range(len(self._lanes)):
-            self._lanes[lane].draw(view)
-        if self._frogcollision == False and self._reachedExit == False:
+
+        Parameter alpha: The interpolation factor
+        Precondition: alpha is an int or float in 0..1
+        """
+        (lanes,edges) = self._cull(view.camera)
+        self._placeHud(view.camera)
+        with span('level.place'):
+            self._place(alpha,lanes,edges)
+        collision = self._sim.getFrogCollision()
+        showFrog = collision == False and self._sim.getReachedExit() == False
+        showDeath = collision == True and self._sim.getPauseGame() == False
+        if view is self._view:
+            # Everything is already on screen; only show or hide the frog
+            self._scroll(lanes)
+            self._show(self._frog,showFrog)
+            self._show(self._death,showDeath)
+            return
+
+        with span('level.lanes'):
+            baked = self._fits(view.camera)
+            if baked:
+                self._background.draw(view)
+            for lane in lanes:
+                self._lanes[lane].draw(view,not baked)
+            if not self._batch is None:
+                self._batch.draw(view)
+        if showFrog:
             self._frog.draw(view)
-        if self._frogcollision == True and self._pauseGame == False:
+        if showDeath:
             self._death.draw(view)
         for frog in range(len(self._liveCounter)):
             self._liveCounter[frog].draw(view)
         self._liveText.draw(view)
 
-    def continueGame(self,level):
+    def attach(self,view):
         """
-        Helper method to reset frog and continute the game
+        Attaches the lanes, frog and lives meter to the view
 
-        Parameter level: The loaded json file that contains infromation for the level
-        Precondition: level is a preloaded json file
-        """
-        self._frog.setX(level['start'][0] * GRID_SIZE + (GRID_SIZE / 2))
-        self._frog.setY(level['start'][1] * GRID_SIZE + (GRID_SIZE / 2))
-        self._frog.angle = FROG_NORTH
-        self._frogcollision = False
-        self._pauseGame = False
-        self._frog.frame = 0
+        Once attached, the level stays on screen. Calling draw with this view then only
+        moves the objects, instead of drawing each one of them again. This is much faster
+        on levels with many objects.
 
-    def _animateDeath(self,dt):
-        """
-        Helper method for update that creates the death animation for Froggit
+        The background is baked again when the level is attached, so attach the level
+        after resizing the window (and setting the camera).  A level larger than the
+        camera is not baked, as the background would be too large for a single texture.
+        Instead only the lanes on screen are attached, and draw attaches and removes
+        lanes as they scroll on or off screen.
 
-        Parameter dt: The time in seconds since last update
-        Precondition: dt is an int or a float
+        Parameter view: The window to attach the level to
+        Precondition: view is a valid window
         """
-        if not self._animator2 is None:          # We have something to animate
-            try:
-                self._animator2.send(dt)
-            except:
-                self._animator2 = None
-                self._pauseGame = True
-                self._liveCounter = self._liveCounter[:-1]
-
-        elif self._frogcollision == True and self._pauseGame == False:
-            self._animator2 = self._death.deathAnimation(dt)
-            next(self._animator2)
-
-    def _frogMovement(self,level,keyInput,dt,hitboxes):
+        self.detach()
+        self._view = view
+        self._baked = self._fits(view.camera)
+        if self._baked:
+            self._background.invalidate()
+            view.add(self._background,LAYER_TILES)
+        self._onscreen = self._cull(view.camera)[0]
+        for lane in self._onscreen:
+            self._lanes[lane].attach(view,not self._baked)
+        if not self._batch is None:
+            view.add(self._batch,LAYER_OBJECTS)
+        for frog in self._liveCounter:
+            view.add(frog,LAYER_HUD)
+        view.add(self._liveText,LAYER_HUD)
+
+    def detach(self):
+        """
+        Removes everything in this level from the view it is attached to
+        """
+        if self._view is None:
+            return
+        self._view.remove(self._background)
+        for lane in self._lanes:
+            lane.detach()
+        if not self._batch is None:
+            self._view.remove(self._batch)
+        for frog in self._liveCounter:
+            self._view.remove(frog)
+        self._view.remove(self._liveText)
+        self._view.remove(self._frog)
+        self._view.remove(self._death)
+        self._view = None
+        self._onscreen = range(0)
+
+    def continueGame(self):
         """
-        Helper method for update that controls the movement of the frog
-        depending on user input
-
-        Parameter level: The loaded json file that contains infromation for the level
-        Precondition: level is a preloaded json file
-
-        Parameter keyInput: The current key being pressed
-        Precondition: keyInput is a str
-
-        Parameter dt: The time in seconds since last update
-        Precondition: dt is an int or a float
+        Helper method to reset frog and continute the game
+        """
+        self._sim.continueGame()
+        self._previous = None
+        self._sync()
 
-        Parameter hitboxes: The preloaded json file that contains the hitboxes
-        for the objects in the game
-        Precondition: hitboxes is a preloaded json file
+    # HELPER METHODS
+    def _sync(self):
         """
-        if not self._animator is None:
-            try:
-                self._animator.send(dt)
-                currentFrame = self._frog.frame
-                self.hitbox = hitboxes['sprites']['frog']['hitboxes'][currentFrame]
-            except StopIteration:
-                self._animator = None
-                self._delay = FROG_SPEED
-
-        if keyInput != 'none':
-            if self._delay <= 0:
-                if self._animator == None:
-                    self._createGenerator(level,keyInput)
-            else:
-                self._delay -= dt
+        Helper method to copy the exits and lives of the simulation after an update
 
-    def _createGenerator(self,level,keyInput):
+        This also plays the sounds for the events reported by the simulation.
         """
-        Helper method for _frogMovement that creates the generator for the
-        coroutine
+        for x in self._spec.hedges:
+            self._lanes[x].updateSafeFrogs(self._sim.getSafeFrogs(x))
+        lives = self._sim.getLives()
+        if len(self._liveCounter) > lives:
+            if not self._view is None:
+                for frog in self._liveCounter[lives:]:
+                    self._view.remove(frog)
+            self._liveCounter = self._liveCounter[:lives]
 
-        Parameter level: The loaded json file that contains infromation for the level
-        Precondition: level is a preloaded json file
+        for event in self._sim.popEvents():
+            if event == EVENT_CROAK:
+                self._frog.croak()
+            elif event == EVENT_TRILL:
+                self._frog.trill()
+            elif event == EVENT_SPLAT:
+                self._death.splat()
 
-        Parameter keyInput: The current key being pressed
-        Precondition: keyInput is a str
-        """
-        if keyInput == 'up':
-            if self._moveUp(level):
-                self._animator = self._frog.slideAnimation(keyInput,self._trill)
-                next(self._animator)
-            else:
-                self._blocked = True
-        elif keyInput == 'down':
-            if self._moveDown(level):
-                self._animator = self._frog.slideAnimation(keyInput,False)
-                next(self._animator)
-        elif keyInput == 'right':
-            if self._moveRight(level):
-                self._animator = self._frog.slideAnimation(keyInput,False)
-                next(self._animator)
-        elif keyInput == 'left':
-            if self._moveLeft(level):
-                self._animator = self._frog.slideAnimation(keyInput,False)
-                next(self._animator)
-
-    def _createLcounter(self,level):
+    def _place(self,alpha,lanes,edges):
         """
-        Helper method to create the live counter for Froggit
+        Helper method for draw that moves the frog and obstacles to their positions
 
-        Parameter level: The json file for the current level
-        Precondition: level is a preloaded json file
-        """
-        #Creates the frog heads
-        self._liveCounter = []
-        for x in range(3):
-            source = 'froghead.png'
-            frogHead = GImage(width=GRID_SIZE,height=GRID_SIZE,source=source)
-            frogHead.left = (level['size'][0]-3+x) * GRID_SIZE
-            frogHead.top = (level['size'][1]+1) * GRID_SIZE
-            self._liveCounter.append(frogHead)
+        Only the obstacles in the given lanes, and between the given edges, are moved.
 
-        #Creates the text for live counter
-        self._liveText = GLabel(text="LIVES:",font_name='Spongeboy.ttf')
-        self._liveText.font_size = ALLOY_SMALL
-        self._liveText.linecolor = "dark green"
-        self._liveText.right = self._liveCounter[0].left
-        self._liveText.bottom = level['size'][1] * GRID_SIZE - (GRID_SIZE // 5)
+        Parameter alpha: The interpolation factor (see draw)
+        Precondition: alpha is an int or float in 0..1
 
-    def _findHedge(self,level):
+        Parameter lanes: The lanes on screen
+        Precondition: lanes is a range of lane indices
+
+        Parameter edges: The left and right edges of the screen (None for the whole level)
+        Precondition: edges is None or a pair of numbers
         """
-        Helper method to find the position(s) of Hedge objects in self._lanes
+        frog = self._sim.getFrog()
+        x = frog.x
+        y = frog.y
+        time = None
+        if alpha < 1 and not self._previous is None:
+            (time,x0,y0) = self._previous
+            time = time + (self._sim.getTime()-time)*alpha
+            x = x0 + (x-x0)*alpha
+            y = y0 + (y-y0)*alpha
 
-        Parameter level: The loaded json file that contains infromation for the level
-        Precondition: level is a preloaded json file
-        """
-        self._hedgeLanes = []
-        for x in range(level['size'][1]):
-            if level['lanes'][x]['type'] == 'hedge':
-                self._hedgeLanes.append(x)
-        return self._hedgeLanes
+        self._frog.setX(x)
+        self._frog.setY(y)
+        if self._frog.angle != frog.angle:
+            self._frog.angle = frog.angle
+        self._frog.frame = frog.frame
 
-    def _findWater(self,level):
-        """
-        Helper method to find the position(s) of Water objects in self._lanes
+        self._death.setX(x)
+        self._death.setY(y)
+        self._death.frame = self._sim.getDeath().frame
 
-        Parameter level: The loaded json file that contains infromation for the level
-        Precondition: level is a preloaded json file
-        """
-        self._waterLanes = []
-        for x in range(level['size'][1]):
-            if level['lanes'][x]['type'] == 'water':
-                self._waterLanes.append(x)
-        return self._waterLanes
+        for lane in self._spec.moving:
+            if lane in lanes:
+                self._lanes[lane].update(self._sim.getVisible(lane,time,edges))
 
-    def _moveUp(self,level):
-        """
-        Helper method to move the frog forward
+        if not self._batch is None:
+            self._batch.begin()
+            for lane in lanes:
+                self._lanes[lane].fill()
+            self._batch.end()
 
-        Parameter level: The loaded json file that contains infromation for the level
-        Precondition: level is a preloaded json file
+    def _cull(self,camera):
         """
-        newVar = True
-        self._opening = False
-        self._frog.angle = FROG_NORTH
-        self.setFrogY(self.getFrogY() + GRID_SIZE)
-        for y in range(len(self._findHedge(level))):
-            if Lane.getTile(self._lanes[self._hedgeLanes[y]]).collides(self._frog):
-                newVar = False
-                list = Hedge.getObjs(self._lanes[self._hedgeLanes[y]])
-                frogList = Hedge.getSafeFrogs(self._lanes[self._hedgeLanes[y]])
-                for x in range(len(list)):
-                    if list[x].contains((self.getFrogX(),self.getFrogY())):
-                        currentLane = self._lanes[self._hedgeLanes[y]]
-                        objPos = x
-                        if self._checkSafeFrogs(y) == True:
-                            newVar = False
-                        elif currentLane.opening(objPos,level):
-                            self._opening = True
-                            newVar = True
-                        else:
-                            currentLane.reachExit(objPos,level)
-                            self._reachedExit = True
-                            self._trill = True
-                            newVar = True
-                if self._exitsComplete(level):
-                    self._gameWin = True
-        if newVar == True:
-            self._delay = FROG_SPEED
-        self.setFrogY(self.getFrogY() - GRID_SIZE)
-        return newVar
-
-    def _moveDown(self,level):
-        """
-        Helper method to move the frog downward
+        Helper method for draw that finds the part of the level on screen
 
-        Parameter level: The loaded json file that contains infromation for the level
-        Precondition: level is a preloaded json file
-        """
-        newVar = True
-        self._opening = False
-        self._frog.angle = FROG_SOUTH
-        self.setFrogY(self.getFrogY() - GRID_SIZE)
-        for y in range(len(self._findHedge(level))):
-            if Lane.getTile(self._lanes[self._hedgeLanes[y]]).collides(self._frog):
-                list = Hedge.getObjs(self._lanes[self._hedgeLanes[y]])
-                for x in range(len(list)):
-                    if list[x].contains((self.getFrogX(),self.getFrogY())):
-                        currentLane = self._lanes[self._hedgeLanes[y]]
-                        objPos = x
-                        if currentLane.opening(objPos,level):
-                            self._opening = True
-                        else:
-                            newVar = False
-        if self.getFrogY() - GRID_SIZE > 0:
-            for x in range(len(self._findHedge(level))):
-                if Lane.getTile(self._lanes[self._hedgeLanes[x]]).collides(self._frog):
-                    newVar = False
-        if self.getFrogY() <= 0:
-            newVar = False
-        if self._opening == True:
-            newVar = True
-        self.setFrogY(self.getFrogY() + GRID_SIZE)
-        if newVar == True:
-            self._delay = FROG_SPEED
-        return newVar
-
-    def _moveRight(self,level):
-        """
-        Helper method to move the frog rightward
+        This method returns a pair.  The first is the range of lanes that the camera
+        can see, including one extra lane above and below for obstacles that are taller
+        than their lane. The second is the left and right edges of the camera, or None if
+        the camera sees the whole width of the level.
 
-        Parameter level: The loaded json file that contains infromation for the level
-        Precondition: level is a preloaded json file
+        Parameter camera: The camera of the view
+        Precondition: camera is a GCamera object, or None to see the whole level
         """
-        newVar = True
-        self._frog.angle = FROG_EAST
-        if not (self.getFrogX() + GRID_SIZE < (level['size'][0]*GRID_SIZE)):
-            newVar = False
-        if self._opening == True:
-            newVar = False
-        if newVar == True:
-            self._delay = FROG_SPEED
-        return newVar
+        if camera is None:
+            return (range(len(self._lanes)),None)
+        (left,bottom,right,top) = camera.visible_rect()
+        first = max(0,int(bottom // GRID_SIZE)-1)
+        last = min(len(self._lanes),int(-(-top // GRID_SIZE))+1)
+        if left <= 0 and right >= self._spec.width:
+            return (range(first,last),None)
+        return (range(first,last),(left,right))
 
-    def _moveLeft(self,level):
+    def _fits(self,camera):
         """
-        Helper method to move the frog leftward
+        Helper method that returns True if the camera can see the whole level
 
-        Parameter level: The loaded json file that contains infromation for the level
-        Precondition: level is a preloaded json file
+        Parameter camera: The camera of the view
+        Precondition: camera is a GCamera object, or None to see the whole level
         """
-        newVar = True
-        self._frog.angle = FROG_WEST
-        if not (self.getFrogX() - GRID_SIZE > 0):
-            newVar = False
-        if self._opening == True:
-            newVar = False
-        if newVar == True:
-            self._delay = FROG_SPEED
-        return newVar
+        if camera is None:
+            return True
+        return camera.width >= self._spec.width and camera.height >= self.getHeight()
 
-    def _checkSafeFrogs(self,y):
+    def _scroll(self,lanes):
         """
-        Helper method to check if the current exit is occupied by Safe Frog
+        Helper method for draw that attaches the lanes that came on screen, and
+        removes the lanes that went off screen
+
+        Parameter lanes: The lanes on screen
+        Precondition: lanes is a range of lane indices
+        """
+        if lanes == self._onscreen:
+            return
+        for lane in self._onscreen:
+            if not lane in lanes:
+                self._lanes[lane].detach()
+        for lane in lanes:
+            if not lane in self._onscreen:
+                self._lanes[lane].attach(self._view,not self._baked)
+        self._onscreen = lanes
 
-        Parameter y: The position in hedgeLanes to check
-        Precondition: y is in range of self._hedgeLanes
+    def _placeHud(self,camera):
         """
-        exp = False
-        frogList = Hedge.getSafeFrogs(self._lanes[self._hedgeLanes[y]])
-        for x in range(len(frogList)):
-            if frogList[x].contains((self.getFrogX(),self.getFrogY())):
-                exp = True
-        return exp
+        Helper method for draw that keeps the lives meter in the top right corner
 
-    def _exitsComplete(self,level):
+        Parameter camera: The camera of the view
+        Precondition: camera is a GCamera object, or None to see the whole level
         """
-        Helper method to determine the number of exits there are for the frog
-        land safely on in order to win the level and if each space has been
-        complete. Returns a bool
+        right = self._spec.width if camera is None else camera.right
+        top = self.getHeight() if camera is None else camera.top
+        if self._corner == (right,top):
+            return
+        self._corner = (right,top)
+        for x in range(len(self._liveCounter)):
+            self._liveCounter[x].left = right - (FROG_LIVES-x) * GRID_SIZE
+            self._liveCounter[x].top = top
+        self._liveText.right = right - FROG_LIVES * GRID_SIZE
+        self._liveText.bottom = top - GRID_SIZE - (GRID_SIZE // 5)
+
+    def _show(self,obj,visible):
+        """
+        Helper method for draw that attaches or removes the frog (or death) sprite
+
+        Parameter obj: The sprite to show or hide
+        Precondition: obj is the Frog or the Death object of this level
 
-        Parameter level: The loaded json file that contains infromation for the level
-        Precondition: level is a preloaded json file
+        Parameter visible: Whether the sprite should be on screen
+        Precondition: visible is a bool
         """
-        winner = False
-        for y in range(len(self._findHedge(level))):
-            frogList = Hedge.getSafeFrogs(self._lanes[self._hedgeLanes[y]])
-            newAmt = Hedge.numberOfExits(self._lanes[self._hedgeLanes[y]])
-            self._totalExits += newAmt
-            self._totalSafeFrogs += len(frogList)
-        if self._totalSafeFrogs == self._totalExits:
-            winner = True
-        self._totalExits = 0
-        self._totalSafeFrogs = 0
-        return winner
+        if visible != self._view.is_attached(obj):
+            if visible:
+                self._view.add(obj,LAYER_FROG)
+            else:
+                self._view.remove(obj)
 
-    def _logRide(self,pos,dt,level):
+    def _createLcounter(self):
         """
-        Helper method the mvoes the frog along with log object
-
-        Parameter pos: The position of the lane in the json file
-        Precondition: object is a GImage object
-
-        Parameter dt: The time in seconds since last update
-        Precondition: dt is an int or a float
-
-        Parameter level: The loaded json file that contains infromation for the level
-        Precondition: level is a preloaded json file
+        Helper method to create the live counter for Froggit
         """
-        self._safe = False
-        speed = level['lanes'][pos]['speed']
-        width = level['size'][0] * GRID_SIZE
-        dist = speed*dt
-        frog = (self._frog.getX(),self._frog.getY())
-        if self._lanes[pos].getTile().contains(frog):
-            for y in range(len(self._lanes[pos].getObjs())):
-                collide = self._lanes[pos].getObjs()[y].contains(frog)
-                if collide:
-                    self._frog.setX(self._frog.getX()+dist)
-                    self._safe = True
-        if self._lanes[pos].getTile().contains(frog) and not self._safe:
-            self._frogcollision = True
-            self._animator = None
-        elif self._frog.getX() <= 0:
-            self._frogcollision = True
-            self._animator = None
-        elif self._frog.getX() >= width:
-            self._frogcollision = True
-            self._animator = None
+        #Creates the frog heads
+        self._liveCounter = []
+        for x in range(FROG_LIVES):
+            source = FROG_HEAD
+            frogHead = GImage(width=GRID_SIZE,height=GRID_SIZE,source=source)
+            self._liveCounter.append(frogHead)
+
+        #Creates the text for live counter
+        self._liveText = GLabel(text="LIVES:",font_name='Spongeboy.ttf')
+        self._liveText.font_size = ALLOY_SMALL
+        self._liveText.linecolor = "dark green"
+        self._corner = None
+        self._placeHud(None)
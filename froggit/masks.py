@@ -0,0 +1,366 @@
+"""
+Collision mask module for Froggit
+
+Hitboxes are rectangles, so irregular images (logs, trucks, the big car) collide well
+before their pixels ever touch. A collision mask records which pixels of an image are
+opaque, taken from the alpha channel of the image file. The mask is stored as packed
+bits, eight pixels to a byte, with one row of bytes for each row of pixels.
+
+Masks only refine the hitboxes. Two objects are first tested with their bounding boxes,
+exactly as before. Only when those overlap are the masks tested, and then only inside the
+overlap. The rows of each mask in the overlap are unpacked and ANDed together with NumPy,
+so a precise collision costs little more than the bounding box test.
+
+Decoding an image file is slow, so masks are cached on disk. The cache is keyed by a hash
+of the image file, so a mask is rebuilt whenever its image changes. The images are read
+without Kivy, as this module is used by the simulation, which never opens a window.
+
+Masks require NumPy. Without it, loadMask returns None and collisions use the hitboxes.
+"""
+from consts import *
+import os.path
+import hashlib
+import struct
+import zlib
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# PRIMARY RULE: Masks are not allowed to access anything in any module other than
+# consts.py. In particular, they must never import game2d (or kivy).
+
+# The folder with the image files
+IMAGE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)),'Images')
+
+# The folder with the cached masks
+MASK_FOLDER = os.path.join(IMAGE_FOLDER,'masks')
+
+# The masks loaded so far, keyed by file name
+_MASKS = {}
+
+# The number of bytes in a pixel for each PNG color type (8 bits per channel)
+_CHANNELS = {0:1, 2:3, 3:1, 4:2, 6:4}
+
+
+def readAlpha(path):
+    """
+    Returns the alpha channel of the given PNG file, or None if it cannot be read
+
+    The result is a NumPy array of uint8 with shape (height,width), top row first. Only
+    PNG files with 8 bits per channel and no interlacing are supported, which is every
+    image in Froggit. Images without an alpha channel are completely opaque.
+
+    Parameter path: The file name of the image
+    Precondition: path is a str
+    """
+    try:
+        with open(path,'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    if data[:8] != b'\x89PNG\r\n\x1a\n':
+        return None
+
+    header = None
+    alphas = None
+    chunks = []
+    pos = 8
+    while pos+8 <= len(data):
+        (length,kind) = struct.unpack('>I4s',data[pos:pos+8])
+        body = data[pos+8:pos+8+length]
+        if kind == b'IHDR':
+            header = struct.unpack('>IIBBBBB',body)
+        elif kind == b'tRNS':
+            alphas = body
+        elif kind == b'IDAT':
+            chunks.append(body)
+        elif kind == b'IEND':
+            break
+        pos += length+12
+
+    if header is None:
+        return None
+    (width,height,depth,color,compress,method,interlace) = header
+    if depth != 8 or interlace != 0 or not color in _CHANNELS:
+        return None
+
+    size = _CHANNELS[color]
+    pixels = _unfilter(zlib.decompress(b''.join(chunks)),width,height,size)
+    if color == 4 or color == 6:
+        return pixels[:,size-1::size].copy()
+    elif color == 3 and not alphas is None:
+        table = numpy.full(256,255,dtype=numpy.uint8)
+        table[:len(alphas)] = numpy.frombuffer(alphas,dtype=numpy.uint8)
+        return table[pixels]
+    return numpy.full((height,width),255,dtype=numpy.uint8)
+
+
+def loadMask(path):
+    """
+    Returns the collision mask of the given PNG file, or None if there is none
+
+    Masks are cached in memory and on disk (in MASK_FOLDER), keyed by the hash of the
+    image file. There is no mask if NumPy is not installed, or if the image file cannot
+    be read.
+
+    Parameter path: The file name of the image
+    Precondition: path is a str
+    """
+    if numpy is None:
+        return None
+    if path in _MASKS:
+        return _MASKS[path]
+
+    mask = None
+    try:
+        with open(path,'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        digest = None
+
+    if not digest is None:
+        cache = os.path.join(MASK_FOLDER,digest+'.npz')
+        try:
+            with numpy.load(cache) as saved:
+                mask = CollisionMask(int(saved['width']),saved['bits'])
+        except (OSError,KeyError,ValueError):
+            alpha = readAlpha(path)
+            if not alpha is None:
+                mask = CollisionMask.fromAlpha(alpha)
+                try:
+                    os.makedirs(MASK_FOLDER,exist_ok=True)
+                    numpy.savez(cache,width=mask.width,bits=mask.bits)
+                except OSError:
+                    pass # The cache is only an optimization
+    _MASKS[path] = mask
+    return mask
+
+
+def collides(mask1,x1,y1,mask0,x0,y0,box):
+    """
+    Returns True if two collision masks share an opaque pixel inside the given box
+
+    Each mask is centered on the given position, like the image that it came from. The
+    box should be the overlap of the bounding boxes of the two objects, so that the masks
+    only refine the test with the bounding boxes. Pixels are matched to the nearest
+    whole pixel offset between the two masks.
+
+    Parameter mask1: The first collision mask
+    Precondition: mask1 is a CollisionMask
+
+    Parameter x1: The x coordinate of the center of mask1
+    Precondition: x1 is an int or float
+
+    Parameter y1: The y coordinate of the center of mask1
+    Precondition: y1 is an int or float
+
+    Parameter mask0: The second collision mask
+    Precondition: mask0 is a CollisionMask
+
+    Parameter x0: The x coordinate of the center of mask0
+    Precondition: x0 is an int or float
+
+    Parameter y0: The y coordinate of the center of mask0
+    Precondition: y0 is an int or float
+
+    Parameter box: The area to test, as (left,bottom,right,top)
+    Precondition: box is a 4-element tuple of numbers
+    """
+    (left,bottom,right,top) = box
+    l1 = x1-mask1.width/2
+    b1 = y1-mask1.height/2
+    dx = math.floor(x0-mask0.width/2-l1+0.5)
+    dy = math.floor(y0-mask0.height/2-b1+0.5)
+
+    # The columns and rows of mask1 in the box, clipped to both masks
+    c0 = max(math.floor(left-l1),0,dx)
+    c1 = min(math.ceil(right-l1),mask1.width,mask0.width+dx)
+    r0 = max(math.floor(bottom-b1),0,dy)
+    r1 = min(math.ceil(top-b1),mask1.height,mask0.height+dy)
+    if c0 >= c1 or r0 >= r1:
+        return False
+    rows1 = _window(mask1.bits,r0,r1,c0,c1)
+    rows0 = _window(mask0.bits,r0-dy,r1-dy,c0-dx,c1-dx)
+    return bool(numpy.logical_and(rows1,rows0).any())
+
+
+class CollisionMask(object):
+    """
+    A class representing the opaque pixels of an image
+
+    Masks are immutable. The rows are stored bottom row first, so that a pixel (x,y) of
+    the mask is counted from the bottom left corner, as in the game.
+
+    Attribute width: The width of the mask in pixels
+    Invariant: width is an int >= 0
+
+    Attribute height: The height of the mask in pixels
+    Invariant: height is an int >= 0
+
+    Attribute bits: The pixels, packed eight to a byte (most significant bit first)
+    Invariant: bits is a NumPy array of uint8 with shape (height,ceil(width/8))
+    """
+    # Attribute _turns: The rotations of this mask computed so far, keyed by angle
+    # Invariant: _turns is a dictionary of CollisionMask
+
+    @classmethod
+    def fromAlpha(cls,alpha):
+        """
+        Returns a new mask of the pixels whose alpha is at least MASK_ALPHA
+
+        Parameter alpha: The alpha channel of an image
+        Precondition: alpha is a NumPy array with shape (height,width), top row first
+        """
+        solid = alpha[::-1] >= MASK_ALPHA
+        return cls(alpha.shape[1],numpy.packbits(solid,axis=1))
+
+    def __init__(self,width,bits):
+        """
+        Initializes a mask from packed bits
+
+        Parameter width: The width of the mask in pixels
+        Precondition: width is an int >= 0
+
+        Parameter bits: The pixels, packed eight to a byte (bottom row first)
+        Precondition: bits is a NumPy array of uint8 with shape (height,ceil(width/8))
+        """
+        self.width = width
+        self.height = bits.shape[0]
+        self.bits = bits
+        self._turns = {0:self}
+
+    def contains(self,x,y):
+        """
+        Returns True if the pixel containing the point (x,y) is opaque
+
+        Parameter x: The x coordinate, measured from the left edge of the mask
+        Precondition: x is an int or float
+
+        Parameter y: The y coordinate, measured from the bottom edge of the mask
+        Precondition: y is an int or float
+        """
+        col = math.floor(x)
+        row = math.floor(y)
+        if 0 <= col < self.width and 0 <= row < self.height:
+            return bool(self.bits[row,col >> 3] & (0x80 >> (col & 7)))
+        return False
+
+    def region(self,left,bottom,width,height):
+        """
+        Returns the mask of a rectangle inside this mask (such as a sprite frame)
+
+        Parameter left: The left edge of the rectangle, in pixels
+        Precondition: left is an int >= 0
+
+        Parameter bottom: The bottom edge of the rectangle, in pixels
+        Precondition: bottom is an int >= 0
+
+        Parameter width: The width of the rectangle, in pixels
+        Precondition: width is an int >= 0 with left+width <= the mask width
+
+        Parameter height: The height of the rectangle, in pixels
+        Precondition: height is an int >= 0 with bottom+height <= the mask height
+        """
+        rows = _window(self.bits,bottom,bottom+height,left,left+width)
+        return CollisionMask(width,numpy.packbits(rows,axis=1))
+
+    def rotate(self,angle):
+        """
+        Returns this mask rotated counter-clockwise about its center
+
+        The rotations are remembered, so this is only expensive the first time.
+
+        Parameter angle: The angle of rotation
+        Precondition: angle is a multiple of 90
+        """
+        angle = angle % 360
+        if not angle in self._turns:
+            rows = _window(self.bits,0,self.height,0,self.width)
+            # Rows count up, so a counter-clockwise turn is rot90 in the other direction
+            turned = numpy.rot90(rows,-angle//90)
+            self._turns[angle] = CollisionMask(turned.shape[1],numpy.packbits(turned,axis=1))
+        return self._turns[angle]
+
+
+# HIDDEN FUNCTIONS
+def _window(bits,r0,r1,c0,c1):
+    """
+    Returns the unpacked pixels of packed rows r0..r1-1 and columns c0..c1-1
+
+    Only the bytes that hold those columns are unpacked.
+
+    Parameter bits: The packed pixels
+    Precondition: bits is a NumPy array of uint8
+
+    Parameter r0: The first row
+    Precondition: r0 is an int >= 0
+
+    Parameter r1: The row after the last row
+    Precondition: r1 is an int >= r0
+
+    Parameter c0: The first column
+    Precondition: c0 is an int >= 0
+
+    Parameter c1: The column after the last column
+    Precondition: c1 is an int >= c0
+    """
+    start = c0 >> 3
+    rows = numpy.unpackbits(bits[r0:r1,start:(c1+7) >> 3],axis=1)
+    return rows[:,c0-8*start:c1-8*start]
+
+
+def _unfilter(data,width,height,size):
+    """
+    Returns the pixel bytes of decompressed PNG data, as an array (height,width*size)
+
+    Every row starts with its filter type. The None, Sub and Up filters are undone a
+    whole row at a time. The Average and Paeth filters depend on the pixel before, so
+    they are undone a byte at a time, but they are rare in small images.
+
+    Parameter data: The decompressed image data
+    Precondition: data is a bytes object
+
+    Parameter width: The image width in pixels
+    Precondition: width is an int > 0
+
+    Parameter height: The image height in pixels
+    Precondition: height is an int > 0
+
+    Parameter size: The number of bytes in a pixel
+    Precondition: size is an int > 0
+    """
+    stride = width*size
+    rows = numpy.frombuffer(data,dtype=numpy.uint8)[:height*(stride+1)]
+    rows = rows.reshape(height,stride+1)
+    result = numpy.zeros((height,stride),dtype=numpy.uint8)
+    prior = numpy.zeros(stride,dtype=numpy.uint8)
+    for y in range(height):
+        kind = rows[y,0]
+        line = rows[y,1:]
+        if kind == 0:
+            current = line
+        elif kind == 1:
+            current = numpy.cumsum(line.reshape(width,size),axis=0,dtype=numpy.uint8).ravel()
+        elif kind == 2:
+            current = line+prior
+        else:
+            current = bytearray(line.tobytes())
+            above = prior.tolist()
+            for x in range(stride):
+                a = current[x-size] if x >= size else 0
+                b = above[x]
+                if kind == 3:
+                    value = (a+b) >> 1
+                else:
+                    c = above[x-size] if x >= size else 0
+                    p = a+b-c
+                    (pa,pb,pc) = (abs(p-a),abs(p-b),abs(p-c))
+                    value = a if pa <= pb and pa <= pc else (b if pb <= pc else c)
+                current[x] = (current[x]+value) & 0xFF
+            current = numpy.frombuffer(bytes(current),dtype=numpy.uint8)
+        result[y] = current
+        prior = result[y]
+    return result
@@ -0,0 +1,455 @@
+"""
+Recording and replay module for Froggit
+
+This module records play sessions and replays them. A recording is the exact input of
+every animation frame: the keys that were held down and the time since the last frame.
+The game is deterministic, so playing the same input again reproduces the session
+exactly, including any slowdown that the player reported.
+
+Recordings are stored in a compact binary file. The file starts with a header (the
+level file and the frog speed), followed by runs of identical frames. Each run is a
+frame count, a bit mask of the keys held down, and the frame time. In the fixed-timestep
+game the frame time never changes, so hours of play only take a few kilobytes.
+
+A recording can be replayed in the game window (see the flag --replay in consts.py), or
+headless with the class Session, which plays the game without any graphics at all. The
+headless replay is fast enough to replay hours of play in seconds.
+"""
+from consts import *
+from specs  import *
+from sim    import *
+import os.path
+import struct
+import json
+import time
+
+# PRIMARY RULE: Replay is not allowed to access anything in any module other than
+# consts.py, specs.py and sim.py. In particular, it must never import game2d (or kivy),
+# so that sessions can be replayed without a game window.
+
+# The keys that are recorded, in bit order
+KEY_NAMES = ('up','down','right','left','s','c','r')
+
+# The bit for each recorded key
+KEY_BITS = {KEY_NAMES[x] : 1 << x for x in range(len(KEY_NAMES))}
+
+# The folder with the JSON files
+JSON_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)),'JSON')
+
+# The first bytes of every recording
+_MAGIC = b'FROG'
+# The version of the file format
+_VERSION = 1
+# The header: magic, version, frog speed and the length of the level name
+_HEADER = struct.Struct('<4sBdH')
+# A run of identical frames: frame count, key mask and frame time
+_RUN = struct.Struct('<IBd')
+# The longest run that fits in a record
+_MAX_RUN = 0xFFFFFFFF
+
+
+def keyMask(keys):
+    """
+    Returns the bit mask for the given keys
+
+    Keys that are not recorded are ignored.
+
+    Parameter keys: The keys held down
+    Precondition: keys is an iterable of str
+    """
+    mask = 0
+    for key in keys:
+        if key in KEY_BITS:
+            mask |= KEY_BITS[key]
+    return mask
+
+
+def isKeyDown(mask,key):
+    """
+    Returns True if the key is held down in the given mask
+
+    Parameter mask: The bit mask of the keys held down
+    Precondition: mask is an int in 0..255
+
+    Parameter key: The key to check
+    Precondition: key is one of KEY_NAMES
+    """
+    return (mask & KEY_BITS[key]) != 0
+
+
+def loadJson(name):
+    """
+    Returns the parsed JSON file with the given name in the JSON folder
+
+    Parameter name: The JSON file name
+    Precondition: name is a str naming a JSON file
+    """
+    with open(os.path.join(JSON_FOLDER,name)) as file:
+        return json.load(file)
+
+
+class Recording(object):
+    """
+    A class representing a recorded play session.
+
+    Attribute level: The level file that was played
+    Invariant: level is a str
+
+    Attribute speed: The frog speed (FROG_SPEED) when the session was recorded
+    Invariant: speed is a float > 0
+    """
+    # Attribute _runs: The runs of identical frames
+    # Invariant: _runs is a list of [count,mask,dt] lists with count > 0
+
+    # Attribute _frames: The number of frames in the recording
+    # Invariant: _frames is an int >= 0
+
+    @classmethod
+    def load(cls,path):
+        """
+        Returns the recording stored in the given file
+
+        This method raises a ValueError if the file is not a recording.
+
+        Parameter path: The file name
+        Precondition: path is a str naming a readable file
+        """
+        with open(path,'rb') as file:
+            data = file.read()
+        if len(data) < _HEADER.size:
+            raise ValueError('%s is not a Froggit recording' % repr(path))
+        (magic,version,speed,length) = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError('%s is not a Froggit recording' % repr(path))
+        offset = _HEADER.size
+        level = data[offset:offset+length].decode('utf-8')
+        offset += length
+
+        result = cls(level,speed)
+        size = (len(data)-offset)//_RUN.size
+        for run in _RUN.iter_unpack(data[offset:offset+size*_RUN.size]):
+            result._runs.append(list(run))
+            result._frames += run[0]
+        return result
+
+    def __init__(self,level,speed=FROG_SPEED):
+        """
+        Initializes an empty recording
+
+        Parameter level: The level file that is played
+        Precondition: level is a str
+
+        Parameter speed: The frog speed of the session
+        Precondition: speed is an int or float > 0
+        """
+        self.level = level
+        self.speed = float(speed)
+        self._runs = []
+        self._frames = 0
+
+    def __len__(self):
+        """
+        Returns the number of frames in this recording
+        """
+        return self._frames
+
+    def append(self,mask,dt):
+        """
+        Adds a frame to the end of this recording
+
+        Parameter mask: The bit mask of the keys held down
+        Precondition: mask is an int in 0..255
+
+        Parameter dt: The time in seconds since last frame
+        Precondition: dt is an int or float
+        """
+        if self._runs:
+            run = self._runs[-1]
+            if run[1] == mask and run[2] == dt and run[0] < _MAX_RUN:
+                run[0] += 1
+                self._frames += 1
+                return
+        self._runs.append([1,mask,dt])
+        self._frames += 1
+
+    def frames(self):
+        """
+        Generates the frames of this recording, in order
+
+        Each frame is a (mask,dt) tuple.
+        """
+        for (count,mask,dt) in self._runs:
+            frame = (mask,dt)
+            for x in range(count):
+                yield frame
+
+    def save(self,path):
+        """
+        Writes this recording to the given file
+
+        Parameter path: The file name
+        Precondition: path is a str naming a writable file
+        """
+        with open(path,'wb') as file:
+            file.write(_header(self.level,self.speed))
+            for run in self._runs:
+                file.write(_RUN.pack(*run))
+
+
+class Recorder(object):
+    """
+    A class that records a play session straight to a file.
+
+    Runs are written as soon as they are complete, so almost nothing is lost if the game
+    crashes. Call close at the end of the session to write the last run.
+    """
+    # Attribute _file: The file being written, or None if closed
+    # Invariant: _file is a binary file object or None
+
+    # Attribute _run: The run that is not yet written
+    # Invariant: _run is a [count,mask,dt] list, or None if there are no frames
+
+    def __init__(self,path,level,speed=FROG_SPEED):
+        """
+        Initializes a recorder that writes to the given file
+
+        Parameter path: The file name
+        Precondition: path is a str naming a writable file
+
+        Parameter level: The level file that is played
+        Precondition: level is a str
+
+        Parameter speed: The frog speed of the session
+        Precondition: speed is an int or float > 0
+        """
+        self._file = open(path,'wb')
+        self._file.write(_header(level,speed))
+        self._file.flush()
+        self._run = None
+
+    def record(self,mask,dt):
+        """
+        Records a single frame
+
+        Parameter mask: The bit mask of the keys held down
+        Precondition: mask is an int in 0..255
+
+        Parameter dt: The time in seconds since last frame
+        Precondition: dt is an int or float
+        """
+        run = self._run
+        if not run is None and run[1] == mask and run[2] == dt and run[0] < _MAX_RUN:
+            run[0] += 1
+            return
+        if not run is None:
+            self._file.write(_RUN.pack(*run))
+            self._file.flush()
+        self._run = [1,mask,dt]
+
+    def close(self):
+        """
+        Writes the last run and closes the file
+
+        It is safe to call this method more than once.
+        """
+        if self._file is None:
+            return
+        if not self._run is None:
+            self._file.write(_RUN.pack(*self._run))
+        self._file.close()
+        self._file = None
+        self._run = None
+
+
+class Session(object):
+    """
+    A class that plays Froggit without any graphics.
+
+    A session follows exactly the same states as the Froggit application: it waits for
+    'S', loads the level, plays it, pauses until 'C' after the frog dies or reaches an
+    exit, and waits for 'R' once the game is complete. The only difference is that it
+    drives a Simulation instead of a Level, so nothing is drawn and no sounds are played.
+    """
+    # Attribute _state: The current state of the game (taken from consts.py)
+    # Invariant: _state is one of STATE_INACTIVE, STATE_LOADING, STATE_PAUSED,
+    #            STATE_ACTIVE, STATE_CONTINUE, or STATE_COMPLETE
+
+    # Attribute _sim: The simulation of the current level
+    # Invariant: _sim is a Simulation object or None if no level is currently active
+
+    # Attribute _spec: The compiled level file
+    # Invariant: _spec is a LevelSpec object
+
+    # Attribute _frames: The number of frames played so far
+    # Invariant: _frames is an int >= 0
+
+    # Attribute _time: The total game time played so far
+    # Invariant: _time is a float >= 0
+
+    def getState(self):
+        """
+        Getter for the current state of the game
+        """
+        return self._state
+
+    def getSimulation(self):
+        """
+        Getter for the simulation of the current level (None if there is none)
+        """
+        return self._sim
+
+    def getFrames(self):
+        """
+        Getter for the number of frames played so far
+        """
+        return self._frames
+
+    def getTime(self):
+        """
+        Getter for the total game time in seconds played so far
+        """
+        return self._time
+
+    def __init__(self,level,hitboxes,vectorized=None):
+        """
+        Initializes a session that is waiting for the player to start
+
+        Parameter level: The loaded json file that contains infromation for the level
+        Precondition: level is a preloaded json file
+
+        Parameter hitboxes: The preloaded json file that contains the hitboxes
+        for the objects in the game
+        Precondition: hitboxes is a preloaded json file
+
+        Parameter vectorized: Whether to move obstacles with NumPy (None for the default)
+        Precondition: vectorized is a bool or None (see createEngine)
+        """
+        self._spec = LevelSpec(level,hitboxes)
+        self._vectorized = vectorized
+        self._state = STATE_INACTIVE
+        self._sim = None
+        self._frames = 0
+        self._time = 0.0
+
+    def update(self,mask,dt):
+        """
+        Plays a single frame of the game
+
+        Parameter mask: The bit mask of the keys held down
+        Precondition: mask is an int in 0..255
+
+        Parameter dt: The time in seconds since last frame
+        Precondition: dt is an int or float
+        """
+        self._frames += 1
+        self._time += dt
+        if self._state == STATE_INACTIVE:
+            if isKeyDown(mask,'s'):
+                self._state = STATE_LOADING
+        elif self._state == STATE_LOADING:
+            self._sim = Simulation(self._spec,self._vectorized)
+            self._state = STATE_ACTIVE
+        elif self._state == STATE_ACTIVE:
+            self._stateActive(mask,dt)
+        elif self._state == STATE_PAUSED:
+            if isKeyDown(mask,'c'):
+                self._state = STATE_CONTINUE
+        elif self._state == STATE_CONTINUE:
+            self._sim.setFrogCollision(False)
+            self._sim.setReachedExit(False)
+            self._sim.continueGame()
+            self._state = STATE_ACTIVE
+            self._sim.setAnimator(None)
+        elif self._state == STATE_COMPLETE:
+            if isKeyDown(mask,'r'):
+                self._sim = None
+                self._state = STATE_INACTIVE
+
+    def play(self,recording):
+        """
+        Plays every frame of the given recording
+
+        Parameter recording: The recording to play
+        Precondition: recording is a Recording object
+        """
+        update = self.update
+        for (mask,dt) in recording.frames():
+            update(mask,dt)
+
+    def _stateActive(self,mask,dt):
+        """
+        Helper method for update in STATE_ACTIVE
+
+        Parameter mask: The bit mask of the keys held down
+        Precondition: mask is an int in 0..255
+
+        Parameter dt: The time in seconds since last frame
+        Precondition: dt is an int or float
+        """
+        sim = self._sim
+        if mask & KEY_BITS['up']:
+            sim.step('up',dt)
+        elif mask & KEY_BITS['down']:
+            sim.step('down',dt)
+        elif mask & KEY_BITS['right']:
+            sim.step('right',dt)
+        elif mask & KEY_BITS['left']:
+            sim.step('left',dt)
+        else:
+            sim.step('none',dt)
+        sim.popEvents()
+
+        if sim.getPauseGame():
+            if sim.getLives() == 0:
+                self._state = STATE_COMPLETE
+            else:
+                self._state = STATE_PAUSED
+        elif sim.getReachedExit():
+            if sim.getGameWin():
+                self._state = STATE_COMPLETE
+            else:
+                self._state = STATE_PAUSED
+
+
+def replayHeadless(path):
+    """
+    Replays the recording in the given file without a window, and reports on it
+
+    The report (frames, game time, wall clock time, and the final state) is printed.
+    This function returns the Session after the replay.
+
+    Parameter path: The recording file name
+    Precondition: path is a str naming a Froggit recording
+    """
+    recording = Recording.load(path)
+    if recording.speed != FROG_SPEED:
+        raise ValueError('%s was recorded with frog speed %s, not %s' %
+                         (repr(path),recording.speed,FROG_SPEED))
+    session = Session(loadJson(recording.level),loadJson(OBJECT_DATA))
+    start = time.perf_counter()
+    session.play(recording)
+    elapsed = time.perf_counter()-start
+
+    print('Replayed %d frames (%.1f seconds of play) of %s in %.2f seconds' %
+          (session.getFrames(),session.getTime(),recording.level,elapsed))
+    sim = session.getSimulation()
+    if not sim is None:
+        frog = sim.getFrog()
+        print('Final state %d: frog at (%g,%g), %d lives' %
+              (session.getState(),frog.x,frog.y,sim.getLives()))
+    return session
+
+
+# HELPER FUNCTIONS
+def _header(level,speed):
+    """
+    Returns the header of a recording file
+
+    Parameter level: The level file that is played
+    Precondition: level is a str
+
+    Parameter speed: The frog speed of the session
+    Precondition: speed is an int or float > 0
+    """
+    name = level.encode('utf-8')
+    return _HEADER.pack(_MAGIC,_VERSION,speed,len(name))+name
@@ -0,0 +1,1320 @@
+"""
+Simulation module for Froggit
+
+This module contains the rules of Froggit, separated from the way that the game is drawn.
+A Simulation owns everything that changes while a level is played: the positions of the
+obstacles, the position and animation of the frog, the exits that have been reached,
+the number of lives, and all of the collisions between them.
+
+None of the classes in this module are drawable. They are plain Python objects, which
+means a level can be stepped without a window, a graphics context or audio. That is how
+we batch-simulate levels, run benchmarks and replay sessions on machines that have no
+display. The Level subcontroller wraps a Simulation and simply draws whatever state the
+simulation is in.
+
+Collisions follow the same rules as GObject in game2d, including hitboxes. However, the
+simulation only supports objects rotated by multiples of 90 degrees, which is all that
+Froggit ever needs. If PIXEL_COLLISIONS is True, the hitboxes are refined by collision
+masks (see masks.py), so that the frog only collides with the pixels of an obstacle.
+"""
+from consts import *
+from specs  import *
+from engine import *
+from masks  import *
+import os.path
+import bisect
+import math
+
+# PRIMARY RULE: The simulation is not allowed to access anything in any module other
+# than consts.py, specs.py, engine.py and masks.py. In particular, it must never import
+# game2d (or kivy).
+# If the renderer needs to know something, it should ask with a getter.
+
+
+def bbox(x,y,width,height,angle,hitbox):
+    """
+    Returns the bounding box (l,t,r,b) of an object rotated by a multiple of 90 degrees
+
+    This is the same computation as the method _bbox in GObject, so the simulation
+    agrees with the drawn objects about every collision.
+
+    Parameter x: The x coordinate of the object center
+    Precondition: x is an int or float
+
+    Parameter y: The y coordinate of the object center
+    Precondition: y is an int or float
+
+    Parameter width: The width of the object
+    Precondition: width is an int or float > 0
+
+    Parameter height: The height of the object
+    Precondition: height is an int or float > 0
+
+    Parameter angle: The angle of the object
+    Precondition: angle is a multiple of 90
+
+    Parameter hitbox: The hitbox offsets of the object
+    Precondition: hitbox is a 4-element tuple of numbers
+    """
+    oangle = angle % 360
+    hit = hitbox
+    w = width/2
+    h = height/2
+    if oangle == 0:
+        l = x + hit[0] - w
+        r = x - hit[2] + w
+        t = y - hit[1] + h
+        b = y + hit[3] - h
+    elif oangle == 90:
+        t = y + hit[2] - w
+        b = y - hit[0] + w
+        r = x - hit[3] + h
+        l = x + hit[1] - h
+    elif oangle == 180:
+        l = x + hit[2] - w
+        r = x - hit[0] + w
+        t = y - hit[3] + h
+        b = y + hit[1] - h
+    else:
+        t = y + hit[0] - w
+        b = y - hit[2] + w
+        r = x - hit[1] + h
+        l = x + hit[3] - h
+    return (l,t,r,b)
+
+
+def overlaps(box1,box0):
+    """
+    Returns True if the two bounding boxes intersect
+
+    This is the same test as the method collides in GObject, where box1 is the bounding
+    box of the object and box0 is the bounding box of the argument.
+
+    Parameter box1: The first bounding box
+    Precondition: box1 is a 4-element tuple (l,t,r,b)
+
+    Parameter box0: The second bounding box
+    Precondition: box0 is a 4-element tuple (l,t,r,b)
+    """
+    (l0,t0,r0,b0) = box0
+    (l1,t1,r1,b1) = box1
+    isx = l1 <= l0 <= r1 or l0 <= l1 <= r0
+    isy = b1 <= b0 <= t1 or b0 <= b1 <= t0
+    return isx and isy
+
+
+def sweep(box1,box0,dx,dy):
+    """
+    Returns the first time that two moving bounding boxes intersect, or None if never
+
+    The boxes start where they are given and box0 moves by (dx,dy) relative to box1
+    over an interval of time, which is scaled to be [0,1]. The result is the first time
+    in [0,1] at which overlaps(box1,box0) is True, so it is 0 if they overlap at the
+    start.
+
+    This is the slab method of the function sweep in game2d, but it is not a drop-in
+    replacement. The boxes are (l,t,r,b) as GObject gives them, not (left,bottom,right,
+    top), and only box0 moves. The edges are not sorted either. Like overlaps, a box
+    turned 90 degrees has its edges reversed along an axis, and it is only tested at
+    its near edge (l or b) along that axis. If both boxes are reversed along an axis,
+    they never intersect. For boxes with sorted edges, the two functions agree. The
+    simulation cannot import game2d (which needs Kivy), so the algorithm lives in both.
+
+    Parameter box1: The first bounding box, at the start of the interval
+    Precondition: box1 is a 4-element tuple (l,t,r,b)
+
+    Parameter box0: The second bounding box, at the start of the interval
+    Precondition: box0 is a 4-element tuple (l,t,r,b)
+
+    Parameter dx: The horizontal displacement of box0 relative to box1
+    Precondition: dx is an int or float
+
+    Parameter dy: The vertical displacement of box0 relative to box1
+    Precondition: dy is an int or float
+    """
+    (l0,t0,r0,b0) = box0
+    (l1,t1,r1,b1) = box1
+    first = 0.0
+    last = 1.0
+    for (low1,high1,low0,high0,speed) in ((l1,r1,l0,r0,dx),(b1,t1,b0,t0,dy)):
+        if high1 < low1:
+            if high0 < low0:
+                return None
+            high1 = low1
+        elif high0 < low0:
+            high0 = low0
+        if speed == 0:
+            if high0 < low1 or high1 < low0:
+                return None
+        else:
+            enter = (low1-high0)/speed
+            leave = (high1-low0)/speed
+            if speed < 0:
+                (enter,leave) = (leave,enter)
+            first = max(first,enter)
+            last = min(last,leave)
+            if first > last:
+                return None
+    return first
+
+
+def encloses(box,x,y):
+    """
+    Returns True if the bounding box contains the point (x,y)
+
+    Parameter box: The bounding box
+    Precondition: box is a 4-element tuple (l,t,r,b)
+
+    Parameter x: The x coordinate of the point
+    Precondition: x is an int or float
+
+    Parameter y: The y coordinate of the point
+    Precondition: y is an int or float
+    """
+    (l,t,r,b) = box
+    return l <= x <= r and b <= y <= t
+
+
+class FrogState(object):
+    """
+    A class representing the state of the frog
+
+    This is the simulated half of the Frog model. It tracks where the frog is and the
+    current frame of its hopping animation. The Frog model in models.py copies these
+    values every frame in order to draw the frog.
+
+    Attribute x: The x coordinate of the frog center
+    Invariant: x is a float
+
+    Attribute y: The y coordinate of the frog center
+    Invariant: y is a float
+
+    Attribute angle: The angle of the frog
+    Invariant: angle is one of FROG_NORTH, FROG_SOUTH, FROG_EAST or FROG_WEST
+
+    Attribute frame: The current animation frame of the frog sprite
+    Invariant: frame is an int in 0..4
+
+    Attribute width: The width of a single frame of the frog sprite
+    Invariant: width is a float > 0
+
+    Attribute height: The height of a single frame of the frog sprite
+    Invariant: height is a float > 0
+
+    Attribute hitbox: The hitbox offsets of the frog
+    Invariant: hitbox is a 4-element tuple of numbers
+    """
+    # Attribute _wait: The time to wait on frame 4
+    # Invariant: _wait is an int
+
+    # Attribute _time: The amount of time that the frog has been animating
+    # Invariant: _time is a float
+
+    # Attribute _animating: bool that tells us whether or not the frog is animating
+    # Invariant: _animating is a bool
+
+    def __init__(self,x,y,size,hitbox):
+        """
+        Initializes the frog state
+
+        Parameter x: The starting x coordinate for the frog center
+        Precondition: x is an int or a float
+
+        Parameter y: The starting y coordinate for the frog center
+        Precondition: y is an int or a float
+
+        Parameter size: The size of a single frame of the frog sprite
+        Precondition: size is a 2-element tuple of numbers > 0
+
+        Parameter hitbox: The hitbox offsets of the frog
+        Precondition: hitbox is a 4-element tuple of numbers
+        """
+        self.x = float(x)
+        self.y = float(y)
+        self.angle = FROG_NORTH
+        self.frame = 0
+        self.width = size[0]
+        self.height = size[1]
+        self.hitbox = hitbox
+        self._wait = 0
+        self._time = 0
+        self._animating = False
+
+    def getBox(self):
+        """
+        Returns the bounding box (l,t,r,b) of the frog
+        """
+        return bbox(self.x,self.y,self.width,self.height,self.angle,self.hitbox)
+
+    def slideAnimation(self,keyInput):
+        """
+        Animates the frog when moving
+
+        Parameter keyInput: The current key being pressed
+        Precondition: keyInput is one of 'up', 'down', 'left' or 'right'
+        """
+        self._wait = 0
+        self._time = 0
+        svert = self.y
+        shori = self.x
+        fvert = 0
+        fhori = 0
+        if keyInput == 'up':
+            self.angle = FROG_NORTH
+            value = 1
+            fvert = svert + GRID_SIZE
+        elif keyInput == 'down':
+            self.angle = FROG_SOUTH
+            value = 2
+            fvert = svert - GRID_SIZE
+        elif keyInput == 'right':
+            self.angle = FROG_EAST
+            value = 3
+            fhori = shori + GRID_SIZE
+        elif keyInput == 'left':
+            self.angle = FROG_WEST
+            value = 4
+            fhori = shori - GRID_SIZE
+        if value < 3:
+            steps = (fvert - svert) / FROG_SPEED
+        else:
+            steps = (fhori - shori) / FROG_SPEED
+        self._animating = True
+        while self._animating:
+            dt = (yield)
+            amount = steps * dt
+            if value < 3:
+                self.y += amount
+                self._animateVertical(svert,fvert)
+            else:
+                self.x += amount
+                self._animateHorizontal(shori,fhori)
+            self._snap(value,svert,shori,fvert,fhori,dt)
+
+    def _animateVertical(self,svert,fvert):
+        """
+        Helper method for slideAnimation that picks the frame of a vertical hop
+
+        Parameter svert: The beginning y position of the frog in the animation
+        Precondition: svert is an int or float
+
+        Parameter fvert: The ending y position of the frog in the animation
+        Precondition: fvert is an int or float
+        """
+        frac = 2 * abs((self.y-svert)) / GRID_SIZE
+        if frac < 1:
+            self.frame = round(frac * 4)
+        else:
+            frame = 4 - ((frac - 1) * 4)
+            if frame > -(.5):
+                self.frame = round(frame)
+            else:
+                self.frame = 0
+            if self.frame == 0:
+                self.y = fvert
+
+    def _animateHorizontal(self,shori,fhori):
+        """
+        Helper method for slideAnimation that picks the frame of a horizontal hop
+
+        Parameter shori: The beginning x position of the frog in the animation
+        Precondition: shori is an int or float
+
+        Parameter fhori: The ending x position of the frog in the animation
+        Precondition: fhori is an int or float
+        """
+        frac = 2 * abs((self.x-shori)) / GRID_SIZE
+        if frac < 1:
+            self.frame = round(frac * 4)
+        else:
+            self.frame = 4
+            if self._wait == 1:
+                frame = 4 - ((frac - 1) * 4)
+                if frame > -(.5):
+                    self.frame = round(frame)
+                else:
+                    self.frame = 0
+                if self.frame == 0:
+                    self.x = fhori
+            self._wait = 1
+
+    def _snap(self,value,svert,shori,fvert,fhori,dt):
+        """
+        Helper method for slideAnimation that snaps frog in place
+
+        Parameter value: The value that is attributed to a certain direction
+        Precondition: Value is an int between 1 and 4 (inclusive)
+
+        Parameter svert: The beginning y position of the frog in the animation
+        Precondition: svert is an int or float
+
+        Parameter shori: The beginning x position of the frog in the animation
+        Precondition: shori is an int or float
+
+        Parameter fvert: The ending y position of the frog in the animation
+        Precondition: fvert is an int or float
+
+        Parameter fhori: The ending x position of the frog in the animation
+        Precondition: fhori is an int or float
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a an int or float
+        """
+        if value < 3:
+            if abs(self.y - svert) >= GRID_SIZE:
+                self.y = fvert
+                self._animating = False
+                self.frame = 0
+        else:
+            if abs(self.x - shori) >= GRID_SIZE:
+                self.x = fhori
+                self._animating = False
+                self.frame = 0
+        self._time += dt
+        if self._time >= FROG_SPEED:
+            if value < 3:
+                self.y = fvert
+            else:
+                self.x = fhori
+            self._animating = False
+            self.frame = 0
+
+
+class DeathState(object):
+    """
+    A class representing the state of the death animation
+
+    Attribute x: The x coordinate of the animation center
+    Invariant: x is an int or float
+
+    Attribute y: The y coordinate of the animation center
+    Invariant: y is an int or float
+
+    Attribute frame: The current animation frame of the death sprite
+    Invariant: frame is an int in 0..DEATH_FRAMES-1
+    """
+    # Attribute _time: a float that tells us the amount of time that has elapsed
+    # Invariant: _time is a float
+
+    def __init__(self,x,y):
+        """
+        Initializes the death state
+
+        Parameter x: The starting x coordinate for the animation center
+        Precondition: x is an int or a float
+
+        Parameter y: The starting y coordinate for the animation center
+        Precondition: y is an int or a float
+        """
+        self.x = x
+        self.y = y
+        self.frame = 0
+        self._time = 0
+
+    def deathAnimation(self):
+        """
+        Animates the death of the frog
+
+        The animation ends as soon as it would advance past the last frame.
+        """
+        self._time = 0
+        while True:
+            dt = (yield)
+            self._time += dt
+            frame = round(DEATH_FRAMES * (self._time/DEATH_SPEED))
+            if frame >= DEATH_FRAMES:
+                return
+            self.frame = frame
+
+
+class Simulation(object):
+    """
+    This class simulates a single level of Froggit.
+
+    The simulation is a faithful copy of the rules that used to live in Level. It is
+    updated with the same inputs as Level (the current key, or 'none', and the time since
+    the last update), and it reports the sounds that should be played as events, which
+    the renderer collects with popEvents.
+
+    All attributes of this class are hidden. The renderer reads the state with getters
+    and never changes it directly.
+    """
+    # Attribute _spec: The compiled level file
+    # Invariant: _spec is a LevelSpec object
+
+    # Attribute _frog: The state of the frog
+    # Invariant: _frog is a FrogState object
+
+    # Attribute _death: The state of the death animation
+    # Invariant: _death is a DeathState object
+
+    # Attribute _engine: The engine that moves the obstacles
+    # Invariant: _engine is an ObstacleEngine object
+
+    # Attribute _tiles: The bounding boxes of the lanes
+    # Invariant: _tiles is a list of 4-element tuples, one for each lane
+
+    # Attribute _reach: The extent of the bounding boxes of the objects in each lane
+    # Invariant: _reach is a list of 4-element tuples (ylow,yhigh,xlow,xhigh), one for
+    # each lane, where the x values are offsets from the object centers
+
+    # Attribute _roadRows: The road lanes whose objects reach into each grid row
+    # Invariant: _roadRows is a list of lists of ints, one list for each lane
+
+    # Attribute _safeFrogs: The exits taken by safe frogs in each lane
+    # Invariant: _safeFrogs is a list of lists of ints, one list for each lane
+
+    # Attribute _lives: The number of lives left
+    # Invariant: _lives is an int >= 0
+
+    # Attribute _events: The sound events since the last call to popEvents
+    # Invariant: _events is a list of EVENT_CROAK, EVENT_TRILL or EVENT_SPLAT
+
+    # Attribute _delay: The amount of time to delay before the frog can move again
+    # Invariant: _delay is an int or float
+
+    # Attribute _frogcollision: Bool that tells whether or not the frog was killed
+    # Invariant: _frogcollision is a bool
+
+    # Attribute _reachedExit: Bool that tells us if frog has reached an exit
+    # Invariant: _reachedExit is a bool
+
+    # Attribute _gameWin: Bool that tells us if player has won game
+    # Invariant: _gameWin is a bool
+
+    # Attribute _animator: The coroutine animating the frog, if any
+    # Invariant: _animator is a generator or None
+
+    # Attribute _animator2: The coroutine animating the death, if any
+    # Invariant: _animator2 is a generator or None
+
+    # Attribute _blocked: Bool that tells us if the frog's path is currently blocked
+    # Invariant: _blocked is a bool
+
+    # Attribute _opening: A bool that tells us whether there is an opening in a hedge
+    # Invariant: _opening is a bool
+
+    # Attribute _pauseGame: A bool that tells us whether or not to pause the game
+    # Invariant: _pauseGame is a bool
+
+    # Attribute _trill: A bool that tells us whether the next hop reaches an exit
+    # Invariant: _trill is a bool
+
+    # Attribute _checked: The frog center at the last collision check, if any
+    # Invariant: _checked is a 2-element tuple of floats or None
+
+    # Attribute _masks: The collision masks of the images, keyed by (file,angle), and of
+    # the frog frames, keyed by (sprite,frame,angle)
+    # Invariant: _masks is a dictionary of CollisionMask (or None for no mask), or
+    # None if the simulation does not use collision masks
+
+    def getSpec(self):
+        """
+        Getter for the compiled level file
+        """
+        return self._spec
+
+    def getFrog(self):
+        """
+        Getter for the state of the frog
+        """
+        return self._frog
+
+    def getDeath(self):
+        """
+        Getter for the state of the death animation
+        """
+        return self._death
+
+    def getPositions(self,lane):
+        """
+        Getter for the x coordinates of the objects in the given lane
+
+        The list is in the same order as the objects in the lane specification. It
+        should not be modified.
+
+        Parameter lane: The lane position from the bottom
+        Precondition: lane is a valid lane index
+        """
+        return self._engine.getPositions(lane)
+
+    def getPositionAt(self,lane,index,time):
+        """
+        Getter for the x coordinate of one object at any time
+
+        Obstacle motion is periodic, so this costs O(1) no matter how far in the past or
+        the future the time is. It does not change the simulation.
+
+        Parameter lane: The lane position from the bottom
+        Precondition: lane is a valid lane index
+
+        Parameter index: The position of the object in the lane specification
+        Precondition: index is a valid object position for that lane
+
+        Parameter time: The time in seconds since the level started
+        Precondition: time is an int or float
+        """
+        return self._engine.positionAt(lane,index,time)
+
+    def getTime(self):
+        """
+        Getter for the time in seconds that the obstacles have been moving
+        """
+        return self._engine.getTime()
+
+    def getVisible(self,lane,time=None,span=None):
+        """
+        Getter for the objects in the given lane that are on screen
+
+        The value returned is a pair of lists: the positions of the visible objects in
+        the lane specification, and their x coordinates.
+
+        Parameter lane: The lane position from the bottom
+        Precondition: lane is a valid lane index
+
+        Parameter time: The time in seconds (None for the current time)
+        Precondition: time is an int, float or None
+
+        Parameter span: The left and right edges of the screen (None for the whole level)
+        Precondition: span is None or a pair of numbers
+        """
+        return self._engine.getVisible(lane,time,span)
+
+    def getSafeFrogs(self,lane):
+        """
+        Getter for the exits taken by safe frogs in the given lane
+
+        The list contains positions in the objects of the lane specification, in the
+        order in which they were reached. It should not be modified.
+
+        Parameter lane: The lane position from the bottom
+        Precondition: lane is a valid lane index
+        """
+        return self._safeFrogs[lane]
+
+    def getLives(self):
+        """
+        Getter for the number of lives left
+        """
+        return self._lives
+
+    def getFrogCollision(self):
+        """
+        Getter for the bool that determines if the frog has been killed
+        """
+        return self._frogcollision
+
+    def setFrogCollision(self,value):
+        """
+        Setter for the bool that determines if the frog has been killed
+
+        Parameter value: The bool value to change the attribute to
+        Precondition: value is a bool
+        """
+        self._frogcollision = value
+
+    def getReachedExit(self):
+        """
+        Getter for the bool that determines if the frog has reached an exit
+        """
+        return self._reachedExit
+
+    def setReachedExit(self,value):
+        """
+        Setter for the bool that determines if the frog has reached an exit
+
+        Parameter value: The bool value to change the attribute to
+        Precondition: value is a bool
+        """
+        self._reachedExit = value
+
+    def getGameWin(self):
+        """
+        Getter for the bool that determines if game has been won
+        """
+        return self._gameWin
+
+    def setAnimator(self,value):
+        """
+        Setter for the frog animator
+
+        Parameter value: The animator to use
+        Precondition: value is None
+        """
+        self._animator = value
+
+    def getPauseGame(self):
+        """
+        Getter for the bool that determines if the game should pause
+        """
+        return self._pauseGame
+
+    def __init__(self,spec,vectorized=None,pixels=None):
+        """
+        Initializes the simulation of a level
+
+        Parameter spec: The compiled level file
+        Precondition: spec is a LevelSpec object
+
+        Parameter vectorized: Whether to move obstacles with NumPy (None for the default)
+        Precondition: vectorized is a bool or None (see createEngine)
+
+        Parameter pixels: Whether to refine the hitboxes with collision masks (None for
+        PIXEL_COLLISIONS). The hitboxes are used alone if NumPy is not installed.
+        Precondition: pixels is a bool or None
+        """
+        self._spec = spec
+        self._frog = FrogState(spec.startX,spec.startY,spec.frogSize,spec.frogHitboxes[0])
+        self._death = DeathState(spec.startX,spec.startY)
+        self._engine = createEngine(spec,vectorized)
+        self._tiles = []
+        self._safeFrogs = []
+        for lane in spec.lanes:
+            self._tiles.append(bbox(lane.width/2,lane.bottom+GRID_SIZE/2,lane.width,
+                                    GRID_SIZE,0,(0,0,0,0)))
+            self._safeFrogs.append([])
+        self._indexLanes()
+        self._lives = FROG_LIVES
+        self._events = []
+        self._delay = 0
+        self._opening = False
+        self._frogcollision = False
+        self._reachedExit = False
+        self._gameWin = False
+        self._animator = None
+        self._animator2 = None
+        self._blocked = False
+        self._pauseGame = False
+        self._trill = False
+        self._checked = None
+        if pixels is None:
+            pixels = PIXEL_COLLISIONS
+        self._masks = {} if pixels and not numpy is None else None
+
+    def update(self,keyInput,dt):
+        """
+        Updates the frog and the objects in each lane
+
+        Parameter keyInput: The current key being pressed
+        Precondition: keyInput is one of 'none', 'up', 'down', 'left' or 'right'
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is an int or a float
+        """
+        # Updating obstacles and frog collisions
+        if keyInput == 'none':
+            self._engine.update(dt)
+            if self.collidesRoad(dt,self._checked):
+                self._animator = None
+                self._frogcollision = True
+            self._checked = (self._frog.x,self._frog.y)
+        # Frog riding on log
+        if self._frogcollision != True:
+            if self._animator == None and self._blocked == False:
+                self._rideLogs(dt)
+        self._blocked = False
+        # Movement of the Frog
+        self._trill = False
+        self._frogMovement(keyInput,dt)
+        self._death.x = self._frog.x
+        self._death.y = self._frog.y
+        if self._frogcollision == True and self._pauseGame == False:
+            self._animateDeath(dt)
+
+    def step(self,keyInput,dt):
+        """
+        Advances the simulation by one animation frame
+
+        The obstacles move (and the frog is checked against them) first, and then the
+        frog responds to the key, exactly as in a frame of the game.
+
+        Parameter keyInput: The current key being pressed
+        Precondition: keyInput is one of 'none', 'up', 'down', 'left' or 'right'
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is an int or a float
+        """
+        self.update('none',dt)
+        if keyInput != 'none':
+            self.update(keyInput,dt)
+
+    def continueGame(self):
+        """
+        Resets the frog to the start to continue the game
+        """
+        self._frog.x = float(self._spec.startX)
+        self._frog.y = float(self._spec.startY)
+        self._frog.angle = FROG_NORTH
+        self._frogcollision = False
+        self._pauseGame = False
+        self._frog.frame = 0
+        self._checked = None
+
+    def popEvents(self):
+        """
+        Returns the sound events since the last call, and forgets them
+
+        The events are returned in the order that they happened.
+        """
+        events = self._events
+        self._events = []
+        return events
+
+    def collidesRoad(self,dt=0,start=None):
+        """
+        Returns True if the frog collides with an object in a road lane
+
+        This check is made by update every frame, but it may be called at any time.
+        By default it only tests where everything is now. Given the time since the last
+        check (and where the frog was then), it also tests the whole way that the frog
+        and the objects moved in that time, with sweep. That way a fast car cannot jump
+        past the frog between two frames, and the frog cannot hop through a car, no
+        matter how long the frames are.
+
+        Only the road lanes that reach the rows spanned by the frog are checked, and
+        only the objects near the frog in those lanes.
+
+        Parameter dt: The time in seconds that the objects moved since the last check
+        Precondition: dt is an int or float
+
+        Parameter start: The frog center at the last check (None to use the current one)
+        Precondition: start is a 2-element tuple of numbers or None
+        """
+        frog = self._frog
+        frogbox = frog.getBox()
+        (l,t,r,b) = frogbox
+        fdx = 0 if start is None else frog.x-start[0]
+        fdy = 0 if start is None else frog.y-start[1]
+        swept = dt != 0 or fdx != 0 or fdy != 0
+        if swept:
+            startbox = (l-fdx,t-fdy,r-fdx,b-fdy)
+        low  = min(t,b,t-fdy,b-fdy)
+        high = max(t,b,t-fdy,b-fdy)
+        left  = min(l,r,l-fdx,r-fdx)
+        right = max(l,r,l-fdx,r-fdx)
+        checked = []
+        for row in range(self._toRow(low),self._toRow(high)+1):
+            for pos in self._roadRows[row]:
+                if not pos in checked:
+                    checked.append(pos)
+                    (ylow,yhigh,xlow,xhigh) = self._reach[pos]
+                    if ylow <= high and low <= yhigh:
+                        lane = self._spec.lanes[pos]
+                        dist = lane.speed*dt
+                        objs = lane.objects
+                        positions = self._engine.getPositions(pos)
+                        for y in self._engine.getCandidates(pos,left-xhigh-abs(dist),
+                                                            right-xlow+abs(dist)):
+                            obj = objs[y]
+                            box = bbox(positions[y],obj.y,obj.width,obj.height,
+                                       obj.angle,obj.hitbox)
+                            if (overlaps(box,frogbox) and
+                                self._pixelsTouch(obj,positions[y],box,
+                                                  frog.x,frog.y,frogbox)):
+                                return True
+                            if swept:
+                                box = (box[0]-dist,box[1],box[2]-dist,box[3])
+                                first = sweep(box,startbox,fdx-dist,fdy)
+                                if (not first is None and
+                                    self._pixelsTouch(obj,positions[y]-dist,box,
+                                                      frog.x-fdx,frog.y-fdy,startbox,
+                                                      fdx-dist,fdy,first)):
+                                    return True
+        return False
+
+    # HELPER METHODS
+    def _indexLanes(self):
+        """
+        Helper method for the initializer that indexes the lanes for collisions
+
+        The y extent of the objects in a lane never changes, so we can compute ahead
+        of time which road lanes can reach into each grid row. The x extent is stored
+        as offsets from the object centers, padded by one pixel to absorb rounding.
+        """
+        self._reach = []
+        self._roadRows = [[] for lane in self._spec.lanes]
+        for lane in self._spec.lanes:
+            ylow = xlow = None
+            for obj in lane.objects:
+                (l,t,r,b) = bbox(0,obj.y,obj.width,obj.height,obj.angle,obj.hitbox)
+                if ylow is None:
+                    (ylow,yhigh,xlow,xhigh) = (min(t,b),max(t,b),min(l,r),max(l,r))
+                else:
+                    ylow  = min(ylow,t,b)
+                    yhigh = max(yhigh,t,b)
+                    xlow  = min(xlow,l,r)
+                    xhigh = max(xhigh,l,r)
+            if ylow is None:
+                self._reach.append((0,0,0,0))
+            else:
+                self._reach.append((ylow,yhigh,xlow-1,xhigh+1))
+                if lane.kind == LANE_ROAD:
+                    for row in range(self._toRow(ylow),self._toRow(yhigh)+1):
+                        self._roadRows[row].append(lane.index)
+
+    def _maskOf(self,source,angle):
+        """
+        Returns the collision mask of an image turned by angle, or None if there is none
+
+        Parameter source: The image file
+        Precondition: source is a str
+
+        Parameter angle: The angle of the image
+        Precondition: angle is a multiple of 90
+        """
+        key = (source,angle)
+        if not key in self._masks:
+            mask = loadMask(os.path.join(IMAGE_FOLDER,source))
+            self._masks[key] = None if mask is None else mask.rotate(angle)
+        return self._masks[key]
+
+    def _frogMask(self):
+        """
+        Returns the collision mask of the current frame of the frog, or None if none
+
+        The frames are cut from the mask of the sprite sheet in the same order as the
+        frames of the sprite, from the top row down.
+        """
+        frog = self._frog
+        key = (FROG_SPRITE,frog.frame,frog.angle)
+        if not key in self._masks:
+            sheet = self._maskOf(FROG_SPRITE+'.png',0)
+            if sheet is None:
+                self._masks[key] = None
+            else:
+                width = int(frog.width)
+                height = int(frog.height)
+                columns = sheet.width//width
+                row = frog.frame//columns
+                col = frog.frame % columns
+                frame = sheet.region(col*width,sheet.height-(row+1)*height,width,height)
+                self._masks[key] = frame.rotate(frog.angle)
+        return self._masks[key]
+
+    def _pixelsTouch(self,obj,ox,box,fx,fy,frogbox,dx=0,dy=0,first=1):
+        """
+        Returns True if the frog touches the pixels of an obstacle inside the hitboxes
+
+        The frog moves by (dx,dy) relative to the obstacle, and it is tested at every
+        pixel of that motion from time first to time 1. So with no motion, the frog is
+        tested where it is. The hitboxes are all that there is without collision masks,
+        so the answer is then always True.
+
+        Parameter obj: The obstacle
+        Precondition: obj is an ObjectSpec
+
+        Parameter ox: The x coordinate of the obstacle center
+        Precondition: ox is an int or float
+
+        Parameter box: The bounding box of the obstacle
+        Precondition: box is a 4-element tuple (l,t,r,b)
+
+        Parameter fx: The x coordinate of the frog center
+        Precondition: fx is an int or float
+
+        Parameter fy: The y coordinate of the frog center
+        Precondition: fy is an int or float
+
+        Parameter frogbox: The bounding box of the frog
+        Precondition: frogbox is a 4-element tuple (l,t,r,b)
+
+        Parameter dx: The horizontal motion of the frog relative to the obstacle
+        Precondition: dx is an int or float
+
+        Parameter dy: The vertical motion of the frog relative to the obstacle
+        Precondition: dy is an int or float
+
+        Parameter first: The first time to test, in [0,1]
+        Precondition: first is an int or float
+        """
+        if self._masks is None:
+            return True
+        mask1 = self._maskOf(obj.source,obj.angle)
+        mask0 = self._frogMask()
+        if mask1 is None or mask0 is None:
+            return True
+
+        (l1,t1,r1,b1) = box
+        steps = math.ceil(max(abs(dx),abs(dy))*(1-first))
+        for step in range(steps+1):
+            time = first+(1-first)*step/steps if steps else first
+            (l0,t0,r0,b0) = frogbox
+            (sx,sy) = (dx*time,dy*time)
+            moved = (l0+sx,t0+sy,r0+sx,b0+sy)
+            if overlaps(box,moved):
+                window = (max(min(l1,r1),min(l0,r0)+sx),max(min(t1,b1),min(t0,b0)+sy),
+                          min(max(l1,r1),max(l0,r0)+sx),min(max(t1,b1),max(t0,b0)+sy))
+                if collides(mask1,ox,obj.y,mask0,fx+sx,fy+sy,window):
+                    return True
+        return False
+
+    def _pixelsUnder(self,obj,ox,fx,fy,dx=0,first=1):
+        """
+        Returns True if the frog center is over a pixel of an obstacle
+
+        The frog moves by dx relative to the obstacle, and it is tested at every pixel
+        of that motion from time first to time 1. This is always True without collision
+        masks, as the frog is already known to be inside the hitbox.
+
+        Parameter obj: The obstacle
+        Precondition: obj is an ObjectSpec
+
+        Parameter ox: The x coordinate of the obstacle center
+        Precondition: ox is an int or float
+
+        Parameter fx: The x coordinate of the frog center
+        Precondition: fx is an int or float
+
+        Parameter fy: The y coordinate of the frog center
+        Precondition: fy is an int or float
+
+        Parameter dx: The horizontal motion of the frog relative to the obstacle
+        Precondition: dx is an int or float
+
+        Parameter first: The first time to test, in [0,1]
+        Precondition: first is an int or float
+        """
+        if self._masks is None:
+            return True
+        mask = self._maskOf(obj.source,obj.angle)
+        if mask is None:
+            return True
+
+        left = ox-mask.width/2
+        bottom = obj.y-mask.height/2
+        steps = math.ceil(abs(dx)*(1-first))
+        for step in range(steps+1):
+            time = first+(1-first)*step/steps if steps else first
+            if mask.contains(fx+dx*time-left,fy-bottom):
+                return True
+        return False
+
+    def _toRow(self,y):
+        """
+        Returns the grid row containing the given y coordinate
+
+        Coordinates below (above) the level belong to the bottom (top) row.
+
+        Parameter y: The y coordinate
+        Precondition: y is an int or float
+        """
+        row = int(y // GRID_SIZE)
+        return min(max(row,0),self._spec.rows-1)
+
+    def _rideLogs(self,dt):
+        """
+        Helper method for update that moves the frog along with the logs
+
+        The frog can only be inside one water lane (two if it is on the border), so
+        only those lanes are ridden. Every other water lane only checks whether the
+        frog has left the screen, so that check is made once for each run of water
+        lanes before, between and after the lanes ridden.
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is an int or a float
+        """
+        waters = self._spec.waters
+        if len(waters) == 0:
+            return
+        fy = self._frog.y
+        row = self._toRow(fy)
+        last = -1
+        for pos in (row-1,row):
+            if pos >= 0 and self._spec.lanes[pos].kind == LANE_WATER:
+                (l,t,r,b) = self._tiles[pos]
+                if b <= fy <= t:
+                    if self._hasWaters(last,pos):
+                        self._checkOffscreen()
+                    self._logRide(pos,dt)
+                    last = pos
+        if self._hasWaters(last,self._spec.rows):
+            self._checkOffscreen()
+
+    def _hasWaters(self,first,last):
+        """
+        Returns True if there is a water lane strictly between the given lanes
+
+        Parameter first: The lower lane position
+        Precondition: first is an int >= -1
+
+        Parameter last: The upper lane position
+        Precondition: last is an int > first
+        """
+        waters = self._spec.waters
+        return bisect.bisect_right(waters,first) < bisect.bisect_left(waters,last)
+
+    def _checkOffscreen(self):
+        """
+        Helper method for _rideLogs that kills the frog if it left the screen
+        """
+        if self._frog.x <= 0 or self._frog.x >= self._spec.width:
+            self._frogcollision = True
+            self._animator = None
+
+    def _animateDeath(self,dt):
+        """
+        Helper method for update that advances the death animation
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is an int or a float
+        """
+        if not self._animator2 is None:
+            try:
+                self._animator2.send(dt)
+            except StopIteration:
+                self._animator2 = None
+                self._pauseGame = True
+                self._lives = max(self._lives-1,0)
+
+        elif self._frogcollision == True and self._pauseGame == False:
+            self._events.append(EVENT_SPLAT)
+            self._animator2 = self._death.deathAnimation()
+            next(self._animator2)
+
+    def _frogMovement(self,keyInput,dt):
+        """
+        Helper method for update that controls the movement of the frog
+        depending on user input
+
+        Parameter keyInput: The current key being pressed
+        Precondition: keyInput is a str
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is an int or a float
+        """
+        if not self._animator is None:
+            try:
+                self._animator.send(dt)
+            except StopIteration:
+                self._animator = None
+                self._delay = FROG_SPEED
+
+        if keyInput != 'none':
+            if self._delay <= 0:
+                if self._animator == None:
+                    self._createGenerator(keyInput)
+            else:
+                self._delay -= dt
+
+    def _createGenerator(self,keyInput):
+        """
+        Helper method for _frogMovement that creates the generator for the
+        coroutine
+
+        Parameter keyInput: The current key being pressed
+        Precondition: keyInput is a str
+        """
+        if keyInput == 'up':
+            moved = self._moveUp()
+            self._blocked = not moved
+        elif keyInput == 'down':
+            moved = self._moveDown()
+        elif keyInput == 'right':
+            moved = self._moveRight()
+        elif keyInput == 'left':
+            moved = self._moveLeft()
+        else:
+            moved = False
+
+        if moved:
+            self._events.append(EVENT_TRILL if self._trill else EVENT_CROAK)
+            self._animator = self._frog.slideAnimation(keyInput)
+            next(self._animator)
+
+    def _collidesTile(self,pos):
+        """
+        Returns True if the frog collides with the given lane
+
+        Parameter pos: The position of the lane in the level
+        Precondition: pos is a valid lane index
+        """
+        return overlaps(self._tiles[pos],self._frog.getBox())
+
+    def _findExit(self,pos):
+        """
+        Returns the position of the hedge object containing the frog, or None
+
+        Parameter pos: The position of the lane in the level
+        Precondition: pos is the index of a hedge lane
+        """
+        x = self._frog.x
+        y = self._frog.y
+        objs = self._spec.lanes[pos].objects
+        result = None
+        for item in range(len(objs)):
+            obj = objs[item]
+            if encloses(bbox(obj.x,obj.y,obj.width,obj.height,0,obj.hitbox),x,y):
+                result = item
+        return result
+
+    def _moveUp(self):
+        """
+        Helper method to move the frog forward
+        """
+        newVar = True
+        self._opening = False
+        self._frog.angle = FROG_NORTH
+        self._frog.y = self._frog.y + GRID_SIZE
+        for pos in self._spec.hedges:
+            if self._collidesTile(pos):
+                newVar = False
+                objs = self._spec.lanes[pos].objects
+                for x in range(len(objs)):
+                    obj = objs[x]
+                    box = bbox(obj.x,obj.y,obj.width,obj.height,0,obj.hitbox)
+                    if encloses(box,self._frog.x,self._frog.y):
+                        if self._checkSafeFrogs(pos):
+                            newVar = False
+                        elif obj.source == 'open.png':
+                            self._opening = True
+                            newVar = True
+                        else:
+                            if obj.source == 'exit.png':
+                                self._safeFrogs[pos].append(x)
+                            self._reachedExit = True
+                            self._trill = True
+                            newVar = True
+                if self._exitsComplete():
+                    self._gameWin = True
+        if newVar == True:
+            self._delay = FROG_SPEED
+        self._frog.y = self._frog.y - GRID_SIZE
+        return newVar
+
+    def _moveDown(self):
+        """
+        Helper method to move the frog downward
+        """
+        newVar = True
+        self._opening = False
+        self._frog.angle = FROG_SOUTH
+        self._frog.y = self._frog.y - GRID_SIZE
+        for pos in self._spec.hedges:
+            if self._collidesTile(pos):
+                objs = self._spec.lanes[pos].objects
+                for x in range(len(objs)):
+                    obj = objs[x]
+                    box = bbox(obj.x,obj.y,obj.width,obj.height,0,obj.hitbox)
+                    if encloses(box,self._frog.x,self._frog.y):
+                        if obj.source == 'open.png':
+                            self._opening = True
+                        else:
+                            newVar = False
+        if self._frog.y - GRID_SIZE > 0:
+            for pos in self._spec.hedges:
+                if self._collidesTile(pos):
+                    newVar = False
+        if self._frog.y <= 0:
+            newVar = False
+        if self._opening == True:
+            newVar = True
+        self._frog.y = self._frog.y + GRID_SIZE
+        if newVar == True:
+            self._delay = FROG_SPEED
+        return newVar
+
+    def _moveRight(self):
+        """
+        Helper method to move the frog rightward
+        """
+        newVar = True
+        self._frog.angle = FROG_EAST
+        if not (self._frog.x + GRID_SIZE < self._spec.width):
+            newVar = False
+        if self._opening == True:
+            newVar = False
+        if newVar == True:
+            self._delay = FROG_SPEED
+        return newVar
+
+    def _moveLeft(self):
+        """
+        Helper method to move the frog leftward
+        """
+        newVar = True
+        self._frog.angle = FROG_WEST
+        if not (self._frog.x - GRID_SIZE > 0):
+            newVar = False
+        if self._opening == True:
+            newVar = False
+        if newVar == True:
+            self._delay = FROG_SPEED
+        return newVar
+
+    def _checkSafeFrogs(self,pos):
+        """
+        Helper method to check if the current exit is occupied by Safe Frog
+
+        Parameter pos: The position of the hedge lane in the level
+        Precondition: pos is the index of a hedge lane
+        """
+        size = self._spec.safeSize
+        objs = self._spec.lanes[pos].objects
+        for item in self._safeFrogs[pos]:
+            obj = objs[item]
+            box = bbox(obj.x,obj.y,size[0],size[1],0,(0,0,0,0))
+            if encloses(box,self._frog.x,self._frog.y):
+                return True
+        return False
+
+    def _exitsComplete(self):
+        """
+        Helper method to determine if every exit in the level has a safe frog
+        """
+        totalExits = 0
+        totalSafeFrogs = 0
+        for pos in self._spec.hedges:
+            for obj in self._spec.lanes[pos].objects:
+                if obj.source == 'exit.png':
+                    totalExits += 1
+            totalSafeFrogs += len(self._safeFrogs[pos])
+        return totalSafeFrogs == totalExits
+
+    def _logRide(self,pos,dt):
+        """
+        Helper method the moves the frog along with the logs in one lane
+
+        The frog rides a log if its center is on the log at any time since the last
+        update, and not just where the log is now. Otherwise a log could move out from
+        under the frog in a long frame, before the frog is moved along with it.
+
+        Parameter pos: The position of the lane in the level
+        Precondition: pos is the index of a water lane
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is an int or a float
+        """
+        safe = False
+        lane = self._spec.lanes[pos]
+        width = self._spec.width
+        dist = lane.speed*dt
+        fx = self._frog.x
+        fy = self._frog.y
+        inside = encloses(self._tiles[pos],fx,fy)
+        if inside:
+            objs = lane.objects
+            positions = self._engine.getPositions(pos)
+            (ylow,yhigh,xlow,xhigh) = self._reach[pos]
+            point = (fx,fy,fx,fy)
+            for y in self._engine.getCandidates(pos,fx-xhigh-abs(dist),fx-xlow+abs(dist)):
+                obj = objs[y]
+                box = bbox(positions[y],obj.y,obj.width,obj.height,obj.angle,obj.hitbox)
+                if encloses(box,fx,fy) and self._pixelsUnder(obj,positions[y],fx,fy):
+                    ride = True
+                else:
+                    box = (box[0]-dist,box[1],box[2]-dist,box[3])
+                    first = sweep(box,point,-dist,0)
+                    ride = (not first is None and
+                            self._pixelsUnder(obj,positions[y]-dist,fx,fy,-dist,first))
+                if ride:
+                    self._frog.x = self._frog.x+dist
+                    safe = True
+        if inside and not safe:
+            self._frogcollision = True
+            self._animator = None
+        elif self._frog.x <= 0:
+            self._frogcollision = True
+            self._animator = None
+        elif self._frog.x >= width:
+            self._frogcollision = True
+            self._animator = None
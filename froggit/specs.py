@@ -0,0 +1,323 @@
+"""
+Level specification module for Froggit
+
+This module contains the compiled form of a level file. The level files are JSON
+dictionaries, and indexing them (level['lanes'][x]['speed'] and so on) every animation
+frame means hashing the same strings over and over again. Instead, a level file is
+compiled exactly once, when the level is loaded, into a LevelSpec. The LevelSpec has one
+LaneSpec for each lane and one ObjectSpec for each obstacle or exit in a lane.
+
+All of the values that the game needs every frame (pixel widths, wrap bounds, lane types,
+hitboxes, and the lists of hedge and water lanes) are computed ahead of time. The specs
+are immutable, so they can be safely shared by everything that needs them.
+"""
+from consts import *
+import os.path
+import struct
+
+# PRIMARY RULE: Specs are not allowed to access anything in any module other than
+# consts.py. In particular, they must never import game2d, so that they can be used
+# without a game window.
+
+# The folder with the image files
+IMAGE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)),'Images')
+
+# The image sizes read so far, keyed by file name
+_IMAGE_SIZES = {}
+
+
+def imageSize(name):
+    """
+    Returns the (width,height) of the given PNG file in the Images folder
+
+    Only the file header is read, so this is much faster than loading the image, and it
+    does not need a game window. The size is None if the file is not a readable PNG.
+
+    Parameter name: The image file name
+    Precondition: name is a str
+    """
+    if name in _IMAGE_SIZES:
+        return _IMAGE_SIZES[name]
+
+    size = None
+    try:
+        with open(os.path.join(IMAGE_FOLDER,name),'rb') as f:
+            header = f.read(24)
+        if header[:8] == b'\x89PNG\r\n\x1a\n' and header[12:16] == b'IHDR':
+            size = struct.unpack('>II',header[16:24])
+    except OSError:
+        pass
+    _IMAGE_SIZES[name] = size
+    return size
+
+
+class Spec(object):
+    """
+    Parent class for an immutable, compiled specification.
+
+    The attributes of a specification are computed in the initializer and can never be
+    changed afterwards. Attempting to assign to an attribute raises an AttributeError.
+    Subclasses list their attributes in __slots__ and assign them with _freeze.
+    """
+    __slots__ = ()
+
+    def __setattr__(self,name,value):
+        """
+        Prevents any assignment to the attributes of this specification.
+        """
+        raise AttributeError('%s is immutable' % self.__class__.__name__)
+
+    def __delattr__(self,name):
+        """
+        Prevents any deletion of the attributes of this specification.
+        """
+        raise AttributeError('%s is immutable' % self.__class__.__name__)
+
+    def _freeze(self,**values):
+        """
+        Helper method for the initializers that assigns the given attributes
+
+        Parameter values: The attribute values, keyed by attribute name
+        Precondition: values only has keys in __slots__
+        """
+        for key in values:
+            object.__setattr__(self,key,values[key])
+
+
+class ObjectSpec(Spec):
+    """
+    A class representing a single obstacle or exit in a lane.
+
+    Attribute kind: The object type from the level file (e.g. 'car1')
+    Invariant: kind is a str
+
+    Attribute source: The image file for the object
+    Invariant: source is a str
+
+    Attribute x: The initial x coordinate of the object center
+    Invariant: x is an int or float
+
+    Attribute y: The y coordinate of the object center
+    Invariant: y is an int or float
+
+    Attribute angle: The angle of the object (180 for obstacles moving left)
+    Invariant: angle is 0 or 180
+
+    Attribute hitbox: The hitbox offsets of the object
+    Invariant: hitbox is a 4-element tuple of numbers
+
+    Attribute width: The width of the object image in pixels
+    Invariant: width is an int > 0
+
+    Attribute height: The height of the object image in pixels
+    Invariant: height is an int > 0
+    """
+    __slots__ = ('kind','source','x','y','angle','hitbox','width','height')
+
+    def __init__(self,data,row,speed,hitboxes):
+        """
+        Compiles the specification for a single object
+
+        Parameter data: The object entry in the level file
+        Precondition: data is a dictionary with keys 'type' and 'position'
+
+        Parameter row: The lane index from the bottom
+        Precondition: row is an int >= 0
+
+        Parameter speed: The speed of the lane (0 if it does not move)
+        Precondition: speed is an int or float
+
+        Parameter hitboxes: The preloaded json file that contains the hitboxes
+        for the objects in the game
+        Precondition: hitboxes is a preloaded json file
+        """
+        kind = data['type']
+        info = hitboxes['images'][kind]
+        size = imageSize(kind+'.png')
+        if size is None:
+            size = info['size']
+        self._freeze(kind=kind,source=kind+'.png',
+                     x=(data['position'] * GRID_SIZE) + (GRID_SIZE // 2),
+                     y=(row * GRID_SIZE) + (GRID_SIZE // 2),
+                     angle=180 if speed < 0 else 0,
+                     hitbox=tuple(info['hitbox']),
+                     width=size[0],height=size[1])
+
+
+class LaneSpec(Spec):
+    """
+    A class representing a single compiled lane.
+
+    Objects moving right wrap to the left buffer once they pass the right buffer, while
+    objects moving left wrap to the right buffer once they pass the left bound. The
+    left bound is always 4 grid squares offscreen, to make room for the longest trucks.
+
+    Attribute index: The lane position from the bottom
+    Invariant: index is an int >= 0
+
+    Attribute kind: The lane type
+    Invariant: kind is one of LANE_GRASS, LANE_ROAD, LANE_WATER, or LANE_HEDGE
+
+    Attribute source: The image file for the lane background
+    Invariant: source is a str
+
+    Attribute speed: The speed of the objects in this lane (0 if they do not move)
+    Invariant: speed is an int or float
+
+    Attribute moving: Whether the objects in this lane move
+    Invariant: moving is a bool
+
+    Attribute width: The width of the lane in pixels
+    Invariant: width is an int > 0
+
+    Attribute bottom: The y coordinate of the bottom edge of the lane
+    Invariant: bottom is an int >= 0
+
+    Attribute top: The y coordinate of the top edge of the lane
+    Invariant: top is an int > bottom
+
+    Attribute wrapLeft: The x coordinate of the left wrap bound
+    Invariant: wrapLeft is an int <= 0
+
+    Attribute wrapRight: The x coordinate of the right wrap bound
+    Invariant: wrapRight is an int >= width
+
+    Attribute objects: The objects in this lane
+    Invariant: objects is a (possibly empty) tuple of ObjectSpec
+    """
+    __slots__ = ('index','kind','source','speed','moving','width','bottom','top',
+                 'wrapLeft','wrapRight','objects')
+
+    def __init__(self,data,row,width,offscreen,hitboxes):
+        """
+        Compiles the specification for a single lane
+
+        Parameter data: The lane entry in the level file
+        Precondition: data is a dictionary with the key 'type'
+
+        Parameter row: The lane index from the bottom
+        Precondition: row is an int >= 0
+
+        Parameter width: The width of the level in pixels
+        Precondition: width is an int > 0
+
+        Parameter offscreen: The number of grid squares that objects travel offscreen
+        Precondition: offscreen is an int >= 0
+
+        Parameter hitboxes: The preloaded json file that contains the hitboxes
+        for the objects in the game
+        Precondition: hitboxes is a preloaded json file
+        """
+        name = data['type']
+        kind = LANE_TYPES[name] if name in LANE_TYPES else LANE_HEDGE
+        moving = kind == LANE_ROAD or kind == LANE_WATER
+        speed = data['speed'] if moving else 0
+
+        objects = ()
+        if kind != LANE_GRASS:
+            objects = tuple(ObjectSpec(item,row,speed,hitboxes) for item in data['objects'])
+
+        if speed < 0:
+            wrapLeft = -4 * GRID_SIZE
+        else:
+            wrapLeft = -offscreen * GRID_SIZE
+        self._freeze(index=row,kind=kind,source=name+'.png',speed=speed,moving=moving,
+                     width=width,bottom=row*GRID_SIZE,top=(row+1)*GRID_SIZE,
+                     wrapLeft=wrapLeft,wrapRight=width+offscreen*GRID_SIZE,
+                     objects=objects)
+
+
+class LevelSpec(Spec):
+    """
+    A class representing a compiled level file.
+
+    Attribute columns: The number of grid squares across the level
+    Invariant: columns is an int > 0
+
+    Attribute rows: The number of lanes in the level
+    Invariant: rows is an int > 0
+
+    Attribute width: The width of the level in pixels
+    Invariant: width is an int > 0
+
+    Attribute height: The height of the lanes in pixels (without the lives meter)
+    Invariant: height is an int > 0
+
+    Attribute start: The starting grid square of the frog
+    Invariant: start is a 2-element tuple of ints
+
+    Attribute startX: The starting x coordinate of the frog center
+    Invariant: startX is an int or float
+
+    Attribute startY: The starting y coordinate of the frog center
+    Invariant: startY is an int or float
+
+    Attribute offscreen: The number of grid squares that objects travel offscreen
+    Invariant: offscreen is an int >= 0
+
+    Attribute lanes: The lanes of the level, from the bottom up
+    Invariant: lanes is a tuple of LaneSpec of length rows
+
+    Attribute roads: The positions of the road lanes
+    Invariant: roads is a tuple of ints
+
+    Attribute waters: The positions of the water lanes
+    Invariant: waters is a tuple of ints
+
+    Attribute hedges: The positions of the hedge lanes
+    Invariant: hedges is a tuple of ints
+
+    Attribute moving: The positions of the lanes whose objects move
+    Invariant: moving is a tuple of ints
+
+    Attribute frogHitboxes: The hitboxes of the frog, one for each animation frame
+    Invariant: frogHitboxes is a tuple of 4-element tuples of numbers
+
+    Attribute frogSize: The size of a single frame of the frog sprite
+    Invariant: frogSize is a 2-element tuple of numbers > 0
+
+    Attribute safeSize: The size of a safe frog image
+    Invariant: safeSize is a 2-element tuple of ints > 0
+    """
+    __slots__ = ('columns','rows','width','height','start','startX','startY','offscreen',
+                 'lanes','roads','waters','hedges','moving','frogHitboxes','frogSize',
+                 'safeSize')
+
+    def __init__(self,level,hitboxes):
+        """
+        Compiles a level file into a level specification
+
+        Parameter level: The loaded json file that contains infromation for the level
+        Precondition: level is a preloaded json file
+
+        Parameter hitboxes: The preloaded json file that contains the hitboxes
+        for the objects in the game
+        Precondition: hitboxes is a preloaded json file
+        """
+        columns = level['size'][0]
+        rows = level['size'][1]
+        width = columns * GRID_SIZE
+        offscreen = level['offscreen']
+
+        lanes = tuple(LaneSpec(level['lanes'][x],x,width,offscreen,hitboxes)
+                      for x in range(rows))
+        start = tuple(level['start'])
+        frog = hitboxes['sprites'][FROG_KEY]
+        sheet = imageSize(FROG_SPRITE+'.png')
+        if sheet is None:
+            sheet = (frog['size'][0]*frog['format'][1],frog['size'][1]*frog['format'][0])
+        safe = imageSize(FROG_SAFE)
+        if safe is None:
+            safe = (GRID_SIZE,GRID_SIZE)
+        self._freeze(columns=columns,rows=rows,width=width,height=rows*GRID_SIZE,
+                     start=start,
+                     startX=start[0] * GRID_SIZE + (GRID_SIZE // 2),
+                     startY=start[1] * GRID_SIZE + (GRID_SIZE // 2),
+                     offscreen=offscreen,lanes=lanes,
+                     roads=tuple(x for x in range(rows) if lanes[x].kind == LANE_ROAD),
+                     waters=tuple(x for x in range(rows) if lanes[x].kind == LANE_WATER),
+                     hedges=tuple(x for x in range(rows) if lanes[x].kind == LANE_HEDGE),
+                     moving=tuple(x for x in range(rows) if lanes[x].moving),
+                     frogHitboxes=tuple(map(tuple,frog['hitboxes'])),
+                     frogSize=(sheet[0]/frog['format'][1],sheet[1]/frog['format'][0]),
+                     safeSize=safe)
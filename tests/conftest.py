@@ -0,0 +1,48 @@
+"""
+Shared configuration for the Froggit tests
+
+The modules of Froggit are not a package. The game is run from the froggit folder, and
+the modules import each other by name, so that folder is put on the path. The module
+consts reads (and removes) flags from sys.argv when it is imported, so it is imported
+here with a clean command line, before pytest's own arguments can confuse it.
+
+Tests that need Kivy skip themselves when it is not installed.
+"""
+import os
+import sys
+import json
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FROGGIT = os.path.join(ROOT,'froggit')
+sys.path.insert(0,FROGGIT)
+os.environ.setdefault('KIVY_NO_ARGS','1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG','1')
+
+_argv = sys.argv
+sys.argv = ['froggit']
+try:
+    import consts
+finally:
+    sys.argv = _argv
+
+
+def readJSON(name):
+    """
+    Returns the parsed JSON file with the given name in the JSON folder
+
+    Parameter name: The file name
+    Precondition: name is a str
+    """
+    with open(os.path.join(FROGGIT,'JSON',name)) as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def level():
+    """
+    Returns a function that compiles the level file with the given name
+    """
+    import specs
+    hitboxes = readJSON(consts.OBJECT_DATA)
+    return lambda name: specs.LevelSpec(readJSON(name),hitboxes)
@@ -0,0 +1,115 @@
+"""
+Tests for the 2D affine transforms in introcs/geom/affine.py
+
+Every transform is checked against the same transform built as a Matrix. A Matrix
+stores 32-bit floats, so the two only agree up to float32 rounding.
+"""
+import random
+import numpy
+import pytest
+from introcs import Matrix, Affine2, Point2, Vector2, Point3
+
+
+def _close(affine,matrix):
+    """
+    Returns True if the affine transform and the matrix are the same transform
+
+    Parameter affine: The affine transform
+    Precondition: affine is an Affine2 object
+
+    Parameter matrix: The matrix
+    Precondition: matrix is a Matrix object of a transform of the plane
+    """
+    d = matrix._data
+    expected = [d[0,0],d[0,1],d[0,3],d[1,0],d[1,1],d[1,3]]
+    return numpy.allclose(affine.list(),expected,rtol=1e-5,atol=1e-4)
+
+
+def _pair(seed,length=6):
+    """
+    Returns a seeded random transform, built both as an Affine2 and as a Matrix
+
+    Parameter seed: The seed of the operations
+    Precondition: seed is an int
+
+    Parameter length: The number of operations
+    Precondition: length is an int >= 0
+    """
+    script = random.Random(seed)
+    affine = Affine2()
+    matrix = Matrix()
+    for _ in range(length):
+        op = script.choice(['translate','rotate','scale'])
+        if op == 'translate':
+            args = (script.uniform(-50,50),script.uniform(-50,50))
+        elif op == 'rotate':
+            args = (script.choice([90,180,-90,script.uniform(-360,360)]),)
+        else:
+            args = (script.uniform(0.5,2),script.uniform(0.5,2))
+        getattr(affine,op)(*args)
+        getattr(matrix,op)(*args)
+    return (affine,matrix)
+
+
+def test_constructors():
+    assert _close(Affine2(),Matrix())
+    assert _close(Affine2.CreateTranslation(3,-4),Matrix.CreateTranslation(3,-4))
+    assert _close(Affine2.CreateRotation(37),Matrix.CreateRotation(37))
+    assert _close(Affine2.CreateScale(2,0.5),Matrix.CreateScale(2,0.5))
+    assert Affine2.CreateRotation(90).list() == [0,-1,0,1,0,0]
+
+
+@pytest.mark.parametrize('seed',range(10))
+def test_operations(seed):
+    (affine,matrix) = _pair(seed)
+    assert _close(affine,matrix)
+    assert Affine2.CreateFromMatrix(matrix) == affine
+    assert _close(affine,affine.toMatrix())
+
+
+@pytest.mark.parametrize('seed',range(10))
+def test_mul(seed):
+    (p,pm) = _pair(seed)
+    (q,qm) = _pair(seed+100)
+    assert _close(p*q,pm*qm)
+    assert isinstance(p*qm,Matrix) and _close(p*q,p*qm)
+    assert _close(p*q,pm*q)
+
+    p *= q
+    pm *= qm
+    assert _close(p,pm)
+
+
+@pytest.mark.parametrize('seed',range(10))
+def test_inverse(seed):
+    (affine,matrix) = _pair(seed)
+    assert _close(affine.inverse(),matrix.inverse())
+    assert affine*affine.inverse() == Affine2()
+    copy = affine.copy()
+    assert copy.invert() is copy and copy == affine.inverse()
+    with pytest.raises(AssertionError):
+        Affine2.CreateScale(0,1).inverse()
+
+
+@pytest.mark.parametrize('seed',range(10))
+def test_transform(seed):
+    (affine,matrix) = _pair(seed)
+    for value in [Point2(3,-7),Vector2(0.5,2),Point3(1,2,3)]:
+        result = affine.transform(value)
+        assert type(result) == type(value)
+        assert numpy.allclose(result.list(),matrix.transform(value).list(),atol=1e-3)
+    assert affine.transform(Point3(1,2,3)).z == 3
+
+
+@pytest.mark.parametrize('seed',range(10))
+def test_transform_points(seed):
+    (affine,matrix) = _pair(seed)
+    points = numpy.random.default_rng(seed).uniform(-100,100,(32,2))
+    result = affine.transform_points(points)
+    expected = [affine.transform(Point2(float(x),float(y))).list() for (x,y) in points]
+    assert numpy.allclose(result,expected)
+
+    # Integer points become floats, and out may be the points themselves
+    assert affine.transform_points([[1,2]]).dtype == numpy.float64
+    assert affine.transform_points(points,out=points) is points
+    assert numpy.allclose(points,expected)
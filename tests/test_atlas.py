@@ -0,0 +1,123 @@
+"""
+Tests for the texture atlases in game2d/atlas.py
+
+The packer is checked on random sizes, and the atlases are built from images that the
+tests write to a temporary folder.
+"""
+import os
+import random
+import pytest
+
+pytest.importorskip('kivy')
+numpy = pytest.importorskip('numpy')
+from game2d import atlas
+
+
+def _power(value):
+    """
+    Returns True if value is a power of two
+    """
+    return value > 0 and value & (value-1) == 0
+
+
+def _check(layout,sizes,size,padding):
+    """
+    Asserts that the layout places every rectangle once, without overlaps
+
+    Each rectangle is tested with its padding, which must stay inside the page.
+    """
+    placed = []
+    for (width,height,rects) in layout:
+        assert _power(width) and _power(height)
+        edge = padding//2
+        boxes = []
+        for (name,x,y) in rects:
+            (w,h) = sizes[name]
+            box = (x-edge,y-edge,x+w+padding-edge,y+h+padding-edge)
+            assert box[0] >= 0 and box[1] >= 0
+            assert box[2] <= width and box[3] <= height
+            for other in boxes:
+                assert box[2] <= other[0] or other[2] <= box[0] or \
+                       box[3] <= other[1] or other[3] <= box[1]
+            boxes.append(box)
+            placed.append(name)
+        if len(rects) > 1:
+            assert width <= size and height <= size
+    assert sorted(placed) == sorted(sizes)
+
+
+@pytest.mark.parametrize('seed',range(5))
+@pytest.mark.parametrize('padding',[0,2,3])
+def test_pack_rects(seed,padding):
+    script = random.Random(seed)
+    sizes = {'image%d' % n : (script.randrange(1,120),script.randrange(1,120))
+             for n in range(80)}
+    layout = atlas.pack_rects(sizes,256,padding)
+    assert len(layout) > 1
+    _check(layout,sizes,256,padding)
+
+
+def test_pack_large():
+    sizes = {'big':(300,40),'tall':(10,256),'small':(20,20),'tiny':(5,5)}
+    layout = atlas.pack_rects(sizes,256,2)
+    _check(layout,sizes,256,2)
+    pages = {rects[0][0] : (width,height,len(rects)) for (width,height,rects) in layout}
+    # Both need more than a page with their padding, so each gets its own
+    assert pages['tall'] == (16,512,1)
+    assert pages['big'] == (512,64,1)
+    assert len(layout) == 3
+
+
+def _image(seed,width,height):
+    """
+    Returns seeded random RGBA pixels of the given size
+    """
+    rng = numpy.random.default_rng(seed)
+    return rng.integers(0,256,(height,width,4),dtype=numpy.uint8)
+
+
+def test_png_round_trip(tmp_path):
+    pixels = _image(0,23,17)
+    path = str(tmp_path/'image.png')
+    atlas.write_png(path,pixels)
+    assert (atlas.read_image(path) == pixels).all()
+
+
+def test_build_atlas(tmp_path):
+    images = {'a.png':_image(1,40,30),'b.png':_image(2,12,50),'c.png':_image(3,64,8)}
+    for name in images:
+        atlas.write_png(str(tmp_path/name),images[name])
+    path = str(tmp_path/'out'/'objects.atlas')
+    sources = sorted(images)
+
+    assert not atlas.is_fresh(path,sources,str(tmp_path))
+    assert atlas.build_atlas(path,sources,str(tmp_path),64,2)
+    assert atlas.is_fresh(path,sources,str(tmp_path))
+
+    # Every image is in a page, measured from the bottom left corner
+    regions = atlas.read_atlas(path)
+    assert sorted(regions) == sources
+    for name in sources:
+        (page,x,y,w,h) = regions[name]
+        pixels = atlas.read_image(os.path.join(str(tmp_path/'out'),page))
+        top = pixels.shape[0]-y-h
+        assert (pixels[top:top+h,x:x+w] == images[name]).all()
+
+    # Nothing changed, so nothing is built
+    stamp = os.stat(path).st_mtime_ns
+    assert not atlas.build_atlas(path,sources,str(tmp_path),64,2)
+    assert os.stat(path).st_mtime_ns == stamp
+
+    # A new image, a different page size, or a new source all rebuild
+    images['b.png'] = _image(4,12,50)
+    atlas.write_png(str(tmp_path/'b.png'),images['b.png'])
+    assert not atlas.is_fresh(path,sources,str(tmp_path))
+    assert atlas.build_atlas(path,sources,str(tmp_path),64,2)
+    (page,x,y,w,h) = atlas.read_atlas(path)['b.png']
+    pixels = atlas.read_image(os.path.join(str(tmp_path/'out'),page))
+    top = pixels.shape[0]-y-h
+    assert (pixels[top:top+h,x:x+w] == images['b.png']).all()
+
+    assert atlas.build_atlas(path,sources,str(tmp_path),128,2)
+    assert not atlas.build_atlas(path,sources,str(tmp_path),128,2)
+    assert not atlas.is_fresh(path,sources[:2],str(tmp_path))
@@ -0,0 +1,139 @@
+"""
+Tests for the collision world in game2d/collision.py
+
+Every query of a CollisionWorld is checked against testing every object by hand.
+"""
+import random
+import pytest
+
+pytest.importorskip('kivy')
+from game2d import GRectangle, CollisionWorld
+from game2d.collision import _normalize, _overlaps
+
+
+def _scene(seed,count=120):
+    """
+    Returns a seeded list of (object,layer,mask) triples
+
+    Most objects are turned by a multiple of 90 degrees, but some are not.
+
+    Parameter seed: The seed of the scene
+    Precondition: seed is an int
+
+    Parameter count: The number of objects
+    Precondition: count is an int >= 0
+    """
+    script = random.Random(seed)
+    result = []
+    for _ in range(count):
+        angle = script.choice([0,0,90,180,270,script.uniform(0,360)])
+        obj = GRectangle(x=script.uniform(0,400),y=script.uniform(0,400),angle=angle,
+                         width=script.uniform(2,60),height=script.uniform(2,60))
+        result.append((obj,script.choice([1,2,4]),script.choice([7,7,3,6,1])))
+    return result
+
+
+def _world(scene,size):
+    """
+    Returns a collision world with the objects of the scene
+
+    Parameter scene: The objects, with their layers and masks
+    Precondition: scene is a list of (GObject,int,int) triples
+
+    Parameter size: The cell size
+    Precondition: size is a number > 0
+    """
+    world = CollisionWorld(size)
+    for (obj,layer,mask) in scene:
+        world.add(obj,layer,mask)
+    return world
+
+
+def _collide(a,b):
+    """
+    Returns True if the objects collide, the way a CollisionWorld decides it
+
+    Parameter a: The first object
+    Precondition: a is a GObject
+
+    Parameter b: The second object
+    Precondition: b is a GObject
+    """
+    return (_overlaps(_normalize(a._bbox()),_normalize(b._bbox())) and a.collides(b))
+
+
+def _pairs(scene):
+    """
+    Returns the colliding pairs of the scene, by testing every pair
+
+    Parameter scene: The objects, with their layers and masks
+    Precondition: scene is a list of (GObject,int,int) triples
+    """
+    result = []
+    for pos in range(len(scene)):
+        (a,alayer,amask) = scene[pos]
+        for (b,blayer,bmask) in scene[pos+1:]:
+            if alayer & bmask and blayer & amask and _collide(a,b):
+                result.append((a,b))
+    return result
+
+
+@pytest.mark.parametrize('seed',range(4))
+@pytest.mark.parametrize('size',[16,64,1000])
+def test_pairs(seed,size):
+    scene = _scene(seed)
+    world = _world(scene,size)
+    expected = _pairs(scene)
+    assert expected
+    assert world.pairs() == expected
+
+    # Move some objects, and remove others
+    script = random.Random(seed)
+    for (obj,layer,mask) in script.sample(scene,40):
+        obj.x += script.uniform(-80,80)
+        obj.angle = script.choice([0,90,obj.angle+10])
+    for item in script.sample(scene,20):
+        world.remove(item[0])
+        scene.remove(item)
+    world.update()
+    assert len(world) == len(scene)
+    assert world.pairs() == _pairs(scene)
+
+
+@pytest.mark.parametrize('seed',range(4))
+def test_query(seed):
+    scene = _scene(seed)
+    world = _world(scene,32)
+    objects = [item[0] for item in scene]
+    for (obj,layer,mask) in scene[:30]:
+        expected = [other for (other,olayer,omask) in scene
+                    if not other is obj and olayer & mask and _collide(obj,other)]
+        assert world.query(obj) == expected
+
+    probe = GRectangle(x=200,y=200,width=150,height=90,angle=90)
+    assert world.query(probe,2) == [other for (other,olayer,omask) in scene
+                                    if olayer & 2 and _collide(probe,other)]
+
+    script = random.Random(seed)
+    for _ in range(30):
+        (x,y) = (script.uniform(0,400),script.uniform(0,400))
+        assert world.query_point(x,y) == [obj for obj in objects if obj.contains((x,y))]
+
+        box = (x,y,x+script.uniform(0,100),y+script.uniform(0,100))
+        assert world.query_rect(*box,mask=5) == [obj for (obj,layer,mask) in scene
+                                                if layer & 5 and
+                                                _overlaps(_normalize(obj._bbox()),box)]
+
+
+def test_membership():
+    scene = _scene(0,3)
+    world = _world(scene,64)
+    (obj,layer,mask) = scene[0]
+    assert obj in world and len(world) == 3
+
+    world.add(obj,8,8)
+    assert len(world) == 3
+    assert world.query_rect(-1000,-1000,1000,1000,8) == [obj]
+
+    world.clear()
+    assert not obj in world and world.pairs() == []
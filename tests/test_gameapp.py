@@ -0,0 +1,279 @@
+"""
+Tests for the resource caches of GameApp in game2d/app.py
+
+The caches are class attributes, so every test gives GameApp fresh ones (and its own
+resource folders) with monkeypatch.  Rendering text needs an OpenGL context, so the
+text tests render with a stand-in.
+"""
+import os
+import json
+import types
+from collections import OrderedDict
+import pytest
+
+pytest.importorskip('kivy')
+from game2d.app import GameApp
+
+
+@pytest.fixture
+def jsons(tmp_path,monkeypatch):
+    """
+    Returns a folder of JSON files that GameApp loads from, with an empty JSON cache
+    """
+    monkeypatch.setattr(GameApp,'json',str(tmp_path),raising=False)
+    monkeypatch.setattr(GameApp,'JSON_CACHE',{})
+    return tmp_path
+
+
+def test_load_json(jsons):
+    path = jsons/'level.json'
+    path.write_text(json.dumps({'lanes':[1,2]}))
+    data = GameApp.load_json('level.json')
+    assert data == {'lanes':[1,2]}
+    assert GameApp.load_json('level.json') is data
+    assert GameApp.load_json('nothing.json') is None
+
+    # A different size reloads the file
+    path.write_text(json.dumps({'lanes':[1,2,3]}))
+    assert GameApp.load_json('level.json') == {'lanes':[1,2,3]}
+
+    # So does a newer modification time, even with the same size
+    data = GameApp.load_json('level.json')
+    path.write_text(json.dumps({'lanes':[4,5,6]}))
+    stats = os.stat(path)
+    os.utime(path,ns=(stats.st_atime_ns,stats.st_mtime_ns+10**9))
+    assert GameApp.load_json('level.json') == {'lanes':[4,5,6]}
+
+    # A file that is not JSON is not cached
+    (jsons/'broken.json').write_text('{')
+    assert GameApp.load_json('broken.json') is None
+    assert not 'broken.json' in GameApp.JSON_CACHE
+
+
+def test_unload_json(jsons):
+    (jsons/'a.json').write_text('[1]')
+    (jsons/'b.json').write_text('[2]')
+    data = GameApp.load_json('a.json')
+    GameApp.load_json('b.json')
+    assert GameApp.unload_json('a.json') is data
+    assert GameApp.unload_json('a.json') is None
+    assert list(GameApp.JSON_CACHE) == ['b.json']
+    assert not GameApp.load_json('a.json') is data
+
+    assert GameApp.unload_json() is None
+    assert GameApp.JSON_CACHE == {}
+
+
+class _Label(object):
+    """
+    A stand-in for the Kivy text renderer, which needs an OpenGL context
+
+    Every rendered text is recorded in the class attribute RENDERED.
+    """
+    RENDERED = []
+
+    def __init__(self,**options):
+        self.options = options
+
+    def refresh(self):
+        self.texture = types.SimpleNamespace(size=(10*len(self.options['text']),20),
+                                             options=self.options)
+        _Label.RENDERED.append(self.options['text'])
+
+
+@pytest.fixture
+def texts(monkeypatch):
+    """
+    Returns the list of rendered texts, with an empty text cache of size 3
+    """
+    import kivy.core.text
+    monkeypatch.setattr(kivy.core.text,'Label',_Label)
+    monkeypatch.setattr(_Label,'RENDERED',[])
+    monkeypatch.setattr(GameApp,'TEXT_CACHE',OrderedDict())
+    monkeypatch.setattr(GameApp,'TEXT_STATS',{'hits':0, 'misses':0, 'evictions':0})
+    monkeypatch.setattr(GameApp,'TEXT_CACHE_SIZE',3)
+    return _Label.RENDERED
+
+
+def test_load_text(texts):
+    options = ('SCORE','Roboto',24,False,(1,1,1,1),'center','middle')
+    texture = GameApp.load_text(*options)
+    assert texture.options['text'] == 'SCORE' and texture.options['color'] == (1,1,1,1)
+    # The color may be a list, as it is the same key
+    assert GameApp.load_text(*options[:4],[1,1,1,1],*options[5:]) is texture
+    assert texts == ['SCORE']
+    assert GameApp.text_cache_stats() == {'hits':1,'misses':1,'evictions':0,
+                                          'size':1,'capacity':3}
+
+    # A change to any one option is a different texture
+    changes = ['LIVES','Arcade',32,True,(1,0,0,1),'left','top']
+    for pos in range(len(options)):
+        GameApp.clear_text_cache()
+        GameApp.load_text(*options)
+        changed = options[:pos]+(changes[pos],)+options[pos+1:]
+        assert not GameApp.load_text(*changed) is texture
+        assert GameApp.text_cache_stats()['misses'] == 2
+        assert GameApp.text_cache_stats()['hits'] == 0
+        assert len(GameApp.TEXT_CACHE) == 2
+
+
+def test_text_eviction(texts):
+    style = ('Roboto',24,False,(1,1,1,1),'center','middle')
+    first = GameApp.load_text('A',*style)
+    GameApp.load_text('B',*style)
+    GameApp.load_text('C',*style)
+    # Using A again makes B the least recently used
+    assert GameApp.load_text('A',*style) is first
+    GameApp.load_text('D',*style)
+    assert [key[0] for key in GameApp.TEXT_CACHE] == ['C','A','D']
+    stats = GameApp.text_cache_stats()
+    assert (stats['hits'],stats['misses'],stats['evictions']) == (1,4,1)
+
+    GameApp.load_text('B',*style)
+    GameApp.load_text('E',*style)
+    assert [key[0] for key in GameApp.TEXT_CACHE] == ['D','B','E']
+    assert GameApp.text_cache_stats()['evictions'] == 3
+    assert texts == ['A','B','C','D','B','E']
+
+
+def test_shared_labels(texts,monkeypatch):
+    from kivy.graphics import Rectangle
+    from game2d import grectangle, GLabel
+    # Drawing the stand-in texture would need an OpenGL context
+    monkeypatch.setattr(grectangle,'Rectangle',
+                        lambda texture=None, **keywords: Rectangle(**keywords))
+    labels = [GLabel(text='GAME OVER',font_size=30,linecolor='red') for _ in range(2)]
+    for label in labels:
+        label._validate()
+    assert labels[0]._texture is labels[1]._texture
+    assert texts == ['GAME OVER']
+    assert GameApp.text_cache_stats()['hits'] == 1
+    assert labels[0].width == 90
+
+    labels[1].bold = True
+    labels[1]._validate()
+    assert not labels[0]._texture is labels[1]._texture
+    assert texts == ['GAME OVER','GAME OVER']
+
+
+class _Owner(object):
+    """
+    An object that holds textures (any object that can be weakly referenced)
+    """
+    pass
+
+
+class _Page(object):
+    """
+    A stand-in for an atlas page, whose regions are also stand-ins
+    """
+    def get_region(self,x,y,width,height):
+        return types.SimpleNamespace(page=self,region=(x,y,width,height))
+
+
+@pytest.fixture
+def textures(tmp_path,monkeypatch):
+    """
+    Returns a folder of image files, with an empty texture cache of 100 bytes
+
+    Textures need an OpenGL context, so the tests add stand-ins to the cache with
+    _cache_texture instead of loading the files.
+    """
+    for name in ['a.png','b.png','c.png','d.png']:
+        (tmp_path/name).write_bytes(b'')
+    monkeypatch.setattr(GameApp,'images',str(tmp_path),raising=False)
+    monkeypatch.setattr(GameApp,'TEXTURE_CACHE',OrderedDict())
+    monkeypatch.setattr(GameApp,'TEXTURE_SIZES',{})
+    monkeypatch.setattr(GameApp,'TEXTURE_RESIDENT',0)
+    monkeypatch.setattr(GameApp,'TEXTURE_REFS',{})
+    monkeypatch.setattr(GameApp,'TEXTURE_STATS',{'hits':0, 'misses':0, 'evictions':0})
+    monkeypatch.setattr(GameApp,'TEXTURE_BUDGET',100)
+    monkeypatch.setattr(GameApp,'ATLAS_INDEX',{})
+    monkeypatch.setattr(GameApp,'FRAME_CACHE',{})
+    return tmp_path
+
+
+def test_texture_lru(textures):
+    a = object()
+    GameApp._cache_texture('a.png',a,40)
+    GameApp._cache_texture('b.png',object(),40)
+    # Using a makes b the least recently used
+    assert GameApp.load_texture('a.png') is a
+    GameApp._cache_texture('c.png',object(),40)
+    assert list(GameApp.TEXTURE_CACHE) == ['a.png','c.png']
+    GameApp._cache_texture('d.png',object(),30)
+    assert list(GameApp.TEXTURE_CACHE) == ['c.png','d.png']
+    assert GameApp.texture_stats() == {'hits':1,'misses':4,'evictions':2,'resident':70,
+                                       'budget':100,'count':2,'held':0}
+
+    # A texture bigger than the budget is kept until the next one is loaded
+    GameApp._cache_texture('a.png',object(),150)
+    assert list(GameApp.TEXTURE_CACHE) == ['a.png']
+    GameApp._cache_texture('b.png',object(),10)
+    assert list(GameApp.TEXTURE_CACHE) == ['b.png']
+    assert GameApp.TEXTURE_RESIDENT == 10
+    assert GameApp.texture_stats()['evictions'] == 5
+
+    GameApp.unload_texture('b.png')
+    assert GameApp.texture_stats()['resident'] == 0
+
+
+def test_held_textures(textures):
+    owner = _Owner()
+    GameApp.hold_texture(owner,'a.png')
+    GameApp._cache_texture('a.png',object(),40)
+    GameApp._cache_texture('b.png',object(),40)
+    GameApp._cache_texture('c.png',object(),40)
+    assert list(GameApp.TEXTURE_CACHE) == ['a.png','c.png']
+
+    # A page stays as long as one of its regions is held
+    GameApp.ATLAS_INDEX['d.png'] = ('objects','atlas/page0.png',0,0,8,8)
+    GameApp.ATLAS_INDEX['b.png'] = ('objects','atlas/page0.png',8,0,8,8)
+    (textures/'atlas').mkdir()
+    (textures/'atlas'/'page0.png').write_bytes(b'')
+    GameApp.unload_texture('c.png')
+    GameApp._cache_texture('atlas/page0.png',_Page(),50)
+    release = GameApp.hold_texture(owner,'d.png')
+    region = GameApp.load_texture('d.png')
+    assert region.region == (0,0,8,8) and GameApp.load_texture('b.png').region[0] == 8
+    assert GameApp.TEXTURE_RESIDENT == 90
+    GameApp._cache_texture('c.png',object(),40)
+    assert sorted(GameApp.TEXTURE_CACHE) == ['a.png','atlas/page0.png','b.png','c.png',
+                                             'd.png']
+    assert GameApp.texture_stats()['evictions'] == 1
+    assert GameApp.texture_stats()['held'] == 2
+    assert GameApp.texture_stats()['resident'] == 130
+
+    # Evicting the page evicts its regions too
+    release()
+    assert list(GameApp.TEXTURE_CACHE) == ['a.png','c.png']
+    assert GameApp.texture_stats()['evictions'] == 4
+    assert GameApp.texture_stats()['resident'] == 80
+
+
+def test_release_textures(textures):
+    import gc
+    owner = _Owner()
+    other = _Owner()
+    release = GameApp.hold_texture(owner,'a.png')
+    GameApp.hold_texture(other,'b.png')
+    GameApp.hold_texture(other,'b.png')
+    GameApp._cache_texture('a.png',object(),60)
+    GameApp._cache_texture('b.png',object(),60)
+    assert GameApp.TEXTURE_RESIDENT == 120
+    assert GameApp.TEXTURE_REFS == {'a.png':1,'b.png':2}
+
+    # Releasing the hold evicts the texture, as the cache is over its budget
+    release()
+    release()
+    assert list(GameApp.TEXTURE_CACHE) == ['b.png']
+    assert GameApp.TEXTURE_REFS == {'b.png':2}
+    assert GameApp.texture_stats()['evictions'] == 1
+
+    # So does collecting the owner, which releases all of its holds
+    del other
+    gc.collect()
+    assert GameApp.TEXTURE_REFS == {}
+    GameApp._cache_texture('c.png',object(),60)
+    assert list(GameApp.TEXTURE_CACHE) == ['c.png']
+    assert GameApp.texture_stats()['evictions'] == 2
@@ -0,0 +1,105 @@
+"""
+Tests for the scrolling camera in game2d/gcamera.py
+"""
+import types
+import pytest
+
+pytest.importorskip('kivy')
+from introcs import Point2
+from game2d import GCamera, GRectangle
+from game2d.gview import GView
+
+
+def test_defaults():
+    camera = GCamera(width=800,height=600)
+    assert camera.visible_rect() == (0,0,800,600)
+    assert (camera.left,camera.bottom,camera.right,camera.top) == (0,0,800,600)
+    # The scroll undoes the center of the camera
+    camera.look_at(1000,-200)
+    assert camera._translate.xy == (400-1000,300+200)
+    with pytest.raises(ValueError):
+        GCamera(width=800)
+
+
+def test_bounds():
+    camera = GCamera(width=100,height=50,bounds=(0,0,1000,40))
+    # Too short for the camera, so it is centered vertically
+    assert (camera.x,camera.y) == (50,20)
+
+    camera.look_at(500,1000)
+    assert (camera.x,camera.y) == (500,20)
+    camera.look_at(-30,0)
+    assert camera.visible_rect() == (0,-5,100,45)
+    camera.look_at(2000,0)
+    assert (camera.left,camera.right) == (900,1000)
+
+    # New bounds move the camera back inside them
+    camera.bounds = (0,0,300,300)
+    assert (camera.x,camera.y) == (250,25)
+    camera.bounds = None
+    camera.look_at(-500,-500)
+    assert (camera.x,camera.y) == (-500,-500)
+
+
+def test_update():
+    target = types.SimpleNamespace(x=50,y=25)
+    camera = GCamera(width=100,height=50,target=target,margin=10)
+    camera.update()
+    assert (camera.x,camera.y) == (50,25)
+
+    # Within the margin, the camera stays put
+    (target.x,target.y) = (58,17)
+    camera.update()
+    assert (camera.x,camera.y) == (50,25)
+
+    # Past the margin, it follows just enough to keep the target at the margin
+    (target.x,target.y) = (80,0)
+    camera.update()
+    assert (camera.x,camera.y) == (70,10)
+
+    camera.bounds = (0,0,100,1000)
+    (target.x,target.y) = (300,300)
+    camera.update()
+    assert (camera.x,camera.y) == (50,290)
+
+    camera.target = None
+    camera.update()
+    assert (camera.x,camera.y) == (50,290)
+
+
+def test_overlaps():
+    camera = GCamera(width=100,height=50,x=200,y=100)
+    assert camera.overlaps(150,75,250,125)
+    assert camera.overlaps(0,0,150,75)
+    assert camera.overlaps(240,120,400,400)
+    assert not camera.overlaps(0,0,149,200)
+    assert not camera.overlaps(251,0,300,200)
+    assert not camera.overlaps(150,126,250,200)
+    # The turned rectangles are tested with their bounding boxes
+    assert camera.is_visible(GRectangle(x=140,y=100,width=10,height=30,angle=90))
+    assert not camera.is_visible(GRectangle(x=140,y=100,width=30,height=10,angle=90))
+
+
+def test_conversions():
+    camera = GCamera(width=100,height=50,x=200,y=100)
+    # A Point2 and a pair of numbers are both valid points
+    for point in [Point2(10,20),(10,20)]:
+        world = camera.to_world(point)
+        assert isinstance(world,Point2)
+        assert (world.x,world.y) == (160,95)
+        view = camera.to_view(world)
+        assert isinstance(view,Point2) and (view.x,view.y) == (10,20)
+    assert camera.to_view((150,75)) == Point2(0,0)
+    with pytest.raises(AssertionError):
+        camera.to_world((1,2,3))
+
+
+def test_view_camera():
+    view = GView()
+    camera = GCamera(width=100,height=50)
+    view.camera = camera
+    assert view.camera is camera
+    with pytest.raises(AssertionError):
+        view.camera = types.SimpleNamespace(_translate=None)
+    view.camera = None
+    assert view.camera is None
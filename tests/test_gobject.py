@@ -0,0 +1,186 @@
+"""
+Tests for the drawing caches and cached geometry of the shapes in game2d/gobject.py
+
+The rebuilds are counted by wrapping the _reset method of GRectangle, and the cached
+bounding boxes and matrices are checked against those of a new rectangle.
+"""
+import pytest
+
+pytest.importorskip('kivy')
+from game2d import GRectangle
+from game2d.gview import GView
+
+
+@pytest.fixture
+def resets(monkeypatch):
+    """
+    Returns a list that records every rebuild of a GRectangle drawing cache
+    """
+    calls = []
+    reset = GRectangle._reset
+    def counted(self):
+        calls.append(self)
+        reset(self)
+    monkeypatch.setattr(GRectangle,'_reset',counted)
+    return calls
+
+
+def test_setters_rebuild_once(resets):
+    rect = GRectangle(x=10,y=20,width=30,height=40,fillcolor='red')
+    assert rect._stale and resets == []
+    rect._validate()
+    assert resets == [rect] and not rect._stale
+
+    rect.width = 50
+    rect.height = 60
+    rect.fillcolor = 'blue'
+    rect.linecolor = 'black'
+    rect.linewidth = 2
+    assert rect._stale and len(resets) == 1
+    rect._validate()
+    rect._validate()
+    assert len(resets) == 2 and not rect._stale
+
+    # The position and angle are transforms, so they need no rebuild
+    rect.x = 100
+    rect.angle = 90
+    assert not rect._stale
+
+
+def test_draw_rebuilds_once(resets):
+    view = GView()
+    rect = GRectangle(width=30,height=40,fillcolor='red')
+    rect.draw(view)
+    rect.draw(view)
+    assert resets == [rect]
+    rect.fillcolor = 'green'
+    rect.width = 10
+    rect.draw(view)
+    rect.draw(view)
+    assert resets == [rect,rect]
+
+
+def test_batch_update(resets):
+    rect = GRectangle(width=30,height=40,fillcolor='red')
+    rect._validate()
+    with rect.batch_update():
+        rect.width = 50
+        with rect.batch_update():
+            rect.fillcolor = 'blue'
+            rect.height = 70
+        # The inner block does not rebuild, as the outer one is still open
+        assert rect._stale and len(resets) == 1
+        rect.linewidth = 3
+    assert len(resets) == 2 and not rect._stale
+    rect._validate()
+    assert len(resets) == 2
+
+    # A block with no changes does not rebuild
+    with rect.batch_update():
+        pass
+    assert len(resets) == 2
+
+
+def test_attached_rebuild(resets):
+    view = GView()
+    rect = GRectangle(width=30,height=40,fillcolor='red')
+    view.add(rect)
+    assert resets == [rect] and not view._pending
+    rect.width = 50
+    rect.fillcolor = 'blue'
+    assert view._pending == {rect}
+    view._flush()
+    view._flush()
+    assert resets == [rect,rect] and not view._pending
+
+    # A removed object is no longer rebuilt by the view
+    view.remove(rect)
+    rect.height = 10
+    assert not view._pending and rect._stale
+
+
+def test_stale_size(resets):
+    rect = GRectangle(width=30,height=40,fillcolor='red')
+    rect._validate()
+    rect.width = 50
+    assert rect._stale
+    # Reading the size brings the cache up to date first
+    assert rect.width == 50
+    assert resets == [rect,rect] and not rect._stale
+    rect.height = 60
+    assert rect.height == 60
+    assert len(resets) == 3 and not rect._stale
+    assert (rect.width,rect.height) == (50,60)
+    assert len(resets) == 3
+
+
+def _fresh(rect):
+    """
+    Returns a new rectangle with the same position, angle, scale, size and hitbox
+
+    Parameter rect: The rectangle to copy
+    Precondition: rect is a GRectangle
+    """
+    result = GRectangle(x=rect.x,y=rect.y,angle=rect.angle,width=rect.width,
+                        height=rect.height,hitbox=rect.hitbox)
+    # The constructor has no scale keyword
+    result.scale = rect.scale
+    return result
+
+
+def _same(matrix,other):
+    """
+    Returns True if the two matrices transform some sample points the same way
+    """
+    for point in [(0,0),(1,0),(0,1),(-7.5,3.25)]:
+        if matrix._transform(*point) != pytest.approx(other._transform(*point)):
+            return False
+    return True
+
+
+def test_cached_geometry():
+    rect = GRectangle(x=10,y=20,width=30,height=40)
+    changes = [('x',5),('y',-3),('angle',30),('scale',(2,0.5)),('width',12),
+               ('height',8),('hitbox',(1,2,3,4)),('angle',90),('scale',1.5),
+               ('hitbox',None),('x',-20),('angle',200)]
+    for (attr,value) in changes:
+        # Query everything first, so that there are cached values to go out of date
+        (rect._bbox(),rect.matrix,rect.inverse)
+        setattr(rect,attr,value)
+        fresh = _fresh(rect)
+        assert rect._bbox() == pytest.approx(fresh._compute_bbox()), attr
+        assert _same(rect.matrix,fresh.matrix), attr
+        assert _same(rect.inverse,fresh.inverse), attr
+
+
+def test_cached_queries(monkeypatch):
+    calls = {'bbox':0,'matrix':0}
+    compute = GRectangle._compute_bbox
+    build = GRectangle._build_matrix
+    def bbox(self):
+        calls['bbox'] += 1
+        return compute(self)
+    def matrix(self):
+        calls['matrix'] += 1
+        build(self)
+    monkeypatch.setattr(GRectangle,'_compute_bbox',bbox)
+    monkeypatch.setattr(GRectangle,'_build_matrix',matrix)
+
+    # A turned rectangle needs the matrix for its bounding box
+    rect = GRectangle(x=10,y=20,width=30,height=40,angle=45)
+    box = rect._bbox()
+    assert calls == {'bbox':1,'matrix':1}
+    for _ in range(3):
+        assert rect._bbox() is box
+        (rect.matrix,rect.inverse,rect.x,rect.width,rect.angle)
+    assert calls == {'bbox':1,'matrix':1}
+
+    # The same angle is not a change
+    rect.angle = 45
+    rect._bbox()
+    assert calls == {'bbox':1,'matrix':1}
+    rect.y = 0
+    assert rect._bbox() != box
+    rect._bbox()
+    rect.inverse
+    assert calls == {'bbox':2,'matrix':2}
@@ -0,0 +1,77 @@
+"""
+Tests for the tiles in game2d/gtile.py
+
+Textures need an OpenGL context, so these tests use stand-in textures, and check the
+texture coordinates that a tile computes without drawing it.
+"""
+import types
+import pytest
+
+pytest.importorskip('kivy')
+from game2d import gtile
+from game2d.gtile import GTile
+
+
+def _texture(width,height,uvpos=(0,0),uvsize=(1,1)):
+    """
+    Returns a stand-in for a texture of the given size and texture coordinates
+    """
+    return types.SimpleNamespace(width=width,height=height,uvpos=uvpos,uvsize=uvsize)
+
+
+def _tile(width,height,texture):
+    """
+    Returns a stand-in for a tile of the given size, with the given texture
+    """
+    return types.SimpleNamespace(width=width,height=height,_texture=texture)
+
+
+def test_can_wrap(monkeypatch):
+    tile = _tile(100,100,None)
+    square = _texture(64,32)
+    odd = _texture(100,60)
+    monkeypatch.setattr(gtile,'platform','linux')
+    assert GTile._can_wrap(tile,square) and GTile._can_wrap(tile,odd)
+    assert not GTile._can_wrap(tile,None)
+    assert not GTile._can_wrap(tile,_texture(64,64,(0.25,0),(0.5,1)))
+
+    # Only OpenGL ES 2 needs powers of two
+    for name in ('android','ios'):
+        monkeypatch.setattr(gtile,'platform',name)
+        assert GTile._can_wrap(tile,square) and not GTile._can_wrap(tile,odd)
+
+
+@pytest.mark.parametrize('uvs',[((0,0),(1,1)),((0.25,0.75),(0.5,-0.5)),
+                                ((0.9,0.1),(-0.4,0.3))])
+def test_mesh_matches_quad(monkeypatch,uvs):
+    # A flipped region of a texture (such as an image in an atlas page)
+    texture = _texture(30,20,*uvs)
+    tile = _tile(100,50,texture)
+    (x,y) = (-50,-25)
+    (u0,v0) = texture.uvpos
+    (su,sv) = texture.uvsize
+
+    quad = GTile._quad_coords(tile)
+    assert quad[:2] == (u0,v0) and quad[4:6] == (u0+su*100/30,v0+sv*50/20)
+    def coords(px,py):
+        # The texture coordinates of the quad at a point, by interpolating its corners
+        return (quad[0]+(quad[2]-quad[0])*(px-x)/100,quad[1]+(quad[5]-quad[1])*(py-y)/50)
+
+    monkeypatch.setattr(gtile,'Mesh',lambda **keywords: keywords)
+    mesh = GTile._build_mesh(tile,x,y)
+    vertices = mesh['vertices']
+    assert len(vertices) == 4*4*3*4
+    assert len(mesh['indices']) == 6*4*3
+    for square in range(0,len(vertices),16):
+        # Each square starts the image again, so it is the quad less whole images
+        skipped = set()
+        for pos in range(square,square+16,4):
+            (px,py,u,v) = vertices[pos:pos+4]
+            assert x <= px <= 50 and y <= py <= 25
+            assert min(u0,u0+su) <= u <= max(u0,u0+su)
+            assert min(v0,v0+sv) <= v <= max(v0,v0+sv)
+            (qu,qv) = coords(px,py)
+            skipped.add((round((qu-u)/su,9),round((qv-v)/sv,9)))
+        assert len(skipped) == 1
+        (cu,cv) = skipped.pop()
+        assert cu == int(cu) and cv == int(cv)
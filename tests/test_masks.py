@@ -0,0 +1,250 @@
+"""
+Tests for the collision masks in masks.py
+
+The PNG files are written by the tests, with every filter type, so that readAlpha is
+checked against known pixels. The mask operations are checked pixel by pixel.
+"""
+import os
+import math
+import random
+import struct
+import zlib
+import pytest
+from consts import *
+import masks
+
+numpy = pytest.importorskip('numpy')
+
+# The number of bytes in a pixel for each PNG color type
+CHANNELS = {0:1, 2:3, 3:1, 4:2, 6:4}
+
+
+def _paeth(a,b,c):
+    """
+    Returns the Paeth predictor of the bytes to the left, above and above left
+    """
+    p = a+b-c
+    (pa,pb,pc) = (abs(p-a),abs(p-b),abs(p-c))
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+
+def _filter(line,prior,kind,size):
+    """
+    Returns a row of pixel bytes encoded with the given PNG filter type
+
+    Parameter line: The bytes of the row
+    Precondition: line is a list of ints in 0..255
+
+    Parameter prior: The bytes of the row above (all 0 for the first row)
+    Precondition: prior is a list of ints in 0..255, the same length as line
+
+    Parameter kind: The filter type
+    Precondition: kind is an int in 0..4
+
+    Parameter size: The number of bytes in a pixel
+    Precondition: size is an int > 0
+    """
+    result = [kind]
+    for x in range(len(line)):
+        a = line[x-size] if x >= size else 0
+        b = prior[x]
+        c = prior[x-size] if x >= size else 0
+        guess = [0,a,b,(a+b) >> 1,_paeth(a,b,c)][kind]
+        result.append((line[x]-guess) % 256)
+    return result
+
+
+def _png(path,pixels,color,palette=None):
+    """
+    Writes the pixels to a PNG file, with a random filter type for each row
+
+    Parameter path: The file name
+    Precondition: path is a str
+
+    Parameter pixels: The pixel bytes, with shape (height,width*size), top row first
+    Precondition: pixels is a NumPy array of uint8
+
+    Parameter color: The PNG color type
+    Precondition: color is a key of CHANNELS
+
+    Parameter palette: The alpha of each palette entry (None for no tRNS chunk)
+    Precondition: palette is None or a bytes object
+    """
+    (height,stride) = pixels.shape
+    size = CHANNELS[color]
+    script = random.Random(stride)
+    data = []
+    prior = [0]*stride
+    for row in pixels.tolist():
+        data.extend(_filter(row,prior,script.randrange(5),size))
+        prior = row
+
+    def chunk(kind,body):
+        return (struct.pack('>I',len(body))+kind+body+
+                struct.pack('>I',zlib.crc32(kind+body)))
+
+    with open(path,'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR',struct.pack('>IIBBBBB',stride//size,height,8,color,0,0,0)))
+        if color == 3:
+            f.write(chunk(b'PLTE',bytes(range(256))*3))
+        if not palette is None:
+            f.write(chunk(b'tRNS',palette))
+        f.write(chunk(b'IDAT',zlib.compress(bytes(data))))
+        f.write(chunk(b'IEND',b''))
+
+
+@pytest.mark.parametrize('color',[6,4,3,2,0])
+def test_read_alpha(tmp_path,color):
+    rng = numpy.random.default_rng(color)
+    (width,height) = (37,23)
+    size = CHANNELS[color]
+    pixels = rng.integers(0,256,(height,width*size),dtype=numpy.uint8)
+    path = str(tmp_path/'image.png')
+    palette = None
+    if color == 3:
+        palette = bytes(rng.integers(0,256,100,dtype=numpy.uint8))
+    _png(path,pixels,color,palette)
+
+    alpha = masks.readAlpha(path)
+    assert alpha.shape == (height,width) and alpha.dtype == numpy.uint8
+    if color in (4,6):
+        expected = pixels[:,size-1::size]
+    elif color == 3:
+        # Palette entries past the tRNS chunk are opaque
+        table = numpy.array(list(palette)+[255]*156,dtype=numpy.uint8)
+        expected = table[pixels]
+    else:
+        expected = numpy.full((height,width),255)
+    assert (alpha == expected).all()
+
+
+def test_read_alpha_images(tmp_path):
+    import specs
+    alpha = masks.readAlpha(os.path.join(masks.IMAGE_FOLDER,'car1.png'))
+    assert alpha.shape[::-1] == specs.imageSize('car1.png')
+    assert 0 < (alpha >= MASK_ALPHA).sum() < alpha.size
+
+    assert masks.readAlpha(str(tmp_path/'nothing.png')) is None
+    path = tmp_path/'text.png'
+    path.write_bytes(b'not an image')
+    assert masks.readAlpha(str(path)) is None
+
+
+def _mask(seed,width,height):
+    """
+    Returns a seeded random mask, and the alpha channel it came from
+
+    Parameter seed: The seed of the pixels
+    Precondition: seed is an int
+
+    Parameter width: The width of the mask
+    Precondition: width is an int > 0
+
+    Parameter height: The height of the mask
+    Precondition: height is an int > 0
+    """
+    rng = numpy.random.default_rng(seed)
+    alpha = rng.integers(0,256,(height,width),dtype=numpy.uint8)
+    return (masks.CollisionMask.fromAlpha(alpha),alpha)
+
+
+def test_from_alpha():
+    (mask,alpha) = _mask(1,21,13)
+    assert (mask.width,mask.height) == (21,13)
+    assert mask.bits.shape == (13,3)
+    for y in range(13):
+        for x in range(21):
+            assert mask.contains(x+0.5,y+0.5) == (alpha[12-y,x] >= MASK_ALPHA)
+    assert not mask.contains(-0.5,0) and not mask.contains(21,0)
+    assert not mask.contains(0,13)
+
+
+def test_region_and_rotate():
+    (mask,alpha) = _mask(2,19,11)
+    part = mask.region(3,2,12,7)
+    assert (part.width,part.height) == (12,7)
+    for y in range(7):
+        for x in range(12):
+            assert part.contains(x,y) == mask.contains(x+3,y+2)
+
+    turned = mask.rotate(90)
+    assert (turned.width,turned.height) == (11,19)
+    for y in range(11):
+        for x in range(19):
+            # A counter-clockwise turn takes (x,y) to (height-1-y,x)
+            assert turned.contains(10-y,x) == mask.contains(x,y)
+    assert mask.rotate(90) is turned
+    assert mask.rotate(-270) is turned
+    assert mask.rotate(360) is mask
+    assert (turned.rotate(270).bits == mask.bits).all()
+    half = mask.rotate(180)
+    assert (half.bits == mask.rotate(90).rotate(90).bits).all()
+
+
+def _brute(mask1,l1,b1,mask0,l0,b0,box):
+    """
+    Returns True if the masks share an opaque pixel in the box, testing every pixel
+
+    The masks are placed with their bottom left corners at whole pixels.
+    """
+    (left,bottom,right,top) = box
+    for y in range(math.floor(bottom),math.ceil(top)):
+        for x in range(math.floor(left),math.ceil(right)):
+            if mask1.contains(x-l1,y-b1) and mask0.contains(x-l0,y-b0):
+                return True
+    return False
+
+
+def _sparse(seed,width,height):
+    """
+    Returns a seeded random mask with few opaque pixels
+
+    The masks are sparse, so that overlapping boxes do not always collide.
+    """
+    rng = numpy.random.default_rng(seed)
+    alpha = numpy.where(rng.random((height,width)) < 0.1,255,0).astype(numpy.uint8)
+    return masks.CollisionMask.fromAlpha(alpha)
+
+
+@pytest.mark.parametrize('seed',range(4))
+def test_collides(seed):
+    script = random.Random(seed)
+    (hits,misses) = (0,0)
+    for trial in range(150):
+        (w1,h1,w0,h0) = [script.randrange(1,40) for _ in range(4)]
+        mask1 = _sparse(trial,w1,h1)
+        mask0 = _sparse(trial+1000,w0,h0)
+        (l1,b1) = (script.randrange(-10,10),script.randrange(-10,10))
+        (l0,b0) = (script.randrange(-40,40),script.randrange(-40,40))
+        box = (max(l1,l0),max(b1,b0),min(l1+w1,l0+w0),min(b1+h1,b0+h0))
+        if script.random() < 0.3:
+            box = (box[0]+2.5,box[1]-1,box[2]-0.5,box[3])
+        if box[0] >= box[2] or box[1] >= box[3]:
+            continue
+        expected = _brute(mask1,l1,b1,mask0,l0,b0,box)
+        hits += expected
+        misses += not expected
+        assert masks.collides(mask1,l1+w1/2,b1+h1/2,mask0,l0+w0/2,b0+h0/2,box) == expected
+    assert hits > 0 and misses > 0
+
+
+def test_load_mask(tmp_path,monkeypatch):
+    monkeypatch.setattr(masks,'MASK_FOLDER',str(tmp_path/'masks'))
+    monkeypatch.setattr(masks,'_MASKS',{})
+    pixels = numpy.random.default_rng(5).integers(0,256,(9,60),dtype=numpy.uint8)
+    path = str(tmp_path/'image.png')
+    _png(path,pixels,6)
+
+    mask = masks.loadMask(path)
+    assert masks.loadMask(path) is mask
+    assert len(os.listdir(str(tmp_path/'masks'))) == 1
+
+    # A new session reads the mask from the disk cache
+    monkeypatch.setattr(masks,'_MASKS',{})
+    monkeypatch.setattr(masks,'readAlpha',lambda path: None)
+    cached = masks.loadMask(path)
+    assert cached.width == mask.width and (cached.bits == mask.bits).all()
+    assert masks.loadMask(str(tmp_path/'nothing.png')) is None
@@ -0,0 +1,144 @@
+"""
+Tests for the frame profiler in game2d/profiler.py and the frame loop of GameApp
+"""
+import json
+import types
+import pytest
+
+pytest.importorskip('kivy')
+from game2d import profiler
+from game2d.app import GameApp
+
+
+def _profile(frames,capacity=160):
+    """
+    Returns a profiler that has recorded the given frames with fixed timings
+
+    Frame n has the events ('update',n+1) and ('draw',2), with durations in milliseconds.
+
+    Parameter frames: The number of frames
+    Precondition: frames is an int >= 0
+
+    Parameter capacity: The event buffer size
+    Precondition: capacity is an int > 0
+    """
+    result = profiler.Profiler(capacity,1/60)
+    for n in range(frames):
+        start = result.begin_frame()
+        result.record('update',start,(n+1)*1000000)
+        result.record('draw',start,2000000)
+        result.end_frame(1,n % 2)
+    return result
+
+
+def test_summary():
+    summary = _profile(10).summary()
+    assert summary['frames'] == 10
+    assert summary['dropped'] == 5
+    assert summary['budget'] == pytest.approx(1000/60)
+    assert summary['frame']['count'] == 10
+
+    update = summary['phases']['update']
+    assert update['count'] == 10
+    assert update['mean'] == pytest.approx(5.5)
+    assert (update['p50'],update['p99'],update['max']) == (5.0,10.0,10.0)
+    assert summary['phases']['draw'] == {'count':10,'mean':2.0,'p50':2.0,'p99':2.0,
+                                         'max':2.0}
+
+
+def test_ring_buffer():
+    # 16 events and 2 frames fit, so only the last 8 frames of events are kept
+    summary = _profile(20,16).summary()
+    assert summary['frames'] == 20
+    assert summary['phases']['update']['count'] == 8
+    assert summary['phases']['update']['p50'] == 16.0
+    assert summary['frame']['count'] == 2
+
+    result = profiler.Profiler(16)
+    result.reset()
+    assert result.summary()['frame'] == {'count':0,'mean':0.0,'p50':0.0,'p99':0.0,
+                                         'max':0.0}
+
+
+def test_trace(tmp_path):
+    source = _profile(3)
+    trace = source.trace()
+    events = trace['traceEvents']
+    assert [e['name'] for e in events].count('frame') == 3
+    assert len(events) == 9
+    assert all(e['ph'] == 'X' for e in events)
+    assert [e['ts'] for e in events] == sorted(e['ts'] for e in events)
+    assert [e['args'] for e in events if e['name'] == 'frame'] == [{'steps':1}]*3
+    assert [e['args']['frame'] for e in events if e['name'] == 'update'] == [1,2,3]
+    assert trace['otherData'] == {'frames':3,'late':0,'over_budget':0,'dropped':1}
+
+    path = tmp_path/'trace.json'
+    source.write_trace(str(path))
+    with open(path) as f:
+        assert json.load(f) == trace
+
+
+def test_span():
+    assert profiler.active_profiler() is None
+    with profiler.span('idle') as s:
+        assert s is profiler._NULL_SPAN
+
+    result = profiler.Profiler(8)
+    result.activate()
+    try:
+        result.begin_frame()
+        with profiler.span('work'):
+            pass
+        result.end_frame()
+    finally:
+        result.deactivate()
+    assert profiler.active_profiler() is None
+    assert [e[0] for e in result.events()] == ['work']
+
+
+def _app(timestep,timer):
+    """
+    Returns a stand-in for a GameApp that logs the calls made by a frame
+
+    Parameter timestep: The fixed timestep (None for variable)
+    Precondition: timestep is None or a float > 0
+
+    Parameter timer: The frame timer
+    Precondition: timer is a Profiler or the null profiler
+    """
+    log = []
+    app = types.SimpleNamespace(_timestep=timestep,_maxsteps=3,_accumulator=0,
+                                _alpha=1.0,_frametimer=timer,log=log)
+    app.view = types.SimpleNamespace(clear=lambda : log.append('clear'),
+                                     _flush=lambda : log.append('flush'))
+    app.input = types.SimpleNamespace(refresh=lambda : log.append('input'))
+    app.update = lambda dt: log.append(dt)
+    app.draw = lambda : log.append('draw')
+    return app
+
+
+@pytest.mark.parametrize('timed',[False,True])
+def test_refresh(timed):
+    timer = profiler.Profiler(64) if timed else profiler._NULL_PROFILER
+    app = _app(None,timer)
+    GameApp._refresh(app,0.5)
+    assert app.log == ['clear',0.5,'draw','flush','input']
+
+    app = _app(0.25,timer)
+    GameApp._refresh(app,0.6)
+    assert app.log == ['clear',0.25,'input',0.25,'input','draw','flush']
+    assert app._alpha == pytest.approx(0.4)
+
+    # Only three steps are run, and the rest of the time is dropped
+    app.log.clear()
+    GameApp._refresh(app,1.2)
+    assert app.log.count(0.25) == 3
+    assert app._alpha == pytest.approx(0.2)
+
+    if timed:
+        summary = timer.summary()
+        assert summary['frames'] == 3
+        assert summary['dropped'] == 2
+        assert summary['phases']['update']['count'] == 6
+        assert summary['phases']['input']['count'] == 6
+        assert summary['phases']['clear']['count'] == 3
@@ -0,0 +1,130 @@
+"""
+Tests for recording and replaying play sessions in replay.py
+"""
+import random
+import pytest
+from consts import *
+import replay
+
+
+def _script(seed,frames):
+    """
+    Returns a seeded list of (mask,dt) frames that starts and keeps playing a level
+
+    The keys repeat for a while, as a player holds them, so the recording has runs.
+
+    Parameter seed: The seed of the keys and frame times
+    Precondition: seed is an int
+
+    Parameter frames: The number of frames
+    Precondition: frames is an int > 0
+    """
+    script = random.Random(seed)
+    result = [(replay.keyMask(['s']),1/60)]
+    while len(result) < frames:
+        keys = script.choice([[],[],['up'],['left'],['right'],['down'],['c'],['up','c']])
+        dt = script.choice([1/60,1/60,1/30])
+        result.extend([(replay.keyMask(keys),dt)]*script.randrange(1,20))
+    return result[:frames]
+
+
+def test_key_mask():
+    """
+    Key masks have one bit for each recorded key, and ignore the others
+    """
+    mask = replay.keyMask(['up','c','q'])
+    assert replay.isKeyDown(mask,'up')
+    assert replay.isKeyDown(mask,'c')
+    assert not replay.isKeyDown(mask,'down')
+    assert mask == replay.KEY_BITS['up'] | replay.KEY_BITS['c']
+    assert replay.keyMask([]) == 0
+
+
+def test_runs():
+    """
+    Identical frames are stored as a single run
+    """
+    recording = replay.Recording('easy1.json')
+    for x in range(100):
+        recording.append(1,1/60)
+    recording.append(1,1/30)
+    recording.append(0,1/30)
+    recording.append(0,1/30)
+    assert len(recording) == 103
+    assert recording._runs == [[100,1,1/60],[1,1,1/30],[2,0,1/30]]
+    assert list(recording.frames()) == [(1,1/60)]*100+[(1,1/30)]+[(0,1/30)]*2
+
+
+def test_round_trip(tmp_path):
+    """
+    A saved recording loads back frame for frame, and the Recorder writes the same file
+    """
+    frames = _script(1,5000)
+    recording = replay.Recording('complete.json',2.5)
+    for (mask,dt) in frames:
+        recording.append(mask,dt)
+    path = str(tmp_path / 'session.frog')
+    recording.save(path)
+
+    loaded = replay.Recording.load(path)
+    assert loaded.level == 'complete.json'
+    assert loaded.speed == 2.5
+    assert len(loaded) == len(frames)
+    assert list(loaded.frames()) == frames
+
+    other = str(tmp_path / 'recorded.frog')
+    recorder = replay.Recorder(other,'complete.json',2.5)
+    for (mask,dt) in frames:
+        recorder.record(mask,dt)
+    recorder.close()
+    recorder.close()
+    with open(path,'rb') as f1, open(other,'rb') as f2:
+        assert f1.read() == f2.read()
+
+
+def test_not_a_recording(tmp_path):
+    """
+    Loading a file that is not a recording is a ValueError
+    """
+    path = tmp_path / 'bad.frog'
+    path.write_bytes(b'PNG?'+bytes(40))
+    with pytest.raises(ValueError):
+        replay.Recording.load(str(path))
+    path.write_bytes(b'FR')
+    with pytest.raises(ValueError):
+        replay.Recording.load(str(path))
+
+
+def _outcome(session):
+    """
+    Returns the state of a session that a replay must reproduce
+
+    Parameter session: The session after a replay
+    Precondition: session is a Session object
+    """
+    sim = session.getSimulation()
+    frog = sim.getFrog()
+    return (session.getState(),session.getFrames(),session.getTime(),frog.x,frog.y,
+            frog.angle,sim.getLives(),sim.getTime())
+
+
+@pytest.mark.parametrize('name',['easy1.json','complete.json'])
+def test_replay_headless(tmp_path,capsys,name):
+    """
+    Replaying a recording reproduces the session that was recorded, every time
+    """
+    frames = _script(5,4000)
+    live = replay.Session(replay.loadJson(name),replay.loadJson(OBJECT_DATA))
+    recording = replay.Recording(name)
+    for (mask,dt) in frames:
+        live.update(mask,dt)
+        recording.append(mask,dt)
+    path = str(tmp_path / 'session.frog')
+    recording.save(path)
+
+    first = replay.replayHeadless(path)
+    second = replay.replayHeadless(path)
+    assert _outcome(first) == _outcome(live)
+    assert _outcome(second) == _outcome(live)
+    assert live.getSimulation().getLives() < FROG_LIVES
+    assert 'Replayed 4000 frames' in capsys.readouterr().out
@@ -0,0 +1,98 @@
+"""
+Tests for the compiled level specifications in specs.py
+"""
+import pytest
+from conftest import readJSON
+from consts import *
+import specs
+
+
+def test_image_size():
+    """
+    imageSize reads the PNG header, and is None for missing files
+    """
+    assert specs.imageSize('car1.png') == (114,64)
+    assert specs.imageSize('frog2.png') == (300,95)
+    assert specs.imageSize('nothing.png') is None
+
+
+def test_level_shape(level):
+    """
+    The level size, start and lane lists match the level file
+    """
+    data = readJSON('easy1.json')
+    spec = level('easy1.json')
+    assert (spec.columns,spec.rows) == tuple(data['size'])
+    assert spec.width == data['size'][0]*GRID_SIZE
+    assert spec.height == data['size'][1]*GRID_SIZE
+    assert spec.start == tuple(data['start'])
+    assert spec.startX == data['start'][0]*GRID_SIZE+GRID_SIZE//2
+    assert spec.startY == data['start'][1]*GRID_SIZE+GRID_SIZE//2
+    assert len(spec.lanes) == spec.rows
+
+    for kind,positions in ((LANE_ROAD,spec.roads),(LANE_WATER,spec.waters),
+                           (LANE_HEDGE,spec.hedges)):
+        assert positions == tuple(x for x in range(spec.rows)
+                                  if spec.lanes[x].kind == kind)
+    assert spec.moving == tuple(sorted(spec.roads+spec.waters))
+
+
+@pytest.mark.parametrize('name',['easy1.json','easy2.json','bigones.json',
+                                 'multihedge.json','roadsonly.json','complete.json'])
+def test_lanes_and_objects(level,name):
+    """
+    Every lane and object is compiled from its entry in the level file
+    """
+    data = readJSON(name)
+    hitboxes = readJSON(OBJECT_DATA)
+    spec = level(name)
+    width = spec.width
+    offscreen = data['offscreen']
+    for row in range(spec.rows):
+        entry = data['lanes'][row]
+        lane = spec.lanes[row]
+        assert lane.index == row
+        assert lane.kind == LANE_TYPES.get(entry['type'],LANE_HEDGE)
+        assert (lane.bottom,lane.top) == (row*GRID_SIZE,(row+1)*GRID_SIZE)
+        assert lane.wrapRight == width+offscreen*GRID_SIZE
+        if lane.speed < 0:
+            assert lane.wrapLeft == -4*GRID_SIZE
+        else:
+            assert lane.wrapLeft == -offscreen*GRID_SIZE
+        if lane.kind == LANE_GRASS:
+            assert lane.objects == ()
+            continue
+        assert len(lane.objects) == len(entry['objects'])
+        for (obj,item) in zip(lane.objects,entry['objects']):
+            info = hitboxes['images'][item['type']]
+            assert obj.source == item['type']+'.png'
+            assert obj.x == item['position']*GRID_SIZE+GRID_SIZE//2
+            assert obj.y == row*GRID_SIZE+GRID_SIZE//2
+            assert obj.angle == (180 if lane.speed < 0 else 0)
+            assert obj.hitbox == tuple(info['hitbox'])
+            assert (obj.width,obj.height) == specs.imageSize(obj.source)
+
+
+def test_frog(level):
+    """
+    The frog frames are cut from the sprite sheet with the object data format
+    """
+    frog = readJSON(OBJECT_DATA)['sprites'][FROG_KEY]
+    spec = level('easy1.json')
+    (rows,columns) = frog['format']
+    assert spec.frogSize == (300/columns,95/rows)
+    assert spec.frogHitboxes == tuple(map(tuple,frog['hitboxes']))
+    assert spec.safeSize == specs.imageSize(FROG_SAFE)
+
+
+def test_immutable(level):
+    """
+    Specifications cannot be changed once compiled
+    """
+    spec = level('easy1.json')
+    with pytest.raises(AttributeError):
+        spec.rows = 3
+    with pytest.raises(AttributeError):
+        spec.lanes[1].speed = 0
+    with pytest.raises(AttributeError):
+        del spec.lanes[1].objects[0].x
@@ -0,0 +1,155 @@
+"""
+Tests for the swept collisions in sim.py and game2d/collision.py
+
+Both functions are checked against sampling the motion, and against each other. The
+function in sim.py takes (l,t,r,b) boxes, and the one in game2d takes (left,bottom,
+right,top) boxes, so the tests convert between the two.
+"""
+import random
+import pytest
+import sim
+
+
+def _boxes(seed,count=400,reverse=False):
+    """
+    Returns a seeded list of (box1,box0,dx,dy) sweeps with (l,t,r,b) boxes
+
+    The coordinates are whole numbers, and the motions are often zero along an axis.
+
+    Parameter seed: The seed of the sweeps
+    Precondition: seed is an int
+
+    Parameter count: The number of sweeps
+    Precondition: count is an int >= 0
+
+    Parameter reverse: Whether the edges of a box may be reversed along an axis
+    Precondition: reverse is a bool
+    """
+    script = random.Random(seed)
+    def box():
+        (l,b) = (script.randrange(-40,40),script.randrange(-40,40))
+        (r,t) = (l+script.randrange(0,30),b+script.randrange(0,30))
+        if reverse and script.random() < 0.3:
+            (l,r) = (r,l)
+        if reverse and script.random() < 0.3:
+            (t,b) = (b,t)
+        return (l,t,r,b)
+    result = []
+    for _ in range(count):
+        dx = script.choice([0,script.randrange(-120,121)])
+        dy = script.choice([0,script.randrange(-120,121)])
+        result.append((box(),box(),dx,dy))
+    return result
+
+
+def _shift(box,dx,dy):
+    """
+    Returns the (l,t,r,b) box moved by (dx,dy)
+    """
+    (l,t,r,b) = box
+    return (l+dx,t+dy,r+dx,b+dy)
+
+
+def _sampled(box1,box0,dx,dy,samples=4000):
+    """
+    Returns the first sampled time in [0,1] at which the boxes overlap, or None
+
+    Parameter box1: The first box, which stays put
+    Precondition: box1 is a 4-element tuple (l,t,r,b)
+
+    Parameter box0: The second box, which moves by (dx,dy)
+    Precondition: box0 is a 4-element tuple (l,t,r,b)
+
+    Parameter dx: The horizontal displacement of box0
+    Precondition: dx is an int or float
+
+    Parameter dy: The vertical displacement of box0
+    Precondition: dy is an int or float
+
+    Parameter samples: The number of intervals
+    Precondition: samples is an int > 0
+    """
+    for step in range(samples+1):
+        time = step/samples
+        if sim.overlaps(box1,_shift(box0,dx*time,dy*time)):
+            return time
+    return None
+
+
+def _check(time,box1,box0,dx,dy):
+    """
+    Asserts that time is the first time that the moving boxes overlap
+
+    Touching edges may be lost to rounding at the exact time, so the boxes are tested
+    a hair later, and no sample may overlap a hair before.
+    """
+    sampled = _sampled(box1,box0,dx,dy)
+    if time is None:
+        assert sampled is None
+        return
+    assert 0 <= time <= 1
+    assert sampled is None or sampled >= time-1e-9
+    late = min(1,time+1e-9)
+    assert (sim.overlaps(box1,_shift(box0,dx*late,dy*late)) or
+            sim.overlaps(box1,_shift(box0,dx*time,dy*time)))
+
+
+@pytest.mark.parametrize('seed',range(3))
+def test_sim_sweep(seed):
+    for (box1,box0,dx,dy) in _boxes(seed,reverse=True):
+        time = sim.sweep(box1,box0,dx,dy)
+        _check(time,box1,box0,dx,dy)
+        assert (sim.sweep(box1,box0,0,0) == 0) == sim.overlaps(box1,box0)
+
+
+def test_sim_sweep_reversed():
+    # A reversed box is only tested at its near edge
+    assert sim.sweep((0,10,10,0),(5,5,-20,0),0,0) == 0
+    assert sim.sweep((0,10,10,0),(20,5,-20,0),0,0) == None
+    assert sim.sweep((0,10,10,0),(-10,5,-30,0),20,0) == 0.5
+    # Two boxes reversed along the same axis never intersect
+    assert sim.sweep((10,10,0,0),(5,5,-5,0),0,0) == None
+
+
+def _game2d(box):
+    """
+    Returns the (l,t,r,b) box as a game2d box (left,bottom,right,top)
+
+    A reversed axis becomes the point at its near edge, as overlaps tests it.
+    """
+    (l,t,r,b) = box
+    return (l,b,max(l,r),max(b,t))
+
+
+@pytest.mark.parametrize('seed',range(3))
+def test_sweeps_agree(seed):
+    collision = pytest.importorskip('game2d.collision')
+    for (box1,box0,dx,dy) in _boxes(seed,reverse=True):
+        (l1,t1,r1,b1) = box1
+        (l0,t0,r0,b0) = box0
+        if (r1 < l1 and r0 < l0) or (t1 < b1 and t0 < b0):
+            continue
+        expected = sim.sweep(box1,box0,dx,dy)
+        assert collision.sweep(_game2d(box1),(0,0),_game2d(box0),(dx,dy)) == expected
+
+        # Only the relative motion matters
+        result = collision.sweep(_game2d(box0),(dx+3,dy-5),_game2d(box1),(3,-5))
+        if expected is None:
+            assert result is None
+        else:
+            assert result == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('seed',range(3))
+def test_game2d_sweep(seed):
+    collision = pytest.importorskip('game2d.collision')
+    from game2d import GRectangle
+    for (box1,box0,dx,dy) in _boxes(seed,100):
+        time = collision.sweep(_game2d(box1),(0,0),_game2d(box0),(dx,dy))
+        _check(time,box1,box0,dx,dy)
+
+    # Objects are swept from their current bounding boxes
+    car = GRectangle(x=0,y=0,width=20,height=10)
+    frog = GRectangle(x=60,y=0,width=10,height=10,angle=90)
+    assert collision.sweep(car,(100,0),frog,(0,0)) == pytest.approx(0.45)
+    assert collision.sweep(car,(100,0),frog,(0,30)) is None